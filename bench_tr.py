@@ -0,0 +1,785 @@
+"""
+Benchmark do gerador de TR: Markdown, DOCX e ponta a ponta (gerar + serializar)
+nas variantes do formulário (termo.py, termo1.py/termo3.py e termo2.py), com
+tempo por documento e pico de memória (tracemalloc).
+
+Uso:
+    python bench_tr.py                          # mede e imprime
+    python bench_tr.py --json bench.json        # guarda os resultados
+    python bench_tr.py --comparar bench.json    # compara com uma medição anterior
+    python bench_tr.py --importacao             # importação a frio do tr_core x orçamento
+    python bench_tr.py --memoria-docx           # pico de RSS por DOCX: bytes x arquivo x partes
+    python bench_tr.py --incremental            # TR inteiro x só a seção alterada (Markdown + DOCX)
+    python bench_tr.py --clausulas              # DOCX colando as cláusulas prontas x renderizando tudo
+    python bench_tr.py --tabela-docx 5000       # tabela de N linhas no DOCX: API célula a célula x moldes lxml
+    python bench_tr.py --medicao 300000         # apuração da medição (6.1 + KPIs) com N OS/chamados
+    python bench_tr.py --itens 10000            # tabela de itens (CSV/XLSX): leitura, memória e renderização
+    python bench_tr.py --pdf 500                # PAC de N TRs em PDF no lote: PDFs/s sustentados, 1 x N processos
+    python bench_tr.py --comparacao 1000        # redline entre duas versões de um TR com N itens
+    python bench_tr.py --instrumentacao         # custo das etapas medidas: desligada x ligada
+    python bench_tr.py --previa 2000            # pré-visualização por seção x TR inteiro, com N itens
+    python bench_tr.py --repositorio 20000      # busca FTS5 de TRs parecidos num banco com N TRs
+    python bench_tr.py --semelhantes 5000       # busca de objeto parecido (TF-IDF + cosseno) com N textos
+    python bench_tr.py --llm                    # redação das seções: sequencial x em paralelo, no stub local
+
+Com --comparar, o script termina com código 1 se algum tempo piorar mais que
+--tolerancia (padrão 25%) — para rodar antes de publicar uma nova versão do
+template.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from tr_core import (
+    SECRETARIAS_PADRAO,
+    Documento,
+    formatar_secretarias,
+    monta_bloco,
+    montar_tr,
+    montar_tr_campos_livres,
+    montar_tr_secretarias,
+    render_markdown,
+    to_docx,
+)
+
+# Importação a frio de `import tr_core` (sem Streamlit nem python-docx)
+ORCAMENTO_IMPORTACAO_MS = 30.0
+
+CASOS = {
+    "objeto curto": dict(
+        objeto="Locação de veículos utilitários com motorista",
+        secretarias=["Secretaria Municipal de Saúde"],
+        vigencia_meses=12,
+        incluir_opcao_hibrida=True,
+        kpis_padrao=True,
+    ),
+    "objeto 5 KB, 11 secretarias": dict(
+        objeto="Contratação de serviços de manutenção predial preventiva e corretiva. " * 72,
+        secretarias=SECRETARIAS_PADRAO,
+        vigencia_meses=24,
+        incluir_opcao_hibrida=False,
+        kpis_padrao=False,
+    ),
+}
+
+# ----------------------------------
+# Variantes
+# ----------------------------------
+# Cada app é uma casca fina sobre um montador do tr_core; termo3.py usa o
+# mesmo montador de termo1.py.
+
+def _campos_livres(caso: dict) -> Documento:
+    # a primeira versão tem formulário próprio: as secretarias vão em "unidades"
+    return montar_tr_campos_livres(
+        objeto=caso["objeto"], unidades="; ".join(caso["secretarias"]), quantidades="", locais="",
+        prazos=f"{caso['vigencia_meses']} meses", regime="", normas="", sustentabilidade="", riscos="",
+        justificativas="", incluir_opcao_hibrida=caso["incluir_opcao_hibrida"], kpis_padrao=caso["kpis_padrao"],
+    )
+
+VARIANTES = {
+    "termo": _campos_livres,
+    "termo1": lambda caso: montar_tr_secretarias(**caso),
+    "termo2": lambda caso: montar_tr(**caso),
+}
+
+# ----------------------------------
+# Medição
+# ----------------------------------
+def cronometrar(funcao, repeticoes: int = 5, numero: int | None = None) -> float:
+    """Melhor tempo por chamada (s), com o número de chamadas por rodada escolhido pelo timeit."""
+    temporizador = timeit.Timer(funcao)
+    if numero is None:
+        numero, _ = temporizador.autorange()
+    return min(temporizador.repeat(repeat=repeticoes, number=numero)) / numero
+
+def pico_memoria(funcao) -> int:
+    """Pico de memória alocada (bytes) durante uma chamada."""
+    funcao()  # aquece caches e importações, que não contam como custo por documento
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def etapas(montar, caso: dict) -> dict:
+    documento = montar(caso)
+
+    def ponta_a_ponta():
+        documento = montar(caso)
+        return render_markdown(documento), to_docx(documento)
+
+    return {
+        "markdown": lambda: render_markdown(montar(caso)),
+        "docx": lambda: to_docx(documento),
+        "ponta a ponta": ponta_a_ponta,
+    }
+
+def medir(variantes=VARIANTES, repeticoes: int = 5, numero: int | None = None) -> dict:
+    resultados = {}
+
+    def registrar(nome, funcao):
+        resultados[nome] = {
+            "us": cronometrar(funcao, repeticoes, numero) * 1e6,
+            "pico_kb": pico_memoria(funcao) / 1024,
+        }
+        print(f"{nome:<58} {resultados[nome]['us']:>11.2f} µs  {resultados[nome]['pico_kb']:>9.1f} KB")
+
+    for nome_caso, caso in CASOS.items():
+        registrar(f"monta_bloco [{nome_caso}]", lambda: monta_bloco("Objeto detalhado", caso["objeto"]))
+        registrar(f"formatar_secretarias [{nome_caso}]", lambda: formatar_secretarias(caso["secretarias"]))
+
+    for nome_variante in variantes:
+        for nome_caso, caso in CASOS.items():
+            for etapa, funcao in etapas(VARIANTES[nome_variante], caso).items():
+                registrar(f"{nome_variante} {etapa} [{nome_caso}]", funcao)
+    return resultados
+
+def salvar(resultados: dict, caminho: str, repeticoes: int, numero: int | None) -> None:
+    Path(caminho).write_text(json.dumps({
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "repeticoes": repeticoes,
+        "numero": numero,  # None = automático (timeit.autorange); compare medições feitas do mesmo jeito
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }, ensure_ascii=False, indent=2), encoding="utf-8")
+
+def comparar(resultados: dict, caminho: str, tolerancia: float) -> list[str]:
+    """Imprime a variação de cada medida e devolve as que pioraram além da tolerância."""
+    anteriores = json.loads(Path(caminho).read_text(encoding="utf-8"))["resultados"]
+    regressoes = []
+    print(f"\nComparação com {caminho} (tolerância {tolerancia:.0%}):")
+    for nome, atual in resultados.items():
+        anterior = anteriores.get(nome)
+        if not anterior:
+            continue
+        variacao = atual["us"] / anterior["us"] - 1
+        marca = ""
+        if variacao > tolerancia:
+            marca = "  <-- REGRESSÃO"
+            regressoes.append(nome)
+        print(f"{nome:<58} {anterior['us']:>11.2f} -> {atual['us']:>11.2f} µs ({variacao:+.0%}){marca}")
+    return regressoes
+
+def medir_importacao(orcamento_ms: float, rodadas: int = 5) -> bool:
+    """
+    Tempo de `import tr_core` num interpretador novo (melhor de `rodadas`),
+    conferindo que nem o Streamlit nem o python-docx foram carregados.
+    """
+    import subprocess
+
+    codigo = (
+        "import sys, time; t = time.perf_counter(); import tr_core; t = time.perf_counter() - t; "
+        "print(t * 1e3, *[m for m in ('streamlit', 'docx') if m in sys.modules])"
+    )
+    medidas = []
+    for _ in range(rodadas):
+        saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True,
+                               cwd=Path(__file__).resolve().parent).stdout.split()
+        medidas.append(float(saida[0]))
+        pesados = saida[1:]
+    melhor = min(medidas)
+    print(f"import tr_core a frio: {melhor:.1f} ms (orçamento {orcamento_ms:.0f} ms)")
+    if pesados:
+        print(f"importação carregou {', '.join(pesados)}: deveria ser sob demanda")
+    return melhor <= orcamento_ms and not pesados
+
+SAIDAS_DOCX = ("bytes", "arquivo", "partes")
+
+def documento_grande(linhas: int) -> Documento:
+    """TR consolidado: o caso de 11 secretarias com uma tabela de itens de `linhas` linhas."""
+    from tr_core.modelo import Tabela
+
+    base = montar_tr(**CASOS["objeto 5 KB, 11 secretarias"])
+    itens = Tabela(
+        ("Item", "Descrição", "Unidade", "Qtde", "Valor unitário (R$)", "Valor total (R$)"),
+        [(str(i), f"Item de consumo nº {i} conforme especificação do anexo", "un", "10", "1.234,56", "12.345,60")
+         for i in range(1, linhas + 1)],
+        alinhamentos=("l", "l", "l", "r", "r", "r"),
+    )
+    return Documento((*base.blocos, itens))
+
+def pico_docx(saida: str, linhas: int, destino: str) -> dict:
+    """
+    Executado num processo novo (ver medir_memoria_docx): acréscimo do pico de
+    RSS e pico do tracemalloc ao gerar um DOCX grande por uma das saídas.
+    """
+    import resource
+
+    from tr_core.render_docx import escrever_docx, iterar_docx
+
+    documento = documento_grande(linhas)
+    to_docx(documento_grande(1))  # aquece o modelo base e as importações
+
+    def gerar():
+        if saida == "bytes":  # o que o download do Streamlit faz hoje
+            Path(destino).write_bytes(to_docx(documento))
+        elif saida == "arquivo":
+            escrever_docx(documento, destino)
+        else:
+            with open(destino, "wb") as arquivo:
+                for parte in iterar_docx(documento):
+                    arquivo.write(parte)
+
+    antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    gerar()
+    depois = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "rss_kb": depois - antes,
+        "pico_kb": pico_memoria(gerar) / 1024,
+        "docx_kb": Path(destino).stat().st_size / 1024,
+    }
+
+def medir_memoria_docx(linhas: int) -> dict:
+    """Cada saída num interpretador novo, para que o pico de RSS de uma não esconda o da outra."""
+    import subprocess
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for saida in SAIDAS_DOCX:
+            codigo = (
+                "import json, bench_tr; "
+                f"print(json.dumps(bench_tr.pico_docx({saida!r}, {linhas}, {str(Path(diretorio) / 'tr.docx')!r})))"
+            )
+            bruto = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True,
+                                   cwd=Path(__file__).resolve().parent).stdout
+            resultados[saida] = json.loads(bruto)
+            r = resultados[saida]
+            print(f"DOCX {linhas} linhas, saída {saida:<8} RSS +{r['rss_kb']:>8.0f} KB  "
+                  f"tracemalloc {r['pico_kb']:>8.0f} KB  (arquivo {r['docx_kb']:.0f} KB)")
+    return resultados
+
+def medir_incremental(repeticoes: int = 5) -> None:
+    """
+    Edição de um campo num TR com as seções 2, 3, 4 e 6.4 redigidas: montar e
+    serializar tudo de novo x remontar pelos fragmentos (só o quadro-resumo muda).
+    """
+    from itertools import count
+
+    from tr_core.incremental import MontadorIncremental
+
+    paragrafo = "Texto redigido da seção, com **rótulo** e detalhamento técnico do objeto. " * 6
+    redigidas = dict(
+        justificativa="\n\n".join([paragrafo] * 8),
+        solucao="\n".join(f"- **Item {i}:** {paragrafo}" for i in range(20)),
+        requisitos="\n".join(f"{i}. {paragrafo}" for i in range(1, 13)),
+        kpis="\n".join(f"- **KPI {i} (%):** {paragrafo}" for i in range(6)),
+    )
+    entradas = dict(CASOS["objeto curto"], **redigidas)
+    vigencias = count(1)
+    montador = MontadorIncremental()
+
+    def completo():
+        documento = montar_tr(**dict(entradas, vigencia_meses=next(vigencias)))
+        return render_markdown(documento), to_docx(documento)
+
+    def incremental():
+        montagem = montador.montar(**dict(entradas, vigencia_meses=next(vigencias)))
+        return montagem.markdown, montagem.docx()
+
+    incremental()
+    tempos = {nome: cronometrar(f, repeticoes) for nome, f in (("TR inteiro", completo), ("incremental", incremental))}
+    for nome, segundos in tempos.items():
+        print(f"edição da vigência, {nome:<11}: {segundos * 1e3:8.2f} ms (Markdown + DOCX)")
+    print(f"{tempos['TR inteiro'] / tempos['incremental']:.1f}x; seções refeitas: "
+          f"{', '.join(montador.montar(**dict(entradas, vigencia_meses=next(vigencias))).renderizadas)}")
+
+def tabela_pela_api(doc, tabela, estilo_id) -> None:
+    """Tabela célula a célula pela API do python-docx (o renderizador anterior), para comparação."""
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    t = doc.add_table(rows=1 + len(tabela.linhas), cols=len(tabela.cabecalho))
+    if estilo_id:
+        t._tbl.tblStyle_val = estilo_id
+    for i, linha in enumerate((tabela.cabecalho, *tabela.linhas)):
+        for celula, valor, alinhamento in zip(t.rows[i].cells, linha, tabela.alinhamentos):
+            p = celula.paragraphs[0]
+            run = p.add_run(str(valor))
+            if i == 0:
+                run.bold = True
+            if alinhamento == "r":
+                p.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+def medir_tabela_docx(linhas: int) -> None:
+    """Tabela de `linhas` itens no DOCX: célula a célula pela API x linhas clonadas de um molde (lxml)."""
+    from tr_core.modelo import Tabela
+    from tr_core.render_docx import _ESTILO_TABELA, _adicionar_tabela, _ids_de_estilo, _novo_documento, bytes_docx
+
+    tabela = documento_grande(linhas).blocos[-1]
+    assert type(tabela) is Tabela
+
+    def renderizar(adicionar):
+        doc = _novo_documento(None)
+        inicio = time.perf_counter()
+        adicionar(doc, tabela, _ids_de_estilo(doc)[_ESTILO_TABELA])
+        return time.perf_counter() - inicio, bytes_docx(doc)
+
+    renderizar(_adicionar_tabela)
+    tempos = {}
+    for nome, adicionar in (("API célula a célula", tabela_pela_api), ("moldes lxml", _adicionar_tabela)):
+        tempos[nome], docx = renderizar(adicionar)
+        print(f"tabela de {linhas} linhas, {nome:<19}: {tempos[nome] * 1e3:10.1f} ms ({len(docx) / 1024:.0f} KB)")
+    print(f"{tempos['API célula a célula'] / tempos['moldes lxml']:.0f}x")
+
+def medir_clausulas(repeticoes: int = 5) -> None:
+    """DOCX do TR com as cláusulas 4–6 coladas do fragmento já renderizado x todos os blocos pelo python-docx."""
+    from tr_core.clausulas import VIGENTES, clausulas_usadas
+    from tr_core.render_docx import _ids_de_estilo, _novo_documento, _renderizar_blocos, bytes_docx, montar_docx
+
+    documento = montar_tr(**CASOS["objeto curto"])
+
+    def sem_biblioteca():
+        doc = _novo_documento(None)
+        _renderizar_blocos(doc, documento.blocos, _ids_de_estilo(doc))
+        return bytes_docx(doc)
+
+    def com_biblioteca():
+        return bytes_docx(montar_docx(documento))
+
+    com_biblioteca()
+    usadas = clausulas_usadas(documento)
+    blocos_biblioteca = sum(len(VIGENTES[c].blocos) for c in usadas)
+    print(f"{len(usadas)} cláusula(s) da biblioteca, {blocos_biblioteca} de {len(documento.blocos)} blocos do TR")
+    tempos = {nome: cronometrar(f, repeticoes) for nome, f in (("renderizando tudo", sem_biblioteca), ("com as cláusulas", com_biblioteca))}
+    for nome, segundos in tempos.items():
+        print(f"DOCX {nome:<17}: {segundos * 1e3:8.2f} ms")
+    print(f"{tempos['renderizando tudo'] / tempos['com as cláusulas']:.1f}x")
+
+def registro_sintetico(diretorio: Path, eventos: int, itens: int = 40) -> tuple[Path, Path]:
+    """CSVs de itens e de OS/chamados (formato brasileiro: ";", vírgula decimal e dd/mm/aaaa)."""
+    import numpy as np
+
+    aleatorio = np.random.default_rng(18)
+    caminho_itens = diretorio / "itens.csv"
+    with caminho_itens.open("w", encoding="utf-8") as f:
+        f.write("Item;Descrição;Unidade;Quantidade\n")
+        for i in range(1, itens + 1):
+            f.write(f"{i};Serviço {i} do contrato;h;{eventos // itens * 14}\n")
+    inicio = np.datetime64("2026-01-01T00:00")
+    abertura = inicio + aleatorio.integers(0, 90 * 24 * 60, eventos).astype("timedelta64[m]")
+    atendimento = abertura + aleatorio.integers(5, 8 * 60, eventos).astype("timedelta64[m]")
+    solucao = atendimento + aleatorio.integers(30, 48 * 60, eventos).astype("timedelta64[m]")
+    prazo = abertura + np.timedelta64(48, "h")
+    colunas = {
+        "item": aleatorio.integers(1, itens + 1, eventos).astype(str),
+        "quantidade": np.char.replace(np.round(aleatorio.uniform(0.5, 8, eventos), 1).astype(str), ".", ","),
+        "abertura": abertura.astype(str),
+        "atendimento": atendimento.astype(str),
+        "solucao": solucao.astype(str),
+        "retrabalho": np.where(aleatorio.random(eventos) < 0.04, "sim", "não"),
+        "conforme": np.where(aleatorio.random(eventos) < 0.1, np.where(aleatorio.random(eventos) < 0.95, "sim", "não"), ""),
+        "prazo": prazo.astype(str),
+        "entrega": solucao.astype(str),
+        "horas_indisponivel": np.where(aleatorio.random(eventos) < 0.0005, "1,5", "0"),
+    }
+    # metade das datas no formato dd/mm/aaaa hh:mm, como exportam alguns sistemas
+    brasileiro = aleatorio.random(eventos) < 0.5
+    for nome in ("abertura", "prazo"):
+        iso = colunas[nome]
+        colunas[nome] = np.where(
+            brasileiro,
+            np.char.add(np.char.add(np.char.add(np.char.add(np.char.add(
+                [v[8:10] for v in iso], "/"), [v[5:7] for v in iso]), "/"), [v[0:4] for v in iso]),
+                [" " + v[11:16] for v in iso]),
+            iso,
+        )
+    caminho_eventos = diretorio / "eventos.csv"
+    with caminho_eventos.open("w", encoding="utf-8") as f:
+        f.write(";".join(colunas) + "\n")
+        for linha in zip(*(c.tolist() for c in colunas.values())):
+            f.write(";".join(linha) + "\n")
+    return caminho_itens, caminho_eventos
+
+def medir_medicao(eventos: int) -> None:
+    """Leitura dos CSVs, apuração vetorizada e boletim (Markdown + DOCX) com N OS/chamados."""
+    from tr_core.medicao import documento_medicao, ler_eventos, ler_itens, medir
+    from tr_core.render_docx import to_docx
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_itens, caminho_eventos = registro_sintetico(Path(diretorio), eventos)
+        tamanho = caminho_eventos.stat().st_size
+        inicio = time.perf_counter()
+        itens, registro = ler_itens(caminho_itens), ler_eventos(caminho_eventos)
+        lido = time.perf_counter()
+        medicao = medir(itens, registro, "2026-03-01", "2026-04-01")
+        apurado = time.perf_counter()
+        documento = documento_medicao(medicao)
+        markdown, docx = render_markdown(documento), to_docx(documento)
+        fim = time.perf_counter()
+    print(f"registro: {eventos} OS/chamados, {tamanho / 1e6:.1f} MB; {len(itens)} itens; "
+          f"{medicao.eventos} no período")
+    print(f"leitura dos CSVs : {lido - inicio:8.2f} s")
+    print(f"apuração (NumPy) : {(apurado - lido) * 1e3:8.1f} ms")
+    print(f"boletim MD + DOCX: {(fim - apurado) * 1e3:8.1f} ms ({len(markdown)} caracteres, {len(docx)} bytes)")
+    for nome, valor in medicao.indicadores.items():
+        print(f"  {nome}: {valor:.2f}")
+
+def planilha_sintetica(diretorio: Path, itens: int, formato: str = "csv") -> Path:
+    """Tabela de itens de uma ARP: linhas de título, cabeçalho usual e valores no formato brasileiro."""
+    import random
+
+    aleatorio = random.Random(19)
+    unidades = ("un", "cx", "pct", "resma", "kg", "l", "fr", "m")
+    linhas = [
+        ("Item", "Descrição do item", "Unid.", "Qtde", "Valor unit. (R$)", "Valor total (R$)"),
+        *((str(i), f"Item de consumo nº {i} conforme especificação do anexo, marca de referência ou similar",
+           aleatorio.choice(unidades), str(aleatorio.randint(1, 5000)),
+           f"{aleatorio.randint(1, 200000) / 100:.2f}".replace(".", ","), "")
+          for i in range(1, itens + 1)),
+    ]
+    titulo = (("PREFEITURA MUNICIPAL DE BRASNORTE",), ("Ata de Registro de Preços nº 12/2026",), ())
+    caminho = diretorio / f"itens.{formato}"
+    if formato == "xlsx":
+        from openpyxl import Workbook
+
+        pasta = Workbook(write_only=True)
+        planilha = pasta.create_sheet()
+        for linha in (*titulo, *linhas):
+            planilha.append(linha)
+        pasta.save(caminho)
+    else:
+        with caminho.open("w", encoding="utf-8") as f:
+            f.writelines(";".join(linha) + "\n" for linha in (*titulo, *linhas))
+    return caminho
+
+def medir_itens(itens: int) -> None:
+    """
+    Importação da tabela de itens (CSV e, com openpyxl, XLSX) com N/10 e N
+    itens: tempo, pico de memória da leitura x tamanho das colunas e
+    renderização do TR com a tabela.
+    """
+    from tr_core.itens import formatar_moeda, ler_tabela
+
+    formatos = ["csv"]
+    try:
+        import openpyxl  # noqa: F401
+
+        formatos.append("xlsx")
+    except ImportError:
+        print("openpyxl não instalado: só CSV")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for formato in formatos:
+            for quantidade in (max(itens // 10, 1), itens):
+                caminho = planilha_sintetica(Path(diretorio), quantidade, formato)
+                inicio = time.perf_counter()
+                tabela = ler_tabela(caminho)
+                tempo = time.perf_counter() - inicio
+                pico = pico_memoria(lambda: ler_tabela(caminho))
+                print(f"{formato:<4} {quantidade:>7} itens: leitura {tempo * 1e3:8.1f} ms  "
+                      f"pico {pico / 1024:8.0f} KB  colunas {tabela.nbytes() / 1024:7.0f} KB "
+                      f"({tabela.nbytes() / quantidade:.0f} B/item)  total R$ {formatar_moeda(tabela.total_centavos)}")
+
+    documento = montar_tr(**CASOS["objeto curto"], itens=tabela)
+    inicio = time.perf_counter()
+    markdown = render_markdown(documento)
+    meio = time.perf_counter()
+    docx = to_docx(documento)
+    fim = time.perf_counter()
+    print(f"TR com {len(tabela)} itens: Markdown {(meio - inicio) * 1e3:.1f} ms ({len(markdown) / 1e6:.1f} MB), "
+          f"DOCX {(fim - meio) * 1e3:.0f} ms ({len(docx) / 1e6:.1f} MB)")
+
+def objetos_sinteticos(quantidade: int):
+    """Objetos variados (combinações de ação, item e complemento) para povoar o repositório."""
+    import random
+
+    acoes = ("Aquisição de", "Locação de", "Contratação de serviços de", "Registro de preços para", "Manutenção de")
+    itens = ("veículos utilitários", "material de expediente", "medicamentos da farmácia básica", "pneus",
+             "equipamentos de informática", "gêneros alimentícios", "combustível", "mobiliário escolar",
+             "serviços de limpeza predial", "ambulâncias", "software de gestão", "uniformes escolares")
+    complementos = ("para a Secretaria de Saúde", "com motorista", "para as escolas municipais", "da frota",
+                    "sob demanda", "para a zona rural", "com instalação", "para o hospital municipal")
+    aleatorio = random.Random(14)
+    for i in range(quantidade):
+        yield f"{aleatorio.choice(acoes)} {aleatorio.choice(itens)} {aleatorio.choice(complementos)} (lote {i})"
+
+def medir_repositorio(quantidade: int) -> None:
+    """Grava `quantidade` TRs num banco temporário e mede a busca por objetos parecidos."""
+    import statistics
+
+    from tr_core.repositorio import Repositorio
+
+    base = CASOS["objeto curto"]
+    markdown = render_markdown(montar_tr(**base))  # o custo medido é o do banco, não o da geração
+    with tempfile.TemporaryDirectory() as diretorio:
+        repositorio = Repositorio(Path(diretorio) / "trs.sqlite3")
+        inicio = time.perf_counter()
+        for objeto in objetos_sinteticos(quantidade):
+            repositorio.salvar(dict(base, objeto=objeto), markdown)
+        segundos = time.perf_counter() - inicio
+        tamanho = sum(f.stat().st_size for f in Path(diretorio).iterdir()) / 2**20
+        print(f"repositório: {quantidade} TRs gravados em {segundos:.1f} s "
+              f"({quantidade / segundos:.0f} TRs/s), {tamanho:.1f} MB")
+
+        consultas = ("locação de veículos com motorista", "medicamentos para o hospital", "pneus da frota",
+                     "limpeza predial", "software de gestão escolar", "aquisição de uniformes")
+        tempos = []
+        for consulta in consultas:
+            for _ in range(20):
+                inicio = time.perf_counter()
+                resultados = repositorio.buscar(consulta)
+                tempos.append(time.perf_counter() - inicio)
+            print(f"  {consulta!r}: {resultados[0].objeto if resultados else '-'}")
+        print(f"busca (10 mais parecidos): mediana {statistics.median(tempos) * 1e3:.2f} ms, "
+              f"máximo {max(tempos) * 1e3:.2f} ms")
+
+def medir_semelhantes(quantidade: int) -> None:
+    """Índice de objetos parecidos com `quantidade` textos em cache: montagem e tempo por busca."""
+    from tr_core.semelhantes import IndiceSemelhantes
+
+    objetos = list(objetos_sinteticos(quantidade))
+    indice = IndiceSemelhantes()
+    inicio = time.perf_counter()
+    for objeto in objetos:
+        indice.adicionar(objeto, objeto)
+    indice.buscar("aquecimento")  # monta a matriz TF-IDF
+    print(f"índice de semelhantes: {len(indice)} objetos em {(time.perf_counter() - inicio) * 1e3:.0f} ms")
+    alvo = objetos[len(objetos) // 2]
+    consultas = {
+        alvo.upper().replace("(", "- ").replace(")", ""): "grafia",
+        alvo.replace(" com ", " c/ ").replace(" para ", " p/ ").replace("ç", "c").replace("ã", "a"): "grafia",
+        "Aquisição de ambulâncias para o hospital": "objeto novo",
+    }
+    for consulta, tipo in consultas.items():
+        segundos = cronometrar(lambda: indice.buscar(consulta))
+        similaridade, objeto, _ = indice.buscar(consulta)[0]
+        print(f"  {tipo:<11} {segundos * 1e6:8.0f} µs  {similaridade:.2f}  {consulta!r} -> {objeto!r}")
+
+def medir_pdf(quantidade: int, processos: int | None = None) -> None:
+    """
+    PDF de um TR (x DOCX) e um PAC sintético de `quantidade` objetos em PDF
+    pela geração em lote, com 1 processo e com o pool: PDFs/s sustentados,
+    contando a partida dos trabalhadores.
+    """
+    import os
+
+    from tr_core.lote import gerar_lote
+    from tr_core.render_pdf import to_pdf
+
+    documento = montar_tr(**CASOS["objeto curto"])
+    pdf = to_pdf(documento)
+    print(f"TR padrão: PDF {cronometrar(lambda: to_pdf(documento)) * 1e3:.2f} ms ({len(pdf) / 1024:.0f} KB), "
+          f"DOCX {cronometrar(lambda: to_docx(documento)) * 1e3:.2f} ms")
+
+    base = {k: v for k, v in CASOS["objeto curto"].items() if k != "objeto"}
+    entradas = [dict(base, objeto=objeto, municipio="Brasnorte-MT") for objeto in objetos_sinteticos(quantidade)]
+    processos = processos or os.cpu_count() or 1
+    for n in sorted({1, processos}):
+        with tempfile.TemporaryDirectory() as diretorio:
+            resultado = gerar_lote(entradas, diretorio, processos=n, formatos=("pdf",))
+            tamanho = sum(a.stat().st_size for a in resultado.arquivos) / 2**20
+        print(f"PAC com {quantidade} TRs, {n} processo(s): {resultado.segundos:.2f} s — "
+              f"{resultado.docs_por_segundo:.0f} PDFs/s ({tamanho:.1f} MB)")
+
+def medir_comparacao(itens: int) -> None:
+    """
+    Duas versões de um TR com `itens` itens (vigência, secretarias, KPIs e
+    justificativa mudados; itens alterados, incluídos e removidos): tempo do
+    alinhamento, do redline em Markdown e do DOCX com controle de alterações.
+    """
+    from tr_core.comparacao import comparar, redline_docx, redline_markdown
+    from tr_core.itens import TabelaItens
+
+    def tabela(revisada: bool) -> TabelaItens:
+        tabela = TabelaItens()
+        for i in range(1, itens + 1):
+            if revisada and i == itens // 2:
+                continue
+            quantidade = i % 13 + 1 + (5 if revisada and i % 100 == 10 else 0)
+            tabela.acrescentar(str(i), f"Item {i}: material de consumo tipo {i % 17}", "un", quantidade, 12.5 + i)
+            if revisada and i == itens * 4 // 5:
+                tabela.acrescentar(f"{i}A", "Item incluído na revisão", "cx", 3, 99.9)
+        return tabela
+
+    base = dict(CASOS["objeto curto"], data="01/10/2026")
+    antes = montar_tr(**base, itens=tabela(False))
+    depois = montar_tr(**dict(base, vigencia_meses=24, kpis_padrao=False),
+                       justificativa="A contratação é necessária para abastecer as unidades de saúde.",
+                       itens=tabela(True))
+    comparacao = comparar(antes, depois)
+    resumo = comparacao.resumo()
+    print(f"TR com {itens} itens: {resumo['alterada']} cláusula(s) alterada(s), {resumo['incluída']} incluída(s), "
+          f"{resumo['removida']} removida(s), {resumo['inalterada']} inalterada(s)")
+    print(f"  comparar           {cronometrar(lambda: comparar(antes, depois), numero=1) * 1e3:8.1f} ms")
+    print(f"  redline Markdown   {cronometrar(lambda: redline_markdown(comparacao), numero=1) * 1e3:8.1f} ms")
+    print(f"  só as alterações   {cronometrar(lambda: redline_markdown(comparacao, True), numero=1) * 1e3:8.1f} ms")
+    print(f"  redline DOCX       {cronometrar(lambda: redline_docx(comparacao), repeticoes=3, numero=1) * 1e3:8.0f} ms")
+
+def medir_previa(itens: int) -> None:
+    """
+    O que a pré-visualização envia ao navegador num TR com `itens` itens e as
+    seções redigidas: o Markdown inteiro x só cabeçalho e títulos (seções
+    fechadas) x a maior seção aberta; e o tempo para dividir o TR em seções.
+    """
+    from tr_core.itens import TabelaItens
+    from tr_core.previa import secoes_previa
+
+    tabela = TabelaItens()
+    for i in range(1, itens + 1):
+        tabela.acrescentar(str(i), f"Item {i}: material de consumo tipo {i % 17}", "un", i % 13 + 1, 12.5 + i)
+    redigida = "Texto redigido com apoio de IA, revisado pela secretaria demandante. " * 60
+    documento = montar_tr(**CASOS["objeto curto"], itens=tabela, justificativa=redigida,
+                          solucao=redigida, requisitos=redigida, kpis=redigida)
+    markdown = render_markdown(documento)
+    secoes = secoes_previa(documento)
+    fechadas = sum(len(s.markdown.encode("utf-8")) if s.titulo is None else len(s.titulo.encode("utf-8"))
+                   for s in secoes)
+    maior = max((s for s in secoes if s.titulo), key=lambda s: len(s.markdown))
+    print(f"TR com {itens} itens: Markdown inteiro {len(markdown.encode('utf-8')) / 1024:.0f} KB por execução")
+    print(f"  seções fechadas     {fechadas / 1024:8.1f} KB ({len(secoes) - 1} seções)")
+    print(f"  maior seção aberta  {len(maior.markdown.encode('utf-8')) / 1024:8.1f} KB ({maior.titulo[:40]})")
+    print(f"  dividir em seções   {cronometrar(lambda: secoes_previa(documento)) * 1e3:8.2f} ms (blocos já renderizados)")
+
+def medir_instrumentacao() -> None:
+    """
+    Custo da instrumentação (tr_core.instrumentacao) por chamada, numa função
+    vazia, e num TR completo (montar + Markdown + DOCX): sem decorador,
+    desligada e ligada (sem log).
+    """
+    from tr_core import instrumentacao
+
+    def vazia():
+        return None
+
+    decorada = instrumentacao.instrumentada("vazia")(vazia)
+    caso = CASOS["objeto curto"]
+
+    def tr():
+        documento = montar_tr(**caso)
+        return render_markdown(documento), to_docx(documento)
+
+    tr()  # cache de cláusulas e modelo base prontos antes de medir
+    instrumentacao.desativar()
+    sem = cronometrar(vazia)
+    desligada = cronometrar(decorada)
+    instrumentacao.ativar()
+    ligada = cronometrar(decorada)
+    # rodadas alternadas (vale a melhor de cada), para o ruído da máquina não pesar de um lado só
+    tr_desligada = tr_ligada = float("inf")
+    for _ in range(5):
+        instrumentacao.desativar()
+        tr_desligada = min(tr_desligada, cronometrar(tr, repeticoes=1))
+        instrumentacao.ativar()
+        tr_ligada = min(tr_ligada, cronometrar(tr, repeticoes=1))
+    instrumentacao.desativar()
+    print(f"função vazia: {sem * 1e9:.0f} ns; decorada, desligada {desligada * 1e9:.0f} ns, ligada {ligada * 1e9:.0f} ns")
+    print(f"TR completo: desligada {tr_desligada * 1e3:.2f} ms, ligada {tr_ligada * 1e3:.2f} ms "
+          f"({(tr_ligada / tr_desligada - 1):+.1%})")
+    for linha in instrumentacao.resumo():
+        if linha["etapa"] != "vazia":
+            print(f"  {linha['etapa']:<16} {linha['media_ms']:7.2f} ms  {linha['tamanho_medio'] or '':>8}")
+
+def medir_modelo_docx() -> None:
+    """Ponto de partida do DOCX: pacote padrão lido do disco x cópia do modelo em memória."""
+    from docx import Document
+
+    from tr_core.base_docx import novo_documento
+
+    novo_documento()
+    for nome, fabrica in (("Document() a frio", Document), ("novo_documento() (cópia)", novo_documento)):
+        print(f"{nome}: {cronometrar(fabrica) * 1e3:8.3f} ms/documento")
+
+def medir_redacao(atraso: float) -> None:
+    """Redação das 4 seções contra o stub local (sem cache): limite 1 x limite 4 x falhas."""
+    from tr_core.llm import CacheEmDisco, ClienteOpenAI, ServicoLLM
+    from tr_core.llm_stub import StubLLM
+    from tr_core.redacao import SECOES, redigir_secoes
+
+    objeto = CASOS["objeto curto"]["objeto"]
+    with StubLLM(atraso=atraso) as stub, tempfile.TemporaryDirectory() as diretorio:
+        for limite in (1, len(SECOES)):
+            # cache novo a cada rodada, para medir as chamadas e não o disco
+            servico = ServicoLLM(ClienteOpenAI(base_url=stub.url), CacheEmDisco(f"{diretorio}/{limite}"))
+            resultado = redigir_secoes(objeto, servico=servico, limite=limite)
+            print(f"redação, limite {limite}: {resultado.segundos:6.2f} s, "
+                  f"{len(resultado.textos)} seção(ões) redigida(s), {servico.chamadas_api} chamada(s)")
+        servico = ServicoLLM(ClienteOpenAI(base_url=stub.url), CacheEmDisco(f"{diretorio}/timeout"))
+        resultado = redigir_secoes(objeto, servico=servico, timeout=atraso * 5)
+        print(f"redação, timeout {atraso * 5:.2f} s: {resultado.segundos:6.2f} s, fallback em {sorted(resultado.falhas)}")
+
+    with StubLLM(falhar=True) as stub, tempfile.TemporaryDirectory() as diretorio:
+        servico = ServicoLLM(ClienteOpenAI(base_url=stub.url, timeout=5), CacheEmDisco(diretorio))
+        resultado = redigir_secoes(objeto, servico=servico)
+        print(f"redação, endpoint com erro: fallback em {sorted(resultado.falhas)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", type=int, default=None, help="chamadas por rodada (padrão: automático)")
+    parser.add_argument("-r", "--repeticoes", type=int, default=5, help="rodadas por medida (vale a melhor)")
+    parser.add_argument("--variantes", default=",".join(VARIANTES), help="ex.: termo2,termo3")
+    parser.add_argument("--json", metavar="ARQUIVO", help="grava os resultados em JSON")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="JSON de uma medição anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita no --comparar")
+    parser.add_argument("--importacao", action="store_true", help="mede a importação a frio do tr_core")
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_IMPORTACAO_MS,
+                        help="tempo máximo aceito para a importação a frio")
+    parser.add_argument("--memoria-docx", action="store_true", help="pico de memória por DOCX grande, por saída")
+    parser.add_argument("--linhas", type=int, default=5000, help="linhas da tabela no --memoria-docx")
+    parser.add_argument("--tabela-docx", type=int, metavar="N", help="tabela de N linhas no DOCX: API x moldes lxml")
+    parser.add_argument("--docx-base", action="store_true", help="compara Document() x cópia do modelo base")
+    parser.add_argument("--incremental", action="store_true", help="TR inteiro x só a seção alterada")
+    parser.add_argument("--clausulas", action="store_true", help="DOCX com as cláusulas prontas x renderizando tudo")
+    parser.add_argument("--medicao", type=int, metavar="N", help="apuração da medição com N OS/chamados")
+    parser.add_argument("--itens", type=int, metavar="N", help="importação da tabela de itens com N itens")
+    parser.add_argument("--pdf", type=int, metavar="N", help="PAC de N TRs em PDF na geração em lote")
+    parser.add_argument("-j", "--processos", type=int, default=None, help="processos no --pdf (padrão: nº de CPUs)")
+    parser.add_argument("--comparacao", type=int, metavar="N", help="redline entre duas versões de um TR com N itens")
+    parser.add_argument("--previa", type=int, metavar="N", help="pré-visualização por seção, TR com N itens")
+    parser.add_argument("--instrumentacao", action="store_true", help="custo das etapas medidas: desligada x ligada")
+    parser.add_argument("--repositorio", type=int, metavar="N", help="busca FTS5 num repositório com N TRs")
+    parser.add_argument("--semelhantes", type=int, metavar="N", help="busca de objeto parecido com N textos")
+    parser.add_argument("--llm", action="store_true", help="mede a redação paralela das seções no stub local")
+    parser.add_argument("--atraso", type=float, default=0.02, help="pausa do stub entre as partes (s)")
+    args = parser.parse_args()
+
+    if args.llm:
+        medir_redacao(args.atraso)
+    elif args.importacao:
+        sys.exit(0 if medir_importacao(args.orcamento_ms) else 1)
+    elif args.memoria_docx:
+        medir_memoria_docx(args.linhas)
+    elif args.docx_base:
+        medir_modelo_docx()
+    elif args.semelhantes:
+        medir_semelhantes(args.semelhantes)
+    elif args.repositorio:
+        medir_repositorio(args.repositorio)
+    elif args.incremental:
+        medir_incremental(args.repeticoes)
+    elif args.clausulas:
+        medir_clausulas(args.repeticoes)
+    elif args.tabela_docx:
+        medir_tabela_docx(args.tabela_docx)
+    elif args.medicao:
+        medir_medicao(args.medicao)
+    elif args.itens:
+        medir_itens(args.itens)
+    elif args.pdf:
+        medir_pdf(args.pdf, args.processos)
+    elif args.comparacao:
+        medir_comparacao(args.comparacao)
+    elif args.instrumentacao:
+        medir_instrumentacao()
+    elif args.previa:
+        medir_previa(args.previa)
+    else:
+        escolhidas = [v.strip() for v in args.variantes.split(",") if v.strip()]
+        desconhecidas = set(escolhidas) - set(VARIANTES)
+        if desconhecidas:
+            parser.error(f"variante(s) desconhecida(s): {', '.join(sorted(desconhecidas))}")
+        inicio = time.perf_counter()
+        resultados = medir(escolhidas, args.repeticoes, args.n)
+        print(f"\n{len(resultados)} medida(s) em {time.perf_counter() - inicio:.0f} s")
+        regressoes = comparar(resultados, args.comparar, args.tolerancia) if args.comparar else []
+        if args.json:
+            salvar(resultados, args.json, args.repeticoes, args.n)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}.")
+            sys.exit(1)
@@ -0,0 +1,36 @@
+"""
+Pré-visualização do TR nos apps Streamlit (termo*.py), seção por seção.
+
+Cada seção é um st.fragment com um seletor. Fechada, só o título e o tamanho
+vão para o navegador. Ao abrir, só aquele fragmento é reexecutado e só o
+Markdown daquela seção é enviado, sem reexecutar a página nem reenviar as
+outras seções. O Markdown de cada seção já vem pronto do servidor
+(tr_core.previa; no termo2.py, guardado no cache de documentos), então abrir
+e fechar uma seção não gera nada de novo.
+"""
+import streamlit as st
+
+from tr_core.previa import SecaoPrevia
+
+def _tamanho(texto: str) -> str:
+    return f"{len(texto.encode('utf-8')) / 1024:.1f} KB".replace(".", ",")
+
+@st.fragment
+def _secao(secao: SecaoPrevia, chave: str) -> None:
+    with st.container(border=True):
+        if st.toggle(f"**{secao.titulo}** · {_tamanho(secao.markdown)}", key=chave):
+            st.markdown(secao.markdown)
+
+def mostrar_previa(secoes: tuple, prefixo: str = "previa") -> None:
+    """
+    Cabeçalho do TR e um bloco recolhido por seção. O estado aberto/fechado
+    fica no session_state, pelo título da seção, e vale também para o
+    próximo TR gerado na sessão.
+    """
+    st.markdown("### Pré-visualização")
+    st.caption("Abra uma seção para ver o texto; o documento completo está nos downloads acima.")
+    for secao in secoes:
+        if secao.titulo is None:
+            st.markdown(secao.markdown)
+        else:
+            _secao(secao, f"{prefixo}:{secao.titulo}")
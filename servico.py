@@ -0,0 +1,313 @@
+"""
+Serviço HTTP (ASGI) de geração de TR, para que outros sistemas (protocolo,
+e-processo) peçam o documento sem passar pela interface Streamlit.
+
+    uvicorn servico:app --host 0.0.0.0 --port 8000
+
+Rotas:
+    POST /tr       corpo JSON com os campos da geração em lote (tr_core.lote):
+                   objeto (obrigatório), secretarias, vigencia_meses,
+                   incluir_opcao_hibrida, kpis_padrao, municipio; e "formato":
+                   "md" (padrão) -> text/markdown
+                   "docx"        -> o arquivo Word
+                   "pdf"         -> o PDF (tr_core.render_pdf), para o Portal/PNCP
+                   "ambos"       -> JSON {"markdown": ..., "docx_base64": ...}
+    GET  /metrics  métricas no formato texto do Prometheus (com as etapas da
+                   geração, se TR_INSTRUMENTACAO=1: ver tr_core.instrumentacao)
+    GET  /saude    verificação de vida
+
+A geração roda num pool de processos (ou de threads), fora do laço de eventos.
+O DOCX é gravado pelo trabalhador num arquivo temporário e transmitido em
+partes, sem trafegar nem ficar inteiro na memória do processo do servidor.
+Quando já há gerações demais em andamento/na fila, o serviço responde 503 com
+Retry-After em vez de acumular requisições; corpos acima do limite recebem 413.
+
+Configuração por variável de ambiente:
+    TR_SERVICO_EXECUTOR       "processos" (padrão) ou "threads"
+    TR_SERVICO_TRABALHADORES  nº de trabalhadores (padrão: nº de CPUs)
+    TR_SERVICO_FILA           gerações simultâneas aceitas, contando a fila (padrão: 8 por trabalhador)
+    TR_SERVICO_MAX_BYTES      tamanho máximo do corpo da requisição (padrão: 64 KB)
+"""
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from tr_core import instrumentacao
+from tr_core.lote import normalizar_entrada
+from tr_core.metricas import Registro
+
+FORMATOS = ("md", "docx", "pdf", "ambos")
+MAX_BYTES_PADRAO = 64 * 1024
+TAMANHO_PARTE = 64 * 1024
+TIPO_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TIPO_PDF = "application/pdf"
+
+# ----------------------------------
+# Trabalho executado no pool
+# ----------------------------------
+def _aquecer() -> None:
+    """Deixa o modelo base do DOCX, o renderizador PDF e o template de cada município prontos em cada trabalhador."""
+    from tr_core.base_docx import carregar_base
+    from tr_core.gerador import modelo_do_municipio
+    from tr_core.municipios import municipios
+    from tr_core.render_pdf import to_pdf  # noqa: F401  (fontes e tabelas de larguras)
+
+    for m in municipios():
+        modelo_do_municipio(m.id)
+        carregar_base(m.docx_base, m.brasao, m.linhas_timbre)
+
+def gerar(entrada: dict, formato: str) -> tuple[str, bytes | None]:
+    """Markdown e, no formato "ambos", os bytes do DOCX."""
+    from tr_core import montar_tr, render_markdown
+
+    documento = montar_tr(**entrada)
+    docx = None
+    if formato == "ambos":
+        from tr_core import to_docx
+
+        docx = to_docx(documento)
+    return render_markdown(documento), docx
+
+def gerar_pdf(entrada: dict) -> bytes:
+    """PDF do TR (algumas dezenas de KB: volta inteiro do trabalhador)."""
+    from tr_core import montar_tr
+    from tr_core.render_pdf import to_pdf
+
+    return to_pdf(montar_tr(**entrada))
+
+def gerar_arquivo_docx(entrada: dict) -> str:
+    """Grava o DOCX num arquivo temporário e devolve o caminho (quem transmite apaga)."""
+    from tr_core import montar_tr
+    from tr_core.render_docx import escrever_docx
+
+    descritor, caminho = tempfile.mkstemp(prefix="tr_", suffix=".docx")
+    try:
+        with os.fdopen(descritor, "wb") as destino:
+            escrever_docx(montar_tr(**entrada), destino)
+    except BaseException:
+        os.unlink(caminho)
+        raise
+    return caminho
+
+def _com_etapas(pid_servidor: int, funcao, *args):
+    """
+    Executa `funcao` no trabalhador e devolve também as etapas medidas nele,
+    para entrarem no /metrics do servidor. Num pool de threads o processo é o
+    mesmo e elas já foram registradas.
+    """
+    if os.getpid() == pid_servidor:
+        return funcao(*args), []
+    with instrumentacao.coletar() as etapas:
+        resultado = funcao(*args)
+    return resultado, etapas
+
+# ----------------------------------
+# Aplicação ASGI
+# ----------------------------------
+class ErroHTTP(Exception):
+    def __init__(self, status: int, mensagem: str, cabecalhos: tuple = ()):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+        self.cabecalhos = cabecalhos
+
+def _config(nome: str, padrao: int) -> int:
+    valor = os.environ.get(nome)
+    return int(valor) if valor else padrao
+
+class ServicoTR:
+    def __init__(
+        self,
+        executor: str | None = None,
+        trabalhadores: int | None = None,
+        fila: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.tipo_executor = executor or os.environ.get("TR_SERVICO_EXECUTOR") or "processos"
+        if self.tipo_executor not in ("processos", "threads"):
+            raise ValueError(f"TR_SERVICO_EXECUTOR inválido: {self.tipo_executor!r} (use processos ou threads)")
+        self.trabalhadores = trabalhadores or _config("TR_SERVICO_TRABALHADORES", os.cpu_count() or 1)
+        self.fila = fila or _config("TR_SERVICO_FILA", 8 * self.trabalhadores)
+        self.max_bytes = max_bytes or _config("TR_SERVICO_MAX_BYTES", MAX_BYTES_PADRAO)
+        self.pendentes = 0
+        self._executor = None
+
+        self.metricas = Registro()
+        self._latencia = self.metricas.histograma(
+            "tr_requisicao_segundos", "Latência das requisições HTTP, da chegada à resposta.", ("rota", "status"),
+        )
+        self._geracao = self.metricas.histograma(
+            "tr_geracao_segundos", "Tempo de geração do TR no pool, incluindo a espera na fila.", ("formato",),
+        )
+        self._pendentes = self.metricas.medidor(
+            "tr_geracoes_pendentes", "Gerações em andamento ou aguardando um trabalhador.",
+        )
+        self._rejeicoes = self.metricas.contador(
+            "tr_rejeicoes_total", "Requisições recusadas antes da geração.", ("motivo",),
+        )
+
+    # --- pool ---
+
+    def iniciar(self) -> None:
+        if self._executor is None:
+            if self.tipo_executor == "threads":
+                self._executor = ThreadPoolExecutor(self.trabalhadores, "tr-servico", initializer=_aquecer)
+            else:
+                self._executor = ProcessPoolExecutor(self.trabalhadores, initializer=_aquecer)
+
+    def encerrar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _gerar(self, funcao, formato: str, *args):
+        if self.pendentes >= self.fila:
+            self._rejeicoes.incrementar(motivo="fila_cheia")
+            raise ErroHTTP(503, "Serviço ocupado; tente novamente em instantes.", ((b"retry-after", b"1"),))
+        self.iniciar()
+        self.pendentes += 1
+        self._pendentes.definir(self.pendentes)
+        inicio = time.perf_counter()
+        try:
+            resultado, etapas = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _com_etapas, os.getpid(), funcao, *args
+            )
+            instrumentacao.importar(etapas)
+            return resultado
+        finally:
+            self.pendentes -= 1
+            self._pendentes.definir(self.pendentes)
+            self._geracao.observar(time.perf_counter() - inicio, formato=formato)
+
+    # --- ASGI ---
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._ciclo_de_vida(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        inicio = time.perf_counter()
+        rota = scope["path"]
+        try:
+            status, corpo, tipo, cabecalhos = await self._rotear(scope, receive)
+        except ErroHTTP as erro:
+            status, corpo, tipo, cabecalhos = erro.status, _json({"erro": erro.mensagem}), "application/json", erro.cabecalhos
+        except Exception as erro:  # falha inesperada na geração: 500 sem derrubar o serviço
+            status, corpo, tipo, cabecalhos = 500, _json({"erro": f"Falha ao gerar o TR: {erro}"}), "application/json", ()
+        if isinstance(corpo, Path):
+            await self._enviar_arquivo(send, status, corpo, tipo, cabecalhos)
+        else:
+            await _iniciar_resposta(send, status, tipo, len(corpo), cabecalhos)
+            await send({"type": "http.response.body", "body": corpo})
+        if rota not in ("/tr", "/metrics", "/saude"):
+            rota = "outra"  # não deixa caminhos arbitrários virarem séries novas
+        self._latencia.observar(time.perf_counter() - inicio, rota=rota, status=str(status))
+
+    async def _enviar_arquivo(self, send, status, caminho: Path, tipo, cabecalhos):
+        """Transmite o arquivo temporário em partes e o apaga ao final (mesmo se o cliente cair)."""
+        try:
+            with caminho.open("rb") as arquivo:
+                await _iniciar_resposta(send, status, tipo, os.fstat(arquivo.fileno()).st_size, cabecalhos)
+                while True:
+                    parte = arquivo.read(TAMANHO_PARTE)
+                    mais = len(parte) == TAMANHO_PARTE
+                    await send({"type": "http.response.body", "body": parte, "more_body": mais})
+                    if not mais:
+                        break
+        finally:
+            caminho.unlink(missing_ok=True)
+
+    async def _ciclo_de_vida(self, receive, send):
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] == "lifespan.startup":
+                self.iniciar()
+                await send({"type": "lifespan.startup.complete"})
+            elif mensagem["type"] == "lifespan.shutdown":
+                self.encerrar()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _rotear(self, scope, receive):
+        metodo, rota = scope["method"], scope["path"]
+        if rota == "/tr":
+            if metodo != "POST":
+                raise ErroHTTP(405, "Use POST.", ((b"allow", b"POST"),))
+            return await self._tr(scope, receive)
+        if rota == "/metrics" and metodo == "GET":
+            texto = self.metricas.texto() + instrumentacao.texto()
+            return 200, texto.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8", ()
+        if rota == "/saude" and metodo == "GET":
+            return 200, _json({"status": "ok", "pendentes": self.pendentes}), "application/json", ()
+        raise ErroHTTP(404, "Rota não encontrada.")
+
+    async def _tr(self, scope, receive):
+        dados = await self._ler_json(scope, receive)
+        if not isinstance(dados, dict):
+            raise ErroHTTP(422, "O corpo deve ser um objeto JSON.")
+        formato = str(dados.pop("formato", None) or "md").lower()
+        if formato not in FORMATOS:
+            raise ErroHTTP(422, f"'formato' deve ser um de: {', '.join(FORMATOS)}.")
+        try:
+            entrada = normalizar_entrada(dados)
+        except (TypeError, ValueError) as erro:
+            raise ErroHTTP(422, str(erro)) from None
+        del entrada["arquivo"]
+
+        if formato == "docx":
+            caminho = await self._gerar(gerar_arquivo_docx, formato, entrada)
+            return 200, Path(caminho), TIPO_DOCX, ((b"content-disposition", b'attachment; filename="TR_Lei_14133.docx"'),)
+        if formato == "pdf":
+            pdf = await self._gerar(gerar_pdf, formato, entrada)
+            return 200, pdf, TIPO_PDF, ((b"content-disposition", b'attachment; filename="TR_Lei_14133.pdf"'),)
+        markdown, docx = await self._gerar(gerar, formato, entrada, formato)
+        if formato == "md":
+            return 200, markdown.encode("utf-8"), "text/markdown; charset=utf-8", ()
+        corpo = _json({"markdown": markdown, "docx_base64": base64.b64encode(docx).decode("ascii")})
+        return 200, corpo, "application/json", ()
+
+    async def _ler_json(self, scope, receive):
+        declarado = dict(scope["headers"]).get(b"content-length")
+        if declarado is not None and declarado.isdigit() and int(declarado) > self.max_bytes:
+            self._rejeicoes.incrementar(motivo="tamanho")
+            raise ErroHTTP(413, f"Corpo acima de {self.max_bytes} bytes.")
+        partes, total = [], 0
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] == "http.disconnect":
+                raise ErroHTTP(400, "Conexão encerrada pelo cliente.")
+            parte = mensagem.get("body", b"")
+            total += len(parte)
+            if total > self.max_bytes:  # sem Content-Length (chunked): corta ao passar do limite
+                self._rejeicoes.incrementar(motivo="tamanho")
+                raise ErroHTTP(413, f"Corpo acima de {self.max_bytes} bytes.")
+            partes.append(parte)
+            if not mensagem.get("more_body", False):
+                break
+        try:
+            return json.loads(b"".join(partes) or b"null")
+        except ValueError:
+            self._rejeicoes.incrementar(motivo="json")
+            raise ErroHTTP(400, "JSON inválido.") from None
+
+async def _iniciar_resposta(send, status: int, tipo: str, tamanho: int, cabecalhos) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", tipo.encode("latin-1")),
+            (b"content-length", str(tamanho).encode("latin-1")),
+            *cabecalhos,
+        ],
+    })
+
+def _json(dados) -> bytes:
+    return json.dumps(dados, ensure_ascii=False).encode("utf-8")
+
+app = ServicoTR()
@@ -1,296 +1,374 @@
-import io
+import os
 from datetime import date
+
 import streamlit as st
-from docx import Document
+
+from interface_previa import mostrar_previa
+from tr_core import instrumentacao, lista_nao_vazia
+from tr_core.cache import CacheDocumentos, DocumentoGerado, chave_documento
+from tr_core.incremental import MontadorIncremental
+from tr_core.itens import TabelaItens, formatar_moeda, ler_tabela
+from tr_core.justificativa import stream_justificativa
+from tr_core.llm import ErroLLM
+from tr_core.municipios import municipio as municipio_por_nome
+from tr_core.municipios import municipio_padrao, municipios
+from tr_core.rascunhos import novo_id, rascunhos_padrao
+from tr_core.redacao import ROTULOS, iniciar_redacao, secoes_semelhantes
+from tr_core.repositorio import repositorio_padrao
 
 # ----------------------------------
 # Configurações gerais do app
 # ----------------------------------
 st.set_page_config(
-    page_title="Gerador de Termo de Referência — Lei 14.133/2021 (Brasnorte-MT)",
+    page_title=f"Gerador de Termo de Referência — Lei 14.133/2021 ({municipio_padrao().nome})",
     layout="wide",
     initial_sidebar_state="expanded",
 )
 
 # ----------------------------------
-# Funções utilitárias
+# Cache de documentos (compartilhado entre as sessões do processo)
 # ----------------------------------
-def lista_nao_vazia(valor: str) -> bool:
-    return bool(valor and str(valor).strip())
+@st.cache_resource
+def cache_documentos() -> CacheDocumentos:
+    return CacheDocumentos(maximo=256)
 
-def monta_bloco(label: str, valor: str) -> str:
-    """Renderiza um parágrafo só se houver conteúdo."""
-    return f"- **{label}:** {valor.strip()}\n" if lista_nao_vazia(valor) else ""
+@st.cache_resource
+def montador() -> MontadorIncremental:
+    return MontadorIncremental()
 
-def to_docx(md_text: str) -> bytes:
-    """
-    Gera um DOCX simples a partir do texto Markdown.
-    (Implementação básica: insere como parágrafos; para estilização avançada, parsear o Markdown.)
-    """
-    doc = Document()
-    for line in md_text.split("\n"):
-        if line.startswith("# "):
-            doc.add_heading(line[2:], level=1)
-        elif line.startswith("## "):
-            doc.add_heading(line[3:], level=2)
-        elif line.startswith("### "):
-            doc.add_heading(line[4:], level=3)
-        else:
-            doc.add_paragraph(line)
-    bio = io.BytesIO()
-    doc.save(bio)
-    return bio.getvalue()
-
-def formatar_secretarias(lista_sel):
-    if not lista_sel:
-        return ""
-    if len(lista_sel) == 1:
-        return lista_sel[0]
-    return "; ".join(lista_sel)
-
-def gerar_tr(
-    objeto: str,
-    secretarias: list[str],
-    vigencia_meses: int,
-    incluir_opcao_hibrida: bool,
-    kpis_padrao: bool,
-    municipio: str = "Brasnorte-MT",
-) -> str:
-    """Gera o TR completo em Markdown com os campos simplificados."""
-    hoje = date.today().strftime("%d/%m/%Y")
-    objeto_md = f"**{objeto.strip()}**" if lista_nao_vazia(objeto) else "**[INSERIR OBJETO SOLICITADO]**"
-    secretarias_md = formatar_secretarias(secretarias)
-
-    md = []
-    md.append(f"# TERMO DE REFERÊNCIA — Lei nº 14.133/2021\n")
-    md.append(f"**Município:** {municipio}  \n**Data:** {hoje}\n")
-    md.append("---\n")
-
-    # 1. Das condições gerais
-    md.append("## 1. DAS CONDIÇÕES GERAIS DA CONTRATAÇÃO\n")
-    md.append(
-        f"1.1 O presente Termo de Referência tem por objeto {objeto_md}, em conformidade com as especificações de descrição e quantidade detalhadamente elencadas neste documento, amparada pelas disposições legais vigentes que regulam tal procedimento, visando atender as necessidades da Prefeitura Municipal de Brasnorte-MT e de suas Secretarias Municipais.\n"
-    )
-    md.append(f"1.2 O objeto desta contratação não se enquadra como sendo de bem de luxo, conforme Decreto Municipal nº 03/2024.\n")
-    md.append(
-        f"1.3 O prazo de vigência da contratação será de 12 meses, contados da data de assinatura da ARP (Ata Registro de Preço) ou do Contrato conforme celebrado, na forma do artigo 105 da Lei n° 14.133/2021, podendo o mesmo ser prorrogado a critério da Administração Pública.\n"
-    )
-    
-    md.append(f"1.4 O custo estimado total da contratação é de R$ 00.000,00 (descrever o valor em reais) conforme custos unitários apostos na tabela acima, conforme pesquisa de preço nos termos do Decreto Municipal n° 05/2024.\n"
-    )
+@st.cache_resource(max_entries=16)
+def tabela_de_itens(conteudo: bytes, nome: str) -> TabelaItens:
+    """Planilha enviada, lida uma vez (as próximas execuções do script reaproveitam a tabela)."""
+    import io
 
+    return ler_tabela(io.BytesIO(conteudo), nome)
 
-    # Quadro‑resumo (simplificado)
-    md.append("\n**Quadro-resumo do objeto:**\n")
-    md.append(monta_bloco("Objeto detalhado", objeto))
-    if lista_nao_vazia(secretarias_md):
-        md.append(monta_bloco("Unidade(s) demandante(s)", secretarias_md))
-    md.append(monta_bloco("Prazo de vigência (meses)", str(vigencia_meses)))
-    md.append("\n")
-
-    # 2. Necessidade e fundamentação
-    md.append("## 2. DESCRIÇÃO DA NECESSIDADE DA CONTRATAÇÃO E FUNDAMENTAÇÃO LEGAL\n")
-    import openai
-
-# Insira sua chave de API da OpenAI aqui
-openai.api_key = "sua-chave-api-aqui"
-
-def gerar_justificativa(objeto):
-    prompt = f"""
-Você é um especialista em licitações públicas, com mais de 10 anos de experiência, atuando como responsável técnico pela elaboração e instrução de processos de contratação na Prefeitura Municipal de Brasnorte-MT. Considerando a Lei nº 14.133/2021 e demais normativos aplicáveis, elabore a seção "Justificativa e da Necessidade da Contratação" para compor o Termo de Referência, cujo objeto é: "{objeto}".
-
-O texto deve:
-- Apresentar a descrição clara da demanda pública, alinhada às atividades administrativas e operacionais do município e suas secretarias.
-- Explicar por que a contratação é necessária, com base em evidências práticas e na ausência de estrutura própria da Administração (quando aplicável).
-- Demonstrar que o objeto é essencial à continuidade dos serviços públicos ou à implementação de políticas públicas locais.
-- Fundamentar-se nas especificações e quantidades descritas no Termo de Referência.
-- Assegurar que a demanda está alinhada ao Plano Anual de Contratações (PAC), e que há previsão orçamentária compatível.
-- Apontar a impossibilidade de execução direta pela Administração, se for o caso.
-- Incluir os fundamentos legais pertinentes, especialmente o artigo 6º, inciso XXIII, alínea ‘b’, da Lei nº 14.133/2021.
-- Ser redigida em linguagem técnica, objetiva e juridicamente fundamentada, voltada à instrução de um processo administrativo de contratação pública.
-"""
-
-    resposta = openai.ChatCompletion.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "Você é um redator técnico especialista em licitações públicas."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.4,
-        max_tokens=1000
-    )
+@st.cache_resource
+def endpoint_metricas():
+    """/metrics das etapas (tr_core.instrumentacao), se TR_INSTRUMENTACAO_PORTA estiver definida."""
+    porta = os.environ.get("TR_INSTRUMENTACAO_PORTA")
+    return instrumentacao.servir_metricas(int(porta)) if porta else None
 
-    justificativa = resposta['choices'][0]['message']['content']
-    return justificativa
-
-
-if __name__ == "__main__":
-    objeto_input = input("Informe o objeto da contratação (ex: Locação de veículos utilitários com motorista): ")
-    texto_gerado = gerar_justificativa(objeto_input)
-    print("\n--- JUSTIFICATIVA E DA NECESSIDADE DA CONTRATAÇÃO ---\n")
-    print(texto_gerado)
-
-    
-    # 3. Solução, opções e ciclo de vida
-    md.append("## 3. DESCRIÇÃO DA SOLUÇÃO COMO UM TODO (CICLO DE VIDA) E ESPECIFICAÇÃO DOS SERVIÇOS\n")
-    md.append("**Resumo da necessidade (síntese):** [apresentar em 3–5 linhas].\n\n")
-    md.append("**Opções de solução:**\n")
-    md.append("- **Opção A — Execução própria pela Prefeitura:** recursos humanos, infraestrutura e competências exigidas; "
-              "limitações (ex.: ausência de suporte técnico/equipe qualificada, custos de capacitação, riscos de continuidade) e inviabilidade prática/econômica.\n")
-    md.append("- **Opção B — Contratação/Aquisição do objeto:** atendimento pelo mercado, níveis de serviço, prazos, garantias, manutenção/assistência técnica.\n")
-    if incluir_opcao_hibrida:
-        md.append("- **Opção C — Híbrida/Colaborativa:** parte interna + terceirização de etapas específicas, com avaliação de prós e contras.\n")
-    md.append("\n**Conclusão – Solução escolhida:** justificar a alternativa mais vantajosa ao interesse público (eficiência, economicidade e qualidade).\n")
-    md.append("**Ciclo de Vida do Objeto:** aquisição/implantação → operação → manutenção/assistência → atualizações/treinamentos → desmobilização/descartes, "
-              "incluindo sustentabilidade, garantia e suporte pós‑venda.\n")
-    md.append("**Especificação técnica:** características mínimas, desempenho esperado, normas aplicáveis (ABNT/INMETRO/ANVISA/ANEEL etc.), "
-              "padrões de qualidade, prazos de atendimento, SLAs e evidências de conformidade.\n")
-
-    # 4. Requisitos
-    md.append("## 4. REQUISITOS DA CONTRATAÇÃO\n")
-    md.append("Liste requisitos **objetivos e verificáveis** (adapte ao objeto):\n")
-    md.append("1. Conformidade técnica com as especificações e normas indicadas.\n")
-    md.append("2. Qualificação técnica mínima (atestados, equipes, certificações quando cabíveis).\n")
-    md.append("3. Prazos de entrega/execução (SLA, janelas de atendimento, tempo de resposta).\n")
-    md.append("4. Garantia (prazo, cobertura, substituição/recall quando aplicável).\n")
-    md.append("5. Assistência técnica/manutenção (preventiva e corretiva, tempos de restauração).\n")
-    md.append("6. Treinamento/capacitação de usuários/servidores, com material didático.\n")
-    md.append("7. Documentação técnica (manuais, catálogos, ART/RRT quando exigível).\n")
-    md.append("8. Segurança e conformidade regulatória (saúde, meio ambiente, LGPD quando pertinente).\n")
-    md.append("9. Logística e entrega (locais, horários, acondicionamento, rastreabilidade).\n")
-    md.append("10. Medição e aceitação (procedimentos, evidências, formulários).\n")
-    md.append("11. Sustentabilidade (eficiência energética, redução de resíduos, destinação final).\n")
-    md.append("12. Penalidades e garantias contratuais alinhadas à Lei nº 14.133/2021.\n")
-
-    # 5. Execução contratual
-    md.append("## 5. MODELO DE EXECUÇÃO CONTRATUAL\n")
-    md.append("- **5.1** Execução fiel pelas partes, conforme cláusulas e Lei nº 14.133/2021; responsabilidade por inexecução total ou parcial.\n")
-    md.append("- **5.2** Execução conforme este TR, observando Edital e Instrumento Contratual após assinatura.\n")
-    md.append("- **5.3** Solicitação do objeto **de forma parcelada**, mediante **OS** e **NE**.\n")
-    md.append("- **5.4** Comprovação por **Nota Fiscal** da contratada, **ateste** por servidor competente, com **relatório circunstanciado** (ex.: livro de ponto, comprovantes de entrega/serviços).\n")
-    md.append("- **5.5** Responsabilidade integral da contratada pelos ônus de execução.\n")
-    md.append("- **5.6** Observância da **NAD (Nota de Autorização de Despesas)**.\n")
-    md.append("- **5.7** Comunicações formais **por escrito** (admitido meio eletrônico quando aplicável).\n")
-    md.append("- **5.8** Prestação **sob demanda** mediante OS/documento equivalente, com **prazos e quantidades** definidos.\n")
-    md.append("- **5.9** Plano de mobilização/desmobilização e cronograma físico‑financeiro (quando aplicável).\n")
-    md.append("- **5.10** Gestão e fiscalização contratual (gestor e fiscais; rotinas de reunião e reporte).\n")
-    md.append("- **5.11** Confidencialidade, proteção de dados e propriedade intelectual (quando pertinente).\n")
-    md.append("- **5.12** Subcontratação e equipe mínima (critérios e limites, quando admitido).\n")
-    md.append("- **5.13** Reposição de bens/partes e prazos de correção de não conformidades.\n")
-    md.append("- **5.14** Indicadores de desempenho vinculados à medição/aceite e sanções.\n")
-
-    # 6. Critérios de medição
-    md.append("## 6. CRITÉRIOS DE MEDIÇÃO\n")
-    md.append("- **6.1 Itens e unidades de medida:**\n")
-    md.append("  | Item | Descrição | Unidade | Qtde medida no período | Qtde acumulada | Saldo |\n")
-    md.append("  |---|---|---|---:|---:|---:|\n")
-    md.append("  | 1 | [Descrever] | [un/h/m²/mês] | 0 | 0 | 0 |\n")
-    md.append("- **6.2 Evidências de execução:** relatórios, checklists assinados, registros fotográficos, logs/sistemas, canhotos de entrega, certificados de treinamento.\n")
-    md.append("- **6.3 Critérios de aceite:** padrões técnicos, tolerâncias e desempenho; procedimento de inspeção (amostragem, testes, prazos para correção).\n")
-    md.append("- **6.4 Indicadores de desempenho (SLA/KPI):**\n")
-    if kpis_padrao:
-        md.append("  - **Disponibilidade (%):** (Horas disponíveis ÷ Horas previstas) × 100.\n")
-        md.append("  - **Tempo de resposta (h):** tempo entre abertura e primeiro atendimento.\n")
-        md.append("  - **Tempo de solução (h):** tempo entre abertura e solução.\n")
-        md.append("  - **Taxa de retrabalho (%):** (Ocorrências retrabalhadas ÷ Total de ocorrências) × 100.\n")
-        md.append("  - **Conformidade amostral (%):** (Itens conformes ÷ Itens amostrados) × 100.\n")
-        md.append("  - **Pontualidade em entregas (%):** (Entregas pontuais ÷ Entregas totais) × 100.\n")
-    else:
-        md.append("  - [Definir de 3 a 6 indicadores mensuráveis coerentes com o objeto]\n")
-    md.append("- **6.5 Fórmulas de cálculo:** explicitar fórmulas dos indicadores adotados.\n")
-    md.append("- **6.6 Periodicidade da medição:** [semanal/mensal/por OS/por marco].\n")
-    md.append("- **6.7 Glosas e penalidades:** condições e procedimentos para glosa/desconto, reconvocação, reexecução e penalidades contratuais (sem transcrições legais).\n")
-    md.append("- **6.8 Aceite final:** condições para aceite definitivo, termo de recebimento e encerramento.\n")
+endpoint_metricas()
+
+# Medição das etapas ligada no painel de diagnóstico: vale só para esta sessão
+instrumentacao.medir_no_contexto(st.session_state.get("diagnostico_medir", False))
+
+def gerar_documento(**entradas) -> DocumentoGerado:
+    """
+    Gera (ou reaproveita do cache) o TR; o DOCX só é montado quando solicitado.
+    Numa edição, só as seções cujas entradas mudaram são renderizadas de novo.
+    """
+    data = date.today().strftime("%d/%m/%Y")
 
-    md.append("\n---\n")
-    md.append("_Observação: este documento deve ser ajustado ao objeto específico, convertendo requisitos em métricas mensuráveis (números, tolerâncias, prazos e padrões)._")
+    def _gerar():
+        montagem = montador().montar(**entradas, data=data)
+        return DocumentoGerado(montagem.documento, montagem.markdown, montagem.docx)
+
+    return cache_documentos().obter_ou_gerar(chave_documento(**entradas, data=data), _gerar)
 
-    
 # ----------------------------------
-# Lista fixa de Secretarias (multiselect)
+# Rascunho (tr_core.rascunhos)
 # ----------------------------------
-SECRETARIAS_PADRAO = [
-    "Gabinete Municipal",
-    "Secretaria Municipal de Administração",
-    "Secretaria Municipal de Assistencia Social",
-    "Secretaria Municipal de Assuntos Indigenas",
-    "Secretaria Municipal de Des. Agrario e Meio Ambiente",
-    "Secretaria Municipal de Educação",
-    "Secretaria Municipal de Esportes",
-    "Secretaria Municipal de Finanças",
-    "Secretaria Municipal de Infraestrutura",
-    "Secretaria Municipal de Planejamento, Turismo e Cultura",
-    "Secretaria Municipal de Saúde",
-]
+# O formulário e o TR gerado ficam guardados pelo id que vai na URL
+# (?rascunho=<id>): ao recarregar a página ou reabrir o link depois que a
+# sessão expirou, tudo volta como estava, sem gerar de novo nem chamar a IA.
+CAMPOS_RASCUNHO = {
+    "objeto": "",
+    "secretarias_sel": [],
+    "vigencia_meses": 12,
+    "incluir_opcao_hibrida": True,
+    "kpis_padrao": True,
+    "redigir_justificativa": False,
+    "redigir_secoes": False,
+}
+
+def estado_rascunho() -> dict:
+    estado = {campo: st.session_state.get(campo) for campo in CAMPOS_RASCUNHO}
+    estado["municipio"] = st.session_state["municipio_sel"].nome if "municipio_sel" in st.session_state else None
+    estado["itens"] = st.session_state.get("itens_rascunho")
+    estado["tr_entradas"] = st.session_state.get("tr_entradas")
+    return estado
+
+if "rascunho_id" not in st.session_state:
+    id_rascunho = st.query_params.get("rascunho")
+    rascunho = rascunhos_padrao().carregar(id_rascunho) if id_rascunho else None
+    if rascunho is None:
+        id_rascunho = novo_id()
+    else:
+        for campo in CAMPOS_RASCUNHO:
+            if rascunho.get(campo) is not None:
+                st.session_state[campo] = rascunho[campo]
+        if rascunho.get("municipio"):
+            try:
+                st.session_state["municipio_sel"] = municipio_por_nome(rascunho["municipio"])
+            except ValueError:  # prefeitura que saiu do registro depois do rascunho
+                pass
+        st.session_state["itens_rascunho"] = rascunho.get("itens")
+        st.session_state["tr_entradas"] = rascunho.get("tr_entradas")
+    st.session_state["rascunho_id"] = id_rascunho
+    st.query_params["rascunho"] = id_rascunho
+for campo, padrao in CAMPOS_RASCUNHO.items():
+    st.session_state.setdefault(campo, padrao)
 
 # ----------------------------------
 # UI
 # ----------------------------------
-st.title("Gerador de Termo de Referência — Lei 14.133/2021 (Pref. de Brasnorte-MT)")
+# Um único processo atende todas as prefeituras do registro (tr_core.municipios);
+# com uma só, o seletor nem aparece.
+with st.sidebar:
+    opcoes_municipio = municipios()
+    if len(opcoes_municipio) > 1:
+        st.session_state.setdefault("municipio_sel", municipio_padrao())
+        municipio = st.selectbox(
+            "Município",
+            options=opcoes_municipio,
+            format_func=lambda m: m.nome,
+            key="municipio_sel",
+        )
+    else:
+        municipio = municipio_padrao()
+
+st.title(f"Gerador de Termo de Referência — Lei 14.133/2021 (Pref. de {municipio.nome})")
 st.caption("Agora com seleção de Secretarias e vigência em meses, conforme solicitado.")
 
 with st.sidebar:
     st.header("Dados de entrada")
-    objeto = st.text_input("Objeto detalhado (obrigatório)", placeholder="Ex.: Contratação de serviços de manutenção predial preventiva e corretiva")
+    objeto = st.text_input("Objeto detalhado (obrigatório)", placeholder="Ex.: Contratação de serviços de manutenção predial preventiva e corretiva", key="objeto")
 
+    # secretarias de um rascunho de outro município não estão entre as opções
+    st.session_state["secretarias_sel"] = [s for s in st.session_state["secretarias_sel"] if s in municipio.secretarias]
     secretarias_sel = st.multiselect(
         "Unidade(s) demandante(s) — selecione as Secretarias participantes do certame",
-        options=SECRETARIAS_PADRAO,
-        default=[],
-        help="Você pode selecionar uma ou várias Secretarias."
+        options=municipio.secretarias,
+        help="Você pode selecionar uma ou várias Secretarias.",
+        key="secretarias_sel",
     )
 
     vigencia_meses = st.number_input(
         "Prazo de vigência (meses)",
         min_value=1,
         max_value=60,
-        value=12,
         step=1,
-        help="Informe apenas o período de vigência do contrato em meses."
+        help="Informe apenas o período de vigência do contrato em meses.",
+        key="vigencia_meses",
+    )
+
+    planilha_itens = st.file_uploader(
+        "Tabela de itens (CSV ou XLSX) — opcional",
+        type=["csv", "xlsx"],
+        help="Colunas de descrição, quantidade e valor unitário (item e unidade são opcionais). "
+             "A tabela entra após a cláusula 1.1 e o custo estimado total, na 1.4.",
     )
+    # A planilha enviada não volta com o rascunho (o navegador não reenvia o
+    # arquivo), mas a tabela já lida sim: fica em "itens_rascunho" até outra
+    # planilha ser enviada ou ela ser descartada.
+    itens = st.session_state.get("itens_rascunho")
+    if planilha_itens is not None:
+        try:
+            itens = tabela_de_itens(planilha_itens.getvalue(), planilha_itens.name)
+        except ValueError as erro:
+            st.error(f"Tabela de itens não importada: {erro}")
+            itens = None
+        st.session_state["itens_rascunho"] = itens
+    if itens is not None:
+        st.caption(f"{len(itens)} item(ns) — custo estimado total: R$ {formatar_moeda(itens.total_centavos)}")
+        if planilha_itens is None and st.button("Descartar a tabela de itens do rascunho"):
+            st.session_state["itens_rascunho"] = None
+            st.rerun()
 
     st.markdown("---")
-    incluir_opcao_hibrida = st.checkbox("Incluir Opção C (modelo híbrido/colaborativo)", value=True)
-    kpis_padrao = st.checkbox("Incluir KPIs/SLAs padrão sugeridos", value=True)
+    incluir_opcao_hibrida = st.checkbox("Incluir Opção C (modelo híbrido/colaborativo)", key="incluir_opcao_hibrida")
+    kpis_padrao = st.checkbox("Incluir KPIs/SLAs padrão sugeridos", key="kpis_padrao")
+    redigir_justificativa = st.checkbox(
+        "Redigir a justificativa (seção 2) com IA",
+        help="Usa a API da OpenAI (OPENAI_API_KEY). Objetos já redigidos saem do cache, sem nova cobrança.",
+        key="redigir_justificativa",
+    )
+    redigir_secoes = st.checkbox(
+        "Redigir também as seções 3, 4 e os KPIs (6.4) com IA",
+        help="As seções são redigidas em paralelo; a que falhar ou demorar demais mantém o texto padrão.",
+        key="redigir_secoes",
+    )
     st.markdown("---")
     gerar = st.button("Gerar Termo de Referência", type="primary", use_container_width=True)
 
+    st.caption(f"Rascunho salvo automaticamente — para retomar, guarde o link desta página "
+               f"(`?rascunho={st.session_state['rascunho_id']}`).")
+    if st.button("Novo rascunho", use_container_width=True):
+        st.session_state.clear()
+        st.query_params.clear()
+        st.rerun()
+
+# Gravação adiada: várias edições seguidas viram uma escrita só, e uma
+# execução que não mudou nada não grava.
+rascunhos_padrao().agendar(st.session_state["rascunho_id"], estado_rascunho())
+
+# TRs já emitidos para objetos parecidos (tr_core.repositorio): reaproveitar um
+# deles evita gerar, e pagar a redação com IA, de novo.
+if lista_nao_vazia(objeto):
+    semelhantes = repositorio_padrao().buscar(objeto, limite=5)
+    if semelhantes:
+        with st.expander(f"TRs anteriores com objeto parecido ({len(semelhantes)})"):
+            for anterior in semelhantes:
+                col1, col2 = st.columns([4, 1])
+                col1.markdown(f"**{anterior.objeto}**  \n{anterior.municipio} — gerado em {anterior.criado_em.replace('T', ' ')}")
+                if col2.button("Usar este TR", key=f"reusar_{anterior.id}"):
+                    st.session_state["tr_entradas"] = repositorio_padrao().obter(anterior.id).entradas
+                    st.rerun()
+
+# Textos já redigidos com IA para um objeto quase igual: só entram no TR se o
+# usuário aceitar (um objeto parecido pode ser outra contratação).
+secoes_ia = (("justificativa",) if redigir_justificativa else ()) + (
+    ("solucao", "requisitos", "kpis") if redigir_secoes else ()
+)
+aceitos = {}
+if lista_nao_vazia(objeto) and secoes_ia:
+    ofertas = secoes_semelhantes(objeto, secoes_ia, incluir_opcao_hibrida, municipio=municipio.id)
+    if ofertas:
+        with st.container(border=True):
+            st.markdown(
+                "Já há texto redigido com IA para objeto parecido:  \n" + "  \n".join(
+                    f"- **{ROTULOS[secao]}**: “{oferta.entrada}” (similaridade de {oferta.similaridade:.0%})"
+                    for secao, oferta in ofertas.items()
+                )
+            )
+            # a chave inclui o objeto: aceitar para um objeto não vale para o próximo
+            if st.checkbox("Usar esses textos em vez de redigir de novo", key=f"aceitar_semelhantes::{objeto.strip()}"):
+                aceitos = {secao: oferta.texto for secao, oferta in ofertas.items()}
+
 if gerar:
     if not lista_nao_vazia(objeto):
         st.error("Informe o **Objeto detalhado** para gerar o TR.")
         st.stop()
 
-    resultado = gerar_tr(
+    # As seções 3, 4 e 6.4 partem antes, em paralelo, enquanto a justificativa
+    # aparece em streaming logo abaixo.
+    redacao = None
+    if redigir_secoes:
+        redacao = iniciar_redacao(
+            objeto, ("solucao", "requisitos", "kpis"), incluir_opcao_hibrida, municipio=municipio.id, aceitos=aceitos,
+        )
+
+    justificativa = None
+    if redigir_justificativa:
+        st.markdown("#### 2. Justificativa — redação assistida")
+        if "justificativa" in aceitos:
+            justificativa = aceitos["justificativa"]
+            st.markdown(justificativa)
+        else:
+            try:
+                with instrumentacao.etapa("justificativa_streaming") as medicao:
+                    justificativa = st.write_stream(stream_justificativa(objeto, municipio=municipio.id))
+                    medicao.tamanho = len(justificativa)
+            except ErroLLM as erro:
+                st.warning(f"Não foi possível redigir a justificativa com IA ({erro}). Mantido o roteiro padrão da seção 2.")
+
+    redigidas = {}
+    if redacao is not None:
+        with st.spinner("Redigindo as seções 3, 4 e 6.4..."), instrumentacao.etapa("redacao_secoes"):
+            resultado_redacao = redacao.result()
+        redigidas = resultado_redacao.textos
+        for secao, motivo in resultado_redacao.falhas.items():
+            st.warning(f"Seção {ROTULOS[secao]} não redigida com IA ({motivo}). Mantido o texto padrão.")
+
+    # Guardado na sessão para que o TR continue na tela nas próximas
+    # execuções do script (ex.: ao clicar em "Preparar arquivo Word").
+    st.session_state["tr_entradas"] = dict(
         objeto=objeto,
         secretarias=secretarias_sel,
         vigencia_meses=int(vigencia_meses),
         incluir_opcao_hibrida=incluir_opcao_hibrida,
         kpis_padrao=kpis_padrao,
-        municipio="Brasnorte-MT",
+        municipio=municipio.nome,
+        justificativa=justificativa,
+        solucao=redigidas.get("solucao"),
+        requisitos=redigidas.get("requisitos"),
+        kpis=redigidas.get("kpis"),
+        itens=itens,
+    )
+    repositorio_padrao().salvar(
+        st.session_state["tr_entradas"],
+        gerar_documento(**st.session_state["tr_entradas"]).markdown,
     )
+    # o texto redigido pela IA é caro de refazer: vai para o rascunho já
+    rascunhos_padrao().salvar(st.session_state["rascunho_id"], estado_rascunho())
+
+entradas = st.session_state.get("tr_entradas")
+if entradas:
+    gerado = gerar_documento(**entradas)
+    resultado = gerado.markdown
+    arquivo = "TR_Lei_14133_" + municipio_por_nome(entradas.get("municipio")).municipio.replace(" ", "_")
 
     st.success("TR gerado com sucesso! Revise e ajuste os pontos específicos do objeto antes de publicar.")
     st.download_button(
         label="Baixar em Markdown (.md)",
         data=resultado.encode("utf-8"),
-        file_name="TR_Lei_14133_Brasnorte.md",
+        file_name=f"{arquivo}.md",
         mime="text/markdown",
         use_container_width=True,
     )
 
-    docx_bytes = to_docx(resultado)
-    st.download_button(
-        label="Baixar em Word (.docx)",
-        data=docx_bytes,
-        file_name="TR_Lei_14133_Brasnorte.docx",
-        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        use_container_width=True,
-    )
-
-    st.markdown("### Pré-visualização")
-    st.markdown(resultado)
+    # O DOCX é a etapa mais cara da página: só é montado a pedido do usuário
+    # (ou se outra sessão já o deixou pronto no cache).
+    if gerado.docx_pronto or st.button("Preparar arquivo Word (.docx)", use_container_width=True):
+        st.download_button(
+            label="Baixar em Word (.docx)",
+            data=gerado.docx(),
+            file_name=f"{arquivo}.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            use_container_width=True,
+        )
+
+    # PDF para a publicação no Portal da Transparência/PNCP: como o DOCX, só é
+    # diagramado a pedido e fica guardado no cache junto do documento.
+    if gerado.pdf_pronto or st.button("Preparar arquivo PDF (.pdf)", use_container_width=True):
+        st.download_button(
+            label="Baixar em PDF (.pdf)",
+            data=gerado.pdf(),
+            file_name=f"{arquivo}.pdf",
+            mime="application/pdf",
+            use_container_width=True,
+        )
+
+    # Só os títulos das seções vão para o navegador; o texto de cada uma, ao ser aberta
+    with instrumentacao.etapa("preview_streamlit"):
+        mostrar_previa(gerado.secoes())
 else:
     st.info("Preencha os campos no painel lateral e clique em **Gerar Termo de Referência**.")
 
+with st.expander("Administração — cache de documentos"):
+    estatisticas = cache_documentos().estatisticas()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Acertos", estatisticas["acertos"])
+    col2.metric("Faltas", estatisticas["faltas"])
+    col3.metric("Taxa de acerto", f"{estatisticas['taxa_acerto']:.0%}")
+    st.caption(f"{estatisticas['documentos']} de {estatisticas['maximo']} documento(s) em cache.")
+    fragmentos = montador().fragmentos.estatisticas()
+    st.caption(f"Seções reaproveitadas na montagem: {fragmentos['taxa_acerto']:.0%} "
+               f"({fragmentos['documentos']} fragmento(s) em cache).")
+    if st.button("Limpar cache"):
+        cache_documentos().limpar()
+        montador().fragmentos.limpar()
+        st.rerun()
+
+# Painel de diagnóstico, fora do menu: só aparece com ?diagnostico=1 na URL.
+if st.query_params.get("diagnostico") == "1":
+    with st.expander("Diagnóstico — tempo por etapa", expanded=True):
+        if instrumentacao.ativa():
+            st.caption("Medição ligada em todo o processo (TR_INSTRUMENTACAO).")
+        else:
+            # a mudança reexecuta o script, que liga a medição no início (só nesta sessão)
+            st.toggle("Medir as etapas desta sessão", key="diagnostico_medir")
+        etapas = instrumentacao.resumo()
+        if etapas:
+            st.dataframe(etapas, use_container_width=True, hide_index=True)
+            st.caption("Últimas etapas medidas (a mais recente primeiro):")
+            st.dataframe(instrumentacao.recentes()[::-1][:30], use_container_width=True, hide_index=True)
+            with st.popover("Métricas (Prometheus)"):
+                st.code(instrumentacao.texto(), language="text")
+        else:
+            st.caption("Nenhuma etapa medida ainda: ligue a medição e gere um TR.")
+
 st.markdown("---")
-st.caption("© Prefeitura Municipal de Brasnorte-MT — Modelo orientado pela Lei nº 14.133/2021. Ajuste conforme o objeto específico e as diretrizes internas.")
+st.caption(f"© {municipio.prefeitura} — Modelo orientado pela Lei nº 14.133/2021. Ajuste conforme o objeto específico e as diretrizes internas.")
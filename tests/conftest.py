@@ -0,0 +1,18 @@
+import pytest
+
+from tr_core.llm import CacheEmDisco, ClienteOpenAI, ServicoLLM
+from tr_core.llm_stub import StubLLM
+
+@pytest.fixture
+def stub():
+    with StubLLM(atraso=0) as servidor:
+        yield servidor
+
+@pytest.fixture
+def novo_servico(stub, tmp_path):
+    """Fábrica de ServicoLLM ligados ao stub, com o cache em disco em tmp_path (compartilhado entre eles)."""
+    def criar(**opcoes):
+        opcoes.setdefault("cache", CacheEmDisco(tmp_path / "llm"))
+        return ServicoLLM(cliente=ClienteOpenAI(base_url=stub.url, api_key="teste"), **opcoes)
+
+    return criar
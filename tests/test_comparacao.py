@@ -0,0 +1,95 @@
+import io
+import zipfile
+
+import pytest
+from lxml import etree
+
+from tr_core.comparacao import ALTERADA, INALTERADA, comparar, redline_docx, redline_markdown
+from tr_core.gerador import montar_tr
+from tr_core.itens import TabelaItens
+from tr_core.render_docx import to_docx
+from tr_core.render_markdown import render_markdown
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DATA = "2026-03-01T00:00:00Z"
+
+def _itens(*valores) -> TabelaItens:
+    itens = TabelaItens()
+    for i, valor in enumerate(valores, 1):
+        itens.acrescentar(str(i), f"Item {i}", "un", 10, valor)
+    return itens
+
+def _tr(objeto="Locação de veículos", **outros):
+    entradas = dict(secretarias=["Secretaria Municipal de Saúde"], vigencia_meses=12, incluir_opcao_hibrida=True,
+                    kpis_padrao=True, data="01/03/2026", itens=_itens(1, 2, 3))
+    return montar_tr(objeto, **{**entradas, **outros})
+
+@pytest.fixture(scope="module")
+def revisao():
+    antes = _tr()
+    depois = _tr("Locação de veículos leves", vigencia_meses=24, incluir_opcao_hibrida=False, kpis_padrao=False,
+                 itens=_itens(1, 5, 3, 4), justificativa="Nova **justificativa**.")
+    return antes, depois, comparar(antes, depois)
+
+def _document_xml(docx: bytes):
+    return etree.fromstring(zipfile.ZipFile(io.BytesIO(docx)).read("word/document.xml"))
+
+def _texto(raiz, aceitar: bool) -> str:
+    """Texto do documento com todas as revisões aceitas (ou rejeitadas)."""
+    descartado = W + ("del" if aceitar else "ins")
+    return "".join(
+        t.text or "" for t in raiz.iter(W + "t", W + "delText")
+        if not any(a.tag == descartado for a in t.iterancestors())
+    )
+
+def test_documentos_iguais_nao_tem_alteracoes():
+    comparacao = comparar(_tr(), _tr())
+
+    assert comparacao.alteracoes == []
+    assert redline_markdown(comparacao) == render_markdown(_tr())
+    assert redline_markdown(comparacao, somente_alteracoes=True) == ""
+    assert _document_xml(redline_docx(comparacao, data=DATA)).find(f".//{W}ins") is None
+
+def test_alinhamento_por_clausula(revisao):
+    resumo = revisao[2].resumo()
+
+    assert resumo["chaves"] == ["1.1", "1.4", "2", "3", "6.4"]
+    assert resumo[ALTERADA] == 5 and resumo[INALTERADA] > 30
+
+def test_redline_markdown(revisao):
+    markdown = redline_markdown(revisao[2], somente_alteracoes=True)
+
+    assert "**[Cláusula 1.1 — alterada]**" in markdown and "**[Seção 2 — alterada]**" in markdown
+    assert "**Locação de** ~~**veículos**~~<ins>**veículos leves**</ins>" in markdown
+    assert "**Prazo de vigência (meses):** ~~12~~<ins>24</ins>" in markdown
+    assert "R$ ~~60,00 (sessenta~~ <ins>130,00 (cento e trinta</ins> reais)" in markdown
+    # só as linhas alteradas da tabela, removida antes da incluída
+    assert "| ~~2~~ | ~~Item 2~~ | ~~un~~ | ~~10~~ | ~~2,00~~ | ~~20,00~~ |\n| <ins>2</ins> |" in markdown
+    assert "| 1 | Item 1 |" not in markdown
+    assert "<ins>Nova **justificativa**.</ins>" in markdown
+
+def test_redline_markdown_completo_tem_o_documento_todo(revisao):
+    markdown = redline_markdown(revisao[2])
+
+    assert markdown.startswith(render_markdown(revisao[1]).split("\n1.1 ")[0])
+    assert "| 1 | Item 1 | un | 10 | 1,00 | 10,00 |" in markdown
+
+def test_redline_docx_aceitar_e_rejeitar_tudo(revisao):
+    antes, depois, comparacao = revisao
+
+    raiz = _document_xml(redline_docx(comparacao, data=DATA))
+
+    assert _texto(raiz, aceitar=True) == _texto(_document_xml(to_docx(depois)), aceitar=True)
+    assert _texto(raiz, aceitar=False) == _texto(_document_xml(to_docx(antes)), aceitar=True)
+
+def test_marcas_de_revisao_do_word(revisao):
+    raiz = _document_xml(redline_docx(revisao[2], autor="Jurídico", data=DATA))
+
+    marcas = raiz.findall(f".//{W}ins") + raiz.findall(f".//{W}del")
+    ids = [m.get(W + "id") for m in marcas]
+
+    assert marcas and len(set(ids)) == len(ids)
+    assert {(m.get(W + "author"), m.get(W + "date")) for m in marcas} == {("Jurídico", DATA)}
+    # texto removido fica em w:delText, e as linhas da tabela levam a marca em w:trPr
+    assert all(m.find(f".//{W}t") is None for m in raiz.iter(W + "del"))
+    assert raiz.find(f".//{W}tr/{W}trPr/{W}del") is not None and raiz.find(f".//{W}tr/{W}trPr/{W}ins") is not None
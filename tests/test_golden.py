@@ -0,0 +1,61 @@
+"""
+Saída em Markdown comparada byte a byte com arquivos de referência
+(tests/golden), gravados pelas implementações originais, antes do modelo de
+documento: o gerar_tr por concatenação de strings (termo2.py, levado para
+tr_core/gerador.py) e o gerar_tr de termo.py e de termo1.py/termo3.py, todos
+com a data do cabeçalho fixada em DATA.
+"""
+import datetime
+from pathlib import Path
+
+import pytest
+
+from tr_core import gerador
+from tr_core.gerador import gerar_tr, montar_tr_campos_livres, montar_tr_secretarias
+from tr_core.render_markdown import render_markdown
+
+DATA = (2026, 3, 1)
+GOLDEN = Path(__file__).parent / "golden"
+
+SECRETARIAS = [
+    "Secretaria Municipal de Administração",
+    "Secretaria Municipal de Saúde",
+    "Secretaria Municipal de Educação, Cultura, Esporte e Lazer",
+]
+OBJETO = "Locação de veículos utilitários com motorista, para atendimento das Secretarias Municipais"
+
+# nome do arquivo -> (formulário de origem, argumentos posicionais)
+CASOS = {
+    "gerar_tr": ("termo2", (OBJETO, SECRETARIAS[1:2], 12, True, True)),
+    "gerar_tr_sem_opcoes": ("termo2", (OBJETO, SECRETARIAS, 24, False, False)),
+    "gerar_tr_objeto_vazio": ("termo2", ("  ", [], 1, True, False)),
+    "gerar_tr_multilinha": ("termo2", ("Aquisição de material\nde expediente  ", ["", " "], 60, False, True)),
+    "campos_livres": ("termo", (
+        OBJETO, "diária", "3 veículos, 220 diárias", "Sede e zona rural", "Início em 10 dias",
+        "Por preço unitário", "CTB e Resolução CONTRAN nº 789/2020", "", "Indisponibilidade de veículos reserva",
+        "ETP nº 12/2026", True, True,
+    )),
+    "campos_livres_vazio": ("termo", ("", "", "", "", "", "", "", "", "", "", False, False)),
+    "secretarias": ("termo1", (OBJETO, SECRETARIAS, 12, True, True)),
+    "secretarias_sem_opcoes": ("termo1", ("", [], 6, False, False)),
+}
+
+_FUNCOES = {
+    "termo2": gerar_tr,
+    "termo": lambda *argumentos: render_markdown(montar_tr_campos_livres(*argumentos)),
+    "termo1": lambda *argumentos: render_markdown(montar_tr_secretarias(*argumentos)),
+}
+
+class _Data(datetime.date):
+    @classmethod
+    def today(cls):
+        return cls(*DATA)
+
+@pytest.mark.parametrize("nome", CASOS)
+def test_saida_igual_a_de_referencia(nome, monkeypatch):
+    monkeypatch.setattr(gerador, "date", _Data)
+    formulario, argumentos = CASOS[nome]
+
+    texto = _FUNCOES[formulario](*argumentos)
+
+    assert texto.encode("utf-8") == (GOLDEN / f"{nome}.md").read_bytes()
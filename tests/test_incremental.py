@@ -0,0 +1,99 @@
+import io
+import zipfile
+
+import pytest
+
+from tr_core.gerador import SECOES_TR, montar_tr
+from tr_core.incremental import MontadorIncremental
+from tr_core.itens import TabelaItens
+from tr_core.render_docx import to_docx
+from tr_core.render_markdown import render_markdown
+
+SECRETARIAS = ["Secretaria Municipal de Saúde", "Secretaria Municipal de Administração"]
+BASE = dict(
+    objeto="Locação de veículos", secretarias=SECRETARIAS, vigencia_meses=12,
+    incluir_opcao_hibrida=True, kpis_padrao=True, data="01/03/2026",
+)
+TODAS = tuple(secao.nome for secao in SECOES_TR)
+
+def _itens(*valores) -> TabelaItens:
+    itens = TabelaItens()
+    for i, valor in enumerate(valores, 1):
+        itens.acrescentar(str(i), f"Item {i}", "un", 10, valor)
+    return itens
+
+def _conteudo(docx: bytes) -> dict:
+    arquivo = zipfile.ZipFile(io.BytesIO(docx))
+    return {nome: arquivo.read(nome) for nome in arquivo.namelist()}
+
+def test_primeira_montagem_renderiza_tudo_e_a_segunda_nada():
+    montador = MontadorIncremental()
+
+    primeira = montador.montar(**BASE)
+    segunda = montador.montar(**{**BASE, "secretarias": list(SECRETARIAS)})
+
+    assert primeira.renderizadas == TODAS
+    assert segunda.renderizadas == ()
+    assert all(a is b for a, b in zip(primeira.fragmentos, segunda.fragmentos))
+
+@pytest.mark.parametrize(("mudanca", "refeitas"), [
+    ({"kpis_padrao": False}, ("6.4",)),
+    ({"vigencia_meses": 24}, ("quadro_resumo",)),
+    ({"secretarias": SECRETARIAS[:1]}, ("quadro_resumo",)),
+    ({"objeto": "Locação de máquinas"}, ("1", "quadro_resumo")),
+    ({"incluir_opcao_hibrida": False}, ("3",)),
+    ({"justificativa": "Texto **redigido**.\n\n- com lista"}, ("2",)),
+    ({"kpis": "- **Disponibilidade:** 99%"}, ("6.4",)),
+    ({"data": "02/03/2026"}, ("cabecalho",)),
+    ({"itens": _itens(1.5, 2)}, ("1",)),
+])
+def test_so_as_secoes_afetadas_sao_refeitas(mudanca, refeitas):
+    montador = MontadorIncremental()
+    antes = montador.montar(**BASE)
+
+    depois = montador.montar(**{**BASE, **mudanca})
+
+    assert depois.renderizadas == refeitas
+    for anterior, atual in zip(antes.fragmentos, depois.fragmentos):
+        assert (anterior is atual) == (atual.secao not in refeitas)
+    assert depois.markdown == render_markdown(montar_tr(**{**BASE, **mudanca}))
+
+def test_itens_comparados_pelo_conteudo():
+    montador = MontadorIncremental()
+    montador.montar(**BASE, itens=_itens(1.5, 2))
+
+    assert montador.montar(**BASE, itens=_itens(1.5, 2)).renderizadas == ()
+    assert montador.montar(**BASE, itens=_itens(1.5, 3)).renderizadas == ("1",)
+
+def test_docx_remontado_dos_fragmentos(monkeypatch):
+    monkeypatch.setattr(zipfile.time, "time", lambda: 1772366400.0)
+    montador = MontadorIncremental()
+    antes = montador.montar(**BASE)
+    antes.docx()
+    xml = {f.secao: f.docx() for f in antes.fragmentos}
+    mudanca = {"kpis_padrao": False, "justificativa": "Texto **redigido**."}
+
+    montagem = montador.montar(**{**BASE, **mudanca})
+
+    assert montagem.docx() == to_docx(montar_tr(**{**BASE, **mudanca}))
+    for fragmento in montagem.fragmentos:
+        # XML já pronto reaproveitado como está; só o das seções refeitas é novo
+        assert (fragmento.docx() is xml[fragmento.secao]) == (fragmento.secao not in montagem.renderizadas)
+
+def test_montagem_compartilhada_nao_e_alterada_pela_remontagem():
+    montador = MontadorIncremental()
+    primeira = montador.montar(**BASE)
+    docx = _conteudo(primeira.docx())
+
+    montador.montar(**{**BASE, "kpis_padrao": False}).docx()
+
+    assert _conteudo(primeira.docx()) == docx
+    assert primeira.markdown == render_markdown(montar_tr(**BASE))
+
+def test_lru_descarta_os_fragmentos_mais_antigos():
+    montador = MontadorIncremental(maximo=len(TODAS))
+    montador.montar(**BASE)
+
+    montador.montar(**{**BASE, "objeto": "Outro objeto", "vigencia_meses": 6})
+
+    assert montador.montar(**BASE).renderizadas == ("1", "quadro_resumo")
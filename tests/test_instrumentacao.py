@@ -0,0 +1,33 @@
+import contextvars
+import threading
+
+from tr_core import instrumentacao
+
+def _medido(nome: str) -> bool:
+    with instrumentacao.etapa(nome):
+        pass
+    return any(r["etapa"] == nome for r in instrumentacao.recentes())
+
+def test_medicao_no_contexto_nao_liga_o_processo():
+    assert not instrumentacao.ativa()
+    outra_thread = []
+
+    def em_contexto_proprio():
+        instrumentacao.medir_no_contexto(True)
+        outra_thread.append(_medido("na_sessao"))
+
+    contextvars.Context().run(em_contexto_proprio)
+    sem_medicao = threading.Thread(target=lambda: outra_thread.append(_medido("em_outra_sessao")))
+    sem_medicao.start()
+    sem_medicao.join()
+
+    assert outra_thread == [True, False]
+    assert not instrumentacao.ativa() and not _medido("fora_da_sessao")
+
+def test_medicao_desligada_no_contexto():
+    def em_contexto_proprio():
+        instrumentacao.medir_no_contexto(True)
+        instrumentacao.medir_no_contexto(False)
+        return _medido("desligada")
+
+    assert not contextvars.Context().run(em_contexto_proprio)
@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+from tr_core.itens import TabelaItens, interpretar_numero, ler_tabela
+
+@pytest.mark.parametrize(("texto", "brasileiro", "esperado"), [
+    ("R$ 1.234,56", True, 1234.56),
+    ("1,234.56", True, 1234.56),    # ponto decimal numa planilha com ";"
+    ("12.50", True, 12.5),
+    ("1.500", True, 1500.0),        # grupos de milhar no formato da planilha
+    ("1.500", False, 1.5),
+    ("1,500", False, 1500.0),
+    ("12,5", False, 12.5),          # vírgula decimal numa planilha com ","
+    ("1.500", None, 1500.0),        # texto numa célula do XLSX
+])
+def test_formato_decidido_por_celula(texto, brasileiro, esperado):
+    assert interpretar_numero(texto, brasileiro) == esperado
+
+@pytest.mark.parametrize("texto", ["1.234.56", "1,2,3", "12,34.5"])
+def test_celula_em_formato_invalido(texto):
+    with pytest.raises(ValueError):
+        interpretar_numero(texto, True)
+
+def test_csv_com_celulas_em_formatos_diferentes():
+    csv = "Descrição;Qtde;Valor unitário\nCaneta;10;1,50\nPapel;2;12.50\nToner;1;1.234,56\n"
+
+    itens = ler_tabela(io.BytesIO(csv.encode("utf-8")), "itens.csv")
+
+    assert list(itens.valores_unitarios) == [1.5, 12.5, 1234.56]
+    assert itens.total_centavos == 1500 + 2500 + 123456
+
+def test_total_do_item_arredonda_meio_centavo_para_cima():
+    itens = TabelaItens()
+    itens.acrescentar("1", "Item", "un", 1, 0.285)
+    itens.acrescentar("2", "Item", "un", 2.5, 1.01)
+
+    assert list(itens.totais) == [29, 253]
+
+@pytest.mark.parametrize("celula", ["inf", "NaN", "1e400", "-Infinity"])
+def test_celula_nao_finita_e_recusada_com_linha_e_coluna(celula):
+    csv = f"Descrição;Qtde;Valor unitário\nCaneta;10;1,50\nPapel;2;{celula}\n"
+
+    with pytest.raises(ValueError, match=r'itens\.csv, linha 3, coluna "Valor unitário"'):
+        ler_tabela(io.BytesIO(csv.encode("utf-8")), "itens.csv")
+
+def test_quantidade_nao_finita_no_acrescentar():
+    with pytest.raises(ValueError):
+        TabelaItens().acrescentar("1", "Item", "un", float("inf"), 1.0)
+
+def test_descricao_com_barra_e_quebra_de_linha_nao_parte_a_tabela_markdown():
+    from tr_core.modelo import Documento
+    from tr_core.render_markdown import render_markdown
+
+    itens = TabelaItens()
+    itens.acrescentar("1", "Cabo 2,5mm | 100m", "rolo", 2, 150.0)
+    itens.acrescentar("2", "Fio\nflexível", "m", 10, 1.0)
+
+    linhas = render_markdown(Documento((itens.tabela(),))).splitlines()
+
+    assert len(linhas) == 5  # cabeçalho, separador, 2 itens e o total
+    assert linhas[2] == "| 1 | Cabo 2,5mm \\| 100m | rolo | 2 | 150,00 | 300,00 |"
+    assert linhas[3].startswith("| 2 | Fio flexível | m |")
+    assert all(l.count("|") - l.count("\\|") == 7 for l in linhas)
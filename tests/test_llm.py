@@ -0,0 +1,106 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tr_core.llm import ErroLLM
+from tr_core.redacao import aredigir_secoes
+
+TAREFA, VERSAO = "justificativa", "1"
+# dez partes no streaming: com atraso de 0,02 s cada chamada leva uns 0,2 s
+TEXTO = "Justificativa redigida em dez partes pelo servidor local de teste."
+
+def _mensagens(objeto):
+    return [{"role": "user", "content": objeto}]
+
+def _devagar(stub, atraso=0.02):
+    stub.atraso = atraso
+    stub.responder = lambda mensagens: TEXTO
+
+def test_pedidos_simultaneos_compartilham_uma_chamada(stub, novo_servico):
+    _devagar(stub)
+    servico = novo_servico()
+
+    async def varios():
+        return await asyncio.gather(*(servico.agerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza")) for _ in range(8)))
+
+    textos = servico.executar(varios(), timeout=30)
+
+    assert textos == [TEXTO] * 8
+    assert stub.requisicoes == 1 and servico.chamadas_api == 1
+
+def test_sessoes_em_threads_compartilham_uma_chamada(stub, novo_servico):
+    _devagar(stub)
+    servico = novo_servico()
+
+    with ThreadPoolExecutor(6) as pool:
+        textos = list(pool.map(
+            lambda _: "".join(servico.stream(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"))), range(6)
+        ))
+
+    assert textos == [TEXTO] * 6
+    assert stub.requisicoes == 1
+
+def test_objetos_diferentes_nao_se_misturam(stub, novo_servico):
+    servico = novo_servico()
+
+    async def dois():
+        return await asyncio.gather(
+            servico.agerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza")),
+            servico.agerar(TAREFA, VERSAO, "Vigilância", _mensagens("Vigilância")),
+        )
+
+    limpeza, vigilancia = servico.executar(dois(), timeout=30)
+
+    assert "Limpeza" in limpeza and "Vigilância" in vigilancia
+    assert stub.requisicoes == 2
+
+def test_cache_em_disco_vale_para_outra_instancia(stub, novo_servico):
+    primeiro = novo_servico().gerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"), timeout=30)
+    outro = novo_servico()
+
+    assert outro.gerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"), timeout=30) == primeiro
+    assert list(outro.stream(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"))) == [primeiro]
+    assert stub.requisicoes == 1 and outro.chamadas_api == 0
+
+@pytest.mark.parametrize("opcoes", [{"modelo": "outro-modelo"}, {"temperatura": 0.9}])
+def test_cache_separado_por_modelo_e_temperatura(stub, novo_servico, opcoes):
+    novo_servico().gerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"), timeout=30)
+    novo_servico(**opcoes).gerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"), timeout=30)
+
+    assert stub.requisicoes == 2
+
+def test_tempo_esgotado_nao_perde_a_chamada(stub, novo_servico):
+    _devagar(stub, atraso=0.1)
+    servico = novo_servico()
+
+    with pytest.raises(ErroLLM, match="Sem resposta"):
+        list(servico.stream(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"), timeout=0.05))
+
+    # quem desistiu não cancela a chamada: ela termina e fica no cache
+    assert servico.gerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"), timeout=30) == TEXTO
+    assert stub.requisicoes == 1
+
+def test_falha_do_llm_vira_erro_llm_e_nao_vai_para_o_cache(stub, novo_servico):
+    stub.falhar = True
+    servico = novo_servico()
+
+    with pytest.raises(ErroLLM):
+        list(servico.stream(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza")))
+    assert servico.cache.obter(servico.chave(TAREFA, VERSAO, "Limpeza")) is None
+
+    stub.falhar = False
+    assert "Limpeza" in servico.gerar(TAREFA, VERSAO, "Limpeza", _mensagens("Limpeza"), timeout=30)
+
+def test_limite_de_chamadas_simultaneas(stub, novo_servico):
+    _devagar(stub)
+    servico = novo_servico()
+
+    inicio = time.perf_counter()
+    resultado = servico.executar(aredigir_secoes("Limpeza", servico=servico, limite=2, timeout=30), timeout=60)
+    segundos = time.perf_counter() - inicio
+
+    assert len(resultado.textos) == 4 and not resultado.falhas
+    assert stub.requisicoes == 4 and stub.pico == 2
+    assert segundos >= 0.35  # duas levas de ~0,2 s
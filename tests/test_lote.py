@@ -0,0 +1,47 @@
+import pytest
+
+from tr_core.lote import gerar_lote, ler_entradas, normalizar_entrada
+
+@pytest.mark.parametrize(("arquivo", "esperado"), [
+    ("tr_limpeza", "tr_limpeza"),
+    ("saida/2026/tr_limpeza", "tr_limpeza"),
+    ("pasta\\tr_limpeza", "tr_limpeza"),
+    ("tr_limpeza.docx", "tr_limpeza"),
+    ("  ", ""),
+])
+def test_arquivo_reduzido_ao_nome(arquivo, esperado):
+    assert normalizar_entrada({"objeto": "Limpeza", "arquivo": arquivo})["arquivo"] == esperado
+
+@pytest.mark.parametrize("arquivo", ["../tr", "saida/../../tr", "..\\tr", "/tmp/tr", "\\\\servidor\\tr", "C:\\tr", ".."])
+def test_arquivo_fora_do_diretorio_de_saida(arquivo):
+    with pytest.raises(ValueError, match="Linha 7: "):
+        normalizar_entrada({"objeto": "Limpeza", "arquivo": arquivo}, 7)
+
+def test_linha_do_csv_na_mensagem(tmp_path):
+    caminho = tmp_path / "pac.csv"
+    caminho.write_text("objeto;arquivo\nLimpeza;tr_limpeza\nVigilância;../../vigilancia\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Linha 3: "):
+        ler_entradas(caminho)
+
+def test_nomes_repetidos_antes_de_gerar(tmp_path):
+    entradas = [
+        normalizar_entrada({"objeto": "Limpeza", "arquivo": "tr"}),
+        normalizar_entrada({"objeto": "Vigilância"}),
+        normalizar_entrada({"objeto": "Manutenção", "arquivo": "a/TR.md"}),
+    ]
+
+    with pytest.raises(ValueError, match="Entradas 1 e 3"):
+        gerar_lote(entradas, tmp_path / "saida", processos=2, formatos=["md"])
+    assert list((tmp_path / "saida").iterdir()) == []
+
+def test_arquivos_gravados_no_diretorio_de_saida(tmp_path):
+    entradas = [
+        normalizar_entrada({"objeto": "Limpeza", "arquivo": "outro/tr_limpeza"}),
+        normalizar_entrada({"objeto": "Vigilância"}),
+    ]
+
+    resultado = gerar_lote(entradas, tmp_path, processos=1, formatos=["md"])
+
+    assert sorted(a.name for a in resultado.arquivos) == ["0002_vigilancia.md", "tr_limpeza.md"]
+    assert all(a.parent == tmp_path for a in resultado.arquivos)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from tr_core.medicao import ler_colunas, ler_eventos, ler_itens, main, medir
+
+def _escrever(pasta, nome, texto):
+    caminho = pasta / nome
+    caminho.write_text(texto, encoding="utf-8")
+    return caminho
+
+def test_data_em_branco_fica_fora_da_media(tmp_path):
+    itens = ler_itens(_escrever(tmp_path, "itens.csv", "item;descricao;unidade;quantidade\n1;Manutenção;hora;100\n"))
+    eventos = ler_eventos(_escrever(
+        tmp_path, "eventos.csv",
+        "item;quantidade;abertura;solucao\n"
+        "1;1;01/03/2024 08:00;01/03/2024 10:00\n"
+        "1;1;02/03/2024 08:00;\n"
+        "1;1;03/03/2024 08:00;03/03/2024 12:00\n",
+    ))
+
+    medicao = medir(itens, eventos, "01/03/2024", "01/04/2024")
+
+    assert medicao.eventos == 3
+    assert medicao.indicadores["Tempo de solução"] == 3.0
+
+def test_sem_nenhuma_data_o_indicador_nao_aparece(tmp_path):
+    itens = ler_itens(_escrever(tmp_path, "itens.csv", "item;descricao;unidade;quantidade\n1;Manutenção;hora;100\n"))
+    eventos = ler_eventos(_escrever(tmp_path, "eventos.csv", "item;quantidade;abertura;solucao\n1;1;01/03/2024 08:00;\n"))
+
+    medicao = medir(itens, eventos, "01/03/2024", "01/04/2024")
+
+    assert "Tempo de solução" not in medicao.indicadores
+
+def test_csv_de_uma_coluna(tmp_path):
+    colunas = ler_colunas(_escrever(tmp_path, "itens.csv", "item\n1\n2\n"))
+
+    assert colunas["item"].tolist() == ["1", "2"]
+    assert isinstance(colunas["item"], np.ndarray)
+
+def test_milhares_sem_virgula_num_csv_com_ponto_e_virgula(tmp_path):
+    itens = ler_itens(_escrever(tmp_path, "itens.csv", "item;descricao;unidade;quantidade\n1;Cópias;un;2.000\n"))
+    eventos = ler_eventos(_escrever(tmp_path, "eventos.csv", "item;quantidade;abertura\n1;1.500;05/03/2024\n1;12,5;06/03/2024\n"))
+
+    medicao = medir(itens, eventos, "01/03/2024", "01/04/2024")
+
+    assert itens.quantidades.tolist() == [2000.0]
+    assert eventos.quantidades.tolist() == [1500.0, 12.5]
+    assert medicao.saldo.tolist() == [487.5]
+
+def test_ponto_decimal_num_csv_com_virgula(tmp_path):
+    itens = ler_itens(_escrever(tmp_path, "itens.csv", 'item,descricao,unidade,quantidade\n1,Cópias,un,"2,000"\n2,Papel,kg,1.500\n'))
+
+    assert itens.quantidades.tolist() == [2000.0, 1.5]
+
+def test_numero_invalido_indica_a_coluna(tmp_path):
+    with pytest.raises(ValueError, match="coluna 'quantidade'"):
+        ler_itens(_escrever(tmp_path, "itens.csv", "item;descricao;unidade;quantidade\n1;Cópias;un;1.234.56\n"))
+
+def test_municipio_desconhecido_na_linha_de_comando(tmp_path, capsys):
+    caminho_itens = _escrever(tmp_path, "itens.csv", "item;descricao;unidade;quantidade\n1;Cópias;un;10\n")
+    caminho_eventos = _escrever(tmp_path, "eventos.csv", "item;quantidade;abertura\n1;1;05/03/2024\n")
+
+    codigo = main([str(caminho_itens), str(caminho_eventos), "--inicio", "2024-03-01", "--fim", "2024-04-01",
+                   "--municipio", "Atlântida", "-o", str(tmp_path / "boletim.docx")])
+
+    assert codigo == 1
+    assert capsys.readouterr().err.startswith("erro: ")
+    assert not (tmp_path / "boletim.docx").exists()
@@ -0,0 +1,106 @@
+import pytest
+
+from tr_core import municipios
+from tr_core.gerador import montar_tr
+from tr_core.municipios import municipio, municipio_padrao, recarregar
+from tr_core.render_markdown import render_markdown
+
+SORRISO = """
+municipio = "Sorriso"
+uf = "MT"
+estado = "Estado de Mato Grosso"
+
+[decretos]
+bem_de_luxo = "Decreto nº 100/2025"
+pesquisa_de_precos = "Decreto nº 101/2025"
+contratacoes = "Decreto nº 102/2025"
+
+[secretarias]
+lista = ["Secretaria Municipal de Agricultura", "Secretaria Municipal de Obras"]
+
+[clausulas]
+"1.3" = "1.3 A vigência será a do contrato, conforme o {decreto_contratacoes} da {prefeitura}."
+"""
+
+@pytest.fixture
+def registro_extra(tmp_path, monkeypatch):
+    """Diretório de TR_MUNICIPIOS; cada teste grava os seus TOMLs e chama recarregar()."""
+    monkeypatch.setenv("TR_MUNICIPIOS", str(tmp_path))
+    yield tmp_path
+    monkeypatch.undo()
+    recarregar()
+
+def _tr(municipio_tr: str = "Brasnorte-MT") -> str:  # o mesmo padrão de montar_tr
+    return render_markdown(montar_tr("Locação de veículos", [], 12, True, True, municipio_tr, data="01/03/2026"))
+
+@pytest.mark.parametrize("nome", ["Brasnorte-MT", "brasnorte-mt", "BRASNORTE", "Brasnorte/MT", "brasnorte mt"])
+def test_municipio_por_nome_ou_id(nome):
+    assert municipio(nome).id == "brasnorte-mt"
+
+@pytest.mark.parametrize("nome", [None, "", "  "])
+def test_sem_nome_vale_o_padrao(nome):
+    assert municipio(nome) is municipio_padrao()
+
+def test_nome_fora_do_registro():
+    with pytest.raises(ValueError, match="Município não registrado: 'Atlântida'.*Brasnorte-MT"):
+        municipio("Atlântida")
+    with pytest.raises(ValueError):
+        montar_tr("Locação", [], 12, True, True, municipio="Atlântida")
+
+def test_toml_adicional(registro_extra):
+    (registro_extra / "sorriso-mt.toml").write_text(SORRISO, encoding="utf-8")
+    recarregar()
+
+    sorriso = municipio("Sorriso")
+    markdown = _tr("sorriso-mt")
+
+    assert sorriso.nome == "Sorriso-MT" and sorriso.secretarias[0] == "Secretaria Municipal de Agricultura"
+    assert sorriso.linhas_timbre == ("PREFEITURA MUNICIPAL DE SORRISO", "Estado de Mato Grosso")
+    assert "**Município:** Sorriso-MT" in markdown
+    assert "Decreto nº 100/2025" in markdown and "Decreto Municipal nº 03/2024" not in markdown
+    assert "1.3 A vigência será a do contrato, conforme o Decreto nº 102/2025 da Prefeitura Municipal de Sorriso-MT." in markdown
+    assert [m.id for m in municipios.municipios()] == ["brasnorte-mt", "sorriso-mt"]
+
+def test_outro_municipio_nao_altera_o_tr_padrao(registro_extra):
+    padrao = _tr()
+    (registro_extra / "sorriso-mt.toml").write_text(SORRISO, encoding="utf-8")
+    recarregar()
+
+    _tr("Sorriso-MT")
+
+    assert _tr() == padrao == _tr("brasnorte")
+
+def test_mesmo_id_substitui_o_do_pacote(registro_extra):
+    (registro_extra / "brasnorte-mt.toml").write_text(SORRISO.replace('"Sorriso"', '"Brasnorte"'), encoding="utf-8")
+    recarregar()
+
+    markdown = _tr()
+
+    assert municipio(None).decretos["bem_de_luxo"] == "Decreto nº 100/2025"
+    assert municipio(None).secretarias == ("Secretaria Municipal de Agricultura", "Secretaria Municipal de Obras")
+    assert "Decreto nº 100/2025" in markdown and "Decreto Municipal nº 03/2024" not in markdown
+    assert "1.3 A vigência será a do contrato" in markdown
+
+def test_municipio_padrao_pela_variavel_de_ambiente(registro_extra, monkeypatch):
+    (registro_extra / "sorriso-mt.toml").write_text(SORRISO, encoding="utf-8")
+    monkeypatch.setenv("TR_MUNICIPIO_PADRAO", "sorriso-mt")
+    recarregar()
+
+    assert municipio("").id == "sorriso-mt"
+    assert "**Município:** Sorriso-MT" in _tr("")
+    assert "**Município:** Brasnorte-MT" in _tr()
+
+def test_toml_sem_campo_obrigatorio(registro_extra):
+    (registro_extra / "incompleto.toml").write_text('municipio = "Incompleto"\n', encoding="utf-8")
+    recarregar()
+
+    with pytest.raises(ValueError, match="incompleto.toml: campo obrigatório ausente: uf"):
+        municipio("Brasnorte-MT")
+
+def test_clausula_com_campo_nao_definido(registro_extra):
+    (registro_extra / "sorriso-mt.toml").write_text(SORRISO.replace("{decreto_contratacoes}", "{decreto_obras}"), encoding="utf-8")
+    recarregar()
+
+    assert municipio("Sorriso-MT").uf == "MT"
+    with pytest.raises(ValueError, match="Município sorriso-mt: campo 'decreto_obras' não definido"):
+        _tr("Sorriso-MT")
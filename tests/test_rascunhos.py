@@ -0,0 +1,109 @@
+import sqlite3
+import time
+
+import pytest
+
+from tr_core.itens import TabelaItens
+from tr_core.rascunhos import Rascunhos, novo_id
+
+ESPERA = 0.2
+
+@pytest.fixture
+def caminho(tmp_path):
+    return tmp_path / "rascunhos.sqlite3"
+
+@pytest.fixture
+def rascunhos(caminho):
+    return Rascunhos(caminho, espera=ESPERA, espera_maxima=4 * ESPERA)
+
+def _esperar(condicao, limite: float = 5.0) -> None:
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "tempo esgotado"
+        time.sleep(0.01)
+
+def _gravado(caminho, id_rascunho):
+    """O que está no banco, lido por outra instância (sem os pendentes desta)."""
+    return Rascunhos(caminho).carregar(id_rascunho)
+
+def test_edicoes_rapidas_viram_uma_gravacao(rascunhos, caminho):
+    id_rascunho = novo_id()
+
+    for vigencia in range(1, 6):
+        assert rascunhos.agendar(id_rascunho, {"objeto": "Locação", "vigencia_meses": vigencia})
+
+    assert rascunhos.carregar(id_rascunho) == {"objeto": "Locação", "vigencia_meses": 5}
+    assert _gravado(caminho, id_rascunho) is None
+    _esperar(lambda: rascunhos.gravacoes == 1)
+    assert _gravado(caminho, id_rascunho) == {"objeto": "Locação", "vigencia_meses": 5}
+    assert rascunhos.estatisticas() == {"agendamentos": 5, "gravacoes": 1, "pendentes": 0}
+
+def test_estado_igual_nao_agenda(rascunhos):
+    id_rascunho = novo_id()
+    rascunhos.agendar(id_rascunho, {"objeto": "Locação"})
+    _esperar(lambda: rascunhos.gravacoes == 1)
+
+    assert not rascunhos.agendar(id_rascunho, {"objeto": "Locação"})
+    time.sleep(2 * ESPERA)
+    assert rascunhos.estatisticas() == {"agendamentos": 1, "gravacoes": 1, "pendentes": 0}
+
+def test_edicao_continua_grava_na_espera_maxima(rascunhos, caminho):
+    id_rascunho = novo_id()
+    inicio = time.monotonic()
+
+    i = 0
+    while rascunhos.gravacoes == 0:
+        assert time.monotonic() - inicio < 10 * ESPERA, "a espera máxima não foi respeitada"
+        i += 1
+        rascunhos.agendar(id_rascunho, {"vigencia_meses": i})
+        time.sleep(ESPERA / 4)
+
+    assert time.monotonic() - inicio >= 4 * ESPERA
+    assert _gravado(caminho, id_rascunho)["vigencia_meses"] <= i
+
+def test_salvar_grava_na_hora_e_descarta_o_pendente(rascunhos, caminho):
+    id_rascunho = novo_id()
+    rascunhos.agendar(id_rascunho, {"objeto": "pendente"})
+
+    rascunhos.salvar(id_rascunho, {"objeto": "salvo"})
+
+    assert _gravado(caminho, id_rascunho) == {"objeto": "salvo"}
+    time.sleep(2 * ESPERA)
+    assert rascunhos.estatisticas()["gravacoes"] == 1
+    assert _gravado(caminho, id_rascunho) == {"objeto": "salvo"}
+
+def test_descarregar_grava_os_pendentes(caminho):
+    rascunhos = Rascunhos(caminho, espera=60, espera_maxima=60)
+    ids = [novo_id() for _ in range(3)]
+    for id_rascunho in ids:
+        rascunhos.agendar(id_rascunho, {"objeto": id_rascunho})
+
+    rascunhos.descarregar()
+
+    assert [_gravado(caminho, i) for i in ids] == [{"objeto": i} for i in ids]
+    assert rascunhos.estatisticas() == {"agendamentos": 3, "gravacoes": 3, "pendentes": 0}
+
+def test_tabela_de_itens_volta_como_tabela(rascunhos, caminho):
+    itens = TabelaItens()
+    itens.acrescentar("1", "Resma de papel A4", "un", 10, 25.9)
+    id_rascunho = novo_id()
+
+    rascunhos.salvar(id_rascunho, {"objeto": "Material", "itens": itens})
+
+    lido = _gravado(caminho, id_rascunho)["itens"]
+    assert isinstance(lido, TabelaItens) and lido.para_json() == itens.para_json()
+
+def test_remover_e_remover_antigos(rascunhos, caminho):
+    novo, antigo, removido = novo_id(), novo_id(), novo_id()
+    for id_rascunho in (novo, antigo, removido):
+        rascunhos.salvar(id_rascunho, {"objeto": id_rascunho})
+    with sqlite3.connect(caminho) as conexao:
+        conexao.execute("UPDATE rascunho SET atualizado_em = '2020-01-01T00:00:00' WHERE id = ?", (antigo,))
+    conexao.close()
+
+    rascunhos.remover(removido)
+
+    assert rascunhos.carregar(removido) is None
+    assert rascunhos.remover_antigos(dias=30) == 1
+    assert _gravado(caminho, antigo) is None and _gravado(caminho, novo) == {"objeto": novo}
+    assert len(rascunhos) == 1
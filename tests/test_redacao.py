@@ -0,0 +1,111 @@
+import pytest
+
+from tr_core.gerador import montar_tr
+from tr_core.redacao import SECOES, aredigir_secoes
+from tr_core.render_markdown import render_markdown
+
+OBJETO = "Serviços de limpeza predial"
+# trecho de cada prompt (tr_core.redacao) -> seção, para o stub responder por seção
+_MARCAS = {
+    "Descrição da Solução": "solucao",
+    "Requisitos da Contratação": "requisitos",
+    "Indicadores de Desempenho": "kpis",
+}
+
+def _secao(mensagens) -> str:
+    pedido = mensagens[-1]["content"]
+    return next((secao for marca, secao in _MARCAS.items() if marca in pedido), "justificativa")
+
+def _responder(palavras: dict[str, int]):
+    """Texto de `palavras[secao]` palavras (uma parte do streaming cada); 0 = resposta vazia."""
+    def responder(mensagens):
+        secao = _secao(mensagens)
+        return " ".join([f"{secao}-{i}" for i in range(palavras.get(secao, 5))])
+
+    return responder
+
+def _redigir(servico, **opcoes):
+    opcoes.setdefault("timeout", 30)
+    return servico.executar(aredigir_secoes(OBJETO, servico=servico, **opcoes), timeout=60)
+
+def _tr(**textos) -> str:
+    return render_markdown(montar_tr(OBJETO, [], 12, True, True, data="01/03/2026", **textos))
+
+def _trecho(markdown: str, inicio: str, fim: str | None = None) -> str:
+    trecho = markdown[markdown.index(inicio):]
+    return trecho[:trecho.index(fim)] if fim else trecho
+
+@pytest.mark.parametrize("limite", [1, 2, 3])
+def test_limite_de_secoes_simultaneas(stub, novo_servico, limite):
+    stub.atraso = 0.05
+    stub.responder = _responder({})
+    servico = novo_servico()
+
+    resultado = _redigir(servico, limite=limite)
+
+    assert list(resultado.textos) == list(SECOES) and not resultado.falhas
+    assert stub.requisicoes == 4 and stub.pico == limite
+
+def test_limite_pela_variavel_de_ambiente(stub, novo_servico, monkeypatch):
+    monkeypatch.setenv("TR_LLM_CONCORRENCIA", "1")
+    stub.atraso = 0.05
+    stub.responder = _responder({})
+    servico = novo_servico()
+
+    _redigir(servico)
+
+    assert stub.pico == 1
+
+def test_secao_que_estoura_o_tempo_fica_com_o_texto_padrao(stub, novo_servico):
+    stub.atraso = 0.05
+    stub.responder = _responder({"kpis": 40})  # ~2 s, contra ~0,25 s das demais
+    servico = novo_servico()
+
+    resultado = _redigir(servico, timeout=1)
+
+    assert list(resultado.falhas) == ["kpis"] and "sem resposta" in resultado.falhas["kpis"]
+    assert list(resultado.textos) == ["justificativa", "solucao", "requisitos"]
+    redigido, padrao = _tr(**resultado.textos), _tr()
+    assert _trecho(redigido, "## 6.") == _trecho(padrao, "## 6.")
+    assert _trecho(redigido, "## 4.", "## 5.") != _trecho(padrao, "## 4.", "## 5.")
+
+def test_secao_com_resposta_vazia_fica_com_o_texto_padrao(stub, novo_servico):
+    stub.responder = _responder({"requisitos": 0})
+    servico = novo_servico()
+
+    resultado = _redigir(servico)
+
+    assert resultado.falhas == {"requisitos": "resposta vazia"}
+    assert _trecho(_tr(**resultado.textos), "## 4.", "## 5.") == _trecho(_tr(), "## 4.", "## 5.")
+
+def test_falha_do_llm_em_todas_as_secoes(stub, novo_servico):
+    stub.falhar = True
+    servico = novo_servico()
+
+    resultado = _redigir(servico)
+
+    assert not resultado.textos and list(resultado.falhas) == list(SECOES)
+    assert _tr(**resultado.textos) == _tr()
+
+@pytest.mark.parametrize("secoes", [SECOES, tuple(reversed(SECOES)), ("kpis", "justificativa")])
+def test_ordem_das_secoes_e_a_pedida(stub, novo_servico, secoes):
+    stub.atraso = 0.01
+    # a justificativa chega por último, os KPIs primeiro
+    stub.responder = _responder({"justificativa": 30, "solucao": 20, "requisitos": 10, "kpis": 2})
+    servico = novo_servico()
+
+    resultado = _redigir(servico, secoes=secoes)
+
+    assert list(resultado.textos) == list(secoes)
+    assert all(texto.startswith(f"{secao}-0") for secao, texto in resultado.textos.items())
+
+def test_ordem_com_secoes_aceitas_e_falhas(stub, novo_servico):
+    stub.responder = _responder({"kpis": 0})
+    servico = novo_servico()
+
+    resultado = _redigir(servico, aceitos={"solucao": "Texto aceito."})
+
+    assert list(resultado.textos) == ["justificativa", "solucao", "requisitos"]
+    assert resultado.textos["solucao"] == "Texto aceito."
+    assert list(resultado.falhas) == ["kpis"]
+    assert stub.requisicoes == 3
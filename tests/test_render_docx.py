@@ -0,0 +1,43 @@
+import io
+import zipfile
+
+import pytest
+
+from tr_core.gerador import montar_tr, montar_tr_campos_livres
+from tr_core.itens import TabelaItens
+from tr_core.render_docx import escrever_docx, iterar_docx, to_docx
+
+def _itens(quantidade: int) -> TabelaItens:
+    itens = TabelaItens()
+    for i in range(1, quantidade + 1):
+        itens.acrescentar(str(i), f"Item de teste nº {i}, com descrição | e quebra\nde linha", "un", i, 1.5 * i)
+    return itens
+
+DOCUMENTOS = {
+    "tr": lambda: montar_tr("Locação de veículos", ["Secretaria Municipal de Saúde"], 12, True, True, data="01/03/2026"),
+    "campos_livres": lambda: montar_tr_campos_livres("", "", "", "", "", "", "", "", "", "", False, False),
+    "tabela_grande": lambda: montar_tr("Material de expediente", [], 12, False, True, data="01/03/2026", itens=_itens(3000)),
+}
+
+@pytest.fixture(autouse=True)
+def _relogio_parado(monkeypatch):
+    # a data de cada membro do .zip vem de time.time(): fixa para comparar bytes gerados em segundos diferentes
+    monkeypatch.setattr(zipfile.time, "time", lambda: 1772366400.0)
+
+@pytest.mark.parametrize("nome", DOCUMENTOS)
+def test_iterar_docx_tem_os_mesmos_bytes_de_to_docx(nome):
+    documento = DOCUMENTOS[nome]()
+
+    partes = list(iterar_docx(documento))
+
+    assert b"".join(partes) == to_docx(documento)
+    assert len(partes) > 3 and all(isinstance(p, bytes) for p in partes)
+
+@pytest.mark.parametrize("nome", DOCUMENTOS)
+def test_escrever_docx_tem_os_mesmos_bytes_de_to_docx(nome):
+    documento = DOCUMENTOS[nome]()
+    destino = io.BytesIO()
+
+    escrever_docx(documento, destino)
+
+    assert destino.getvalue() == to_docx(documento)
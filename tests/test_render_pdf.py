@@ -0,0 +1,99 @@
+import io
+import re
+import zlib
+
+import pytest
+
+from tr_core.gerador import montar_tr
+from tr_core.itens import TabelaItens
+from tr_core.render_pdf import escrever_pdf, to_pdf
+
+def _itens(quantidade: int) -> TabelaItens:
+    itens = TabelaItens()
+    for i in range(1, quantidade + 1):
+        itens.acrescentar(str(i), f"Resma de papel A4 nº {i}", "un", i, 25.9)
+    return itens
+
+def _tr(**outros):
+    return montar_tr("Locação de veículos", ["Secretaria Municipal de Saúde"], 12, True, True, data="01/03/2026", **outros)
+
+def _estrutura(pdf: bytes) -> dict:
+    """Confere cabeçalho, tabela xref e trailer; devolve número do objeto -> corpo."""
+    assert pdf.startswith(b"%PDF-1.4\n") and pdf.endswith(b"%%EOF\n")
+    inicio_xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", pdf).group(1))
+    assert pdf[inicio_xref:].startswith(b"xref\n")
+    tamanho = int(re.search(rb"/Size (\d+)", pdf[inicio_xref:]).group(1))
+    entradas = re.findall(rb"(\d{10}) 00000 n \n", pdf[inicio_xref:])
+    assert len(entradas) == tamanho - 1
+    objetos = {}
+    for numero, posicao in enumerate(map(int, entradas), 1):
+        cabecalho = b"%d 0 obj\n" % numero
+        assert pdf[posicao:posicao + len(cabecalho)] == cabecalho
+        fim = pdf.index(b"\nendobj\n", posicao)
+        objetos[numero] = pdf[posicao + len(cabecalho):fim]
+    return objetos
+
+def _paginas(objetos: dict) -> list[bytes]:
+    """Fluxo de conteúdo (descomprimido) de cada página, na ordem de /Kids."""
+    raiz = next(c for c in objetos.values() if c.startswith(b"<< /Type /Pages"))
+    paginas = []
+    for numero in map(int, re.findall(rb"(\d+) 0 R", raiz.split(b"/Kids")[1])):
+        conteudo = objetos[int(re.search(rb"/Contents (\d+) 0 R", objetos[numero]).group(1))]
+        tamanho = int(re.search(rb"/Length (\d+)", conteudo).group(1))
+        fluxo = conteudo[conteudo.index(b"stream\n") + 7:]
+        assert fluxo[tamanho:] == b"\nendstream"
+        paginas.append(zlib.decompress(fluxo[:tamanho]))
+    assert int(re.search(rb"/Count (\d+)", raiz).group(1)) == len(paginas)
+    return paginas
+
+def test_estrutura_do_pdf():
+    paginas = _paginas(_estrutura(to_pdf(_tr())))
+
+    assert len(paginas) > 1
+    for numero, conteudo in enumerate(paginas, 1):
+        assert b"(P\xe1gina %d de %d) Tj" % (numero, len(paginas)) in conteudo
+        assert b"(PREFEITURA MUNICIPAL DE BRASNORTE) Tj" in conteudo
+
+def test_tabela_grande_quebra_entre_paginas():
+    curto, longo = (_paginas(_estrutura(to_pdf(_tr(itens=_itens(n))))) for n in (3, 400))
+
+    assert len(longo) > len(curto) + 5
+    # o cabeçalho da tabela se repete nas páginas em que ela continua
+    assert sum(b"(Descri\xe7\xe3o) Tj" in pagina for pagina in longo) > 5
+
+def test_caracteres_fora_do_winansi():
+    pdf = to_pdf(_tr(justificativa="Prazo ≥ 30 dias → multa; custo ≈ R$ 10 — “grave”."))
+
+    texto = b"".join(_paginas(_estrutura(pdf)))
+
+    assert b">=" in texto and b"->" in texto and b"\x93grave\x94" in texto
+
+def test_escrever_pdf_igual_a_to_pdf(tmp_path):
+    documento = _tr()
+    destino = io.BytesIO()
+
+    escrever_pdf(documento, destino)
+    escrever_pdf(documento, tmp_path / "tr.pdf")
+
+    assert destino.getvalue() == (tmp_path / "tr.pdf").read_bytes() == to_pdf(documento)
+
+def test_texto_extraido_por_leitor_de_pdf():
+    pypdf = pytest.importorskip("pypdf")
+
+    leitor = pypdf.PdfReader(io.BytesIO(to_pdf(_tr(itens=_itens(50)))))
+    texto = "\n".join(pagina.extract_text() for pagina in leitor.pages)
+
+    assert leitor.metadata.title == "TERMO DE REFERÊNCIA — Lei nº 14.133/2021"
+    assert "Locação de veículos" in texto and "Resma de papel A4 nº 50" in texto
+    assert f"Página {len(leitor.pages)} de {len(leitor.pages)}" in texto
+
+def test_pdf_do_documento_gerado_e_guardado():
+    from tr_core.cache import DocumentoGerado
+    from tr_core.render_markdown import render_markdown
+
+    documento = _tr()
+    gerado = DocumentoGerado(documento, render_markdown(documento))
+
+    assert not gerado.pdf_pronto
+    assert gerado.pdf() == to_pdf(documento)
+    assert gerado.pdf_pronto and gerado.pdf() is gerado.pdf()
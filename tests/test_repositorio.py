@@ -0,0 +1,104 @@
+import json
+import sqlite3
+import zlib
+
+import pytest
+
+from tr_core.repositorio import VERSAO_ESQUEMA, Repositorio, termos_de_busca
+
+# esquema da versão 1, antes da coluna `clausulas`
+ESQUEMA_V1 = """
+CREATE TABLE tr (
+    id INTEGER PRIMARY KEY, chave TEXT NOT NULL UNIQUE, criado_em TEXT NOT NULL, objeto TEXT NOT NULL,
+    municipio TEXT NOT NULL, entradas TEXT NOT NULL, markdown BLOB NOT NULL
+);
+CREATE VIRTUAL TABLE tr_busca USING fts5(objeto, secoes, content='', tokenize='unicode61 remove_diacritics 2');
+PRAGMA user_version=1;
+"""
+
+def _entradas(objeto, **outras):
+    return dict(objeto=objeto, secretarias=[], vigencia_meses=12, incluir_opcao_hibrida=True, kpis_padrao=True, **outras)
+
+@pytest.fixture
+def repositorio(tmp_path):
+    return Repositorio(tmp_path / "trs.sqlite3")
+
+def _banco_v1(caminho):
+    entradas = {**_entradas("Locação de veículos com motorista"), "municipio": "Brasnorte-MT", "data": "01/03/2024"}
+    with sqlite3.connect(caminho) as conexao:
+        conexao.executescript(ESQUEMA_V1)
+        conexao.execute(
+            "INSERT INTO tr VALUES (1, 'chave-v1', '2024-03-01T10:00:00', ?, 'Brasnorte-MT', ?, ?)",
+            (entradas["objeto"], json.dumps(entradas), zlib.compress("# TR antigo".encode("utf-8"))),
+        )
+        conexao.execute("INSERT INTO tr_busca (rowid, objeto, secoes) VALUES (1, ?, '')", (entradas["objeto"],))
+    conexao.close()
+
+def test_banco_da_versao_1_e_migrado(tmp_path):
+    caminho = tmp_path / "trs.sqlite3"
+    _banco_v1(caminho)
+
+    repositorio = Repositorio(caminho)
+
+    conexao = repositorio._conexao()
+    assert conexao.execute("PRAGMA user_version").fetchone()[0] == VERSAO_ESQUEMA
+    assert "clausulas" in [c[1] for c in conexao.execute("PRAGMA table_info(tr)")]
+    antigo = repositorio.obter(1)
+    assert antigo.markdown == "# TR antigo" and antigo.clausulas == {}
+    assert "data" not in antigo.entradas
+    assert [tr.id for tr in repositorio.buscar("locação de veículo")] == [1]
+
+def test_banco_migrado_recebe_trs_novos(tmp_path):
+    caminho = tmp_path / "trs.sqlite3"
+    _banco_v1(caminho)
+    repositorio = Repositorio(caminho)
+
+    novo = repositorio.salvar(_entradas("Locação de veículos sem motorista"), data="01/03/2026")
+
+    assert len(repositorio) == 2
+    assert repositorio.obter(novo).clausulas
+    assert repositorio.com_clausula(next(iter(repositorio.obter(novo).clausulas.values()))) == [novo]
+    assert sorted(tr.id for tr in repositorio.buscar("locação de veículos")) == [1, novo]
+
+def test_reabrir_banco_atual_nao_migra_de_novo(tmp_path):
+    caminho = tmp_path / "trs.sqlite3"
+    Repositorio(caminho).salvar(_entradas("Vigilância patrimonial"), data="01/03/2026")
+
+    assert len(Repositorio(caminho)) == 1
+
+def test_tr_identico_nao_e_guardado_duas_vezes(repositorio):
+    primeiro = repositorio.salvar(_entradas("Vigilância patrimonial"), data="01/03/2026")
+
+    assert repositorio.salvar(_entradas("Vigilância patrimonial"), data="01/03/2026") == primeiro
+    assert repositorio.salvar(_entradas("Vigilância patrimonial"), data="02/03/2026") != primeiro
+    assert len(repositorio) == 2
+
+def test_busca_sem_acento_plural_e_por_prefixo(repositorio):
+    veiculos = repositorio.salvar(_entradas("Locação de veículos utilitários"), data="01/03/2026")
+    repositorio.salvar(_entradas("Aquisição de material de expediente"), data="01/03/2026")
+
+    for consulta in ("LOCACAO DE VEICULO", "veículos", "utilit"):
+        assert [tr.id for tr in repositorio.buscar(consulta)] == [veiculos]
+    assert repositorio.buscar("de da o") == []
+
+def test_busca_ordena_objeto_antes_das_secoes(repositorio):
+    na_secao = repositorio.salvar(
+        _entradas("Serviços de manutenção predial", justificativa="Inclui a pintura das escolas."), data="01/03/2026"
+    )
+    no_objeto = repositorio.salvar(_entradas("Pintura de escolas municipais"), data="01/03/2026")
+
+    assert [tr.id for tr in repositorio.buscar("pintura escolas")] == [no_objeto, na_secao]
+    assert [tr.id for tr in repositorio.buscar("pintura", limite=1)] == [no_objeto]
+
+def test_termos_de_busca():
+    assert termos_de_busca("Locação de Veículos p/ a Secretaria (2026)") == '"locacao"* OR "veiculo"* OR "secretaria"*'
+    assert termos_de_busca("de da 2026") == ""
+
+def test_entradas_guardadas_remontam_o_mesmo_tr(repositorio):
+    from tr_core.gerador import montar_tr
+    from tr_core.render_markdown import render_markdown
+
+    id_tr = repositorio.salvar(_entradas("Locação de veículos", kpis="- **Disponibilidade:** 99%"), data="01/03/2026")
+    salvo = repositorio.obter(id_tr)
+
+    assert render_markdown(montar_tr(**salvo.entradas, data="01/03/2026")) == salvo.markdown
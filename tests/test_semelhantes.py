@@ -0,0 +1,80 @@
+import pytest
+
+from tr_core.semelhantes import IndiceSemelhantes, palavras_de_conteudo
+
+TAREFA, VERSAO = "justificativa", "1"
+
+REDIGIDO = (
+    "Manutenção preventiva e corretiva da frota de veículos leves e pesados da Prefeitura, "
+    "com fornecimento de peças genuínas e mão de obra especializada"
+)
+# outra contratação, com cosseno acima do limiar padrão (0,92)
+QUASE_IGUAIS = (
+    REDIGIDO.replace("preventiva e corretiva", "preventiva"),
+    REDIGIDO.replace("com fornecimento", "sem fornecimento"),
+    REDIGIDO.replace("leves e pesados", "leves"),
+    REDIGIDO.replace("genuínas", "genuínas e acessórios"),
+)
+OUTROS = ("Locação de veículos", "Aquisição de material de expediente", "Serviços de limpeza predial")
+
+def _redigir(servico, objeto):
+    return servico.gerar(TAREFA, VERSAO, objeto, [{"role": "user", "content": objeto}], timeout=30)
+
+def test_palavras_de_conteudo_ignoram_grafia_e_artigos():
+    assert palavras_de_conteudo("Locação de Veículos c/ motorista") == palavras_de_conteudo("locacao veiculo com motoristas")
+    assert palavras_de_conteudo("com motorista") != palavras_de_conteudo("sem motorista")
+
+@pytest.mark.parametrize("parecido", QUASE_IGUAIS)
+def test_cosseno_alto_nao_basta(parecido):
+    indice = IndiceSemelhantes()
+    for objeto in (REDIGIDO, *OUTROS):
+        indice.adicionar(objeto, objeto)
+
+    similaridade, encontrado, _ = indice.buscar(parecido)[0]
+
+    assert encontrado == REDIGIDO and similaridade > 0.92
+    assert palavras_de_conteudo(parecido) != palavras_de_conteudo(REDIGIDO)
+
+@pytest.mark.parametrize("parecido", QUASE_IGUAIS)
+def test_objeto_quase_igual_nao_e_oferecido(novo_servico, parecido):
+    servico = novo_servico()
+    for objeto in (REDIGIDO, *OUTROS):
+        _redigir(servico, objeto)
+
+    assert servico.semelhante(TAREFA, VERSAO, parecido) is None
+
+def test_mesma_grafia_diferente_e_oferecida(novo_servico):
+    servico = novo_servico()
+    _redigir(servico, "Locação de veículos utilitários com motorista")
+
+    oferta = servico.semelhante(TAREFA, VERSAO, "locacao de veiculos utilitarios c/ motorista")
+
+    assert oferta is not None
+    assert oferta.entrada == "Locação de veículos utilitários com motorista"
+
+def test_astream_nunca_troca_o_texto_pelo_de_outro_objeto(novo_servico, stub):
+    servico = novo_servico()
+    primeiro = _redigir(servico, "Locação de veículos utilitários com motorista")
+
+    segundo = _redigir(servico, "locacao de veiculos utilitarios c/ motorista")
+
+    assert stub.requisicoes == 2
+    assert segundo != primeiro
+
+def test_secoes_aceitas_nao_vao_ao_llm(novo_servico, stub):
+    from tr_core.redacao import redigir_secoes, secoes_semelhantes
+
+    servico = novo_servico()
+    redigir_secoes("Locação de veículos com motorista", ("solucao", "kpis"), servico=servico)
+    ofertas = secoes_semelhantes("locacao de veiculos c/ motorista", ("solucao", "kpis"), servico=servico)
+    assert set(ofertas) == {"solucao", "kpis"}
+    chamadas = stub.requisicoes
+
+    resultado = redigir_secoes(
+        "locacao de veiculos c/ motorista", ("solucao", "requisitos", "kpis"), servico=servico,
+        aceitos={"solucao": ofertas["solucao"].texto},
+    )
+
+    assert stub.requisicoes == chamadas + 2  # requisitos e kpis: só o que não foi aceito
+    assert list(resultado.textos) == ["solucao", "requisitos", "kpis"]
+    assert resultado.textos["solucao"] == ofertas["solucao"].texto
@@ -0,0 +1,87 @@
+import asyncio
+import json
+
+import pytest
+
+from servico import ServicoTR
+
+async def _requisicao(app, metodo, rota, partes=(b"",), content_length=True):
+    """Chama a aplicação ASGI como o uvicorn; `partes` são os pedaços do corpo (chunked)."""
+    mensagens = [{"type": "http.request", "body": p, "more_body": i < len(partes) - 1} for i, p in enumerate(partes)]
+
+    async def receive():
+        return mensagens.pop(0) if mensagens else {"type": "http.disconnect"}
+
+    resposta = {"corpo": b""}
+
+    async def send(mensagem):
+        if mensagem["type"] == "http.response.start":
+            resposta["status"], resposta["cabecalhos"] = mensagem["status"], dict(mensagem["headers"])
+        else:
+            resposta["corpo"] += mensagem["body"]
+
+    cabecalhos = [(b"content-length", str(sum(map(len, partes))).encode())] if content_length else []
+    await app({"type": "http", "method": metodo, "path": rota, "headers": cabecalhos}, receive, send)
+    return resposta
+
+def _corpo(**dados) -> bytes:
+    return json.dumps({"objeto": "Locação de veículos", **dados}).encode("utf-8")
+
+@pytest.fixture
+def app():
+    servico = ServicoTR(executor="threads", trabalhadores=1, fila=1, max_bytes=1024)
+    yield servico
+    servico.encerrar()
+
+def _rejeicoes(app, motivo) -> str:
+    linha = f'tr_rejeicoes_total{{motivo="{motivo}"}} '
+    return next(l for l in app.metricas.texto().splitlines() if l.startswith(linha)).split()[-1]
+
+def test_markdown(app):
+    resposta = asyncio.run(_requisicao(app, "POST", "/tr", (_corpo(),)))
+
+    assert resposta["status"] == 200
+    assert resposta["cabecalhos"][b"content-type"].startswith(b"text/markdown")
+    assert "Locação de veículos" in resposta["corpo"].decode("utf-8")
+
+def test_corpo_acima_do_limite_pelo_content_length(app):
+    resposta = asyncio.run(_requisicao(app, "POST", "/tr", (_corpo(objeto="x" * 2000),)))
+
+    assert resposta["status"] == 413
+    assert "1024 bytes" in json.loads(resposta["corpo"])["erro"]
+    assert _rejeicoes(app, "tamanho") == "1"
+
+def test_corpo_acima_do_limite_sem_content_length(app):
+    partes = (b'{"objeto": "', b"x" * 600, b"x" * 600, b'"}')
+
+    resposta = asyncio.run(_requisicao(app, "POST", "/tr", partes, content_length=False))
+
+    assert resposta["status"] == 413
+
+def test_fila_cheia_responde_503(app):
+    async def duas():
+        return await asyncio.gather(
+            _requisicao(app, "POST", "/tr", (_corpo(),)),
+            _requisicao(app, "POST", "/tr", (_corpo(objeto="Vigilância"),)),
+        )
+
+    primeira, segunda = asyncio.run(duas())
+
+    assert primeira["status"] == 200
+    assert segunda["status"] == 503
+    assert segunda["cabecalhos"][b"retry-after"] == b"1"
+    assert _rejeicoes(app, "fila_cheia") == "1"
+    assert app.pendentes == 0
+
+def test_depois_da_fila_esvaziar_volta_a_aceitar(app):
+    async def em_sequencia():
+        return [await _requisicao(app, "POST", "/tr", (_corpo(),)) for _ in range(3)]
+
+    assert [r["status"] for r in asyncio.run(em_sequencia())] == [200, 200, 200]
+
+def test_docx_transmitido_em_partes(app):
+    resposta = asyncio.run(_requisicao(app, "POST", "/tr", (_corpo(formato="docx"),)))
+
+    assert resposta["status"] == 200
+    assert resposta["corpo"][:2] == b"PK"
+    assert int(resposta["cabecalhos"][b"content-length"]) == len(resposta["corpo"])
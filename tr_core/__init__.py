@@ -0,0 +1,50 @@
+"""
+Núcleo de geração do Termo de Referência (Lei nº 14.133/2021), sem dependência
+da interface Streamlit — usado pelos apps `termo*.py` e pela geração em lote.
+
+A importação é leve: o python-docx só é carregado quando um DOCX é pedido
+(primeiro acesso a `tr_core.to_docx`), o renderizador PDF no primeiro acesso a
+`tr_core.to_pdf` e o registro de municípios, no primeiro TR gerado ou acesso a
+`tr_core.SECRETARIAS_PADRAO`.
+"""
+from .gerador import (
+    formatar_secretarias,
+    gerar_tr,
+    lista_nao_vazia,
+    monta_bloco,
+    montar_tr,
+    montar_tr_campos_livres,
+    montar_tr_secretarias,
+)
+from .modelo import Documento
+from .render_markdown import render_markdown
+
+__all__ = [
+    "Documento",
+    "SECRETARIAS_PADRAO",
+    "formatar_secretarias",
+    "gerar_tr",
+    "lista_nao_vazia",
+    "monta_bloco",
+    "montar_tr",
+    "montar_tr_campos_livres",
+    "montar_tr_secretarias",
+    "render_markdown",
+    "to_docx",
+    "to_pdf",
+]
+
+def __getattr__(nome):
+    if nome == "SECRETARIAS_PADRAO":
+        from .secretarias import SECRETARIAS_PADRAO
+
+        return SECRETARIAS_PADRAO
+    if nome == "to_docx":
+        from .render_docx import to_docx
+
+        return to_docx
+    if nome == "to_pdf":
+        from .render_pdf import to_pdf
+
+        return to_pdf
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,96 @@
+"""
+Modelo base do DOCX (papel timbrado + estilos), carregado e interpretado uma
+única vez por processo. Cada TR começa de uma cópia em memória desse modelo,
+em vez de `Document()`, que reabre o pacote padrão do python-docx do disco e
+reinterpreta todo o XML a cada documento.
+
+Há um modelo por combinação de arquivo base, brasão e linhas do timbre, de
+modo que cada município (tr_core.municipios) tem o seu, interpretado na
+primeira vez que é usado.
+
+Configuração (opcional), por variável de ambiente (valem quando o município
+não define os próprios arquivos):
+    TR_DOCX_BASE    caminho de um .docx com cabeçalho/estilos da Prefeitura
+    TR_DOCX_BRASAO  imagem do brasão, usada no cabeçalho do modelo padrão
+"""
+import copy
+import os
+import threading
+from functools import lru_cache
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Cm, Pt, RGBColor
+
+_trava = threading.Lock()
+
+def _aplicar_timbre(doc, brasao: str | None, linhas: tuple) -> None:
+    if not brasao and not linhas:
+        return
+    cabecalho = doc.sections[0].header
+    p = cabecalho.paragraphs[0]
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    if brasao:
+        p.add_run().add_picture(brasao, height=Cm(2))
+        p = cabecalho.add_paragraph()
+        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    if not linhas:
+        return
+    run = p.add_run(linhas[0])
+    run.bold = True
+    for linha in linhas[1:]:
+        p.add_run().add_break()
+        p.add_run(linha)
+
+def _aplicar_estilos(doc) -> None:
+    estilos = doc.styles
+    normal = estilos["Normal"].font
+    normal.name = "Arial"
+    normal.size = Pt(11)
+    for nome in ("Heading 1", "Heading 2", "Heading 3"):
+        fonte = estilos[nome].font
+        fonte.name = "Arial"
+        fonte.color.rgb = RGBColor(0, 0, 0)
+
+def _limpar_corpo(doc) -> None:
+    # do modelo só aproveitamos estilos, cabeçalho/rodapé e configurações de página
+    corpo = doc.element.body
+    for filho in list(corpo):
+        if not filho.tag.endswith("}sectPr"):
+            corpo.remove(filho)
+
+@lru_cache(maxsize=None)
+def _base(caminho: str | None, brasao: str | None, timbre: tuple):
+    if caminho:
+        doc = Document(caminho)
+    else:
+        doc = Document()
+        _aplicar_estilos(doc)
+        _aplicar_timbre(doc, brasao, timbre)
+    _limpar_corpo(doc)
+    return doc
+
+def carregar_base(caminho: str | None = None, brasao: str | None = None, timbre: tuple = ()):
+    """
+    Modelo base já interpretado (compartilhado; não deve ser alterado).
+    `timbre` são as linhas do cabeçalho do modelo padrão (a primeira em
+    negrito), normalmente Municipio.linhas_timbre; sem linhas nem brasão, o
+    modelo sai sem cabeçalho.
+    """
+    caminho = caminho or os.environ.get("TR_DOCX_BASE") or None
+    brasao = brasao or os.environ.get("TR_DOCX_BRASAO") or None
+    with _trava:
+        return _base(caminho, brasao, tuple(timbre))
+
+def novo_documento(caminho: str | None = None, brasao: str | None = None, timbre: tuple = ()):
+    """
+    Cópia em memória do modelo base, pronta para receber o TR.
+
+    Só o document.xml é copiado: as demais partes do pacote (estilos, tema,
+    numeração, cabeçalho, imagens) são apenas lidas durante a geração e
+    ficam compartilhadas entre todas as cópias.
+    """
+    base = carregar_base(caminho, brasao, timbre)
+    parte_principal = base.part
+    memo = {id(p): p for p in parte_principal.package.iter_parts() if p is not parte_principal}
+    return copy.deepcopy(base, memo)
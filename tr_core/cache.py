@@ -0,0 +1,161 @@
+"""
+Cache LRU de documentos já gerados (Markdown + DOCX), indexado por um hash das
+entradas do formulário. Pensado para ficar em memória no processo do app e ser
+compartilhado entre as sessões (vários servidores redigindo o mesmo objeto).
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from .modelo import Documento
+
+class DocumentoGerado:
+    """
+    Markdown pronto para a pré-visualização; o DOCX (a etapa mais cara) só é
+    construído na primeira chamada de docx() e fica guardado junto no cache,
+    assim como o PDF, na primeira chamada de pdf(), e as seções da
+    pré-visualização (tr_core.previa), na de secoes().
+    `gerar_docx` substitui to_docx(documento) (ex.: MontagemTR.docx, que
+    reaproveita os fragmentos já renderizados).
+    """
+    __slots__ = ("documento", "markdown", "_docx", "_pdf", "_secoes", "_gerar_docx", "_trava")
+
+    def __init__(self, documento: Documento, markdown: str, gerar_docx=None):
+        self.documento = documento
+        self.markdown = markdown
+        self._docx = None
+        self._pdf = None
+        self._secoes = None
+        self._gerar_docx = gerar_docx
+        self._trava = threading.Lock()
+
+    @property
+    def docx_pronto(self) -> bool:
+        return self._docx is not None
+
+    def docx(self) -> bytes:
+        if self._docx is None:
+            with self._trava:
+                if self._docx is None:
+                    if self._gerar_docx is not None:
+                        self._docx = self._gerar_docx()
+                    else:
+                        from .render_docx import to_docx
+
+                        self._docx = to_docx(self.documento)
+        return self._docx
+
+    @property
+    def pdf_pronto(self) -> bool:
+        return self._pdf is not None
+
+    def pdf(self) -> bytes:
+        if self._pdf is None:
+            with self._trava:
+                if self._pdf is None:
+                    from .render_pdf import to_pdf
+
+                    self._pdf = to_pdf(self.documento)
+        return self._pdf
+
+    def secoes(self) -> tuple:
+        if self._secoes is None:
+            from .previa import secoes_previa
+
+            self._secoes = secoes_previa(self.documento)
+        return self._secoes
+
+def chave_documento(
+    objeto: str,
+    secretarias: list[str],
+    vigencia_meses: int,
+    incluir_opcao_hibrida: bool,
+    kpis_padrao: bool,
+    municipio: str,
+    data: str,
+    justificativa: str | None = None,
+    solucao: str | None = None,
+    requisitos: str | None = None,
+    kpis: str | None = None,
+    itens=None,
+) -> str:
+    """
+    Hash normalizado das entradas de montar_tr. Só normaliza o que não altera o
+    documento: espaços nas pontas do objeto e o tipo dos valores. A
+    ordem das secretarias é mantida porque aparece no texto. A tabela de itens
+    entra pelo hash do seu conteúdo.
+    """
+    normalizado = [
+        (objeto or "").strip(),
+        list(secretarias or []),
+        int(vigencia_meses),
+        bool(incluir_opcao_hibrida),
+        bool(kpis_padrao),
+        municipio,
+        data,
+        justificativa or "",
+        solucao or "",
+        requisitos or "",
+        kpis or "",
+    ]
+    if itens:  # sem tabela, a chave continua a de antes dela existir
+        normalizado.append(itens.chave)
+    bruto = json.dumps(normalizado, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+class CacheDocumentos:
+    """LRU limitado e seguro entre threads, com contadores de acertos/faltas."""
+
+    def __init__(self, maximo: int = 128):
+        if maximo < 1:
+            raise ValueError("O cache precisa comportar ao menos 1 documento.")
+        self.maximo = maximo
+        self.acertos = 0
+        self.faltas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave: str):
+        with self._trava:
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave: str, valor) -> None:
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+
+    def obter_ou_gerar(self, chave: str, gerar):
+        """Devolve o valor em cache ou chama `gerar()` (fora da trava) e guarda o resultado."""
+        valor = self.obter(chave)
+        if valor is None:
+            valor = gerar()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._itens.clear()
+            self.acertos = self.faltas = 0
+
+    def estatisticas(self) -> dict:
+        with self._trava:
+            total = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "documentos": len(self._itens),
+                "maximo": self.maximo,
+            }
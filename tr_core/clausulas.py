@@ -0,0 +1,187 @@
+"""
+Biblioteca versionada das cláusulas fixas das seções 4 a 6 (requisitos 1–12,
+cláusulas 5.1–5.14 e critérios de medição 6.1–6.8). Cada cláusula tem um id
+("5.3"), uma versão e um hash do conteúdo; os blocos são criados uma única vez
+e o TR os referencia, de modo que:
+
+- o DOCX cola o XML já renderizado de cada cláusula, guardado pelo hash (ver
+  render_docx), em vez de montar os mesmos parágrafos a cada documento;
+- dá para saber exatamente que versão de cada cláusula um TR usou
+  (clausulas_usadas, gravado pelo tr_core.repositorio).
+
+Para alterar o texto de uma cláusula, acrescente uma nova versão em
+_VERSOES (mesmo id, versão + 1) em vez de editar a anterior: a versão mais
+alta é a vigente e as antigas continuam localizáveis pelo hash.
+
+Linha de comando:
+    python -m tr_core.clausulas          # id, versão e hash das cláusulas vigentes
+"""
+from .modelo import Documento, Espaco, ItemLista, Paragrafo, Separador, Tabela, Titulo, trechos
+from .render_markdown import render_markdown
+
+def _canonico(valor):
+    """Forma serializável de um bloco (tipo e campos, sem o Markdown memoizado)."""
+    if hasattr(valor, "__slots__"):
+        return [type(valor).__name__, *(_canonico(getattr(valor, s)) for s in valor.__slots__ if s != "_md")]
+    if isinstance(valor, (tuple, list)):
+        return [_canonico(v) for v in valor]
+    return valor
+
+class Clausula:
+    __slots__ = ("id", "versao", "blocos", "_hash", "_markdown")
+
+    def __init__(self, id: str, versao: int, blocos: tuple):
+        self.id = id
+        self.versao = versao
+        self.blocos = blocos
+        self._hash = None
+        self._markdown = None
+
+    def __repr__(self):
+        return f"Clausula({self.id!r}, v{self.versao}, {self.hash})"
+
+    @property
+    def hash(self) -> str:
+        # calculado no primeiro uso: hashlib/json ficam fora da importação a frio do tr_core
+        if self._hash is None:
+            import hashlib
+            import json
+
+            bruto = json.dumps(_canonico(self.blocos), ensure_ascii=False, separators=(",", ":"))
+            self._hash = hashlib.sha256(bruto.encode("utf-8")).hexdigest()[:16]
+        return self._hash
+
+    @property
+    def markdown(self) -> str:
+        if self._markdown is None:
+            self._markdown = render_markdown(Documento(self.blocos))
+        return self._markdown
+
+def _p(texto: str) -> Paragrafo:
+    return Paragrafo(trechos(texto))
+
+def _item(texto: str, nivel: int = 0, numero: int | None = None) -> ItemLista:
+    return ItemLista(trechos(texto), nivel, numero)
+
+_REQUISITOS = (
+    "Conformidade técnica com as especificações e normas indicadas.",
+    "Qualificação técnica mínima (atestados, equipes, certificações quando cabíveis).",
+    "Prazos de entrega/execução (SLA, janelas de atendimento, tempo de resposta).",
+    "Garantia (prazo, cobertura, substituição/recall quando aplicável).",
+    "Assistência técnica/manutenção (preventiva e corretiva, tempos de restauração).",
+    "Treinamento/capacitação de usuários/servidores, com material didático.",
+    "Documentação técnica (manuais, catálogos, ART/RRT quando exigível).",
+    "Segurança e conformidade regulatória (saúde, meio ambiente, LGPD quando pertinente).",
+    "Logística e entrega (locais, horários, acondicionamento, rastreabilidade).",
+    "Medição e aceitação (procedimentos, evidências, formulários).",
+    "Sustentabilidade (eficiência energética, redução de resíduos, destinação final).",
+    "Penalidades e garantias contratuais alinhadas à Lei nº 14.133/2021.",
+)
+
+_EXECUCAO = (
+    "Execução fiel pelas partes, conforme cláusulas e Lei nº 14.133/2021; responsabilidade por inexecução total ou parcial.",
+    "Execução conforme este TR, observando Edital e Instrumento Contratual após assinatura.",
+    "Solicitação do objeto **de forma parcelada**, mediante **OS** e **NE**.",
+    "Comprovação por **Nota Fiscal** da contratada, **ateste** por servidor competente, com **relatório circunstanciado** (ex.: livro de ponto, comprovantes de entrega/serviços).",
+    "Responsabilidade integral da contratada pelos ônus de execução.",
+    "Observância da **NAD (Nota de Autorização de Despesas)**.",
+    "Comunicações formais **por escrito** (admitido meio eletrônico quando aplicável).",
+    "Prestação **sob demanda** mediante OS/documento equivalente, com **prazos e quantidades** definidos.",
+    "Plano de mobilização/desmobilização e cronograma físico‑financeiro (quando aplicável).",
+    "Gestão e fiscalização contratual (gestor e fiscais; rotinas de reunião e reporte).",
+    "Confidencialidade, proteção de dados e propriedade intelectual (quando pertinente).",
+    "Subcontratação e equipe mínima (critérios e limites, quando admitido).",
+    "Reposição de bens/partes e prazos de correção de não conformidades.",
+    "Indicadores de desempenho vinculados à medição/aceite e sanções.",
+)
+
+# (id, versão, blocos); a ordem é a do documento
+_VERSOES = (
+    ("4", 1, (Titulo(2, "4. REQUISITOS DA CONTRATAÇÃO"),)),
+    ("4.0", 1, (_p("Liste requisitos **objetivos e verificáveis** (adapte ao objeto):"),)),
+    *((f"4.{n}", 1, (_item(texto, numero=n),)) for n, texto in enumerate(_REQUISITOS, 1)),
+    ("5", 1, (Titulo(2, "5. MODELO DE EXECUÇÃO CONTRATUAL"),)),
+    *((f"5.{n}", 1, (_item(f"**5.{n}** {texto}"),)) for n, texto in enumerate(_EXECUCAO, 1)),
+    ("6", 1, (Titulo(2, "6. CRITÉRIOS DE MEDIÇÃO"),)),
+    ("6.1", 1, (
+        _item("**6.1 Itens e unidades de medida:**"),
+        Tabela(
+            ("Item", "Descrição", "Unidade", "Qtde medida no período", "Qtde acumulada", "Saldo"),
+            [("1", "[Descrever]", "[un/h/m²/mês]", "0", "0", "0")],
+            alinhamentos=("l", "l", "l", "r", "r", "r"),
+            nivel=1,
+        ),
+    )),
+    ("6.2", 1, (_item("**6.2 Evidências de execução:** relatórios, checklists assinados, registros fotográficos, logs/sistemas, canhotos de entrega, certificados de treinamento."),)),
+    ("6.3", 1, (_item("**6.3 Critérios de aceite:** padrões técnicos, tolerâncias e desempenho; procedimento de inspeção (amostragem, testes, prazos para correção)."),)),
+    ("6.4", 1, (_item("**6.4 Indicadores de desempenho (SLA/KPI):**"),)),
+    ("6.4.padrao", 1, (
+        _item("**Disponibilidade (%):** (Horas disponíveis ÷ Horas previstas) × 100.", nivel=1),
+        _item("**Tempo de resposta (h):** tempo entre abertura e primeiro atendimento.", nivel=1),
+        _item("**Tempo de solução (h):** tempo entre abertura e solução.", nivel=1),
+        _item("**Taxa de retrabalho (%):** (Ocorrências retrabalhadas ÷ Total de ocorrências) × 100.", nivel=1),
+        _item("**Conformidade amostral (%):** (Itens conformes ÷ Itens amostrados) × 100.", nivel=1),
+        _item("**Pontualidade em entregas (%):** (Entregas pontuais ÷ Entregas totais) × 100.", nivel=1),
+    )),
+    ("6.4.a_definir", 1, (_item("[Definir de 3 a 6 indicadores mensuráveis coerentes com o objeto]", nivel=1),)),
+    ("6.5", 1, (_item("**6.5 Fórmulas de cálculo:** explicitar fórmulas dos indicadores adotados."),)),
+    ("6.6", 1, (_item("**6.6 Periodicidade da medição:** [semanal/mensal/por OS/por marco]."),)),
+    ("6.7", 1, (_item("**6.7 Glosas e penalidades:** condições e procedimentos para glosa/desconto, reconvocação, reexecução e penalidades contratuais (sem transcrições legais)."),)),
+    ("6.8", 1, (_item("**6.8 Aceite final:** condições para aceite definitivo, termo de recebimento e encerramento."),)),
+    ("6.observacao", 1, (
+        Espaco(),
+        Separador(),
+        _p("_Observação: este documento deve ser ajustado ao objeto específico, convertendo requisitos em métricas mensuráveis (números, tolerâncias, prazos e padrões)._"),
+    )),
+)
+
+TODAS = tuple(Clausula(*versao) for versao in _VERSOES)
+VIGENTES = {}    # id -> Clausula de versão mais alta, na ordem do documento
+_POR_INICIO = {}  # primeiro bloco -> Clausula (vigentes), para localizar as cláusulas num TR
+
+for _clausula in TODAS:
+    if _clausula.id not in VIGENTES or VIGENTES[_clausula.id].versao < _clausula.versao:
+        VIGENTES[_clausula.id] = _clausula
+for _clausula in VIGENTES.values():
+    _POR_INICIO[_clausula.blocos[0]] = _clausula
+
+def blocos(*ids: str) -> tuple:
+    """Blocos das cláusulas vigentes, na ordem dada (os mesmos objetos, compartilhados)."""
+    return tuple(bloco for id_clausula in ids for bloco in VIGENTES[id_clausula].blocos)
+
+def segmentar(sequencia):
+    """
+    Percorre os blocos de um documento e entrega (Clausula, blocos) para cada
+    cláusula da biblioteca e (None, blocos) para os trechos entre elas. As
+    cláusulas são reconhecidas pela identidade dos blocos (os do template são
+    compartilhados), sem comparar texto.
+    """
+    soltos = []
+    i, total = 0, len(sequencia)
+    while i < total:
+        clausula = _POR_INICIO.get(sequencia[i])
+        if clausula is not None:
+            fim = i + len(clausula.blocos)
+            if fim <= total and all(a is b for a, b in zip(sequencia[i:fim], clausula.blocos)):
+                if soltos:
+                    yield None, tuple(soltos)
+                    soltos = []
+                yield clausula, clausula.blocos
+                i = fim
+                continue
+        soltos.append(sequencia[i])
+        i += 1
+    if soltos:
+        yield None, tuple(soltos)
+
+def por_hash(hash_clausula: str) -> Clausula | None:
+    """Cláusula (vigente ou não) pelo hash, ex.: o gravado junto de um TR."""
+    return next((c for c in TODAS if c.hash == hash_clausula), None)
+
+def clausulas_usadas(documento: Documento) -> dict:
+    """id -> hash das cláusulas da biblioteca presentes no documento."""
+    return {c.id: c.hash for c, _ in segmentar(documento.blocos) if c is not None}
+
+if __name__ == "__main__":
+    for clausula in VIGENTES.values():
+        print(f"{clausula.id:<14} v{clausula.versao}  {clausula.hash}  {clausula.markdown.splitlines()[-1][:70]}")
@@ -0,0 +1,579 @@
+"""
+Comparação entre duas versões de um TR (revisões do jurídico, do controle
+interno ou da secretaria, ou duas variantes do template) com saída em
+redline: Markdown com ~~removido~~/<ins>incluído</ins> e DOCX com marcas de
+revisão do Word (w:ins/w:del), que podem ser aceitas ou rejeitadas no Word.
+
+Os documentos são alinhados por seção e número de cláusula (1.1, 5.3,
+6.4...), e não linha a linha: cada documento é dividido em unidades (o título
+da seção com o que vem antes da primeira cláusula, e cada cláusula com os
+blocos que a acompanham, como a tabela da 6.1 ou os KPIs da 6.4), e as
+unidades de mesma chave são pareadas. Só as que diferem são comparadas bloco
+a bloco, e só os blocos diferentes palavra a palavra (texto) ou linha a linha
+(tabelas). As cláusulas da biblioteca (tr_core.clausulas) são os mesmos
+objetos nos dois documentos e saem iguais pela identidade, sem comparar texto.
+
+Linha de comando:
+    python -m tr_core.comparacao 12 15 -o revisao.docx             # dois TRs do repositório, pelo id
+    python -m tr_core.comparacao --variantes termo1 termo2 "Objeto"  # duas variantes do template
+"""
+import re
+from difflib import SequenceMatcher
+
+from .clausulas import segmentar
+from .modelo import QUEBRA, Documento, ItemLista, Paragrafo, Tabela, Titulo, Trecho
+from .render_markdown import bloco_md, celula_md
+
+INALTERADA, ALTERADA, INCLUIDA, REMOVIDA = "inalterada", "alterada", "incluída", "removida"
+
+# Marcas de cada bloco (e de cada trecho/linha de um bloco alterado):
+# "=" igual, "+" incluído, "-" removido e, só para blocos, "~" alterado (BlocoRevisado)
+
+class BlocoRevisado:
+    """
+    Bloco presente nas duas versões, com diferenças. `marcas` é uma lista de
+    (marca, Trecho) nos parágrafos, itens e títulos, e de (marca, linha) nas
+    tabelas; a forma do bloco (nível, número, alinhamentos) é a de `depois`.
+    """
+    __slots__ = ("antes", "depois", "marcas")
+
+    def __init__(self, antes, depois, marcas: list):
+        self.antes = antes
+        self.depois = depois
+        self.marcas = marcas
+
+class Unidade:
+    """Seção ou cláusula alinhada entre as versões; `blocos` é uma lista de (marca, bloco)."""
+    __slots__ = ("chave", "secao", "situacao", "blocos")
+
+    def __init__(self, chave: str, secao: str, situacao: str, blocos: list):
+        self.chave = chave
+        self.secao = secao
+        self.situacao = situacao
+        self.blocos = blocos
+
+    def __repr__(self):
+        return f"Unidade({self.chave!r}, {self.situacao})"
+
+class Comparacao:
+    __slots__ = ("antes", "depois", "unidades", "titulos")
+
+    def __init__(self, antes: Documento, depois: Documento, unidades: list, titulos: dict):
+        self.antes = antes
+        self.depois = depois
+        self.unidades = unidades
+        self.titulos = titulos  # seção -> Titulo (o da versão nova, quando existe)
+
+    @property
+    def alteracoes(self) -> list:
+        """Unidades alteradas, incluídas ou removidas, na ordem do documento."""
+        return [u for u in self.unidades if u.situacao != INALTERADA]
+
+    def resumo(self) -> dict:
+        """Quantas unidades em cada situação e a chave das que mudaram."""
+        contagem = {INALTERADA: 0, ALTERADA: 0, INCLUIDA: 0, REMOVIDA: 0}
+        for unidade in self.unidades:
+            contagem[unidade.situacao] += 1
+        return {**contagem, "chaves": [u.chave for u in self.alteracoes]}
+
+# ----------------------------------
+# Divisão em seções e cláusulas
+# ----------------------------------
+_SECAO = re.compile(r"\s*(\d+)\.")
+_CLAUSULA = re.compile(r"\s*(\d+(?:\.\d+)+)\.?(?:\s|$)")
+
+def _numero(trechos) -> str | None:
+    """Número de cláusula no início do texto ("1.1 O presente...", "**5.3** Solicitação...")."""
+    inicio = "".join(t.texto for t in trechos[:3] if t is not QUEBRA)
+    m = _CLAUSULA.match(inicio)
+    return m.group(1) if m else None
+
+def _unidades(blocos) -> list:
+    """(chave, seção, blocos) de cada unidade, na ordem do documento; o que vem antes da seção 1 é a "0"."""
+    biblioteca = {id(trecho[0]): clausula.id for clausula, trecho in segmentar(blocos) if clausula is not None}
+    unidades = []
+    secao = chave = secao_atual = "0"
+    atual = []
+    for bloco in blocos:
+        tipo = type(bloco)
+        nova = None
+        id_clausula = biblioteca.get(id(bloco))
+        if tipo is Titulo and bloco.nivel == 2:
+            m = _SECAO.match(bloco.texto)
+            secao = nova = m.group(1) if m else bloco.texto.strip()
+        elif id_clausula is not None:
+            # "6.4.padrao" continua a 6.4; "6.observacao" é uma unidade própria
+            if id_clausula.replace(".", "").isdigit() or id_clausula.rsplit(".", 1)[0] != chave:
+                nova = id_clausula
+        elif tipo is ItemLista and bloco.numero is not None and bloco.nivel == 0:
+            nova = f"{secao}.{bloco.numero}"
+        elif tipo is Paragrafo or tipo is ItemLista:
+            numero = _numero(bloco.trechos)
+            if numero is not None and numero.startswith(secao + "."):
+                nova = numero
+        if nova is not None:
+            if atual:
+                unidades.append((chave, secao_atual, tuple(atual)))
+            chave, secao_atual, atual = nova, secao, []
+        atual.append(bloco)
+    if atual:
+        unidades.append((chave, secao_atual, tuple(atual)))
+    return unidades
+
+# ----------------------------------
+# Comparação
+# ----------------------------------
+def _linhas_tabela(tabela: Tabela):
+    """Linhas da tabela como tuplas de texto; a de itens (tr_core.itens) é identificada pelo hash do conteúdo."""
+    itens = getattr(tabela.linhas, "itens", None)
+    if itens is not None:
+        return ("itens", itens.chave)
+    return tuple(tuple(str(c) for c in linha) for linha in tabela.linhas)
+
+def _assinatura(bloco):
+    tipo = type(bloco)
+    if tipo is Paragrafo:
+        return (tipo, tuple((t.texto, t.negrito, t.italico) for t in bloco.trechos))
+    if tipo is ItemLista:
+        return (tipo, bloco.nivel, bloco.numero, tuple((t.texto, t.negrito, t.italico) for t in bloco.trechos))
+    if tipo is Titulo:
+        return (tipo, bloco.nivel, bloco.texto)
+    if tipo is Tabela:
+        return (tipo, tuple(bloco.cabecalho), tuple(bloco.alinhamentos), bloco.nivel, _linhas_tabela(bloco))
+    return (tipo,)
+
+# a palavra leva o espaço que a segue: espaços soltos não servem de âncora ao alinhamento
+_PALAVRA = re.compile(r"\S+\s*|\s+")
+# abaixo dessa fração de palavras em comum, o bloco é mostrado como removido + incluído
+_SEMELHANCA_MINIMA = 0.4
+
+def _tokens(trechos) -> list:
+    """Palavras com a formatação; a quebra de linha forçada vira um token próprio."""
+    tokens = []
+    for t in trechos:
+        if t is QUEBRA:
+            tokens.append(("\n", None, None))
+        else:
+            tokens.extend((p, t.negrito, t.italico) for p in _PALAVRA.findall(t.texto))
+    return tokens
+
+def _agrupar(marcados) -> list:
+    """(marca, token) -> (marca, Trecho), juntando os tokens vizinhos de mesma marca e formatação."""
+    trechos = []
+    grupo, chave = [], None
+    for marca, (texto, negrito, italico) in marcados:
+        if negrito is None:
+            if grupo:
+                trechos.append((chave[0], Trecho("".join(grupo), chave[1], chave[2])))
+                grupo, chave = [], None
+            trechos.append((marca, QUEBRA))
+            continue
+        if (marca, negrito, italico) != chave and grupo:
+            trechos.append((chave[0], Trecho("".join(grupo), chave[1], chave[2])))
+            grupo = []
+        chave = (marca, negrito, italico)
+        grupo.append(texto)
+    if grupo:
+        trechos.append((chave[0], Trecho("".join(grupo), chave[1], chave[2])))
+    return trechos
+
+def _diferencas(a: list, b: list, emparelhar: bool = False) -> list:
+    """
+    (marca, item) de duas sequências: as pontas comuns são cortadas antes do
+    SequenceMatcher (na tabela, só o trecho alterado é comparado). Num trecho
+    substituído, `emparelhar` alterna removido/incluído item a item (linhas de
+    tabela); senão, todos os removidos vêm antes dos incluídos (palavras).
+    """
+    inicio, limite = 0, min(len(a), len(b))
+    while inicio < limite and a[inicio] == b[inicio]:
+        inicio += 1
+    fim = 0
+    while fim < limite - inicio and a[-1 - fim] == b[-1 - fim]:
+        fim += 1
+    marcas = [("=", x) for x in b[:inicio]]
+    meio_a, meio_b = a[inicio:len(a) - fim], b[inicio:len(b) - fim]
+    for op, i1, i2, j1, j2 in SequenceMatcher(None, meio_a, meio_b, autojunk=False).get_opcodes():
+        if op == "equal":
+            marcas.extend(("=", x) for x in meio_b[j1:j2])
+        elif op == "replace" and emparelhar:
+            velhos, novos = meio_a[i1:i2], meio_b[j1:j2]
+            for k in range(max(len(velhos), len(novos))):
+                if k < len(velhos):
+                    marcas.append(("-", velhos[k]))
+                if k < len(novos):
+                    marcas.append(("+", novos[k]))
+        else:
+            marcas.extend(("-", x) for x in meio_a[i1:i2])
+            marcas.extend(("+", x) for x in meio_b[j1:j2])
+    marcas.extend(("=", x) for x in b[len(b) - fim:])
+    return marcas
+
+def _comparaveis(x, y) -> bool:
+    tipo = type(x)
+    if tipo is not type(y):
+        return False
+    if tipo is Tabela:
+        return tuple(x.cabecalho) == tuple(y.cabecalho)
+    return tipo is Paragrafo or tipo is ItemLista or tipo is Titulo
+
+def _revisar(x, y) -> BlocoRevisado | None:
+    """Diferenças entre dois blocos pareados; None se o texto mudou demais para uma marcação palavra a palavra."""
+    if type(x) is Tabela:
+        linhas_x = [tuple(str(c) for c in linha) for linha in x.linhas]
+        linhas_y = [tuple(str(c) for c in linha) for linha in y.linhas]
+        return BlocoRevisado(x, y, _diferencas(linhas_x, linhas_y, emparelhar=True))
+    if type(x) is Titulo:
+        tokens_x, tokens_y = _tokens((Trecho(x.texto),)), _tokens((Trecho(y.texto),))
+    else:
+        tokens_x, tokens_y = _tokens(x.trechos), _tokens(y.trechos)
+    marcas = _diferencas(tokens_x, tokens_y)
+    iguais = sum(1 for marca, _ in marcas if marca == "=")
+    if 2 * iguais < _SEMELHANCA_MINIMA * (len(tokens_x) + len(tokens_y)):
+        return None
+    return BlocoRevisado(x, y, _agrupar(marcas))
+
+def _comparar_blocos(a: tuple, b: tuple, assinatura) -> list | None:
+    """(marca, bloco) da unidade, ou None se for igual."""
+    if len(a) == len(b) and all(x is y for x, y in zip(a, b)):
+        return None
+    sa, sb = [assinatura(x) for x in a], [assinatura(y) for y in b]
+    if sa == sb:
+        return None
+    marcas = []
+    for op, i1, i2, j1, j2 in SequenceMatcher(None, sa, sb, autojunk=False).get_opcodes():
+        if op == "equal":
+            marcas.extend(("=", y) for y in b[j1:j2])
+        elif op == "delete":
+            marcas.extend(("-", x) for x in a[i1:i2])
+        elif op == "insert":
+            marcas.extend(("+", y) for y in b[j1:j2])
+        else:
+            velhos, novos = a[i1:i2], b[j1:j2]
+            for k in range(max(len(velhos), len(novos))):
+                x = velhos[k] if k < len(velhos) else None
+                y = novos[k] if k < len(novos) else None
+                revisado = _revisar(x, y) if x is not None and y is not None and _comparaveis(x, y) else None
+                if revisado is not None:
+                    marcas.append(("~", revisado))
+                    continue
+                if x is not None:
+                    marcas.append(("-", x))
+                if y is not None:
+                    marcas.append(("+", y))
+    return marcas
+
+def comparar(antes: Documento, depois: Documento) -> Comparacao:
+    """Alinha as duas versões por seção/cláusula e compara só as unidades que diferem."""
+    memo = {}
+
+    def assinatura(bloco):
+        # tabelas grandes aparecem nas duas versões: cada bloco é resumido uma vez só
+        chave = id(bloco)
+        if chave not in memo:
+            memo[chave] = _assinatura(bloco)
+        return memo[chave]
+
+    unidades_a, unidades_b = _unidades(antes.blocos), _unidades(depois.blocos)
+    titulos = {}
+    for _, secao, blocos in (*unidades_a, *unidades_b):
+        if type(blocos[0]) is Titulo and blocos[0].nivel == 2:
+            titulos[secao] = blocos[0]
+
+    unidades = []
+    chaves_a, chaves_b = [u[0] for u in unidades_a], [u[0] for u in unidades_b]
+    for op, i1, i2, j1, j2 in SequenceMatcher(None, chaves_a, chaves_b, autojunk=False).get_opcodes():
+        if op == "equal":
+            for (chave, _, blocos_a), (_, secao, blocos_b) in zip(unidades_a[i1:i2], unidades_b[j1:j2]):
+                marcas = _comparar_blocos(blocos_a, blocos_b, assinatura)
+                if marcas is None:
+                    unidades.append(Unidade(chave, secao, INALTERADA, [("=", b) for b in blocos_b]))
+                else:
+                    unidades.append(Unidade(chave, secao, ALTERADA, marcas))
+            continue
+        for chave, secao, blocos in unidades_a[i1:i2]:
+            unidades.append(Unidade(chave, secao, REMOVIDA, [("-", b) for b in blocos]))
+        for chave, secao, blocos in unidades_b[j1:j2]:
+            unidades.append(Unidade(chave, secao, INCLUIDA, [("+", b) for b in blocos]))
+    return Comparacao(antes, depois, unidades, titulos)
+
+# ----------------------------------
+# Redline em Markdown
+# ----------------------------------
+def _enfatizar(texto: str, negrito: bool, italico: bool) -> str:
+    """**negrito**/_itálico_ com os espaços das pontas fora da marcação (senão ela não vale)."""
+    if not (negrito or italico):
+        return texto
+    miolo = texto.strip()
+    if not miolo:
+        return texto
+    inicio = texto[:len(texto) - len(texto.lstrip())]
+    fim = texto[len(texto.rstrip()):]
+    return f"{inicio}**{miolo}**{fim}" if negrito else f"{inicio}_{miolo}_{fim}"
+
+def _marcar_md(texto: str, marca: str) -> str:
+    if marca == "=":
+        return texto
+    miolo = texto.strip()
+    if not miolo:
+        return texto if marca == "+" else ""
+    inicio = texto[:len(texto) - len(texto.lstrip())]
+    fim = texto[len(texto.rstrip()):]
+    return f"{inicio}~~{miolo}~~{fim}" if marca == "-" else f"{inicio}<ins>{miolo}</ins>{fim}"
+
+def _trechos_marcados_md(marcas) -> str:
+    # trechos vizinhos de mesma marca ficam num só ~~...~~/<ins>...</ins>
+    partes, grupo, marca_grupo = [], [], "="
+    for marca, t in marcas:
+        if marca != marca_grupo or t is QUEBRA:
+            partes.append(_marcar_md("".join(grupo), marca_grupo))
+            grupo, marca_grupo = [], marca
+        if t is QUEBRA:
+            if marca != "-":
+                partes.append("  \n")
+        else:
+            grupo.append(_enfatizar(t.texto, t.negrito, t.italico))
+    partes.append(_marcar_md("".join(grupo), marca_grupo))
+    return "".join(partes)
+
+def _tabela_marcada_md(tabela: Tabela, marcas, somente_alteracoes: bool) -> str:
+    recuo = "  " * tabela.nivel
+    linhas = [f"{recuo}| " + " | ".join(map(celula_md, tabela.cabecalho)) + " |"]
+    linhas.append(recuo + "|" + "|".join("---:" if a == "r" else "---" for a in tabela.alinhamentos) + "|")
+    for marca, linha in marcas:
+        if marca == "=" and somente_alteracoes:
+            continue
+        linhas.append(f"{recuo}| " + " | ".join(_marcar_md(celula_md(c), marca) for c in linha) + " |")
+    return "\n".join(linhas)
+
+def _marcas_do_bloco(marca: str, bloco) -> list:
+    """Marcas de um bloco incluído/removido por inteiro, como as de um BlocoRevisado."""
+    if type(bloco) is Tabela:
+        return [(marca, linha) for linha in bloco.linhas]
+    if type(bloco) is Titulo:
+        return [(marca, Trecho(bloco.texto))]
+    return [(marca, t) for t in bloco.trechos]
+
+def _bloco_marcado_md(marca: str, bloco, somente_alteracoes: bool) -> str:
+    if marca == "=":
+        return bloco_md(bloco)
+    if marca == "~":
+        marcas, bloco = bloco.marcas, bloco.depois
+    elif type(bloco) in (Paragrafo, ItemLista, Titulo, Tabela):
+        marcas = _marcas_do_bloco(marca, bloco)
+    else:
+        return bloco_md(bloco) if marca == "+" else ""  # separador/espaço
+    tipo = type(bloco)
+    if tipo is Tabela:
+        return _tabela_marcada_md(bloco, marcas, somente_alteracoes)
+    if tipo is Titulo:
+        return "#" * bloco.nivel + " " + _trechos_marcados_md(marcas)
+    if tipo is ItemLista:
+        marcador = "- " if bloco.numero is None else f"{bloco.numero}. "
+        return "  " * bloco.nivel + marcador + _trechos_marcados_md(marcas)
+    return _trechos_marcados_md(marcas)
+
+def _rotulo(unidade: Unidade) -> str:
+    if unidade.chave == "0":
+        return "Cabeçalho"
+    if unidade.chave == unidade.secao:
+        return f"Seção {unidade.chave}"
+    return f"Cláusula {unidade.chave}"
+
+def redline_markdown(comparacao: Comparacao, somente_alteracoes: bool = False) -> str:
+    """
+    Versão nova com as diferenças marcadas: ~~removido~~ e <ins>incluído</ins>.
+    Com `somente_alteracoes`, só as unidades que mudaram (e, nas tabelas, só
+    as linhas que mudaram), cada uma sob o título da sua seção.
+    """
+    linhas = []
+    if not somente_alteracoes:
+        for unidade in comparacao.unidades:
+            linhas.extend(_bloco_marcado_md(m, b, False) for m, b in unidade.blocos)
+        return "\n".join(linhas)
+    secao_atual = None
+    for unidade in comparacao.alteracoes:
+        titulo = comparacao.titulos.get(unidade.secao)
+        if unidade.secao != secao_atual and titulo is not None and unidade.chave != unidade.secao:
+            linhas.extend((bloco_md(titulo), ""))
+        secao_atual = unidade.secao
+        linhas.extend((f"**[{_rotulo(unidade)} — {unidade.situacao}]**", ""))
+        linhas.extend(_bloco_marcado_md(m, b, True) for m, b in unidade.blocos)
+        linhas.append("")
+    return "\n".join(linhas)
+
+# ----------------------------------
+# Redline em DOCX (marcas de revisão do Word)
+# ----------------------------------
+class _Revisoes:
+    """Envolve runs/linhas em w:ins/w:del com autor, data e um id por revisão."""
+
+    def __init__(self, autor: str, data: str):
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+
+        self._elemento, self._qn = OxmlElement, qn
+        self.autor, self.data = autor, data
+        self._id = 0
+        self._r, self._t, self._p, self._tr = qn("w:r"), qn("w:t"), qn("w:p"), qn("w:tr")
+
+    def _marca(self, marca: str):
+        self._id += 1
+        qn = self._qn
+        return self._elemento("w:ins" if marca == "+" else "w:del", {
+            qn("w:id"): str(self._id), qn("w:author"): self.autor, qn("w:date"): self.data,
+        })
+
+    def run(self, r, marca: str) -> None:
+        envelope = self._marca(marca)
+        r.addprevious(envelope)
+        envelope.append(r)
+        if marca == "-":
+            for t in r.iter(self._t):
+                t.tag = self._qn("w:delText")
+
+    def paragrafo(self, p, marca: str) -> None:
+        """Parágrafo inteiro incluído/removido: todos os runs e a marca de parágrafo."""
+        for r in p.findall(self._r):
+            self.run(r, marca)
+        rpr = self._elemento("w:rPr")
+        rpr.append(self._marca(marca))
+        p.get_or_add_pPr().append(rpr)
+
+    def linha(self, tr, marca: str) -> None:
+        trpr = tr.find(self._qn("w:trPr"))
+        if trpr is None:
+            trpr = self._elemento("w:trPr")
+            tr.insert(1 if tr[0].tag == self._qn("w:tblPrEx") else 0, trpr)
+        trpr.append(self._marca(marca))
+        for p in tr.iter(self._p):
+            for r in p.findall(self._r):
+                self.run(r, marca)
+
+    def elemento(self, elemento, marca: str) -> None:
+        if elemento.tag == self._p:
+            self.paragrafo(elemento, marca)
+        else:
+            for tr in elemento.iter(self._tr):
+                self.linha(tr, marca)
+
+def montar_redline_docx(comparacao: Comparacao, autor: str = "Revisão do TR", data: str | None = None):
+    """
+    Documento do python-docx com a versão nova e as diferenças como revisões
+    do Word. Os trechos iguais são renderizados como no to_docx (cláusulas da
+    biblioteca coladas do XML pronto).
+    """
+    from datetime import datetime, timezone
+
+    from .render_docx import CorpoDocx
+
+    data = data or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    corpo = CorpoDocx(comparacao.depois.municipio)
+    revisoes = _Revisoes(autor, data)
+
+    iguais = []
+    for unidade in comparacao.unidades:
+        for marca, bloco in unidade.blocos:
+            if marca == "=":
+                iguais.append(bloco)
+                continue
+            if iguais:
+                corpo.acrescentar(iguais)
+                iguais = []
+            if marca in "+-":
+                for elemento in corpo.acrescentar((bloco,)):
+                    revisoes.elemento(elemento, marca)
+            elif type(bloco.depois) is Tabela:
+                tabela = bloco.depois
+                marcada = Tabela(tabela.cabecalho, [linha for _, linha in bloco.marcas], tabela.alinhamentos, tabela.nivel)
+                (tbl,) = corpo.acrescentar((marcada,))
+                for (marca_linha, _), tr in zip(bloco.marcas, tbl.findall(revisoes._tr)[1:]):
+                    if marca_linha != "=":
+                        revisoes.linha(tr, marca_linha)
+            else:
+                p = corpo.paragrafo(bloco.depois, [t for _, t in bloco.marcas])
+                for (marca_trecho, _), r in zip(bloco.marcas, p.findall(revisoes._r)):
+                    if marca_trecho != "=":
+                        revisoes.run(r, marca_trecho)
+    if iguais:
+        corpo.acrescentar(iguais)
+    return corpo.doc
+
+def redline_docx(comparacao: Comparacao, autor: str = "Revisão do TR", data: str | None = None) -> bytes:
+    """DOCX com as diferenças como revisões do Word (aceitar/rejeitar em Revisão > Alterações)."""
+    from .render_docx import bytes_docx
+
+    return bytes_docx(montar_redline_docx(comparacao, autor, data))
+
+# ----------------------------------
+# Linha de comando
+# ----------------------------------
+def _variante(nome: str, objeto: str, municipio: str | None) -> Documento:
+    from .gerador import montar_tr, montar_tr_campos_livres, montar_tr_secretarias
+
+    opcionais = {"municipio": municipio} if municipio else {}
+    if nome == "termo":
+        return montar_tr_campos_livres(objeto, "", "", "", "", "", "", "", "", "", True, True, **opcionais)
+    if nome in ("termo1", "termo3"):
+        return montar_tr_secretarias(objeto, [], 12, True, True, **opcionais)
+    if nome == "termo2":
+        return montar_tr(objeto, [], 12, True, True, **opcionais)
+    raise ValueError(f"Variante desconhecida: {nome!r} (use termo, termo1, termo2 ou termo3)")
+
+def _do_repositorio(id_tr: int) -> Documento:
+    from .gerador import montar_tr
+    from .repositorio import repositorio_padrao
+
+    salvo = repositorio_padrao().obter(id_tr)
+    if salvo is None:
+        raise ValueError(f"TR {id_tr} não encontrado no repositório.")
+    ano, mes, dia = salvo.criado_em[:10].split("-")
+    return montar_tr(**salvo.entradas, data=f"{dia}/{mes}/{ano}")
+
+def main(argv=None) -> int:
+    import argparse
+    import sys
+    import time
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(
+        prog="python -m tr_core.comparacao",
+        description="Compara duas versões de um TR e gera o redline (Markdown ou DOCX com revisões).",
+    )
+    parser.add_argument("versoes", nargs="+",
+                        help="ids de dois TRs do repositório ou, com --variantes, o objeto")
+    parser.add_argument("--variantes", nargs=2, metavar=("ANTES", "DEPOIS"),
+                        help="compara duas variantes do template (termo, termo1, termo2, termo3) para o objeto")
+    parser.add_argument("--municipio", default=None)
+    parser.add_argument("-o", "--saida", help="arquivo .md ou .docx (padrão: só as alterações na saída padrão)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.variantes:
+            objeto = " ".join(args.versoes)
+            antes, depois = (_variante(v, objeto, args.municipio) for v in args.variantes)
+        elif len(args.versoes) == 2 and all(v.isdigit() for v in args.versoes):
+            antes, depois = (_do_repositorio(int(v)) for v in args.versoes)
+        else:
+            parser.error("informe dois ids do repositório ou use --variantes")
+        inicio = time.perf_counter()
+        comparacao = comparar(antes, depois)
+        segundos = time.perf_counter() - inicio
+    except ValueError as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+
+    resumo = comparacao.resumo()
+    print(f"{resumo[ALTERADA]} alterada(s), {resumo[INCLUIDA]} incluída(s), {resumo[REMOVIDA]} removida(s), "
+          f"{resumo[INALTERADA]} igual(is) — comparação em {segundos * 1e3:.1f} ms", file=sys.stderr)
+    if not args.saida:
+        print(redline_markdown(comparacao, somente_alteracoes=True))
+    elif args.saida.lower().endswith(".docx"):
+        Path(args.saida).write_bytes(redline_docx(comparacao))
+    else:
+        Path(args.saida).write_text(redline_markdown(comparacao), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
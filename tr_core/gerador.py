@@ -0,0 +1,424 @@
+from datetime import date
+from functools import lru_cache
+
+from . import clausulas as _clausulas
+from .instrumentacao import instrumentada
+from .modelo import QUEBRA, Documento, Espaco, ItemLista, Paragrafo, Separador, Titulo, Trecho, blocos_de_texto, trechos
+from .municipios import municipio as _municipio
+from .render_markdown import render_markdown
+
+# ----------------------------------
+# Funções utilitárias
+# ----------------------------------
+def lista_nao_vazia(valor: str) -> bool:
+    return bool(valor and str(valor).strip())
+
+def monta_bloco(label: str, valor: str) -> str:
+    """Renderiza um parágrafo só se houver conteúdo."""
+    return f"- **{label}:** {valor.strip()}\n" if lista_nao_vazia(valor) else ""
+
+def item_bloco(label: str, valor: str) -> tuple:
+    """Equivalente de monta_bloco no modelo de documento: um item ou nenhum."""
+    if not lista_nao_vazia(valor):
+        return ()
+    return (ItemLista((Trecho(f"{label}:", negrito=True), Trecho(" " + valor.strip()))),)
+
+def formatar_secretarias(lista_sel):
+    if not lista_sel:
+        return ""
+    if len(lista_sel) == 1:
+        return lista_sel[0]
+    return "; ".join(lista_sel)
+
+def _p(texto: str) -> Paragrafo:
+    return Paragrafo(trechos(texto))
+
+def _item(texto: str, nivel: int = 0, numero: int | None = None) -> ItemLista:
+    return ItemLista(trechos(texto), nivel, numero)
+
+# ----------------------------------
+# Template pré-compilado do TR
+# ----------------------------------
+# Todos os blocos fixos são criados uma única vez, na importação do módulo, e
+# compartilhados entre os documentos. Cada chamada de montar_tr só cria os
+# blocos variáveis (cabeçalho, 1.1, quadro-resumo) e escolhe as variantes da
+# Opção C e dos KPIs.
+
+_TITULO = Titulo(1, "TERMO DE REFERÊNCIA — Lei nº 14.133/2021")
+_ROTULO_MUNICIPIO = Trecho("Município:", negrito=True)
+_ROTULO_DATA = Trecho("Data:", negrito=True)
+
+# 1. Das condições gerais
+_SECAO_1_TITULO = (Separador(), Titulo(2, "1. DAS CONDIÇÕES GERAIS DA CONTRATAÇÃO"))
+_CLAUSULA_1_1_INICIO = Trecho("1.1 O presente Termo de Referência tem por objeto ")
+_OBJETO_VAZIO = Trecho("[INSERIR OBJETO SOLICITADO]", negrito=True)
+
+# 2. Necessidade e fundamentação (roteiro padrão, substituído pela justificativa redigida, se houver).
+# O mesmo vale para o corpo das seções 3 e 4 e para os KPIs da 6.4 (ver tr_core.redacao).
+_SECAO_2_TITULO = (
+    Espaco(),
+    Titulo(2, "2. DESCRIÇÃO DA NECESSIDADE DA CONTRATAÇÃO E FUNDAMENTAÇÃO LEGAL"),
+)
+_SECAO_2_ROTEIRO = (  # seguido da fundamentação legal, que cita o decreto do município
+    _item("**Contexto e problema a resolver:** descreve por que o objeto é necessário, quem será atendido e quais resultados públicos se pretende alcançar."),
+    _item("**Consequências da não contratação:** riscos operacionais, legais, orçamentários e de continuidade do serviço público."),
+    _item("**Alinhamento ao planejamento:** vinculação a PPA/LDO/LOA e planos setoriais, quando aplicável."),
+    _item("**Justificativa técnica e vantajosidade:** adequação do objeto em desempenho, qualidade, custo total do ciclo de vida e economicidade."),
+)
+
+# 3. Solução, opções e ciclo de vida
+_SECAO_3_TITULO = Titulo(2, "3. DESCRIÇÃO DA SOLUÇÃO COMO UM TODO (CICLO DE VIDA) E ESPECIFICAÇÃO DOS SERVIÇOS")
+_SECAO_3_INICIO = (
+    _p("**Resumo da necessidade (síntese):** [apresentar em 3–5 linhas]."),
+    Espaco(),
+    _p("**Opções de solução:**"),
+    _item("**Opção A — Execução própria pela Prefeitura:** recursos humanos, infraestrutura e competências exigidas; "
+          "limitações (ex.: ausência de suporte técnico/equipe qualificada, custos de capacitação, riscos de continuidade) e inviabilidade prática/econômica."),
+    _item("**Opção B — Contratação/Aquisição do objeto:** atendimento pelo mercado, níveis de serviço, prazos, garantias, manutenção/assistência técnica."),
+)
+_OPCAO_C = (
+    _item("**Opção C — Híbrida/Colaborativa:** parte interna + terceirização de etapas específicas, com avaliação de prós e contras."),
+)
+_SECAO_3_FIM = (
+    Espaco(),
+    _p("**Conclusão – Solução escolhida:** justificar a alternativa mais vantajosa ao interesse público (eficiência, economicidade e qualidade)."),
+    _p("**Ciclo de Vida do Objeto:** aquisição/implantação → operação → manutenção/assistência → atualizações/treinamentos → desmobilização/descartes, "
+       "incluindo sustentabilidade, garantia e suporte pós‑venda."),
+    _p("**Especificação técnica:** características mínimas, desempenho esperado, normas aplicáveis (ABNT/INMETRO/ANVISA/ANEEL etc.), "
+       "padrões de qualidade, prazos de atendimento, SLAs e evidências de conformidade."),
+)
+
+# 4 a 6: cláusulas da biblioteca versionada (tr_core.clausulas), referenciadas
+# pelos mesmos blocos em todos os TRs
+_SECAO_4_TITULO = _clausulas.blocos("4")
+_SECAO_4_PADRAO = _clausulas.blocos("4.0", *(f"4.{n}" for n in range(1, 13)))
+_SECAO_5 = _clausulas.blocos("5", *(f"5.{n}" for n in range(1, 15)))
+_SECAO_6_INICIO = _clausulas.blocos("6", "6.1", "6.2", "6.3", "6.4")
+_SECAO_6_TITULO = _clausulas.blocos("6")
+_SECAO_6_2_A_6_4 = _clausulas.blocos("6.2", "6.3", "6.4")
+_KPIS_PADRAO = _clausulas.blocos("6.4.padrao")
+_KPIS_A_DEFINIR = _clausulas.blocos("6.4.a_definir")
+_SECAO_6_FIM = _clausulas.blocos("6.5", "6.6", "6.7", "6.8", "6.observacao")
+
+# ----------------------------------
+# Textos de cada município
+# ----------------------------------
+# Cláusulas que citam a prefeitura ou os decretos municipais. Os campos entre
+# chaves vêm do registro (tr_core.municipios, Municipio.campos) e cada
+# município pode trocar o texto inteiro de uma cláusula no seu TOML.
+CLAUSULAS = {
+    "1.1": ", em conformidade com as especificações de descrição e quantidade detalhadamente elencadas neste documento, amparada pelas disposições legais vigentes que regulam tal procedimento, visando atender as necessidades da {prefeitura} e de suas Secretarias Municipais.",
+    "1.2": "1.2 O objeto desta contratação não se enquadra como sendo de bem de luxo, conforme {decreto_bem_de_luxo}.",
+    "1.3": "1.3 O prazo de vigência da contratação será de 12 meses, contados da data de assinatura da ARP (Ata Registro de Preço) ou do Contrato conforme celebrado, na forma do artigo 105 da Lei n° 14.133/2021, podendo o mesmo ser prorrogado a critério da Administração Pública.",
+    "1.4": "1.4 O custo estimado total da contratação é de {valor_estimado} conforme custos unitários apostos na tabela acima, conforme pesquisa de preço nos termos do {decreto_pesquisa_de_precos}.",
+    "2.fundamentacao": "**Fundamentação legal sucinta:** dispositivos pertinentes da Lei nº 14.133/2021 (ex.: art. 6º, art. 40 e, quando cabível, art. 92) e {decreto_contratacoes}, sem transcrições.",
+    "escopo": "**Escopo e abrangência:** delimita o que está incluído e excluído, unidades atendidas e cobertura territorial (urbana/rural).",
+    "base_normativa": "**Base normativa e princípios:** Lei nº 14.133/2021 (planejamento, eficiência, motivação, legalidade) e, quando aplicável, {decreto_contratacoes} ({municipio}/{uf}).",
+}
+
+# O valor da 1.4 só é conhecido com a tabela de itens (tr_core.itens); sem ela,
+# fica o texto a preencher.
+_VALOR_A_DEFINIR = "R$ 00.000,00 (descrever o valor em reais)"
+_MARCA_VALOR = "\x00"
+
+class ModeloMunicipio:
+    """Blocos do template que dependem do município, compilados uma vez por prefeitura."""
+    __slots__ = ("municipio", "clausula_1_1_fim", "_clausula_1_4", "secao_1_fim", "secao_2_padrao", "escopo_e_base")
+
+    def __init__(self, municipio):
+        textos = {**CLAUSULAS, **municipio.clausulas}
+        campos = {**municipio.campos(), "valor_estimado": _MARCA_VALOR}
+        try:
+            textos = {chave: texto.format(**campos) for chave, texto in textos.items()}
+        except KeyError as erro:
+            raise ValueError(f"Município {municipio.id}: campo {erro.args[0]!r} não definido no TOML") from None
+        self.municipio = municipio
+        self.clausula_1_1_fim = Trecho(textos["1.1"])
+        self._clausula_1_4 = textos["1.4"].split(_MARCA_VALOR)  # texto antes e depois do valor
+        self.secao_1_fim = (
+            _p(textos["1.2"]),
+            _p(textos["1.3"]),
+            self.clausula_1_4(_VALOR_A_DEFINIR),
+            # Quadro‑resumo (simplificado): os itens variáveis vêm logo em seguida
+            Espaco(),
+            _p("**Quadro-resumo do objeto:**"),
+        )
+        self.secao_2_padrao = (*_SECAO_2_ROTEIRO, _item(textos["2.fundamentacao"]))
+        self.escopo_e_base = (_p(textos["escopo"]), _p(textos["base_normativa"]))
+
+    def clausula_1_4(self, valor_estimado: str) -> Paragrafo:
+        return _p(valor_estimado.join(self._clausula_1_4))
+
+@lru_cache(maxsize=None)
+def _compilar(id_municipio: str) -> ModeloMunicipio:
+    from .municipios import registro
+
+    return ModeloMunicipio(next(m for m in registro().values() if m.id == id_municipio))
+
+@lru_cache(maxsize=256)
+def modelo_do_municipio(nome: str | None) -> ModeloMunicipio:
+    """Template compilado do município (pelo nome ou id; sem nome, o do padrão; fora do registro, ValueError)."""
+    return _compilar(_municipio(nome).id)
+
+def _redigida(texto: str | None, nivel: int = 0) -> tuple:
+    """Blocos do texto redigido, ou () para cair no texto padrão."""
+    return blocos_de_texto(texto, nivel) if lista_nao_vazia(texto) else ()
+
+def _cabecalho(municipio: str, data: str | None = None) -> tuple:
+    """Título, município/data e abertura da seção 1 (iguais em todas as variantes)."""
+    hoje = data or date.today().strftime("%d/%m/%Y")
+    nome = modelo_do_municipio(municipio).municipio.nome  # "Brasnorte-MT", qualquer que seja a grafia recebida
+    return (
+        _TITULO,
+        Paragrafo((_ROTULO_MUNICIPIO, Trecho(f" {nome}"), QUEBRA, _ROTULO_DATA, Trecho(f" {hoje}"))),
+        *_SECAO_1_TITULO,
+    )
+
+# ----------------------------------
+# Seções com dependências declaradas
+# ----------------------------------
+# Cada parte do TR declara de quais entradas de montar_tr depende; assim a
+# montagem incremental (tr_core.incremental) sabe o que precisa ser refeito
+# quando só um campo muda (ex.: kpis_padrao só afeta a 6.4).
+
+class Secao:
+    __slots__ = ("nome", "dependencias", "montar")
+
+    def __init__(self, nome: str, dependencias: tuple, montar):
+        self.nome = nome
+        self.dependencias = dependencias
+        self.montar = montar  # recebe as dependências por nome e devolve os blocos
+
+    def blocos(self, entradas: dict) -> tuple:
+        return self.montar(**{nome: entradas[nome] for nome in self.dependencias})
+
+def _secao_1(objeto: str, municipio: str, itens) -> tuple:
+    modelo = modelo_do_municipio(municipio)
+    objeto_tr = Trecho(objeto.strip(), negrito=True) if lista_nao_vazia(objeto) else _OBJETO_VAZIO
+    clausula_1_1 = Paragrafo((_CLAUSULA_1_1_INICIO, objeto_tr, modelo.clausula_1_1_fim))
+    if not itens:
+        return (clausula_1_1, *modelo.secao_1_fim)
+    # com a tabela de itens (tr_core.itens), a 1.4 traz o total calculado
+    return (
+        clausula_1_1,
+        Espaco(),
+        itens.tabela(),
+        Espaco(),
+        *modelo.secao_1_fim[:2],
+        modelo.clausula_1_4(itens.valor_estimado()),
+        *modelo.secao_1_fim[3:],
+    )
+
+def _quadro_resumo(objeto: str, secretarias: list[str], vigencia_meses: int) -> tuple:
+    return (
+        *item_bloco("Objeto detalhado", objeto),
+        *item_bloco("Unidade(s) demandante(s)", formatar_secretarias(secretarias)),
+        *item_bloco("Prazo de vigência (meses)", str(vigencia_meses)),
+    )
+
+def _secao_2(justificativa: str | None, municipio: str) -> tuple:
+    return (*_SECAO_2_TITULO, *(_redigida(justificativa) or modelo_do_municipio(municipio).secao_2_padrao))
+
+def _secao_3(solucao: str | None, incluir_opcao_hibrida: bool) -> tuple:
+    padrao = (*_SECAO_3_INICIO, *(_OPCAO_C if incluir_opcao_hibrida else ()), *_SECAO_3_FIM)
+    return (_SECAO_3_TITULO, *(_redigida(solucao) or padrao))
+
+def _secao_4(requisitos: str | None) -> tuple:
+    return (*_SECAO_4_TITULO, *(_redigida(requisitos) or _SECAO_4_PADRAO))
+
+def _secao_6(medicao) -> tuple:
+    # com a medição apurada (tr_core.medicao), a tabela da 6.1 vem preenchida
+    if medicao is None:
+        return _SECAO_6_INICIO
+    return (*_SECAO_6_TITULO, *medicao.blocos_6_1(), *_SECAO_6_2_A_6_4)
+
+def _kpis(kpis: str | None, kpis_padrao: bool, medicao) -> tuple:
+    indicadores = _redigida(kpis, nivel=1) or (_KPIS_PADRAO if kpis_padrao else _KPIS_A_DEFINIR)
+    if medicao is None or not medicao.indicadores:
+        return indicadores
+    return (*indicadores, medicao.tabela_indicadores())
+
+# Seções 2 a 6, iguais em todas as variantes (só a seção 1 muda entre elas)
+SECOES_2_A_6 = (
+    Secao("2", ("justificativa", "municipio"), _secao_2),
+    Secao("3", ("solucao", "incluir_opcao_hibrida"), _secao_3),
+    Secao("4", ("requisitos",), _secao_4),
+    Secao("5", (), lambda: _SECAO_5),
+    Secao("6", ("medicao",), _secao_6),
+    Secao("6.4", ("kpis", "kpis_padrao", "medicao"), _kpis),
+    Secao("6.5", (), lambda: _SECAO_6_FIM),
+)
+
+# TR de montar_tr/termo2.py, na ordem do documento
+SECOES_TR = (
+    Secao("cabecalho", ("municipio", "data"), _cabecalho),
+    Secao("1", ("objeto", "municipio", "itens"), _secao_1),
+    Secao("quadro_resumo", ("objeto", "secretarias", "vigencia_meses"), _quadro_resumo),
+    *SECOES_2_A_6,
+)
+
+def montar_secoes(secoes, entradas: dict) -> tuple:
+    """Blocos das seções, na ordem; cada uma recebe só as entradas de que depende."""
+    return tuple(bloco for secao in secoes for bloco in secao.blocos(entradas))
+
+def _secoes_2_a_6(
+    incluir_opcao_hibrida: bool,
+    kpis_padrao: bool,
+    municipio: str,
+    justificativa: str | None = None,
+    solucao: str | None = None,
+    requisitos: str | None = None,
+    kpis: str | None = None,
+    medicao=None,
+) -> tuple:
+    return montar_secoes(SECOES_2_A_6, dict(
+        incluir_opcao_hibrida=incluir_opcao_hibrida,
+        kpis_padrao=kpis_padrao,
+        municipio=municipio,
+        justificativa=justificativa,
+        solucao=solucao,
+        requisitos=requisitos,
+        kpis=kpis,
+        medicao=medicao,
+    ))
+
+@instrumentada("montar_tr")
+def montar_tr(
+    objeto: str,
+    secretarias: list[str],
+    vigencia_meses: int,
+    incluir_opcao_hibrida: bool,
+    kpis_padrao: bool,
+    municipio: str = "Brasnorte-MT",
+    justificativa: str | None = None,
+    solucao: str | None = None,
+    requisitos: str | None = None,
+    kpis: str | None = None,
+    data: str | None = None,
+    medicao=None,
+    itens=None,
+) -> Documento:
+    """
+    Monta o TR completo como Documento, pronto para os renderizadores Markdown e DOCX.
+    Os textos redigidos (ex.: pelo LLM) substituem o texto padrão da respectiva
+    parte: `justificativa` a seção 2, `solucao` o corpo da seção 3 (e a Opção C),
+    `requisitos` o da seção 4 e `kpis` os indicadores da 6.4. `data` (dd/mm/aaaa)
+    é a do cabeçalho; por padrão, a de hoje. `medicao` (tr_core.medicao.medir)
+    preenche a tabela da 6.1 e acrescenta os indicadores apurados à 6.4.
+    `itens` (tr_core.itens.ler_tabela) entra como tabela após a 1.1, com o
+    custo estimado total na 1.4.
+    """
+    return Documento(montar_secoes(SECOES_TR, dict(
+        objeto=objeto,
+        secretarias=secretarias,
+        vigencia_meses=vigencia_meses,
+        incluir_opcao_hibrida=incluir_opcao_hibrida,
+        kpis_padrao=kpis_padrao,
+        municipio=municipio,
+        data=data,
+        justificativa=justificativa,
+        solucao=solucao,
+        requisitos=requisitos,
+        kpis=kpis,
+        medicao=medicao,
+        itens=itens,
+    )), municipio)
+
+@instrumentada("gerar_tr", tamanho=len)
+def gerar_tr(
+    objeto: str,
+    secretarias: list[str],
+    vigencia_meses: int,
+    incluir_opcao_hibrida: bool,
+    kpis_padrao: bool,
+    municipio: str = "Brasnorte-MT",
+    justificativa: str | None = None,
+    solucao: str | None = None,
+    requisitos: str | None = None,
+    kpis: str | None = None,
+) -> str:
+    """Gera o TR completo em Markdown com os campos simplificados."""
+    return render_markdown(montar_tr(
+        objeto, secretarias, vigencia_meses, incluir_opcao_hibrida, kpis_padrao, municipio,
+        justificativa, solucao, requisitos, kpis,
+    ))
+
+# ----------------------------------
+# Variantes anteriores do formulário
+# ----------------------------------
+# termo.py (campos livres) e termo1.py/termo3.py (secretarias + vigência) só
+# diferem de montar_tr na seção 1 e no quadro-resumo.
+
+_OBJETO_INICIO = Trecho("O presente Termo de Referência tem por objeto ")
+_OBJETO_MEIO = Trecho(
+    ", conforme especificações, quantidades e condições estabelecidas neste documento, visando atender à Prefeitura Municipal de "
+)
+_OBJETO_FIM = Trecho(" e às suas Secretarias Municipais.")
+_VIGENCIA_CONTRATUAL = _p("**Vigência e prazos de execução/entrega:** definidos neste TR e no instrumento contratual.")
+_ROTULO_VIGENCIA = Trecho("Vigência:", negrito=True)
+_FORMA_E_QUADRO = (
+    _p("**Forma de fornecimento:** contínuo e/ou parcelado, sob demanda, com emissão de Ordem de Serviço (OS) e Nota de Empenho (NE), quando aplicável."),
+    Espaco(),
+    _p("**Quadro-resumo do objeto:**"),
+)
+
+def _objeto_variante(objeto: str, municipio: str) -> Paragrafo:
+    objeto_tr = Trecho(objeto.strip(), negrito=True) if lista_nao_vazia(objeto) else _OBJETO_VAZIO
+    nome = modelo_do_municipio(municipio).municipio.nome
+    return Paragrafo((_OBJETO_INICIO, objeto_tr, _OBJETO_MEIO, Trecho(nome), _OBJETO_FIM))
+
+def montar_tr_campos_livres(
+    objeto: str,
+    unidades: str,
+    quantidades: str,
+    locais: str,
+    prazos: str,
+    regime: str,
+    normas: str,
+    sustentabilidade: str,
+    riscos: str,
+    justificativas: str,
+    incluir_opcao_hibrida: bool,
+    kpis_padrao: bool,
+    municipio: str = "Brasnorte-MT",
+) -> Documento:
+    """TR do formulário de campos livres (termo.py)."""
+    return Documento((
+        *_cabecalho(municipio),
+        _objeto_variante(objeto, municipio),
+        *modelo_do_municipio(municipio).escopo_e_base,
+        _VIGENCIA_CONTRATUAL,
+        *_FORMA_E_QUADRO,
+        *item_bloco("Objeto detalhado", objeto),
+        *item_bloco("Unidade(s) demandante(s)", unidades),
+        *item_bloco("Quantidades estimadas / unidade de fornecimento", quantidades),
+        *item_bloco("Local(is) de entrega / prestação", locais),
+        *item_bloco("Prazo(s) desejado(s)", prazos),
+        *item_bloco("Regime de execução/fornecimento pretendido", regime),
+        *item_bloco("Referências técnicas aplicáveis (ABNT, INMETRO, normas setoriais)", normas),
+        *item_bloco("Sustentabilidade e acessibilidade", sustentabilidade),
+        *item_bloco("Riscos/condicionantes relevantes", riscos),
+        *item_bloco("Justificativas internas disponíveis (ETP, estudos, pareceres)", justificativas),
+        *_secoes_2_a_6(incluir_opcao_hibrida, kpis_padrao, municipio),
+    ), municipio)
+
+def montar_tr_secretarias(
+    objeto: str,
+    secretarias: list[str],
+    vigencia_meses: int,
+    incluir_opcao_hibrida: bool,
+    kpis_padrao: bool,
+    municipio: str = "Brasnorte-MT",
+) -> Documento:
+    """TR do formulário com secretarias e vigência em meses, sem as cláusulas 1.1–1.4 (termo1.py e termo3.py)."""
+    return Documento((
+        *_cabecalho(municipio),
+        _objeto_variante(objeto, municipio),
+        *modelo_do_municipio(municipio).escopo_e_base,
+        Paragrafo((_ROTULO_VIGENCIA, Trecho(f" {vigencia_meses} mês(es), contados na forma definida no instrumento contratual."))),
+        *_FORMA_E_QUADRO,
+        *item_bloco("Objeto detalhado", objeto),
+        *item_bloco("Unidade(s) demandante(s)", formatar_secretarias(secretarias)),
+        *item_bloco("Prazo de vigência (meses)", str(vigencia_meses)),
+        *_secoes_2_a_6(incluir_opcao_hibrida, kpis_padrao, municipio),
+    ), municipio)
@@ -0,0 +1,132 @@
+"""
+Montagem incremental do TR: cada seção (gerador.SECOES_TR) é renderizada à
+parte e guardada pelo valor das entradas de que depende. Quando o servidor
+muda um campo (ex.: desmarca os KPIs padrão ou altera a vigência), só as
+seções afetadas são refeitas; as demais reaproveitam o Markdown e o XML do
+DOCX já prontos e o documento é remontado a partir dos fragmentos.
+
+    montador = MontadorIncremental()
+    montagem = montador.montar("Locação de veículos", secretarias, 12, True, True)
+    montagem.markdown, montagem.docx()
+    montagem = montador.montar("Locação de veículos", secretarias, 12, True, False)
+    montagem.renderizadas  # ("6.4",)
+
+Os fragmentos são imutáveis e o montador é seguro entre threads: uma única
+instância pode ser compartilhada por todas as sessões do app (e por todos os
+municípios, já que a chave de cada fragmento começa pelo do TR).
+"""
+import threading
+from datetime import date
+
+from .cache import CacheDocumentos
+from .gerador import SECOES_TR
+from .instrumentacao import instrumentada
+from .modelo import Documento
+from .municipios import municipio as _municipio
+from .render_markdown import render_markdown
+
+def _congelar(valor):
+    """Valor da entrada como parte da chave (listas viram tuplas)."""
+    return tuple(valor) if isinstance(valor, list) else valor
+
+class Fragmento:
+    """Blocos e Markdown de uma seção; o XML do DOCX só é gerado no primeiro docx()."""
+    __slots__ = ("secao", "blocos", "municipio", "markdown", "_docx", "_trava")
+
+    def __init__(self, secao: str, blocos: tuple, municipio: str):
+        self.secao = secao
+        self.blocos = blocos
+        self.municipio = municipio  # id: o XML usa os estilos do modelo base do município
+        self.markdown = render_markdown(Documento(blocos))
+        self._docx = None
+        self._trava = threading.Lock()
+
+    def docx(self) -> tuple:
+        if self._docx is None:
+            with self._trava:
+                if self._docx is None:
+                    from .render_docx import fragmento_docx
+
+                    self._docx = fragmento_docx(self.blocos, self.municipio)
+        return self._docx
+
+class MontagemTR:
+    """TR remontado a partir dos fragmentos; `renderizadas` lista as seções refeitas nesta montagem."""
+    __slots__ = ("fragmentos", "renderizadas", "municipio", "_documento", "_markdown")
+
+    def __init__(self, fragmentos: tuple, renderizadas: tuple, municipio: str):
+        self.fragmentos = fragmentos
+        self.renderizadas = renderizadas
+        self.municipio = municipio
+        self._documento = None
+        self._markdown = None
+
+    @property
+    def documento(self) -> Documento:
+        if self._documento is None:
+            self._documento = Documento(tuple(b for f in self.fragmentos for b in f.blocos), self.municipio)
+        return self._documento
+
+    @property
+    def markdown(self) -> str:
+        # mesmo texto de render_markdown(documento): seção sem blocos não gera linha
+        if self._markdown is None:
+            self._markdown = "\n".join(f.markdown for f in self.fragmentos if f.blocos)
+        return self._markdown
+
+    def docx(self) -> bytes:
+        from .render_docx import bytes_docx, montar_docx_fragmentos
+
+        return bytes_docx(montar_docx_fragmentos((f.docx() for f in self.fragmentos), self.municipio))
+
+class MontadorIncremental:
+    """Guarda até `maximo` fragmentos (LRU), pelo município, pela seção e pelos valores das suas dependências."""
+
+    def __init__(self, secoes=SECOES_TR, maximo: int = 512):
+        self.secoes = secoes
+        self.fragmentos = CacheDocumentos(maximo)
+
+    @instrumentada("montagem_incremental")
+    def montar(
+        self,
+        objeto: str,
+        secretarias: list[str],
+        vigencia_meses: int,
+        incluir_opcao_hibrida: bool,
+        kpis_padrao: bool,
+        municipio: str = "Brasnorte-MT",
+        justificativa: str | None = None,
+        solucao: str | None = None,
+        requisitos: str | None = None,
+        kpis: str | None = None,
+        data: str | None = None,
+        medicao=None,
+        itens=None,
+    ) -> MontagemTR:
+        """Mesmos argumentos de montar_tr (e a data do cabeçalho, que por padrão é hoje)."""
+        entradas = dict(
+            objeto=objeto,
+            secretarias=secretarias,
+            vigencia_meses=vigencia_meses,
+            incluir_opcao_hibrida=incluir_opcao_hibrida,
+            kpis_padrao=kpis_padrao,
+            municipio=municipio,
+            data=data or date.today().strftime("%d/%m/%Y"),
+            justificativa=justificativa,
+            solucao=solucao,
+            requisitos=requisitos,
+            kpis=kpis,
+            medicao=medicao,  # comparada pela identidade: uma nova apuração refaz a 6.1 e a 6.4
+            itens=itens,      # comparada pelo conteúdo (TabelaItens.chave)
+        )
+        id_municipio = _municipio(municipio).id
+        fragmentos, renderizadas = [], []
+        for secao in self.secoes:
+            chave = (id_municipio, secao.nome, *(_congelar(entradas[n]) for n in secao.dependencias))
+            fragmento = self.fragmentos.obter(chave)
+            if fragmento is None:
+                fragmento = Fragmento(secao.nome, secao.blocos(entradas), id_municipio)
+                self.fragmentos.guardar(chave, fragmento)
+                renderizadas.append(secao.nome)
+            fragmentos.append(fragmento)
+        return MontagemTR(tuple(fragmentos), tuple(renderizadas), municipio)
@@ -0,0 +1,297 @@
+"""
+Instrumentação das etapas da geração do TR (montagem, Markdown, DOCX, PDF,
+chamada ao LLM, pré-visualização no Streamlit): duração e tamanho da saída
+de cada etapa, para saber onde vai o tempo quando o app fica lento.
+
+    with etapa("preview", objeto=objeto) as e:
+        st.markdown(resultado)
+        e.tamanho = len(resultado)
+
+    @instrumentada("to_pdf", tamanho=len)
+    def to_pdf(documento): ...
+
+Cada etapa medida vira:
+    - uma linha de log em JSON (etapa, segundos, tamanho, etapa "pai", erro e
+      os atributos passados a `etapa`), se houver destino configurado;
+    - observações no histograma tr_etapa_segundos e no contador
+      tr_etapa_bytes_total (texto do Prometheus em `texto()`, servido pelo
+      /metrics do serviço HTTP ou por `servir_metricas` nos apps);
+    - uma entrada em `recentes()`, usada pelo painel de diagnóstico.
+
+Desligada (o padrão), `etapa` devolve um objeto nulo compartilhado e a função
+decorada é chamada direto: o custo é o de testar uma variável global.
+
+A medição pode ser ligada no processo inteiro (`ativar`) ou só no contexto
+atual (`medir_no_contexto`): no Streamlit, a execução do script de uma sessão,
+sem medir as das outras.
+
+Configuração por variável de ambiente:
+    TR_INSTRUMENTACAO        "1" liga a medição no processo (ou ativar())
+    TR_INSTRUMENTACAO_LOG    arquivo dos logs JSON, uma linha por etapa ("-" = stderr); também liga a medição
+    TR_INSTRUMENTACAO_PORTA  porta do /metrics dos apps Streamlit (servir_metricas)
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+# Etapas guardadas para o painel de diagnóstico
+MAXIMO_RECENTES = 500
+
+_ativa = False
+_no_contexto = False  # alguma vez medir_no_contexto(True): só então vale consultar _medir
+_estado = None
+_trava = threading.Lock()
+_atual = ContextVar("tr_etapa_atual", default=None)      # nome da etapa em andamento (a "pai" das internas)
+_coletor = ContextVar("tr_etapas_coletadas", default=None)
+_medir = ContextVar("tr_medir_no_contexto", default=False)
+
+class _Estado:
+    def __init__(self, log):
+        from .metricas import Registro
+
+        self.registro = Registro()
+        self.segundos = self.registro.histograma(
+            "tr_etapa_segundos", "Duração de cada etapa da geração do TR.", ("etapa",),
+        )
+        self.bytes = self.registro.contador(
+            "tr_etapa_bytes_total", "Tamanho das saídas de cada etapa (bytes; caracteres no Markdown).", ("etapa",),
+        )
+        self.erros = self.registro.contador(
+            "tr_etapa_erros_total", "Etapas interrompidas por exceção.", ("etapa",),
+        )
+        self.recentes = deque(maxlen=MAXIMO_RECENTES)
+        self.log = log
+
+class _EtapaNula:
+    """O que `etapa` devolve com a instrumentação desligada: aceita e ignora tudo."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+_NULA = _EtapaNula()
+
+class Etapa:
+    __slots__ = ("nome", "atributos", "tamanho", "segundos", "_inicio", "_pai", "_ficha")
+
+    def __init__(self, nome: str, atributos: dict):
+        self.nome = nome
+        self.atributos = atributos
+        self.tamanho = None
+        self.segundos = None
+
+    def __enter__(self):
+        self._pai = _atual.get()
+        self._ficha = _atual.set(self.nome)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        self.segundos = time.perf_counter() - self._inicio
+        _atual.reset(self._ficha)
+        registro = {
+            "etapa": self.nome,
+            "quando": datetime.now().isoformat(timespec="milliseconds"),
+            "segundos": round(self.segundos, 6),
+            "tamanho": self.tamanho,
+            "pai": self._pai,
+            "erro": tipo.__name__ if tipo is not None else None,
+            **self.atributos,
+        }
+        estado = _estado
+        if estado is not None:
+            _registrar(estado, registro)
+            if estado.log is not None:
+                estado.log.info(_json(registro))
+        coletadas = _coletor.get()
+        if coletadas is not None:
+            coletadas.append(registro)
+        return False
+
+def _registrar(estado: _Estado, registro: dict) -> None:
+    nome = registro["etapa"]
+    estado.segundos.observar(registro["segundos"], etapa=nome)
+    if registro["tamanho"] is not None:
+        estado.bytes.incrementar(registro["tamanho"], etapa=nome)
+    if registro["erro"] is not None:
+        estado.erros.incrementar(etapa=nome)
+    estado.recentes.append(registro)
+
+def etapa(nome: str, **atributos):
+    """Mede o bloco `with`; `.tamanho` pode ser definido dentro dele."""
+    if not _ativa and not (_no_contexto and _medir.get()):
+        return _NULA
+    return Etapa(nome, atributos)
+
+def instrumentada(nome: str | None = None, tamanho=None):
+    """
+    Decorador: mede cada chamada da função como a etapa `nome` (padrão: o
+    nome da função); `tamanho(resultado)`, se dado, é o tamanho da saída.
+    """
+    def decorar(funcao):
+        rotulo = nome or funcao.__name__
+
+        @wraps(funcao)
+        def medida(*args, **kwargs):
+            if not _ativa and not (_no_contexto and _medir.get()):
+                return funcao(*args, **kwargs)
+            with Etapa(rotulo, {}) as medicao:
+                resultado = funcao(*args, **kwargs)
+                if tamanho is not None:
+                    medicao.tamanho = tamanho(resultado)
+            return resultado
+
+        return medida
+
+    return decorar
+
+# ----------------------------------
+# Liga/desliga e saídas
+# ----------------------------------
+def _json(registro: dict) -> str:
+    import json
+
+    return json.dumps(registro, ensure_ascii=False, default=str)
+
+def _abrir_log(destino):
+    import logging
+    import sys
+
+    log = logging.getLogger("tr_core.instrumentacao")
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    for tratador in list(log.handlers):
+        log.removeHandler(tratador)
+        tratador.close()
+    if destino == "-":
+        tratador = logging.StreamHandler(sys.stderr)
+    elif isinstance(destino, (str, os.PathLike)):
+        tratador = logging.FileHandler(destino, encoding="utf-8")
+    else:
+        tratador = logging.StreamHandler(destino)
+    tratador.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(tratador)
+    return log
+
+def ativar(log=None) -> None:
+    """
+    Liga a medição no processo. `log` é o destino das linhas JSON: caminho,
+    "-" (stderr) ou um stream aberto; sem ele, só métricas e `recentes()`.
+    """
+    global _ativa, _estado
+    with _trava:
+        if _estado is None:
+            _estado = _Estado(None)
+        if log is not None:
+            _estado.log = _abrir_log(log)
+        _ativa = True
+
+def desativar() -> None:
+    """Desliga a medição; o que já foi medido continua em `texto()` e `recentes()`."""
+    global _ativa
+    _ativa = False
+
+def ativa() -> bool:
+    return _ativa
+
+def medir_no_contexto(ligada: bool) -> None:
+    """
+    Liga ou desliga a medição só no contexto atual (a thread ou tarefa asyncio
+    e as tarefas criadas a partir dela), sem mexer no resto do processo. O
+    app Streamlit chama no início de cada execução do script, com a escolha
+    da sessão. Com ativar(), tudo é medido de qualquer forma.
+    """
+    global _estado, _no_contexto
+    if ligada:
+        with _trava:
+            if _estado is None:
+                _estado = _Estado(None)
+            _no_contexto = True
+    _medir.set(ligada)
+
+def recentes() -> list[dict]:
+    """Últimas etapas medidas, da mais antiga para a mais recente."""
+    return list(_estado.recentes) if _estado is not None else []
+
+def resumo() -> list[dict]:
+    """Por etapa, nas medidas recentes: chamadas, tempo médio, p50, p95, máximo e tamanho médio."""
+    por_etapa = {}
+    for registro in recentes():
+        por_etapa.setdefault(registro["etapa"], []).append(registro)
+    linhas = []
+    for nome, registros in por_etapa.items():
+        tempos = sorted(r["segundos"] for r in registros)
+        tamanhos = [r["tamanho"] for r in registros if r["tamanho"] is not None]
+        linhas.append({
+            "etapa": nome,
+            "chamadas": len(tempos),
+            "media_ms": sum(tempos) / len(tempos) * 1e3,
+            "p50_ms": tempos[len(tempos) // 2] * 1e3,
+            "p95_ms": tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))] * 1e3,
+            "max_ms": tempos[-1] * 1e3,
+            "tamanho_medio": sum(tamanhos) // len(tamanhos) if tamanhos else None,
+        })
+    return sorted(linhas, key=lambda l: -l["media_ms"] * l["chamadas"])
+
+def texto() -> str:
+    """Métricas das etapas no formato texto do Prometheus ("" se nunca ativada)."""
+    return _estado.registro.texto() if _estado is not None else ""
+
+# ----------------------------------
+# Pools de processos
+# ----------------------------------
+class coletar:
+    """Junta numa lista as etapas medidas dentro do bloco `with` (ex.: num trabalhador do pool)."""
+
+    def __enter__(self) -> list:
+        self._ficha = _coletor.set(coletadas := [])
+        return coletadas
+
+    def __exit__(self, *excecao):
+        _coletor.reset(self._ficha)
+        return False
+
+def importar(registros: list[dict]) -> None:
+    """Incorpora as etapas medidas em outro processo às métricas e às recentes deste (sem novo log)."""
+    if _estado is not None:
+        for registro in registros:
+            _registrar(_estado, registro)
+
+# ----------------------------------
+# /metrics para os apps Streamlit
+# ----------------------------------
+def servir_metricas(porta: int, host: str = "127.0.0.1"):
+    """Servidor HTTP mínimo, numa thread, com GET /metrics; devolve o servidor (shutdown() encerra)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Tratador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            corpo = texto().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, porta), Tratador)
+    threading.Thread(target=servidor.serve_forever, name="tr-metricas", daemon=True).start()
+    return servidor
+
+if os.environ.get("TR_INSTRUMENTACAO", "").lower() in ("1", "sim", "true") or os.environ.get("TR_INSTRUMENTACAO_LOG"):
+    ativar(os.environ.get("TR_INSTRUMENTACAO_LOG") or None)
@@ -0,0 +1,496 @@
+"""
+Tabela de itens do TR (cláusula 1.4: "custos unitários apostos na tabela
+acima"), importada de planilhas CSV/XLSX de pesquisa de preços ou de Ata de
+Registro de Preços, que chegam a milhares de itens.
+
+A planilha é lida linha a linha (csv.reader / openpyxl em modo read_only) e
+cada item vai direto para colunas compactas (array/bytearray), sem um objeto
+Python por linha; assim a memória é a dos próprios dados, qualquer que seja o
+tamanho da planilha. O custo de cada item é arredondado ao centavo (meio
+centavo para cima) e o total estimado é a soma desses centavos (inteiros),
+sem erro de arredondamento na soma.
+
+    itens = ler_tabela("ata_2026.xlsx")
+    itens.total_centavos, itens.valor_estimado()   # "R$ 12.345,60 (doze mil, ...)"
+    montar_tr(..., itens=itens)                     # tabela após a 1.1 e valor na 1.4
+
+A planilha precisa de um cabeçalho (as linhas de título antes dele são
+ignoradas) com as colunas de descrição, quantidade e valor unitário; item e
+unidade são opcionais. Os nomes usuais são reconhecidos ("Descrição do item",
+"Qtde", "Unid.", "Valor unit. (R$)", "Preço médio"...). Linhas sem quantidade
+nem valor (subtotais, títulos de lote) são ignoradas.
+
+Linha de comando:
+    python -m tr_core.itens ata_2026.xlsx             # quantidade de itens e total estimado
+    python -m tr_core.itens ata_2026.csv -o itens.md  # tabela em Markdown
+"""
+import argparse
+import csv
+import io
+import math
+import re
+import sys
+import unicodedata
+from array import array
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+
+from .instrumentacao import instrumentada
+from .modelo import Tabela
+
+CABECALHO = ("Item", "Descrição", "Unidade", "Qtde", "Valor unitário (R$)", "Valor total (R$)")
+_ALINHAMENTOS = ("l", "l", "l", "r", "r", "r")
+
+# Linhas procuradas pelo cabeçalho antes de desistir (títulos, órgão, nº da ata...)
+_LINHAS_ANTES_DO_CABECALHO = 30
+
+# ----------------------------------
+# Formatação
+# ----------------------------------
+def _milhares(inteiro: int) -> str:
+    return f"{inteiro:,}".replace(",", ".")
+
+def formatar_moeda(centavos: int) -> str:
+    """12345678 -> "123.456,78"."""
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{_milhares(reais)},{resto:02d}"
+
+def formatar_numero(valor: float, minimo: int = 0, maximo: int = 4) -> str:
+    """Número no formato brasileiro, com `minimo` a `maximo` casas decimais (1.234,5)."""
+    texto = f"{valor:,.{maximo}f}"
+    inteiro, _, decimais = texto.partition(".")
+    decimais = decimais.rstrip("0").ljust(minimo, "0")
+    inteiro = inteiro.replace(",", ".")
+    return f"{inteiro},{decimais}" if decimais else inteiro
+
+_UNIDADES = (
+    "", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove", "dez", "onze", "doze",
+    "treze", "quatorze", "quinze", "dezesseis", "dezessete", "dezoito", "dezenove",
+)
+_DEZENAS = ("", "", "vinte", "trinta", "quarenta", "cinquenta", "sessenta", "setenta", "oitenta", "noventa")
+_CENTENAS = (
+    "", "cento", "duzentos", "trezentos", "quatrocentos", "quinhentos",
+    "seiscentos", "setecentos", "oitocentos", "novecentos",
+)
+_ESCALAS = (("", ""), ("mil", "mil"), ("milhão", "milhões"), ("bilhão", "bilhões"), ("trilhão", "trilhões"))
+
+def _ate_mil(n: int) -> str:
+    if n == 100:
+        return "cem"
+    centena, resto = divmod(n, 100)
+    partes = [_CENTENAS[centena]] if centena else []
+    if resto < 20:
+        if resto:
+            partes.append(_UNIDADES[resto])
+    else:
+        dezena, unidade = divmod(resto, 10)
+        partes.append(_DEZENAS[dezena])
+        if unidade:
+            partes.append(_UNIDADES[unidade])
+    return " e ".join(partes)
+
+def _inteiro_por_extenso(n: int) -> str:
+    grupos = []
+    while n:
+        n, grupo = divmod(n, 1000)
+        grupos.append(grupo)
+    partes = []
+    for escala, grupo in reversed(list(enumerate(grupos))):
+        if not grupo:
+            continue
+        if escala == 1 and grupo == 1:
+            partes.append((grupo, "mil"))  # "mil", não "um mil"
+            continue
+        nome = _ESCALAS[escala][grupo > 1]
+        partes.append((grupo, f"{_ate_mil(grupo)} {nome}".strip()))
+    texto = partes[0][1]
+    for i, (grupo, parte) in enumerate(partes[1:], 1):
+        # "mil e quinhentos", "mil e vinte", mas "mil, trezentos e quarenta"
+        ultimo = i == len(partes) - 1
+        texto += " e " if ultimo and (grupo < 100 or grupo % 100 == 0) else ", "
+        texto += parte
+    return texto
+
+def por_extenso(centavos: int) -> str:
+    """Valor em reais por extenso: 1234560 -> "doze mil, trezentos e quarenta e cinco reais e sessenta centavos"."""
+    reais, resto = divmod(abs(centavos), 100)
+    partes = []
+    if reais:
+        moeda = "real" if reais == 1 else "reais"
+        if reais >= 1_000_000 and reais % 1_000_000 == 0:
+            moeda = "de reais"  # "dois milhões de reais"
+        partes.append(f"{_inteiro_por_extenso(reais)} {moeda}")
+    if resto:
+        partes.append(f"{_inteiro_por_extenso(resto)} {'centavo' if resto == 1 else 'centavos'}")
+    return " e ".join(partes) if partes else "zero real"
+
+# ----------------------------------
+# Tabela em colunas compactas
+# ----------------------------------
+class _Textos:
+    """Coluna de texto: UTF-8 contíguo e o deslocamento do fim de cada valor (sem um str por linha)."""
+    __slots__ = ("_dados", "_fins")
+
+    def __init__(self):
+        self._dados = bytearray()
+        self._fins = array("Q")
+
+    def append(self, texto: str) -> None:
+        self._dados += texto.encode("utf-8")
+        self._fins.append(len(self._dados))
+
+    def __len__(self):
+        return len(self._fins)
+
+    def __getitem__(self, i: int) -> str:
+        inicio = self._fins[i - 1] if i else 0
+        return self._dados[inicio:self._fins[i]].decode("utf-8")
+
+    def __iter__(self):
+        dados, inicio = memoryview(self._dados), 0
+        for fim in self._fins:
+            yield str(dados[inicio:fim], "utf-8")
+            inicio = fim
+
+    def nbytes(self) -> int:
+        return len(self._dados) + self._fins.itemsize * len(self._fins)
+
+class TabelaItens:
+    """
+    Itens com quantidade, valor unitário e valor total (centavos), em colunas.
+    Imutável depois de lida; duas tabelas com o mesmo conteúdo são iguais (ver
+    `chave`), o que permite usá-la como entrada de montar_tr e da montagem
+    incremental.
+    """
+    __slots__ = (
+        "_codigos", "_descricoes", "_unidades", "_nomes_unidade", "_indice_unidade",
+        "quantidades", "valores_unitarios", "totais", "total_centavos", "_chave",
+    )
+
+    def __init__(self):
+        self._codigos = _Textos()
+        self._descricoes = _Textos()
+        self._unidades = array("H")     # índice em _nomes_unidade (poucas unidades distintas)
+        self._nomes_unidade = []
+        self._indice_unidade = {}
+        self.quantidades = array("d")
+        self.valores_unitarios = array("d")
+        self.totais = array("q")         # centavos
+        self.total_centavos = 0
+        self._chave = None
+
+    def acrescentar(self, codigo: str, descricao: str, unidade: str, quantidade: float, valor_unitario: float) -> None:
+        if not (math.isfinite(quantidade) and math.isfinite(valor_unitario)):
+            raise ValueError(f"item {codigo}: quantidade e valor unitário devem ser números finitos")
+        indice = self._indice_unidade.get(unidade)
+        if indice is None:
+            indice = self._indice_unidade[unidade] = len(self._nomes_unidade)
+            self._nomes_unidade.append(unidade)
+        # em decimal, a partir do valor digitado: 0,285 x 1 dá 0,29, não 0,28 (0.285 em binário é 0.28499...)
+        total = int((Decimal(str(quantidade)) * Decimal(str(valor_unitario)) * 100).quantize(_UM, ROUND_HALF_UP))
+        self._codigos.append(codigo)
+        self._descricoes.append(descricao)
+        self._unidades.append(indice)
+        self.quantidades.append(quantidade)
+        self.valores_unitarios.append(valor_unitario)
+        self.totais.append(total)
+        self.total_centavos += total
+        self._chave = None
+
+    def __len__(self):
+        return len(self.totais)
+
+    def linha(self, i: int) -> tuple:
+        """(item, descrição, unidade, quantidade, valor unitário, total em centavos) do i-ésimo item."""
+        return (
+            self._codigos[i], self._descricoes[i], self._nomes_unidade[self._unidades[i]],
+            self.quantidades[i], self.valores_unitarios[i], self.totais[i],
+        )
+
+    def __iter__(self):
+        nomes = self._nomes_unidade
+        return zip(
+            self._codigos, self._descricoes, (nomes[u] for u in self._unidades),
+            self.quantidades, self.valores_unitarios, self.totais,
+        )
+
+    def nbytes(self) -> int:
+        """Memória ocupada pelos dados (colunas), sem a do objeto."""
+        return (
+            self._codigos.nbytes() + self._descricoes.nbytes()
+            + sum(len(c) * c.itemsize for c in (self._unidades, self.quantidades, self.valores_unitarios, self.totais))
+        )
+
+    @property
+    def chave(self) -> str:
+        """Hash do conteúdo (entra na chave do cache de documentos)."""
+        if self._chave is None:
+            import hashlib
+
+            h = hashlib.sha256()
+            for coluna in (self._codigos._dados, self._codigos._fins, self._descricoes._dados,
+                           self._descricoes._fins, self.quantidades, self.valores_unitarios, self.totais):
+                h.update(len(coluna).to_bytes(8, "little"))
+                h.update(coluna)
+            h.update("\x00".join(self._nomes_unidade[u] for u in sorted(set(self._unidades))).encode("utf-8"))
+            h.update(self._unidades)
+            self._chave = h.hexdigest()
+        return self._chave
+
+    def __eq__(self, outra):
+        return isinstance(outra, TabelaItens) and outra.chave == self.chave
+
+    def __hash__(self):
+        return hash(self.chave)
+
+    def valor_estimado(self) -> str:
+        """Texto da cláusula 1.4: "R$ 12.345,60 (doze mil, ... e sessenta centavos)"."""
+        return f"R$ {formatar_moeda(self.total_centavos)} ({por_extenso(self.total_centavos)})"
+
+    def tabela(self, nivel: int = 0) -> Tabela:
+        """Tabela do TR; as linhas são formatadas durante a renderização, não guardadas."""
+        return Tabela(CABECALHO, _LinhasFormatadas(self), _ALINHAMENTOS, nivel)
+
+    # Forma serializável, para guardar junto das entradas do TR (tr_core.repositorio)
+    def para_json(self) -> dict:
+        codigos, descricoes, unidades, quantidades, valores, _ = zip(*self) if len(self) else ((),) * 6
+        return {
+            "item": list(codigos),
+            "descricao": list(descricoes),
+            "unidade": list(unidades),
+            "quantidade": list(quantidades),
+            "valor_unitario": list(valores),
+        }
+
+    @classmethod
+    def de_json(cls, dados: dict) -> "TabelaItens":
+        itens = cls()
+        for linha in zip(dados["item"], dados["descricao"], dados["unidade"], dados["quantidade"], dados["valor_unitario"]):
+            itens.acrescentar(*linha)
+        return itens
+
+_UM = Decimal(1)
+
+class _LinhasFormatadas:
+    """Linhas da Tabela (texto já formatado) geradas sob demanda a partir das colunas, mais a linha do total."""
+    __slots__ = ("itens",)
+
+    def __init__(self, itens: TabelaItens):
+        self.itens = itens
+
+    def __len__(self):
+        return len(self.itens) + 1
+
+    def __iter__(self):
+        for codigo, descricao, unidade, quantidade, valor, total in self.itens:
+            yield (
+                codigo, descricao, unidade, formatar_numero(quantidade),
+                formatar_numero(valor, minimo=2), formatar_moeda(total),
+            )
+        yield ("", "Total estimado", "", "", "", formatar_moeda(self.itens.total_centavos))
+
+# ----------------------------------
+# Leitura
+# ----------------------------------
+def _nome_coluna(nome) -> str:
+    sem_acento = unicodedata.normalize("NFKD", str(nome or "").strip().lower()).encode("ascii", "ignore").decode("ascii")
+    return "_".join("".join(c if c.isalnum() else " " for c in sem_acento).split())
+
+# Prefixos do nome normalizado de cada coluna, em ordem de prioridade
+_PREFIXOS = (
+    ("valor_unitario", ("valor_unit", "vlr_unit", "vl_unit", "preco_unit", "v_unit", "preco_medio", "valor_medio",
+                        "preco_estimado", "valor_estimado_unit", "custo_unit", "preco_referencia", "unitario")),
+    ("quantidade", ("quantidade", "qtde", "qtd", "quant", "qt")),
+    ("unidade", ("unidade", "unid", "und", "un", "u_m", "um")),
+    ("descricao", ("descricao", "especificacao", "discriminacao", "produto", "servico", "objeto", "material")),
+    ("item", ("item", "codigo", "cod", "n", "no", "numero", "seq")),
+)
+
+def _campo(nome_normalizado: str) -> str | None:
+    for campo, prefixos in _PREFIXOS:
+        for prefixo in prefixos:
+            if nome_normalizado == prefixo or nome_normalizado.startswith(prefixo + "_") or (
+                len(prefixo) > 3 and nome_normalizado.startswith(prefixo)
+            ):
+                return campo
+    return None
+
+def _mapa_cabecalho(linha) -> dict | None:
+    """campo -> índice da coluna, se a linha for o cabeçalho (descrição, quantidade e valor unitário)."""
+    mapa = {}
+    for j, nome in enumerate(linha):
+        campo = _campo(_nome_coluna(nome))
+        if campo is not None and campo not in mapa:
+            mapa[campo] = j
+    return mapa if {"descricao", "quantidade", "valor_unitario"} <= mapa.keys() else None
+
+def interpretar_numero(valor, brasileiro: bool | None) -> float | None:
+    """
+    Célula -> float (vazio -> None). O formato é decidido em cada célula: com
+    ponto e vírgula, o último é o decimal ("1.234,56", "1,234.56"); com um só,
+    é o decimal ("12,5", "12.50"), a menos que agrupe de 3 em 3 ("1.500") e
+    seja o separador de milhar do formato da planilha (`brasileiro`: CSV com
+    ";", ou None para o texto numa célula do XLSX; False: CSV com ",").
+    Célula que não segue nenhum dos dois formatos ("1.234.56") ou que não é
+    um número finito ("inf", "NaN", "1e400") é ValueError.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        return _finito(float(valor), valor)
+    texto = str(valor).replace("R$", "").replace("\xa0", "").replace(" ", "").strip()
+    if not texto:
+        return None
+    virgula, ponto = "," in texto, "." in texto
+    if virgula and ponto:
+        milhar = "." if texto.rfind(",") > texto.rfind(".") else ","
+    elif virgula or ponto:
+        sinal = "," if virgula else "."
+        milhar_da_planilha = "," if brasileiro is False else "."
+        if sinal == milhar_da_planilha and _MILHARES[sinal].fullmatch(texto):
+            milhar = sinal
+        else:
+            milhar = "." if sinal == "," else ","
+    else:
+        return _finito(float(texto), valor)
+    decimal = "," if milhar == "." else "."
+    inteiro, _, fracao = texto.partition(decimal)
+    if milhar in fracao or decimal in fracao or (milhar in inteiro and not _MILHARES[milhar].fullmatch(inteiro)):
+        raise ValueError(f"número em formato inválido: {valor!r}")
+    return _finito(float(f"{inteiro.replace(milhar, '')}.{fracao}"), valor)
+
+def _finito(numero: float, valor) -> float:
+    if not math.isfinite(numero):
+        raise ValueError(f"número não finito: {valor!r}")
+    return numero
+
+_MILHARES = {
+    ".": re.compile(r"[-+]?\d{1,3}(\.\d{3})+"),
+    ",": re.compile(r"[-+]?\d{1,3}(,\d{3})+"),
+}
+
+def _texto(valor) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))  # código de item lido como número na planilha
+    return " ".join(str(valor).split())
+
+def _preencher(itens: TabelaItens, linhas, origem: str, brasileiro: bool | None) -> TabelaItens:
+    linhas = iter(linhas)
+    mapa = None
+    numero_linha = 0
+    for numero_linha, cabecalho in enumerate(linhas, 1):
+        mapa = _mapa_cabecalho(cabecalho)
+        if mapa is not None or numero_linha >= _LINHAS_ANTES_DO_CABECALHO:
+            break
+    if mapa is None:
+        raise ValueError(f"{origem}: cabeçalho não encontrado (colunas de descrição, quantidade e valor unitário)")
+
+    j_item, j_descricao, j_unidade = mapa.get("item"), mapa["descricao"], mapa.get("unidade")
+    j_quantidade, j_valor = mapa["quantidade"], mapa["valor_unitario"]
+    largura = max(mapa.values()) + 1
+    for numero_linha, linha in enumerate(linhas, numero_linha + 1):
+        if len(linha) < largura:
+            linha = (*linha, *((None,) * (largura - len(linha))))
+        j = j_quantidade
+        try:
+            quantidade = interpretar_numero(linha[j], brasileiro)
+            j = j_valor
+            valor = interpretar_numero(linha[j], brasileiro)
+        except ValueError as erro:
+            coluna = _texto(cabecalho[j])
+            raise ValueError(f"{origem}, linha {numero_linha}, coluna \"{coluna}\": valor numérico inválido ({erro})") from None
+        if quantidade is None and valor is None:
+            continue  # linha vazia, subtotal ou título de lote
+        if quantidade is None or valor is None:
+            raise ValueError(f"{origem}, linha {numero_linha}: falta {'a quantidade' if quantidade is None else 'o valor unitário'}")
+        descricao = _texto(linha[j_descricao])
+        if not descricao:
+            raise ValueError(f"{origem}, linha {numero_linha}: item sem descrição")
+        codigo = _texto(linha[j_item]) if j_item is not None else ""
+        unidade = _texto(linha[j_unidade]) if j_unidade is not None else ""
+        itens.acrescentar(codigo or str(len(itens) + 1), descricao, unidade, quantidade, valor)
+    return itens
+
+def linhas_csv(arquivo):
+    """
+    Linhas de um CSV (arquivo binário), uma a uma. Devolve também o formato
+    provável dos números, para as células ambíguas como "1.500" (ver interpretar_numero):
+    brasileiro com separador ";" ou tabulação, americano com ",".
+    """
+    binario = arquivo if hasattr(arquivo, "peek") else io.BufferedReader(arquivo, 65536)
+    inicio = binario.peek(65536)
+    # planilhas exportadas no Windows costumam vir em cp1252; o início do arquivo decide
+    try:
+        inicio.decode("utf-8")
+        codificacao = "utf-8-sig"
+    except UnicodeDecodeError as erro:
+        codificacao = "utf-8-sig" if erro.start > len(inicio) - 4 else "cp1252"  # caractere cortado no fim
+    # o separador mais frequente no início (o csv.Sniffer se confunde com as linhas de título)
+    amostra = inicio[:8192].decode(codificacao, errors="ignore")
+    separador = max(";\t,", key=amostra.count)
+    texto = io.TextIOWrapper(binario, encoding=codificacao, newline="")
+    return csv.reader(texto, delimiter=separador), separador != ","
+
+def linhas_xlsx(arquivo):
+    """Linhas da primeira planilha de um XLSX, lidas em modo read_only (sem carregar a pasta inteira)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Leitura de XLSX requer o pacote openpyxl (pip install openpyxl); ou exporte em CSV") from None
+
+    pasta = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        yield from pasta.worksheets[0].iter_rows(values_only=True)
+    finally:
+        pasta.close()
+
+@instrumentada("ler_tabela_itens")
+def ler_tabela(origem, nome: str | None = None) -> TabelaItens:
+    """
+    Lê a tabela de itens de um CSV ou XLSX: caminho ou arquivo binário aberto
+    (ex.: o upload do Streamlit, com `nome` para saber o formato).
+    """
+    nome = nome or getattr(origem, "name", None) or str(origem)
+    xlsx = Path(nome).suffix.lower() in (".xlsx", ".xlsm")
+    fechar = None
+    if isinstance(origem, (str, Path)):
+        origem = fechar = open(origem, "rb")
+    try:
+        if xlsx:
+            # os números do XLSX já vêm como números; só o texto numa célula precisa ser interpretado
+            return _preencher(TabelaItens(), linhas_xlsx(origem), Path(nome).name, brasileiro=None)
+        linhas, brasileiro = linhas_csv(origem)
+        return _preencher(TabelaItens(), linhas, Path(nome).name, brasileiro)
+    except UnicodeDecodeError:
+        raise ValueError(f"{Path(nome).name}: codificação não reconhecida; salve o CSV em UTF-8") from None
+    finally:
+        if fechar is not None:
+            fechar.close()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tr_core.itens",
+        description="Lê a tabela de itens (CSV/XLSX) e mostra o custo estimado total da contratação.",
+    )
+    parser.add_argument("planilha", help="CSV ou XLSX com descrição, quantidade e valor unitário")
+    parser.add_argument("-o", "--saida", default=None, help="grava a tabela em Markdown")
+    args = parser.parse_args(argv)
+
+    try:
+        itens = ler_tabela(args.planilha)
+    except (OSError, ValueError) as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+    print(f"{len(itens)} item(ns); custo estimado total: {itens.valor_estimado()}")
+    if args.saida:
+        from .modelo import Documento
+        from .render_markdown import render_markdown
+
+        Path(args.saida).write_text(render_markdown(Documento((itens.tabela(),))), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Redação assistida da seção 2 ("Justificativa e da Necessidade da Contratação").
+Usa o ServicoLLM compartilhado (streaming, cache em disco e coalescência).
+"""
+from functools import lru_cache
+
+from .instrumentacao import instrumentada
+from .llm import ServicoLLM, TextoSemelhante
+from .municipios import PADRAO
+from .municipios import municipio as _municipio
+
+TAREFA = "justificativa"
+# Incrementar sempre que PROMPT ou SISTEMA mudarem: invalida o cache em disco.
+VERSAO_PROMPT = "1"
+
+SISTEMA = "Você é um redator técnico especialista em licitações públicas."
+
+PROMPT = """
+Você é um especialista em licitações públicas, com mais de 10 anos de experiência, atuando como responsável técnico pela elaboração e instrução de processos de contratação na {prefeitura}. Considerando a Lei nº 14.133/2021 e demais normativos aplicáveis, elabore a seção "Justificativa e da Necessidade da Contratação" para compor o Termo de Referência, cujo objeto é: "{objeto}".
+
+O texto deve:
+- Apresentar a descrição clara da demanda pública, alinhada às atividades administrativas e operacionais do município e suas secretarias.
+- Explicar por que a contratação é necessária, com base em evidências práticas e na ausência de estrutura própria da Administração (quando aplicável).
+- Demonstrar que o objeto é essencial à continuidade dos serviços públicos ou à implementação de políticas públicas locais.
+- Fundamentar-se nas especificações e quantidades descritas no Termo de Referência.
+- Assegurar que a demanda está alinhada ao Plano Anual de Contratações (PAC), e que há previsão orçamentária compatível.
+- Apontar a impossibilidade de execução direta pela Administração, se for o caso.
+- Incluir os fundamentos legais pertinentes, especialmente o artigo 6º, inciso XXIII, alínea ‘b’, da Lei nº 14.133/2021.
+- Ser redigida em linguagem técnica, objetiva e juridicamente fundamentada, voltada à instrução de um processo administrativo de contratação pública.
+"""
+
+def tarefa_municipio(tarefa: str, municipio: str | None) -> str:
+    """
+    Tarefa no cache do LLM para o município: a de Brasnorte segue sem sufixo
+    (o cache já gravado continua valendo); as demais prefeituras ganham "@id",
+    pois o prompt cita a prefeitura.
+    """
+    id_municipio = _municipio(municipio).id
+    return tarefa if id_municipio == PADRAO else f"{tarefa}@{id_municipio}"
+
+def mensagens(objeto: str, municipio: str | None = None) -> list[dict]:
+    return [
+        {"role": "system", "content": SISTEMA},
+        {"role": "user", "content": PROMPT.format(objeto=objeto, prefeitura=_municipio(municipio).prefeitura)},
+    ]
+
+@lru_cache(maxsize=None)
+def servico_padrao() -> ServicoLLM:
+    """Serviço único por processo, para que o cache e a coalescência valham entre sessões."""
+    return ServicoLLM()
+
+def stream_justificativa(objeto: str, servico: ServicoLLM | None = None, municipio: str | None = None):
+    """Gerador síncrono com o texto da justificativa à medida que é redigido."""
+    objeto = objeto.strip()
+    tarefa = tarefa_municipio(TAREFA, municipio)
+    return (servico or servico_padrao()).stream(tarefa, VERSAO_PROMPT, objeto, mensagens(objeto, municipio))
+
+@instrumentada("gerar_justificativa", tamanho=len)
+def gerar_justificativa(objeto: str, servico: ServicoLLM | None = None, municipio: str | None = None) -> str:
+    objeto = objeto.strip()
+    tarefa = tarefa_municipio(TAREFA, municipio)
+    return (servico or servico_padrao()).gerar(tarefa, VERSAO_PROMPT, objeto, mensagens(objeto, municipio))
+
+async def astream_justificativa(objeto: str, servico: ServicoLLM | None = None, municipio: str | None = None):
+    objeto = objeto.strip()
+    tarefa = tarefa_municipio(TAREFA, municipio)
+    async for parte in (servico or servico_padrao()).astream(tarefa, VERSAO_PROMPT, objeto, mensagens(objeto, municipio)):
+        yield parte
+
+def justificativa_semelhante(
+    objeto: str, servico: ServicoLLM | None = None, municipio: str | None = None
+) -> TextoSemelhante | None:
+    """Justificativa já redigida para um objeto quase igual, para o app oferecer no lugar de redigir outra."""
+    objeto = objeto.strip()
+    servico = servico or servico_padrao()
+    tarefa = tarefa_municipio(TAREFA, municipio)
+    if servico.cache.obter(servico.chave(tarefa, VERSAO_PROMPT, objeto)) is not None:
+        return None  # o próprio objeto já está no cache
+    return servico.semelhante(tarefa, VERSAO_PROMPT, objeto)
@@ -0,0 +1,317 @@
+"""
+Acesso ao LLM (API de chat da OpenAI ou servidor compatível, como o stub de
+tr_core.llm_stub) para as seções redigidas do TR.
+
+- cliente assíncrono com streaming de tokens;
+- cache persistente em disco, por (tarefa, versão do prompt, entrada, modelo,
+  temperatura), para não gerar (nem pagar) duas vezes o mesmo texto;
+- coalescência: pedidos simultâneos com a mesma chave compartilham uma única
+  chamada em andamento, inclusive entre sessões diferentes do Streamlit;
+- `semelhante` encontra o texto já redigido para um objeto quase igual (só
+  caixa, acentos, pontuação, plural ou "c/" x "com"), pela similaridade de
+  tr_core.semelhantes e com as mesmas palavras de conteúdo. Nunca é usado
+  automaticamente: o app o oferece e o usuário decide (ver
+  tr_core.redacao.secoes_semelhantes).
+
+As chamadas rodam num laço asyncio próprio, em uma thread de fundo; os métodos
+síncronos (gerar/stream) servem ao Streamlit e a scripts.
+
+Configuração por variável de ambiente:
+    OPENAI_API_KEY    chave da API
+    TR_LLM_BASE_URL   URL base compatível com a OpenAI (ex.: http://127.0.0.1:8765/v1)
+    TR_LLM_MODELO     modelo (padrão: gpt-4)
+    TR_LLM_CACHE      diretório do cache (padrão: .cache_tr/llm)
+    TR_LLM_SEMELHANCA similaridade mínima para oferecer o texto de outro objeto (padrão: 0.92; 0 desliga)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from .instrumentacao import etapa
+
+MODELO_PADRAO = "gpt-4"
+TEMPERATURA_PADRAO = 0.4
+MAX_TOKENS_PADRAO = 1000
+# Abaixo disso, objetos que só trocam uma palavra (ex.: "Locação" x "Aquisição"
+# do mesmo item) não reaproveitam o texto um do outro.
+SEMELHANCA_PADRAO = 0.92
+
+class ErroLLM(RuntimeError):
+    """Falha ao obter texto do LLM (rede, chave, limite de uso, tempo esgotado...)."""
+
+# ----------------------------------
+# Cache em disco
+# ----------------------------------
+class CacheEmDisco:
+    """Um arquivo JSON por chave, gravado de forma atômica (arquivo temporário + os.replace)."""
+
+    def __init__(self, diretorio):
+        self.diretorio = Path(diretorio)
+
+    @staticmethod
+    def chave(tarefa: str, versao: str, entrada: str, modelo: str, temperatura: float) -> str:
+        bruto = json.dumps([tarefa, versao, entrada, modelo, temperatura], ensure_ascii=False)
+        return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / chave[:2] / f"{chave}.json"
+
+    def obter(self, chave: str) -> str | None:
+        try:
+            with self._caminho(chave).open(encoding="utf-8") as f:
+                return json.load(f)["texto"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def guardar(self, chave: str, texto: str, **metadados) -> None:
+        caminho = self._caminho(chave)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_name(f"{caminho.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporario.write_text(json.dumps({**metadados, "texto": texto}, ensure_ascii=False), encoding="utf-8")
+        os.replace(temporario, caminho)
+
+    def entradas(self):
+        """Itera (metadados, texto) de tudo o que está no cache."""
+        for caminho in self.diretorio.glob("*/*.json"):
+            try:
+                dados = json.loads(caminho.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            texto = dados.pop("texto", None)
+            if texto is not None:
+                yield dados, texto
+
+# ----------------------------------
+# Cliente
+# ----------------------------------
+class ClienteOpenAI:
+    """Chat completions com streaming via SDK oficial (`openai>=1.0`), importado sob demanda."""
+
+    def __init__(self, base_url: str | None = None, api_key: str | None = None, timeout: float = 120.0):
+        from openai import AsyncOpenAI
+
+        self._cliente = AsyncOpenAI(
+            base_url=base_url or os.environ.get("TR_LLM_BASE_URL") or None,
+            api_key=api_key or os.environ.get("OPENAI_API_KEY") or "sem-chave",
+            timeout=timeout,
+        )
+
+    async def stream(self, mensagens: list[dict], modelo: str, temperatura: float, max_tokens: int):
+        resposta = await self._cliente.chat.completions.create(
+            model=modelo,
+            messages=mensagens,
+            temperature=temperatura,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        async for pedaco in resposta:
+            if pedaco.choices and pedaco.choices[0].delta.content:
+                yield pedaco.choices[0].delta.content
+
+# ----------------------------------
+# Serviço (cache + coalescência)
+# ----------------------------------
+class _Chamada:
+    """Chamada em andamento: guarda as partes já recebidas e acorda quem acompanha."""
+    __slots__ = ("partes", "concluida", "erro", "tarefa", "_aviso")
+
+    def __init__(self):
+        self.partes = []
+        self.tarefa = None  # referência forte à Task, que o asyncio só guarda de forma fraca
+        self.concluida = False
+        self.erro = None
+        self._aviso = asyncio.Event()
+
+    def _notificar(self):
+        self._aviso.set()
+        self._aviso = asyncio.Event()
+
+    def publicar(self, parte: str) -> None:
+        self.partes.append(parte)
+        self._notificar()
+
+    def encerrar(self, erro: BaseException | None = None) -> None:
+        self.concluida = True
+        self.erro = erro
+        self._notificar()
+
+    async def acompanhar(self):
+        # quem chega atrasado recebe primeiro o que já foi produzido
+        i = 0
+        while True:
+            while i < len(self.partes):
+                yield self.partes[i]
+                i += 1
+            if self.concluida:
+                if self.erro is not None:
+                    raise ErroLLM(str(self.erro)) from self.erro
+                return
+            await self._aviso.wait()
+
+@dataclass
+class TextoSemelhante:
+    texto: str
+    entrada: str          # objeto para o qual o texto foi redigido
+    similaridade: float
+
+class ServicoLLM:
+    def __init__(
+        self,
+        cliente=None,
+        cache: CacheEmDisco | None = None,
+        modelo: str | None = None,
+        temperatura: float = TEMPERATURA_PADRAO,
+        max_tokens: int = MAX_TOKENS_PADRAO,
+        semelhanca: float | None = None,
+    ):
+        self._cliente = cliente
+        self.cache = cache or CacheEmDisco(os.environ.get("TR_LLM_CACHE") or ".cache_tr/llm")
+        self.modelo = modelo or os.environ.get("TR_LLM_MODELO") or MODELO_PADRAO
+        self.temperatura = temperatura
+        self.max_tokens = max_tokens
+        if semelhanca is None:
+            semelhanca = float(os.environ.get("TR_LLM_SEMELHANCA") or SEMELHANCA_PADRAO)
+        self.semelhanca = semelhanca
+        self.chamadas_api = 0
+        self._em_andamento = {}
+        self._indices = None  # (tarefa, versão) -> IndiceSemelhantes, montado na primeira busca
+        self._laco = None
+        self._trava = threading.Lock()
+        self._trava_indices = threading.Lock()
+
+    @property
+    def cliente(self):
+        if self._cliente is None:
+            self._cliente = ClienteOpenAI()
+        return self._cliente
+
+    def chave(self, tarefa: str, versao: str, entrada: str) -> str:
+        return self.cache.chave(tarefa, versao, entrada, self.modelo, self.temperatura)
+
+    # --- objetos parecidos ---
+
+    def _indice(self, tarefa: str, versao: str):
+        from .semelhantes import IndiceSemelhantes
+
+        if self._indices is None:
+            # uma varredura do cache em disco por processo; depois o índice
+            # só recebe os textos novos (ver _executar)
+            indices = {}
+            for metadados, texto in self.cache.entradas():
+                if (metadados.get("modelo"), metadados.get("temperatura")) != (self.modelo, self.temperatura):
+                    continue
+                chave = (metadados.get("tarefa"), metadados.get("versao"))
+                indices.setdefault(chave, IndiceSemelhantes()).adicionar(metadados.get("entrada") or "", texto)
+            self._indices = indices
+        return self._indices.setdefault((tarefa, versao), IndiceSemelhantes())
+
+    def semelhante(self, tarefa: str, versao: str, entrada: str) -> TextoSemelhante | None:
+        """
+        Texto já redigido para outro objeto com similaridade >= self.semelhanca
+        e as mesmas palavras de conteúdo, se houver. Só para oferecer ao
+        usuário: astream nunca o usa no lugar de redigir.
+        """
+        from .semelhantes import palavras_de_conteudo
+
+        if not 0 < self.semelhanca <= 1:
+            return None
+        with self._trava_indices:
+            encontrados = self._indice(tarefa, versao).buscar(entrada, self.semelhanca, quantidade=5)
+        palavras = palavras_de_conteudo(entrada)
+        for similaridade, original, texto in encontrados:
+            if palavras_de_conteudo(original) == palavras:
+                return TextoSemelhante(texto, original, similaridade)
+        return None
+
+    async def astream(self, tarefa: str, versao: str, entrada: str, mensagens: list[dict]):
+        """
+        Partes do texto à medida que chegam: do cache (do próprio objeto), de
+        uma chamada em andamento ou de uma nova.
+        """
+        chave = self.chave(tarefa, versao, entrada)
+        texto = self.cache.obter(chave)
+        if texto is not None:
+            yield texto
+            return
+        chamada = self._em_andamento.get(chave)
+        if chamada is None:
+            chamada = self._em_andamento[chave] = _Chamada()
+            metadados = {"tarefa": tarefa, "versao": versao, "entrada": entrada,
+                         "modelo": self.modelo, "temperatura": self.temperatura}
+            chamada.tarefa = asyncio.get_running_loop().create_task(
+                self._executar(chave, chamada, mensagens, metadados)
+            )
+        async for parte in chamada.acompanhar():
+            yield parte
+
+    async def _executar(self, chave: str, chamada: _Chamada, mensagens: list[dict], metadados: dict) -> None:
+        self.chamadas_api += 1
+        try:
+            with etapa("llm_api", tarefa=metadados["tarefa"], modelo=self.modelo) as medicao:
+                async for parte in self.cliente.stream(mensagens, self.modelo, self.temperatura, self.max_tokens):
+                    chamada.publicar(parte)
+                texto = "".join(chamada.partes)
+                medicao.tamanho = len(texto)
+            if texto.strip():
+                self.cache.guardar(chave, texto, **metadados)
+                with self._trava_indices:
+                    if self._indices is not None:
+                        self._indice(metadados["tarefa"], metadados["versao"]).adicionar(metadados["entrada"], texto)
+            chamada.encerrar()
+        except Exception as erro:
+            chamada.encerrar(erro)
+        finally:
+            self._em_andamento.pop(chave, None)
+
+    async def agerar(self, tarefa: str, versao: str, entrada: str, mensagens: list[dict]) -> str:
+        return "".join([parte async for parte in self.astream(tarefa, versao, entrada, mensagens)])
+
+    # --- ponte síncrona (Streamlit, scripts) ---
+
+    def laco(self) -> asyncio.AbstractEventLoop:
+        """Laço asyncio do serviço, numa thread de fundo criada na primeira chamada."""
+        with self._trava:
+            if self._laco is None:
+                self._laco = asyncio.new_event_loop()
+                threading.Thread(target=self._laco.run_forever, name="tr-llm", daemon=True).start()
+            return self._laco
+
+    def executar(self, corrotina, timeout: float | None = None):
+        """Executa uma corrotina no laço do serviço e devolve o resultado."""
+        return asyncio.run_coroutine_threadsafe(corrotina, self.laco()).result(timeout)
+
+    def gerar(self, tarefa: str, versao: str, entrada: str, mensagens: list[dict], timeout: float | None = None) -> str:
+        return self.executar(self.agerar(tarefa, versao, entrada, mensagens), timeout)
+
+    def stream(self, tarefa: str, versao: str, entrada: str, mensagens: list[dict], timeout: float = 120.0):
+        """Gerador síncrono das partes do texto (ex.: para st.write_stream)."""
+        fila = queue.Queue()
+        fim = object()
+
+        async def _bombear():
+            try:
+                async for parte in self.astream(tarefa, versao, entrada, mensagens):
+                    fila.put(parte)
+            except Exception as erro:
+                fila.put(erro)
+            finally:
+                fila.put(fim)
+
+        asyncio.run_coroutine_threadsafe(_bombear(), self.laco())
+        while True:
+            try:
+                item = fila.get(timeout=timeout)
+            except queue.Empty:
+                raise ErroLLM(f"Sem resposta do LLM em {timeout:.0f}s.") from None
+            if item is fim:
+                return
+            if isinstance(item, ErroLLM):
+                raise item
+            if isinstance(item, Exception):
+                raise ErroLLM(str(item)) from item
+            yield item
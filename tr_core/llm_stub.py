@@ -0,0 +1,149 @@
+"""
+Servidor local que imita o endpoint /v1/chat/completions da OpenAI (com e sem
+streaming), para desenvolver e testar a redação assistida sem chamar a API real.
+
+    python -m tr_core.llm_stub --porta 8765
+    TR_LLM_BASE_URL=http://127.0.0.1:8765/v1 streamlit run termo2.py
+
+Em código:
+    with StubLLM() as stub:
+        servico = ServicoLLM(cliente=ClienteOpenAI(base_url=stub.url))
+        ...
+        stub.requisicoes  # quantas chamadas chegaram ao "LLM"
+        stub.pico         # o máximo delas atendidas ao mesmo tempo
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def resposta_padrao(mensagens: list[dict]) -> str:
+    pedido = mensagens[-1]["content"].strip() if mensagens else ""
+    return (
+        "**Texto simulado pelo servidor local.**\n\n"
+        f"Resposta de teste ao pedido: {pedido[:200]}\n\n"
+        "- Necessidade demonstrada.\n"
+        "- Fundamentação na Lei nº 14.133/2021."
+    )
+
+class StubLLM:
+    """
+    `responder(mensagens) -> str` define o texto devolvido; `atraso` é a pausa
+    entre as partes do streaming (em segundos); `falhar` faz o servidor
+    responder 500, para testar os caminhos de fallback.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", porta: int = 0, responder=resposta_padrao,
+                 atraso: float = 0.01, falhar: bool = False):
+        self.responder = responder
+        self.atraso = atraso
+        self.falhar = falhar
+        self.requisicoes = 0
+        self.simultaneas = 0
+        self.pico = 0
+        self._trava = threading.Lock()
+        self._servidor = ThreadingHTTPServer((host, porta), self._tratador())
+        self._servidor.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/v1"
+
+    def iniciar(self) -> "StubLLM":
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *_):
+        self.parar()
+
+    def _tratador(self):
+        stub = self
+
+        class Tratador(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                tamanho = int(self.headers.get("Content-Length") or 0)
+                corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+                with stub._trava:
+                    stub.requisicoes += 1
+                    stub.simultaneas += 1
+                    stub.pico = max(stub.pico, stub.simultaneas)
+                try:
+                    self._responder(corpo)
+                finally:
+                    with stub._trava:
+                        stub.simultaneas -= 1
+
+            def _responder(self, corpo: dict):
+                if stub.falhar:
+                    self._json(500, {"error": {"message": "falha simulada", "type": "server_error"}})
+                    return
+                texto = stub.responder(corpo.get("messages", []))
+                modelo = corpo.get("model", "stub")
+                if corpo.get("stream"):
+                    self._stream(texto, modelo)
+                else:
+                    self._json(200, {
+                        "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": modelo,
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": texto}}],
+                    })
+
+            def _json(self, status: int, dados: dict):
+                bruto = json.dumps(dados).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(bruto)))
+                self.end_headers()
+                self.wfile.write(bruto)
+
+            def _stream(self, texto: str, modelo: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                # uma "palavra" por evento, como os tokens da API real
+                palavras = texto.split(" ")
+                for i, palavra in enumerate(palavras):
+                    parte = palavra if i == len(palavras) - 1 else palavra + " "
+                    evento = {
+                        "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": modelo,
+                        "choices": [{"index": 0, "delta": {"content": parte}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(evento)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    if stub.atraso:
+                        time.sleep(stub.atraso)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Tratador
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local compatível com /v1/chat/completions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--atraso", type=float, default=0.02, help="pausa entre as partes do streaming (s)")
+    args = parser.parse_args()
+    stub = StubLLM(args.host, args.porta, atraso=args.atraso)
+    print(f"Stub do LLM em {stub.url} (Ctrl+C para sair)")
+    try:
+        stub._servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,239 @@
+"""
+Geração em lote de Termos de Referência (ex.: todas as linhas do Plano Anual
+de Contratações), sem passar pela interface Streamlit.
+
+Uso:
+    python -m tr_core.lote pac_2026.csv -o saida/ -j 8
+    python -m tr_core.lote pac_2026.csv -o saida/ --formato pdf   # para o Portal/PNCP
+
+A entrada pode ser CSV (separador "," ou ";") ou JSONL, com as colunas/chaves:
+    objeto (obrigatório), secretarias, vigencia_meses, incluir_opcao_hibrida,
+    kpis_padrao, municipio, arquivo
+
+`secretarias` aceita lista (JSONL) ou texto separado por "|" ou ";"; o valor
+"todas" seleciona todas as secretarias do município (tr_core.municipios).
+`arquivo` é o nome, sem extensão, dos arquivos gerados no diretório de saída
+(padrão: nº de ordem + objeto); diretórios no nome são descartados, e ".." ou
+caminhos absolutos são recusados.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .gerador import lista_nao_vazia, montar_tr
+from .municipios import municipio as _municipio
+from .render_markdown import render_markdown
+
+FORMATOS = ("md", "docx", "pdf")
+
+# Vigência aceita, em meses (Lei 14.133/2021, art. 107: até 10 anos)
+VIGENCIA_MINIMA, VIGENCIA_MAXIMA = 1, 120
+
+_VERDADEIRO = {"1", "s", "sim", "x", "true", "t", "yes", "y"}
+_FALSO = {"0", "n", "nao", "não", "false", "f", "no"}
+
+@dataclass
+class ResultadoLote:
+    documentos: int
+    arquivos: list[Path]
+    segundos: float
+
+    @property
+    def docs_por_segundo(self) -> float:
+        return self.documentos / self.segundos if self.segundos else 0.0
+
+def _onde(linha: int | None) -> str:
+    return f"Linha {linha}: " if linha is not None else ""
+
+def _booleano(valor, padrao: bool, linha: int | None, campo: str) -> bool:
+    if isinstance(valor, bool):
+        return valor
+    texto = "" if valor is None else str(valor).strip().lower()
+    if not texto:
+        return padrao
+    if texto in _VERDADEIRO:
+        return True
+    if texto in _FALSO:
+        return False
+    raise ValueError(f"{_onde(linha)}valor inválido para '{campo}': {valor!r}")
+
+def _secretarias(valor, municipio: str) -> list[str]:
+    if not valor:
+        return []
+    if isinstance(valor, str):
+        if valor.strip().lower() == "todas":
+            return list(_municipio(municipio).secretarias)
+        valor = re.split(r"[|;]", valor)
+    return [str(s).strip() for s in valor if lista_nao_vazia(s)]
+
+def _arquivo(valor, linha: int | None) -> str:
+    """Nome dado na entrada -> nome-base dentro do diretório de saída ("" = automático)."""
+    texto = str(valor or "").strip()
+    if not texto:
+        return ""
+    partes = re.split(r"[\\/]", texto)
+    if texto.startswith(("/", "\\")) or re.match(r"[A-Za-z]:", texto) or ".." in partes:
+        raise ValueError(f"{_onde(linha)}'arquivo' deve ser só o nome, sem diretórios: {valor!r}")
+    nome = partes[-1].strip()
+    raiz, extensao = os.path.splitext(nome)
+    if extensao.lower().lstrip(".") in FORMATOS:
+        nome = raiz  # "tr_001.docx" grava tr_001.docx, e não tr_001.docx.docx
+    if not nome.strip(". "):
+        raise ValueError(f"{_onde(linha)}nome de arquivo inválido: {valor!r}")
+    return nome
+
+def _nome_arquivo(indice: int, objeto: str) -> str:
+    ascii_ = unicodedata.normalize("NFKD", objeto).encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^a-z0-9]+", "-", ascii_.lower()).strip("-")[:60].rstrip("-")
+    return f"{indice:04d}_{slug or 'tr'}"
+
+def normalizar_entrada(registro: dict, linha: int | None = None) -> dict:
+    """
+    Converte um registro do CSV/JSONL (ou o JSON do serviço HTTP) nos
+    argumentos de `gerar_tr` (+ nome do arquivo). `linha` só entra nas mensagens de erro.
+    """
+    objeto = registro.get("objeto") or ""
+    if not isinstance(objeto, str) or not lista_nao_vazia(objeto):
+        raise ValueError(f"{_onde(linha)}o campo 'objeto' é obrigatório.")
+    valor = registro.get("vigencia_meses")
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        vigencia = 12  # ausente ou célula vazia no CSV; 0 explícito é rejeitado abaixo
+    else:
+        try:
+            # int("12") e int(12); 12.5, True e "doze" não são vigência
+            if isinstance(valor, bool) or (isinstance(valor, float) and not valor.is_integer()):
+                raise ValueError
+            vigencia = int(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"{_onde(linha)}'vigencia_meses' deve ser inteiro: {valor!r}") from None
+        if not VIGENCIA_MINIMA <= vigencia <= VIGENCIA_MAXIMA:
+            raise ValueError(
+                f"{_onde(linha)}'vigencia_meses' deve estar entre {VIGENCIA_MINIMA} e {VIGENCIA_MAXIMA}: {valor!r}"
+            )
+    try:
+        municipio = _municipio(str(registro.get("municipio") or "")).nome
+    except ValueError as erro:
+        raise ValueError(f"{_onde(linha)}{erro}") from None
+    return {
+        "arquivo": _arquivo(registro.get("arquivo"), linha),
+        "objeto": objeto,
+        "secretarias": _secretarias(registro.get("secretarias"), municipio),
+        "vigencia_meses": vigencia,
+        "incluir_opcao_hibrida": _booleano(registro.get("incluir_opcao_hibrida"), True, linha, "incluir_opcao_hibrida"),
+        "kpis_padrao": _booleano(registro.get("kpis_padrao"), True, linha, "kpis_padrao"),
+        "municipio": municipio,
+    }
+
+def ler_entradas(caminho) -> list[dict]:
+    """Lê um CSV ou JSONL de objetos e devolve as entradas normalizadas."""
+    caminho = Path(caminho)
+    with caminho.open(encoding="utf-8-sig", newline="") as f:
+        if caminho.suffix.lower() in (".jsonl", ".ndjson"):
+            registros = [(n, json.loads(l)) for n, l in enumerate(f, 1) if l.strip()]
+        else:
+            amostra = f.read(4096)
+            f.seek(0)
+            try:
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+            except csv.Error:  # uma coluna só (ex.: apenas "objeto"): não há separador a detectar
+                dialeto = csv.excel
+            # linha 1 é o cabeçalho
+            registros = list(enumerate(csv.DictReader(f, dialect=dialeto), 2))
+    return [normalizar_entrada(r, n) for n, r in registros]
+
+def _gerar_um(tarefa) -> list[str]:
+    entrada, destino, formatos = tarefa
+    entrada = dict(entrada)
+    base = os.path.join(destino, entrada.pop("arquivo"))
+    documento = montar_tr(**entrada)
+    gerados = []
+    if "md" in formatos:
+        Path(base + ".md").write_text(render_markdown(documento), encoding="utf-8")
+        gerados.append(base + ".md")
+    if "docx" in formatos:
+        from .render_docx import escrever_docx  # python-docx só quando o formato é pedido
+
+        escrever_docx(documento, base + ".docx")
+        gerados.append(base + ".docx")
+    if "pdf" in formatos:
+        from .render_pdf import escrever_pdf
+
+        escrever_pdf(documento, base + ".pdf")
+        gerados.append(base + ".pdf")
+    return gerados
+
+def gerar_lote(entradas: list[dict], destino, processos: int | None = None, formatos=FORMATOS) -> ResultadoLote:
+    """
+    Gera um TR por entrada, distribuindo o trabalho num pool de processos.
+    Cada processo grava seus próprios arquivos, evitando devolver os bytes ao processo principal.
+    """
+    formatos = tuple(formatos)
+    invalidos = set(formatos) - set(FORMATOS)
+    if invalidos:
+        raise ValueError(f"Formato(s) não suportado(s): {', '.join(sorted(invalidos))}")
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    processos = processos or os.cpu_count() or 1
+    tarefas = [
+        ({**e, "arquivo": e.get("arquivo") or _nome_arquivo(i, e["objeto"])}, str(destino), formatos)
+        for i, e in enumerate(entradas, 1)
+    ]
+    # dois TRs com o mesmo nome se sobrescreveriam em silêncio (e Windows/macOS não distinguem maiúsculas)
+    primeira = {}
+    for i, (entrada, _, _) in enumerate(tarefas, 1):
+        chave = entrada["arquivo"].casefold()
+        if chave in primeira:
+            raise ValueError(f"Entradas {primeira[chave]} e {i}: mesmo nome de arquivo ({entrada['arquivo']!r}).")
+        primeira[chave] = i
+
+    inicio = time.perf_counter()
+    if processos == 1 or len(tarefas) <= 1:
+        resultados = list(map(_gerar_um, tarefas))
+    else:
+        lote = max(1, len(tarefas) // (processos * 4))
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            resultados = list(pool.map(_gerar_um, tarefas, chunksize=lote))
+    segundos = time.perf_counter() - inicio
+
+    arquivos = [Path(a) for r in resultados for a in r]
+    return ResultadoLote(documentos=len(tarefas), arquivos=arquivos, segundos=segundos)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tr_core.lote",
+        description="Gera Termos de Referência em lote a partir de um CSV/JSONL.",
+    )
+    parser.add_argument("entrada", help="arquivo .csv ou .jsonl com os objetos")
+    parser.add_argument("-o", "--saida", default="saida_tr", help="diretório de saída (padrão: saida_tr)")
+    parser.add_argument("-j", "--processos", type=int, default=None, help="nº de processos (padrão: nº de CPUs)")
+    parser.add_argument("--formato", default="md,docx", help="formatos separados por vírgula: md, docx, pdf")
+    args = parser.parse_args(argv)
+
+    try:
+        entradas = ler_entradas(args.entrada)
+        resultado = gerar_lote(
+            entradas,
+            args.saida,
+            processos=args.processos,
+            formatos=[f.strip() for f in args.formato.split(",") if f.strip()],
+        )
+    except (OSError, ValueError) as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{resultado.documentos} TR(s), {len(resultado.arquivos)} arquivo(s) em {args.saida} — "
+        f"{resultado.segundos:.2f}s ({resultado.docs_por_segundo:.1f} documentos/s)"
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
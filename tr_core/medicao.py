@@ -0,0 +1,377 @@
+"""
+Medição do contrato (seção 6 do TR): quantidades medidas, acumuladas e saldo
+por item e os indicadores da 6.4, apurados a partir do cadastro de itens e do
+registro de OS/chamados/entregas exportado em CSV. Os cálculos são feitos por
+coluna com NumPy (sem laço por linha), de modo que um registro com centenas de
+milhares de linhas é apurado em segundos.
+
+    itens = ler_itens("itens.csv")
+    eventos = ler_eventos("os_2026.csv")
+    medicao = medir(itens, eventos, "2026-03-01", "2026-04-01")
+    montar_tr(..., medicao=medicao)     # 6.1 preenchida e indicadores apurados na 6.4
+    documento_medicao(medicao)          # boletim de medição do período
+
+Cadastro de itens (uma linha por item do contrato):
+    item, descricao, unidade, quantidade (contratada)
+
+Registro de eventos (uma linha por OS/chamado/entrega); só item, quantidade e
+abertura são obrigatórias, cada indicador é apurado se as suas colunas existirem:
+    item, quantidade, abertura     quantidades do período e acumuladas
+    atendimento, solucao           tempo de resposta e de solução (h)
+    retrabalho                     taxa de retrabalho (sim/não)
+    conforme                       conformidade amostral (sim/não; vazio = não amostrado)
+    prazo, entrega                 pontualidade em entregas
+    horas_indisponivel             disponibilidade (sobre as horas do período)
+
+CSV com separador "," ou ";", datas em ISO (2026-03-05 14:30) ou dd/mm/aaaa
+[hh:mm] e números lidos como na tabela de itens (itens.interpretar_numero):
+"1.500" é mil e quinhentos num CSV com ";" e um e meio num CSV com ",".
+
+Linha de comando:
+    python -m tr_core.medicao itens.csv eventos.csv --inicio 2026-03-01 --fim 2026-04-01 -o boletim.docx
+"""
+import argparse
+import csv
+import sys
+import unicodedata
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .itens import interpretar_numero
+from .modelo import QUEBRA, Documento, ItemLista, Paragrafo, Tabela, Titulo, Trecho, trechos
+from .municipios import municipio as _municipio
+
+_SIM = ("1", "s", "sim", "x", "true", "t", "yes", "y")
+
+# Indicadores da 6.4, na ordem do template: (nome, unidade)
+INDICADORES = (
+    ("Disponibilidade", "%"),
+    ("Tempo de resposta", "h"),
+    ("Tempo de solução", "h"),
+    ("Taxa de retrabalho", "%"),
+    ("Conformidade amostral", "%"),
+    ("Pontualidade em entregas", "%"),
+)
+
+CABECALHO_6_1 = ("Item", "Descrição", "Unidade", "Qtde medida no período", "Qtde acumulada", "Saldo")
+_ALINHAMENTOS_6_1 = ("l", "l", "l", "r", "r", "r")
+
+# ----------------------------------
+# Leitura
+# ----------------------------------
+def _nome_coluna(nome: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", nome.strip().lower()).encode("ascii", "ignore").decode("ascii")
+    return "_".join(sem_acento.replace("-", " ").split())
+
+def ler_colunas(caminho) -> dict[str, np.ndarray]:
+    """CSV como colunas de texto (nome normalizado, ex.: "Horas indisponível" -> horas_indisponivel)."""
+    return _ler_colunas(caminho)[0]
+
+def _ler_colunas(caminho) -> tuple[dict[str, np.ndarray], str]:
+    """Colunas e separador do CSV (o separador decide o formato dos números ambíguos)."""
+    caminho = Path(caminho)
+    with caminho.open(encoding="utf-8-sig", newline="") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+        except csv.Error:  # uma coluna só (ou arquivo vazio): não há separador a detectar
+            dialeto = csv.excel
+        cabecalho = [_nome_coluna(c) for c in next(csv.reader(f, dialeto), [])]
+        # o leitor em C do NumPy separa as colunas bem mais rápido que csv.reader + zip
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # arquivo só com o cabeçalho
+            try:
+                tabela = np.loadtxt(
+                    f, dtype=object, delimiter=dialeto.delimiter, quotechar='"', comments=None, ndmin=2
+                )
+            except ValueError as erro:
+                raise ValueError(f"{caminho.name}: {erro}") from None
+    if tabela.size == 0:
+        return {nome: np.array([], dtype=str) for nome in cabecalho}, dialeto.delimiter
+    if tabela.shape[1] != len(cabecalho):
+        raise ValueError(f"{caminho.name}: {tabela.shape[1]} coluna(s) nos dados, {len(cabecalho)} no cabeçalho")
+    return {nome: tabela[:, j].astype(str) for j, nome in enumerate(cabecalho)}, dialeto.delimiter
+
+def _exigir(colunas: dict, nomes: tuple, origem: str) -> None:
+    faltando = [n for n in nomes if n not in colunas]
+    if faltando:
+        raise ValueError(f"{origem}: coluna(s) obrigatória(s) ausente(s): {', '.join(faltando)}")
+
+def _numeros(coluna: np.ndarray, nome: str, brasileiro: bool) -> np.ndarray:
+    """
+    Texto -> float64 (vazio = NaN), célula a célula pelas regras da tabela de
+    itens. Cada texto distinto é convertido uma vez só: num registro as
+    quantidades se repetem muito ("1", "0", "1,5").
+    """
+    distintos, inverso = np.unique(np.char.strip(coluna), return_inverse=True)
+    valores = np.empty(len(distintos), dtype=np.float64)
+    for i, texto in enumerate(distintos.tolist()):
+        try:
+            numero = interpretar_numero(texto, brasileiro)
+        except ValueError as erro:
+            raise ValueError(f"coluna '{nome}': {erro}") from None
+        valores[i] = np.nan if numero is None else numero
+    return valores[inverso.reshape(-1)]
+
+def _datas(coluna: np.ndarray, nome: str) -> np.ndarray:
+    """Texto -> datetime64[s] (vazio = NaT); dd/mm/aaaa é convertido para ISO antes."""
+    texto = np.char.strip(coluna)
+    brasileiro = np.char.find(texto, "/") == 2
+    if brasileiro.any():
+        texto = texto.astype(object)
+        texto[brasileiro] = [f"{v[6:10]}-{v[3:5]}-{v[0:2]}{v[10:]}" for v in texto[brasileiro]]
+        texto = texto.astype(str)
+    try:
+        return texto.astype("datetime64[s]")
+    except ValueError as erro:
+        raise ValueError(f"coluna '{nome}': {erro}") from None
+
+def _booleanos(coluna: np.ndarray) -> np.ndarray:
+    """Texto -> float64: 1.0 (sim), 0.0 (outro valor) e NaN (vazio)."""
+    texto = np.char.lower(np.char.strip(coluna))
+    return np.where(texto == "", np.nan, np.isin(texto, _SIM).astype(np.float64))
+
+@dataclass(eq=False)
+class Itens:
+    codigos: np.ndarray      # texto
+    descricoes: np.ndarray
+    unidades: np.ndarray
+    quantidades: np.ndarray  # contratadas (float64)
+
+    def __len__(self):
+        return len(self.codigos)
+
+def ler_itens(caminho) -> Itens:
+    colunas, separador = _ler_colunas(caminho)
+    _exigir(colunas, ("item", "descricao", "unidade", "quantidade"), Path(caminho).name)
+    codigos = np.char.strip(colunas["item"])
+    repetidos = np.unique(codigos, return_counts=True)
+    repetidos = repetidos[0][repetidos[1] > 1]
+    if len(repetidos):
+        raise ValueError(f"{Path(caminho).name}: item(ns) repetido(s): {', '.join(repetidos[:10])}")
+    return Itens(codigos, colunas["descricao"], colunas["unidade"], _numeros(colunas["quantidade"], "quantidade", separador != ","))
+
+@dataclass(eq=False)
+class Eventos:
+    itens: np.ndarray           # código do item (texto)
+    quantidades: np.ndarray     # float64
+    abertura: np.ndarray        # datetime64[s]
+    opcionais: dict = field(default_factory=dict)  # demais colunas, já convertidas
+
+    def __len__(self):
+        return len(self.itens)
+
+_COLUNAS_DATA = ("atendimento", "solucao", "prazo", "entrega")
+_COLUNAS_SIM_NAO = ("retrabalho", "conforme")
+
+def ler_eventos(caminho) -> Eventos:
+    colunas, separador = _ler_colunas(caminho)
+    _exigir(colunas, ("item", "quantidade", "abertura"), Path(caminho).name)
+    opcionais = {}
+    for nome in _COLUNAS_DATA:
+        if nome in colunas:
+            opcionais[nome] = _datas(colunas[nome], nome)
+    for nome in _COLUNAS_SIM_NAO:
+        if nome in colunas:
+            opcionais[nome] = _booleanos(colunas[nome])
+    if "horas_indisponivel" in colunas:
+        opcionais["horas_indisponivel"] = _numeros(colunas["horas_indisponivel"], "horas_indisponivel", separador != ",")
+    return Eventos(
+        np.char.strip(colunas["item"]),
+        _numeros(colunas["quantidade"], "quantidade", separador != ","),
+        _datas(colunas["abertura"], "abertura"),
+        opcionais,
+    )
+
+# ----------------------------------
+# Apuração
+# ----------------------------------
+def _formatar(valor: float, casas: int = 2) -> str:
+    """Número no formato brasileiro (1.234,5); inteiros sem casas decimais."""
+    if np.isnan(valor):
+        return "—"
+    if float(valor).is_integer():
+        return f"{int(valor):,}".replace(",", ".")
+    texto = f"{valor:,.{casas}f}".rstrip("0").rstrip(".")
+    return texto.replace(",", "_").replace(".", ",").replace("_", ".")
+
+def _data_br(valor: np.datetime64) -> str:
+    return valor.astype("datetime64[D]").item().strftime("%d/%m/%Y")
+
+@dataclass(eq=False)
+class Medicao:
+    itens: Itens
+    inicio: np.datetime64
+    fim: np.datetime64           # exclusivo
+    periodo: np.ndarray          # quantidade medida no período, por item
+    acumulada: np.ndarray        # até o fim do período
+    saldo: np.ndarray            # contratada - acumulada
+    indicadores: dict            # nome -> valor apurado (só os que têm dados)
+    eventos: int                 # eventos no período
+
+    @property
+    def descricao_periodo(self) -> str:
+        ultimo_dia = (self.fim - np.timedelta64(1, "s"))
+        return f"{_data_br(self.inicio)} a {_data_br(ultimo_dia)}"
+
+    def tabela(self, nivel: int = 1) -> Tabela:
+        """Tabela da 6.1 preenchida (mesmo cabeçalho do template)."""
+        linhas = [
+            (codigo, descricao, unidade, _formatar(p), _formatar(a), _formatar(s))
+            for codigo, descricao, unidade, p, a, s in zip(
+                self.itens.codigos.tolist(), self.itens.descricoes.tolist(), self.itens.unidades.tolist(),
+                self.periodo.tolist(), self.acumulada.tolist(), self.saldo.tolist(),
+            )
+        ]
+        return Tabela(CABECALHO_6_1, linhas, _ALINHAMENTOS_6_1, nivel)
+
+    def blocos_6_1(self) -> tuple:
+        """Item 6.1 do TR com a tabela preenchida, no lugar da linha de exemplo do template."""
+        return (
+            ItemLista((Trecho("6.1 Itens e unidades de medida", negrito=True),
+                       Trecho(f" (medição de {self.descricao_periodo}):"))),
+            self.tabela(),
+        )
+
+    def tabela_indicadores(self, nivel: int = 1) -> Tabela:
+        linhas = [
+            (f"{nome} ({unidade})", _formatar(self.indicadores[nome]))
+            for nome, unidade in INDICADORES if nome in self.indicadores
+        ]
+        return Tabela(("Indicador", f"Apurado de {self.descricao_periodo}"), linhas, ("l", "r"), nivel)
+
+def _data(valor) -> np.datetime64:
+    if isinstance(valor, np.datetime64):
+        return valor.astype("datetime64[s]")
+    return _datas(np.array([str(valor)]), "período")[0]
+
+def _horas(inicio: np.ndarray, fim: np.ndarray) -> np.ndarray:
+    """Horas entre as datas; data em branco (NaT) = NaN, fora das médias."""
+    horas = (fim - inicio).astype("timedelta64[s]").astype(np.float64) / 3600.0
+    return np.where(np.isnat(inicio) | np.isnat(fim), np.nan, horas)
+
+def _media(valores: np.ndarray) -> float | None:
+    valores = valores[~np.isnan(valores)]
+    return float(valores.mean()) if len(valores) else None
+
+def medir(itens: Itens, eventos: Eventos, inicio, fim, horas_previstas: float | None = None) -> Medicao:
+    """
+    Apura o período [inicio, fim): quantidades dos eventos abertos no período
+    e acumuladas até `fim`, saldo por item e os indicadores da 6.4 sobre os
+    eventos do período. `horas_previstas` (disponibilidade) é, por padrão, a
+    duração do período.
+    """
+    inicio, fim = _data(inicio), _data(fim)
+    if fim <= inicio:
+        raise ValueError("O fim do período deve ser posterior ao início.")
+
+    # código do item -> linha do cadastro, resolvido uma vez por código distinto
+    codigos, inverso = np.unique(eventos.itens, return_inverse=True)
+    linha_do_codigo = {c: i for i, c in enumerate(itens.codigos.tolist())}
+    desconhecidos = [c for c in codigos.tolist() if c not in linha_do_codigo]
+    if desconhecidos:
+        raise ValueError(f"Item(ns) do registro fora do cadastro: {', '.join(desconhecidos[:10])}")
+    linhas = np.array([linha_do_codigo[c] for c in codigos.tolist()], dtype=np.intp)[inverso]
+
+    ate_o_fim = eventos.abertura < fim
+    no_periodo = ate_o_fim & (eventos.abertura >= inicio)
+    quantidades = np.nan_to_num(eventos.quantidades)
+    acumulada = np.bincount(linhas[ate_o_fim], weights=quantidades[ate_o_fim], minlength=len(itens))
+    periodo = np.bincount(linhas[no_periodo], weights=quantidades[no_periodo], minlength=len(itens))
+
+    opcionais = {nome: coluna[no_periodo] for nome, coluna in eventos.opcionais.items()}
+    abertura = eventos.abertura[no_periodo]
+    valores = {}
+    if "horas_indisponivel" in opcionais:
+        previstas = horas_previstas or float(_horas(inicio, fim))
+        parado = float(np.nansum(opcionais["horas_indisponivel"]))
+        valores["Disponibilidade"] = max(0.0, (previstas - parado) / previstas * 100)
+    if "atendimento" in opcionais:
+        valores["Tempo de resposta"] = _media(_horas(abertura, opcionais["atendimento"]))
+    if "solucao" in opcionais:
+        valores["Tempo de solução"] = _media(_horas(abertura, opcionais["solucao"]))
+    if "retrabalho" in opcionais:
+        taxa = _media(opcionais["retrabalho"])
+        valores["Taxa de retrabalho"] = taxa * 100 if taxa is not None else None
+    if "conforme" in opcionais:
+        taxa = _media(opcionais["conforme"])
+        valores["Conformidade amostral"] = taxa * 100 if taxa is not None else None
+    if "prazo" in opcionais and "entrega" in opcionais:
+        prazo, entrega = opcionais["prazo"], opcionais["entrega"]
+        com_datas = ~(np.isnat(prazo) | np.isnat(entrega))
+        if com_datas.any():
+            valores["Pontualidade em entregas"] = float((entrega[com_datas] <= prazo[com_datas]).mean() * 100)
+
+    return Medicao(
+        itens=itens,
+        inicio=inicio,
+        fim=fim,
+        periodo=periodo,
+        acumulada=acumulada,
+        saldo=np.nan_to_num(itens.quantidades) - acumulada,
+        indicadores={nome: valor for nome, valor in valores.items() if valor is not None},
+        eventos=int(no_periodo.sum()),
+    )
+
+# ----------------------------------
+# Boletim de medição
+# ----------------------------------
+def documento_medicao(medicao: Medicao, municipio: str | None = None, objeto: str = "") -> Documento:
+    """Boletim do período (6.1 e indicadores), para os renderizadores Markdown e DOCX."""
+    cabecalho = [Trecho("Período:", negrito=True), Trecho(f" {medicao.descricao_periodo}")]
+    if objeto.strip():
+        cabecalho += [QUEBRA, Trecho("Objeto:", negrito=True), Trecho(f" {objeto.strip()}")]
+    cabecalho += [QUEBRA, Trecho("OS/chamados no período:", negrito=True), Trecho(f" {_formatar(medicao.eventos)}")]
+    blocos = [
+        Titulo(1, "BOLETIM DE MEDIÇÃO"),
+        Paragrafo(tuple(cabecalho)),
+        Titulo(2, "Itens e unidades de medida"),
+        medicao.tabela(nivel=0),
+    ]
+    if medicao.indicadores:
+        blocos += [Titulo(2, "Indicadores de desempenho (SLA/KPI)"), medicao.tabela_indicadores(nivel=0)]
+    blocos.append(Paragrafo(trechos("_Fórmulas conforme o item 6.4 do Termo de Referência._")))
+    return Documento(tuple(blocos), municipio)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tr_core.medicao",
+        description="Apura a medição do período (quantidades e indicadores) a partir dos CSVs de itens e de OS/chamados.",
+    )
+    parser.add_argument("itens", help="CSV do cadastro de itens")
+    parser.add_argument("eventos", help="CSV do registro de OS/chamados/entregas")
+    parser.add_argument("--inicio", required=True, help="início do período (aaaa-mm-dd ou dd/mm/aaaa)")
+    parser.add_argument("--fim", required=True, help="fim do período, exclusivo (aaaa-mm-dd ou dd/mm/aaaa)")
+    parser.add_argument("--horas-previstas", type=float, default=None, help="base da disponibilidade (padrão: o período)")
+    parser.add_argument("--objeto", default="", help="objeto do contrato, para o boletim")
+    parser.add_argument("--municipio", default=None, help="município (papel timbrado do DOCX)")
+    parser.add_argument("-o", "--saida", default=None, help="boletim .md ou .docx (padrão: Markdown na saída padrão)")
+    args = parser.parse_args(argv)
+
+    try:
+        _municipio(args.municipio)  # nome desconhecido: erro antes de ler os CSVs
+        medicao = medir(ler_itens(args.itens), ler_eventos(args.eventos), args.inicio, args.fim, args.horas_previstas)
+        documento = documento_medicao(medicao, args.municipio, args.objeto)
+        if args.saida and args.saida.lower().endswith(".docx"):
+            from .render_docx import escrever_docx
+
+            escrever_docx(documento, args.saida)
+        else:
+            from .render_markdown import render_markdown
+
+            texto = render_markdown(documento)
+            if args.saida:
+                Path(args.saida).write_text(texto, encoding="utf-8")
+            else:
+                print(texto)
+    except (OSError, ValueError) as erro:
+        print(f"erro: {erro}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
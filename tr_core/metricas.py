@@ -0,0 +1,127 @@
+"""
+Métricas no formato texto do Prometheus (contadores, medidores e histogramas),
+sem dependências externas. Cada métrica é segura entre threads; o Registro
+junta as métricas de um processo e gera o texto servido em /metrics.
+
+    registro = Registro()
+    latencia = registro.histograma("tr_requisicao_segundos", "Latência das requisições.", ("rota",))
+    latencia.observar(0.012, rota="/tr")
+    registro.texto()
+"""
+import bisect
+import threading
+
+# Limites padrão dos histogramas de latência, em segundos
+LIMITES_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _rotulos(nomes: tuple, valores: tuple, extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._trava = threading.Lock()
+
+    def _chave(self, rotulos: dict) -> tuple:
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(rotulos)}")
+        return tuple(str(rotulos[n]) for n in self.rotulos)
+
+    def _cabecalho(self) -> list[str]:
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def incrementar(self, valor: float = 1, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **rotulos) -> float:
+        return self._valores.get(self._chave(rotulos), 0)
+
+    def linhas(self) -> list[str]:
+        with self._trava:
+            itens = sorted(self._valores.items())
+        return self._cabecalho() + [f"{self.nome}{_rotulos(self.rotulos, k)} {_numero(v)}" for k, v in itens]
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: tamanho da fila)."""
+    tipo = "gauge"
+
+    def definir(self, valor: float, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = valor
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple = (), limites: tuple = LIMITES_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor: float, **rotulos) -> None:
+        chave = self._chave(rotulos)
+        with self._trava:
+            serie = self._valores.get(chave)
+            if serie is None:
+                # contagem por faixa (a última é +Inf), soma e total
+                serie = self._valores[chave] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][bisect.bisect_left(self.limites, valor)] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def linhas(self) -> list[str]:
+        with self._trava:
+            itens = sorted((k, ([*c], s, n)) for k, (c, s, n) in self._valores.items())
+        linhas = self._cabecalho()
+        for chave, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, contagem in zip((*self.limites, float("inf")), contagens):
+                acumulado += contagem
+                le = 'le="' + _numero(limite) + '"'
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, chave, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {total}")
+        return linhas
+
+class Registro:
+    def __init__(self):
+        self._metricas = {}
+
+    def _registrar(self, metrica):
+        if metrica.nome in self._metricas:
+            raise ValueError(f"Métrica já registrada: {metrica.nome}")
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, rotulos: tuple = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def medidor(self, nome: str, ajuda: str, rotulos: tuple = ()) -> Medidor:
+        return self._registrar(Medidor(nome, ajuda, rotulos))
+
+    def histograma(self, nome: str, ajuda: str, rotulos: tuple = (), limites: tuple = LIMITES_PADRAO) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def texto(self) -> str:
+        """Exposição no formato texto 0.0.4 do Prometheus."""
+        return "\n".join(l for m in self._metricas.values() for l in m.linhas()) + "\n"
@@ -0,0 +1,139 @@
+"""
+Modelo intermediário do TR: uma lista rasa de blocos (títulos, parágrafos com
+trechos em negrito/itálico, itens de lista e tabelas) que os renderizadores
+Markdown e DOCX percorrem em uma única passada, sem reinterpretar texto.
+
+Os nós são imutáveis por convenção: os blocos fixos do template são criados
+uma vez na importação e compartilhados entre todos os documentos.
+"""
+import re
+
+class Trecho:
+    """Pedaço de texto com formatação uniforme dentro de um parágrafo."""
+    __slots__ = ("texto", "negrito", "italico")
+
+    def __init__(self, texto: str, negrito: bool = False, italico: bool = False):
+        self.texto = texto
+        self.negrito = negrito
+        self.italico = italico
+
+    def __repr__(self):
+        return f"Trecho({self.texto!r}, negrito={self.negrito}, italico={self.italico})"
+
+# Quebra de linha dentro do mesmo parágrafo ("  \n" no Markdown)
+QUEBRA = Trecho("\n")
+
+_MARCACAO = re.compile(r"\*\*(.+?)\*\*|(?<!\w)_(.+?)_(?!\w)")
+
+def trechos(texto: str) -> tuple:
+    """
+    Converte texto com marcação **negrito** / _itálico_ em trechos.
+    Usado no texto fixo do template (na importação) e no texto redigido pelo
+    LLM; o que o usuário digita no formulário entra como Trecho literal.
+    """
+    partes = []
+    pos = 0
+    for m in _MARCACAO.finditer(texto):
+        if m.start() > pos:
+            partes.append(Trecho(texto[pos:m.start()]))
+        if m.group(1) is not None:
+            partes.append(Trecho(m.group(1), negrito=True))
+        else:
+            partes.append(Trecho(m.group(2), italico=True))
+        pos = m.end()
+    if pos < len(texto):
+        partes.append(Trecho(texto[pos:]))
+    return tuple(partes)
+
+# ----------------------------------
+# Blocos
+# ----------------------------------
+# O slot `_md` guarda o Markdown já renderizado do bloco (preenchido pelo
+# renderizador na primeira vez); nos blocos fixos isso equivale ao template
+# pré-compilado, pois só os blocos variáveis são renderizados a cada chamada.
+
+class Titulo:
+    __slots__ = ("nivel", "texto", "_md")
+
+    def __init__(self, nivel: int, texto: str):
+        self.nivel = nivel
+        self.texto = texto
+        self._md = None
+
+class Paragrafo:
+    __slots__ = ("trechos", "_md")
+
+    def __init__(self, trechos: tuple):
+        self.trechos = trechos
+        self._md = None
+
+class ItemLista:
+    """Item de lista com marcador (numero=None) ou numerado; `nivel` 0 é o primeiro nível."""
+    __slots__ = ("trechos", "nivel", "numero", "_md")
+
+    def __init__(self, trechos: tuple, nivel: int = 0, numero: int | None = None):
+        self.trechos = trechos
+        self.nivel = nivel
+        self.numero = numero
+        self._md = None
+
+class Tabela:
+    """Tabela simples; `alinhamentos` usa "l"/"r" por coluna e `nivel` é o recuo no Markdown."""
+    __slots__ = ("cabecalho", "linhas", "alinhamentos", "nivel", "_md")
+
+    def __init__(self, cabecalho: tuple, linhas: list, alinhamentos: tuple | None = None, nivel: int = 0):
+        self.cabecalho = cabecalho
+        self.linhas = linhas
+        self.alinhamentos = alinhamentos or ("l",) * len(cabecalho)
+        self.nivel = nivel
+        self._md = None
+
+class Separador:
+    __slots__ = ("_md",)
+
+    def __init__(self):
+        self._md = None
+
+class Espaco:
+    """Linha em branco entre blocos (não gera parágrafo vazio no DOCX)."""
+    __slots__ = ("_md",)
+
+    def __init__(self):
+        self._md = None
+
+class Documento:
+    """`municipio` escolhe o papel timbrado do DOCX (tr_core.municipios); None usa o padrão."""
+    __slots__ = ("blocos", "municipio")
+
+    def __init__(self, blocos, municipio: str | None = None):
+        self.blocos = blocos
+        self.municipio = municipio
+
+    def __iter__(self):
+        return iter(self.blocos)
+
+def blocos_de_texto(texto: str, nivel: int = 0) -> tuple:
+    """
+    Converte texto livre (ex.: redigido pelo LLM) em blocos: parágrafos
+    separados por linha em branco, itens "- "/"* " e "1. " e marcação
+    **negrito**/_itálico_. Linhas "#"/"##" viram parágrafos em negrito, para
+    não interferir na numeração das seções do TR. `nivel` é o dos itens de
+    lista (ex.: 1 para os KPIs, que ficam sob o item 6.4).
+    """
+    blocos = []
+    for bloco_bruto in re.split(r"\n\s*\n", texto.strip()):
+        if blocos:
+            blocos.append(Espaco())
+        for linha in bloco_bruto.splitlines():
+            linha = linha.strip()
+            if not linha:
+                continue
+            m = re.match(r"^(?:[-*]|(\d+)\.)\s+(.*)$", linha)
+            if m:
+                numero = int(m.group(1)) if m.group(1) else None
+                blocos.append(ItemLista(trechos(m.group(2)), nivel, numero))
+            elif linha.startswith("#"):
+                blocos.append(Paragrafo((Trecho(linha.lstrip("#").strip(), negrito=True),)))
+            else:
+                blocos.append(Paragrafo(trechos(linha)))
+    return tuple(blocos)
@@ -0,0 +1,175 @@
+"""
+Registro dos municípios atendidos (um arquivo TOML por prefeitura, neste
+diretório e no de TR_MUNICIPIOS): nome e UF, decretos citados no TR,
+secretarias, papel timbrado e variantes de cláusula. Os arquivos são lidos uma
+única vez por processo; o gerador compila o template de cada município na
+primeira vez que ele é usado (ver tr_core.gerador.modelo_do_municipio) e o
+guarda em memória, de modo que um mesmo processo atende todas as prefeituras
+sem custo por requisição.
+
+    municipio("Brasnorte-MT").decretos["bem_de_luxo"]  # "Decreto Municipal nº 03/2024"
+    municipio("brasnorte").secretarias
+
+Sem nome (None ou ""), vale o município padrão (TR_MUNICIPIO_PADRAO, por
+padrão Brasnorte-MT), como antes do registro existir; um nome que não está no
+registro é erro (ValueError), para que um TR não saia com o timbre e os
+decretos de outra prefeitura.
+
+Configuração por variável de ambiente:
+    TR_MUNICIPIOS         diretório com TOMLs adicionais (o mesmo id substitui o daqui)
+    TR_MUNICIPIO_PADRAO   id do município padrão (padrão: brasnorte-mt)
+"""
+import glob
+import os
+import threading
+import unicodedata
+
+# os.path/glob em vez de pathlib/dataclasses, e tomllib só na leitura: este
+# módulo entra na importação a frio do tr_core (ver bench_tr.py --importacao)
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+PADRAO = "brasnorte-mt"
+
+class Municipio:
+    __slots__ = ("id", "municipio", "uf", "estado", "decretos", "secretarias", "timbre", "docx_base", "brasao", "clausulas")
+
+    def __init__(
+        self,
+        id: str,                 # nome do arquivo, ex.: "brasnorte-mt"
+        municipio: str,          # "Brasnorte"
+        uf: str,                 # "MT"
+        estado: str = "",        # "Estado de Mato Grosso"
+        decretos: dict | None = None,
+        secretarias: tuple = (),
+        timbre: tuple = (),      # linhas do cabeçalho do DOCX
+        docx_base: str | None = None,
+        brasao: str | None = None,
+        clausulas: dict | None = None,  # variantes: chave de gerador.CLAUSULAS -> texto
+    ):
+        self.id = id
+        self.municipio = municipio
+        self.uf = uf
+        self.estado = estado
+        self.decretos = decretos or {}
+        self.secretarias = secretarias
+        self.timbre = timbre
+        self.docx_base = docx_base
+        self.brasao = brasao
+        self.clausulas = clausulas or {}
+
+    def __repr__(self):
+        return f"Municipio({self.id!r})"
+
+    @property
+    def nome(self) -> str:
+        return f"{self.municipio}-{self.uf}"
+
+    @property
+    def prefeitura(self) -> str:
+        return f"Prefeitura Municipal de {self.nome}"
+
+    @property
+    def linhas_timbre(self) -> tuple:
+        """Linhas do cabeçalho do DOCX/PDF: as do TOML ou, sem elas, o nome da prefeitura e o estado."""
+        linhas = self.timbre or (f"PREFEITURA MUNICIPAL DE {self.municipio.upper()}", self.estado)
+        return tuple(linha for linha in linhas if linha)
+
+    def campos(self) -> dict:
+        """Valores disponíveis nos textos das cláusulas, ex.: "{prefeitura}", "{decreto_bem_de_luxo}"."""
+        return {
+            "municipio": self.municipio,
+            "uf": self.uf,
+            "nome": self.nome,
+            "prefeitura": self.prefeitura,
+            "estado": self.estado,
+            **{f"decreto_{chave}": valor for chave, valor in self.decretos.items()},
+        }
+
+def _chave(nome: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", nome.strip().lower()).encode("ascii", "ignore").decode("ascii")
+    return sem_acento.replace("/", "-").replace(" ", "-")
+
+def _ler(caminho: str) -> Municipio:
+    import tomllib
+
+    with open(caminho, "rb") as arquivo:
+        dados = tomllib.load(arquivo)
+    timbre = dados.get("timbre", {})
+    arquivos = {}
+    for nome in ("docx_base", "brasao"):
+        # relativos ao TOML; "" (ou ausente) deixa valer TR_DOCX_BASE/TR_DOCX_BRASAO
+        valor = timbre.get(nome)
+        arquivos[nome] = os.path.join(os.path.dirname(caminho), valor) if valor else None
+    try:
+        return Municipio(
+            id=os.path.splitext(os.path.basename(caminho))[0],
+            municipio=dados["municipio"],
+            uf=dados["uf"],
+            estado=dados.get("estado", ""),
+            decretos=dict(dados.get("decretos", {})),
+            secretarias=tuple(dados.get("secretarias", {}).get("lista", ())),
+            timbre=tuple(timbre.get("linhas", ())),
+            clausulas=dict(dados.get("clausulas", {})),
+            **arquivos,
+        )
+    except KeyError as erro:
+        raise ValueError(f"{caminho}: campo obrigatório ausente: {erro.args[0]}") from None
+
+_trava = threading.Lock()
+_registro = None  # chave normalizada (id, nome, "município/UF"...) -> Municipio
+
+def _carregar() -> dict:
+    diretorios = [DIRETORIO]
+    if os.environ.get("TR_MUNICIPIOS"):
+        diretorios.append(os.environ["TR_MUNICIPIOS"])
+    por_id = {}
+    for diretorio in diretorios:
+        for caminho in sorted(glob.glob(os.path.join(diretorio, "*.toml"))):
+            municipio_lido = _ler(caminho)
+            por_id[municipio_lido.id] = municipio_lido
+    registro = {}
+    for m in por_id.values():
+        for apelido in (m.id, m.nome, m.municipio, f"{m.municipio}/{m.uf}", f"{m.municipio} {m.uf}"):
+            registro.setdefault(_chave(apelido), m)
+    return registro
+
+def registro() -> dict:
+    global _registro
+    if _registro is None:
+        with _trava:
+            if _registro is None:
+                _registro = _carregar()
+    return _registro
+
+def municipios() -> list[Municipio]:
+    """Municípios registrados, em ordem de nome."""
+    return sorted({id(m): m for m in registro().values()}.values(), key=lambda m: m.nome)
+
+def municipio_padrao() -> Municipio:
+    id_padrao = os.environ.get("TR_MUNICIPIO_PADRAO") or PADRAO
+    try:
+        return registro()[_chave(id_padrao)]
+    except KeyError:
+        raise ValueError(f"Município padrão não registrado: {id_padrao!r}") from None
+
+def municipio(nome: str | None) -> Municipio:
+    """
+    Município pelo id ou nome (sem diferenciar caixa/acentos); sem nome, o
+    padrão. ValueError se o nome não estiver no registro.
+    """
+    if not nome or not nome.strip():
+        return municipio_padrao()
+    encontrado = registro().get(_chave(nome))
+    if encontrado is None:
+        registrados = ", ".join(m.nome for m in municipios())
+        raise ValueError(f"Município não registrado: {nome!r} (registrados: {registrados}).")
+    return encontrado
+
+def recarregar() -> None:
+    """Relê os TOMLs (ex.: depois de incluir uma prefeitura); os templates compilados são descartados."""
+    global _registro
+    with _trava:
+        _registro = None
+    from ..gerador import _compilar, modelo_do_municipio
+
+    modelo_do_municipio.cache_clear()
+    _compilar.cache_clear()
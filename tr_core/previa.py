@@ -0,0 +1,37 @@
+"""
+Pré-visualização do TR por seção: o documento é dividido nos títulos de
+seção (## 1., ## 2., ...) e cada parte guarda o seu Markdown pronto. Os apps
+mostram só os títulos e enviam ao navegador o texto de uma seção quando ela é
+aberta, em vez do TR inteiro (que, com a tabela de itens e as seções
+redigidas, passa de centenas de KB) a cada interação.
+
+    secoes = secoes_previa(documento)
+    secoes[0].titulo is None                      # cabeçalho (título, município e data)
+    "\\n".join(s.markdown for s in secoes) == render_markdown(documento)
+"""
+from .modelo import Documento, Titulo
+from .render_markdown import bloco_md
+
+class SecaoPrevia:
+    __slots__ = ("titulo", "markdown")
+
+    def __init__(self, titulo: str | None, markdown: str):
+        self.titulo = titulo      # texto do título da seção; None no cabeçalho
+        self.markdown = markdown  # da linha do título até o fim da seção
+
+    def __repr__(self):
+        return f"SecaoPrevia({self.titulo!r}, {len(self.markdown)} caracteres)"
+
+def secoes_previa(documento: Documento) -> tuple[SecaoPrevia, ...]:
+    """Cabeçalho e seções do documento, na ordem, com o Markdown de cada parte."""
+    secoes = []
+    titulo, linhas = None, []
+    for bloco in documento.blocos:
+        if type(bloco) is Titulo and bloco.nivel == 2:
+            if linhas or titulo is not None:
+                secoes.append(SecaoPrevia(titulo, "\n".join(linhas)))
+            titulo, linhas = bloco.texto, []
+        linhas.append(bloco._md if bloco._md is not None else bloco_md(bloco))
+    if linhas or titulo is not None:
+        secoes.append(SecaoPrevia(titulo, "\n".join(linhas)))
+    return tuple(secoes)
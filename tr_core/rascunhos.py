@@ -0,0 +1,219 @@
+"""
+Rascunhos do formulário, em SQLite (modo WAL): o estado dos campos e o TR já
+gerado (inclusive as seções redigidas pelo LLM) ficam guardados por id de
+rascunho. Assim, ao recarregar a página, ao expirar a sessão do Streamlit ou
+ao abrir o link em outra máquina (`?rascunho=<id>`), o formulário e o TR
+voltam como estavam, sem gerar de novo nem chamar o LLM.
+
+O app chama `agendar` a cada execução do script; a gravação é adiada até o
+rascunho ficar `espera` segundos sem mudar (ou no máximo `espera_maxima`
+segundos), então uma sequência de edições rápidas vira uma única escrita, e
+uma execução que não mudou nada não grava. `salvar` grava na hora (ex.: logo
+depois de uma redação com IA, que é cara de refazer).
+
+    rascunhos = rascunhos_padrao()
+    id_rascunho = novo_id()
+    rascunhos.agendar(id_rascunho, {"objeto": "Locação de veículos", "vigencia_meses": 12})
+    rascunhos.carregar(id_rascunho)            # o estado mais recente, gravado ou pendente
+
+Configuração por variável de ambiente:
+    TR_RASCUNHOS     arquivo do banco (padrão: dados_tr/rascunhos.sqlite3)
+"""
+import atexit
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+# Rascunhos cujo último estado fica em memória, para não regravar o mesmo
+MAXIMO_EM_MEMORIA = 1024
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS rascunho (
+    id            TEXT PRIMARY KEY,
+    atualizado_em TEXT NOT NULL,
+    estado        BLOB NOT NULL      -- JSON comprimido (zlib)
+) WITHOUT ROWID;
+"""
+
+def novo_id() -> str:
+    """Id curto e difícil de adivinhar (vai na URL do app)."""
+    return secrets.token_urlsafe(9)
+
+# A tabela de itens (tr_core.itens) é o único valor do estado que não é JSON:
+# vai em colunas, marcada, e volta como TabelaItens na leitura.
+_ITENS = "__tabela_itens__"
+
+def _codificar(valor):
+    from .itens import TabelaItens
+
+    if isinstance(valor, TabelaItens):
+        return {_ITENS: valor.para_json()}
+    raise TypeError(f"valor não serializável no rascunho: {type(valor).__name__}")
+
+def _decodificar(objeto: dict):
+    if _ITENS in objeto:
+        from .itens import TabelaItens
+
+        return TabelaItens.de_json(objeto[_ITENS])
+    return objeto
+
+class Rascunhos:
+    """
+    Uma conexão por thread (as sessões do Streamlit rodam em threads
+    diferentes); as gravações adiadas são feitas por uma thread própria.
+    """
+
+    def __init__(self, caminho, espera: float = 1.0, espera_maxima: float = 5.0):
+        self.caminho = str(caminho)
+        if self.caminho != ":memory:":
+            Path(self.caminho).parent.mkdir(parents=True, exist_ok=True)
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self._local = threading.local()
+        self._condicao = threading.Condition()
+        self._pendentes = {}   # id -> [estado, prazo, primeira alteração]
+        self._ultimos = {}     # id -> último estado agendado ou gravado, do menos para o mais recente
+        self._gravador = None
+        self.agendamentos = 0
+        self.gravacoes = 0
+        self._conexao()  # cria o esquema já na abertura
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5.0)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.executescript(_ESQUEMA)
+            self._local.conexao = conexao
+        return conexao
+
+    def agendar(self, id_rascunho: str, estado: dict) -> bool:
+        """
+        Guarda `estado` para gravação adiada; devolve False (sem agendar nada)
+        se for igual ao último estado do rascunho.
+        """
+        with self._condicao:
+            if self._ultimos.get(id_rascunho) == estado:
+                return False
+            estado = self._lembrar(id_rascunho, estado)
+            agora = time.monotonic()
+            pendente = self._pendentes.get(id_rascunho)
+            inicio = pendente[2] if pendente else agora
+            self._pendentes[id_rascunho] = [estado, min(agora + self.espera, inicio + self.espera_maxima), inicio]
+            self.agendamentos += 1
+            if self._gravador is None:
+                self._gravador = threading.Thread(target=self._gravar_adiados, name="tr-rascunhos", daemon=True)
+                self._gravador.start()
+                atexit.register(self.descarregar)
+            self._condicao.notify()
+        return True
+
+    def salvar(self, id_rascunho: str, estado: dict) -> None:
+        """Grava já, descartando o que estava pendente para o rascunho."""
+        with self._condicao:
+            self._pendentes.pop(id_rascunho, None)
+            estado = self._lembrar(id_rascunho, estado)
+        self._gravar([(id_rascunho, estado)])
+
+    def carregar(self, id_rascunho: str) -> dict | None:
+        """Estado mais recente do rascunho (o pendente, se houver) ou None se não existir."""
+        with self._condicao:
+            pendente = self._pendentes.get(id_rascunho)
+            if pendente is not None:
+                return dict(pendente[0])
+        linha = self._conexao().execute("SELECT estado FROM rascunho WHERE id = ?", (id_rascunho,)).fetchone()
+        if linha is None:
+            return None
+        estado = json.loads(zlib.decompress(linha[0]), object_hook=_decodificar)
+        with self._condicao:
+            if id_rascunho not in self._ultimos:
+                self._lembrar(id_rascunho, estado)
+        return dict(estado)
+
+    def _lembrar(self, id_rascunho: str, estado: dict) -> dict:
+        # chamado com a trava: o rascunho passa a ser o mais recente e o mais antigo sai
+        self._ultimos.pop(id_rascunho, None)
+        self._ultimos[id_rascunho] = estado = dict(estado)
+        if len(self._ultimos) > MAXIMO_EM_MEMORIA:
+            del self._ultimos[next(iter(self._ultimos))]
+        return estado
+
+    def remover(self, id_rascunho: str) -> None:
+        with self._condicao:
+            self._pendentes.pop(id_rascunho, None)
+            self._ultimos.pop(id_rascunho, None)
+        with self._conexao() as conexao:
+            conexao.execute("DELETE FROM rascunho WHERE id = ?", (id_rascunho,))
+
+    def remover_antigos(self, dias: int) -> int:
+        """Apaga os rascunhos sem alteração há mais de `dias` dias; devolve quantos."""
+        limite = datetime.fromtimestamp(time.time() - dias * 86400).isoformat(timespec="seconds")
+        with self._conexao() as conexao:
+            return conexao.execute("DELETE FROM rascunho WHERE atualizado_em < ?", (limite,)).rowcount
+
+    def descarregar(self) -> None:
+        """Grava todos os pendentes agora (chamado também na saída do processo)."""
+        with self._condicao:
+            vencidos = [(id_rascunho, p[0]) for id_rascunho, p in self._pendentes.items()]
+            self._pendentes.clear()
+        self._gravar(vencidos)
+
+    def _gravar_adiados(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._pendentes:
+                    self._condicao.wait()
+                agora = time.monotonic()
+                prazo = min(p[1] for p in self._pendentes.values())
+                if prazo > agora:
+                    self._condicao.wait(prazo - agora)
+                    continue
+                vencidos = [(i, p[0]) for i, p in self._pendentes.items() if p[1] <= agora]
+                for id_rascunho, _ in vencidos:
+                    del self._pendentes[id_rascunho]
+            try:
+                self._gravar(vencidos)
+            except sqlite3.Error:
+                # banco ocupado ou indisponível: tenta de novo na próxima espera,
+                # a menos que o rascunho já tenha um estado mais novo pendente
+                with self._condicao:
+                    prazo = time.monotonic() + self.espera
+                    for id_rascunho, estado in vencidos:
+                        self._pendentes.setdefault(id_rascunho, [estado, prazo, prazo])
+
+    def _gravar(self, estados: list) -> None:
+        if not estados:
+            return
+        agora = datetime.now().isoformat(timespec="seconds")
+        linhas = [
+            (id_rascunho, agora, zlib.compress(json.dumps(estado, ensure_ascii=False, default=_codificar).encode("utf-8")))
+            for id_rascunho, estado in estados
+        ]
+        with self._conexao() as conexao:
+            conexao.executemany(
+                "INSERT INTO rascunho (id, atualizado_em, estado) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET atualizado_em = excluded.atualizado_em, estado = excluded.estado",
+                linhas,
+            )
+        with self._condicao:
+            self.gravacoes += len(linhas)
+
+    def estatisticas(self) -> dict:
+        with self._condicao:
+            pendentes = len(self._pendentes)
+        return {"agendamentos": self.agendamentos, "gravacoes": self.gravacoes, "pendentes": pendentes}
+
+    def __len__(self):
+        return self._conexao().execute("SELECT count(*) FROM rascunho").fetchone()[0]
+
+@lru_cache(maxsize=None)
+def rascunhos_padrao() -> Rascunhos:
+    return Rascunhos(os.environ.get("TR_RASCUNHOS") or "dados_tr/rascunhos.sqlite3")
@@ -0,0 +1,222 @@
+"""
+Redação assistida das seções do TR em paralelo: os pedidos de todas as seções
+(2. justificativa, 3. solução, 4. requisitos e 6.4 KPIs) partem ao mesmo
+tempo, limitados a `limite` chamadas simultâneas, cada um com seu próprio
+tempo máximo. O TR inteiro leva mais ou menos o tempo da seção mais lenta, e
+não a soma de todas.
+
+Seção que falhar ou estourar o tempo fica de fora do resultado; montar_tr
+então usa o texto padrão do template para ela.
+
+    resultado = redigir_secoes("Locação de veículos", incluir_opcao_hibrida=True)
+    documento = montar_tr(..., **resultado.textos)
+
+Os prompts citam a prefeitura do TR (municipio=..., ver tr_core.municipios).
+
+Texto redigido para um objeto quase igual nunca entra sozinho: o app mostra o
+que `secoes_semelhantes` encontrou e, se o usuário aceitar, passa esses textos
+em `aceitos`, e só as demais seções são pedidas ao LLM.
+
+Configuração por variável de ambiente (além das de tr_core.llm):
+    TR_LLM_CONCORRENCIA  chamadas simultâneas (padrão: 4)
+    TR_LLM_TIMEOUT       tempo máximo por seção, em segundos (padrão: 60)
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from . import justificativa
+from .justificativa import servico_padrao, tarefa_municipio
+from .llm import ErroLLM, ServicoLLM, TextoSemelhante
+from .municipios import municipio as _municipio
+
+# Incrementar sempre que os prompts abaixo mudarem: invalida o cache em disco.
+VERSAO_PROMPT = "1"
+
+CONCORRENCIA_PADRAO = 4
+TIMEOUT_PADRAO = 60.0
+
+# Nomes das seções = nomes dos parâmetros de montar_tr
+SECOES = ("justificativa", "solucao", "requisitos", "kpis")
+ROTULOS = {
+    "justificativa": "2. Justificativa",
+    "solucao": "3. Solução e ciclo de vida",
+    "requisitos": "4. Requisitos",
+    "kpis": "6.4 Indicadores (KPIs)",
+}
+
+_CONTEXTO = (
+    "Você é um especialista em licitações públicas, com mais de 10 anos de experiência, atuando como "
+    "responsável técnico pela elaboração de Termos de Referência na {prefeitura}. "
+    "Considerando a Lei nº 14.133/2021 e demais normativos aplicáveis, elabore {pedido} do Termo de "
+    'Referência cujo objeto é: "{objeto}".'
+)
+
+_FORMATO = (
+    "Responda apenas com o conteúdo da seção, sem o título, em parágrafos curtos e listas iniciadas por "
+    '"- ", usando **negrito** só nos rótulos. Linguagem técnica, objetiva e sem transcrever a lei.'
+)
+
+_PROMPT_SOLUCAO = """
+{contexto}
+
+O texto deve conter:
+- **Resumo da necessidade** em 3 a 5 linhas.
+- **Opções de solução**, avaliando: Opção A — execução própria pela Prefeitura; Opção B — contratação/aquisição do objeto{opcao_c}.
+- **Conclusão – Solução escolhida**, justificando a alternativa mais vantajosa (eficiência, economicidade e qualidade).
+- **Ciclo de vida do objeto**: aquisição/implantação, operação, manutenção/assistência, atualizações/treinamentos e desmobilização/descarte.
+- **Especificação técnica**: características mínimas, desempenho esperado, normas aplicáveis, prazos de atendimento e SLAs.
+
+{formato}
+"""
+
+_PROMPT_REQUISITOS = """
+{contexto}
+
+Liste de 8 a 12 requisitos objetivos e verificáveis, específicos para o objeto, em lista numerada
+("1. ", "2. ", ...), cobrindo conformidade técnica, qualificação, prazos, garantia, assistência técnica,
+documentação, segurança/conformidade regulatória, logística, medição e aceitação e sustentabilidade,
+quando pertinentes.
+
+{formato}
+"""
+
+_PROMPT_KPIS = """
+{contexto}
+
+Proponha de 3 a 6 indicadores de desempenho (SLA/KPI) mensuráveis e coerentes com o objeto, um por
+linha, no formato "- **Nome (unidade):** fórmula de cálculo ou definição", com meta sugerida quando
+couber.
+
+{formato}
+"""
+
+_PEDIDOS = {
+    "solucao": ('a seção "Descrição da Solução como um Todo (Ciclo de Vida) e Especificação dos Serviços"', _PROMPT_SOLUCAO),
+    "requisitos": ('a seção "Requisitos da Contratação"', _PROMPT_REQUISITOS),
+    "kpis": ('o item "Indicadores de Desempenho (SLA/KPI)" dos Critérios de Medição', _PROMPT_KPIS),
+}
+
+def pedido(
+    secao: str, objeto: str, incluir_opcao_hibrida: bool = True, municipio: str | None = None
+) -> tuple[str, str, list[dict]]:
+    """(tarefa, versão, mensagens) da seção, no formato de ServicoLLM.astream."""
+    if secao == "justificativa":
+        return (
+            tarefa_municipio(justificativa.TAREFA, municipio),
+            justificativa.VERSAO_PROMPT,
+            justificativa.mensagens(objeto, municipio),
+        )
+    if secao not in _PEDIDOS:
+        raise ValueError(f"Seção desconhecida: {secao!r} (use uma de {', '.join(SECOES)}).")
+    descricao, modelo = _PEDIDOS[secao]
+    tarefa = secao
+    opcao_c = ""
+    if secao == "solucao" and incluir_opcao_hibrida:
+        # a variante com Opção C é outro texto: tarefa própria no cache
+        tarefa = "solucao_hibrida"
+        opcao_c = "; Opção C — híbrida/colaborativa (parte interna + terceirização de etapas), com prós e contras"
+    texto = modelo.format(
+        contexto=_CONTEXTO.format(pedido=descricao, objeto=objeto, prefeitura=_municipio(municipio).prefeitura),
+        opcao_c=opcao_c,
+        formato=_FORMATO,
+    )
+    return tarefa_municipio(tarefa, municipio), VERSAO_PROMPT, [
+        {"role": "system", "content": justificativa.SISTEMA},
+        {"role": "user", "content": texto},
+    ]
+
+def secoes_semelhantes(
+    objeto: str,
+    secoes=SECOES,
+    incluir_opcao_hibrida: bool = True,
+    servico: ServicoLLM | None = None,
+    municipio: str | None = None,
+) -> dict[str, TextoSemelhante]:
+    """
+    Por seção, o texto já redigido para um objeto quase igual (ver
+    ServicoLLM.semelhante), para o app oferecer; seções cujo próprio objeto já
+    está no cache ficam de fora, pois saem do cache de qualquer forma.
+    """
+    servico = servico or servico_padrao()
+    objeto = objeto.strip()
+    encontrados = {}
+    for secao in secoes:
+        tarefa, versao, _ = pedido(secao, objeto, incluir_opcao_hibrida, municipio)
+        if servico.cache.obter(servico.chave(tarefa, versao, objeto)) is not None:
+            continue
+        semelhante = servico.semelhante(tarefa, versao, objeto)
+        if semelhante is not None:
+            encontrados[secao] = semelhante
+    return encontrados
+
+@dataclass
+class ResultadoRedacao:
+    textos: dict[str, str] = field(default_factory=dict)  # seção -> texto redigido
+    falhas: dict[str, str] = field(default_factory=dict)  # seção -> motivo (usa o texto padrão)
+    segundos: float = 0.0
+
+def _config(nome: str, padrao: float) -> float:
+    valor = os.environ.get(nome)
+    return float(valor) if valor else padrao
+
+async def aredigir_secoes(
+    objeto: str,
+    secoes=SECOES,
+    incluir_opcao_hibrida: bool = True,
+    servico: ServicoLLM | None = None,
+    limite: int | None = None,
+    timeout: float | None = None,
+    municipio: str | None = None,
+    aceitos: dict[str, str] | None = None,
+) -> ResultadoRedacao:
+    """
+    Redige as seções em paralelo. Deve rodar no laço do serviço (ver
+    iniciar_redacao); uma seção que estoura o tempo é abandonada aqui, mas a
+    chamada em andamento continua e grava o texto no cache para a próxima vez.
+    As seções de `aceitos` (textos de objeto semelhante que o usuário aceitou)
+    não são pedidas ao LLM e entram no resultado como estão.
+    """
+    aceitos = aceitos or {}
+    pedidas = tuple(s for s in secoes if s not in aceitos)
+    servico = servico or servico_padrao()
+    limite = int(limite or _config("TR_LLM_CONCORRENCIA", CONCORRENCIA_PADRAO))
+    timeout = timeout or _config("TR_LLM_TIMEOUT", TIMEOUT_PADRAO)
+    objeto = objeto.strip()
+    semaforo = asyncio.Semaphore(limite)
+
+    async def _redigir(secao: str) -> str:
+        tarefa, versao, mensagens = pedido(secao, objeto, incluir_opcao_hibrida, municipio)
+        async with semaforo:
+            try:
+                texto = await asyncio.wait_for(servico.agerar(tarefa, versao, objeto, mensagens), timeout)
+            except asyncio.TimeoutError:
+                raise ErroLLM(f"sem resposta em {timeout:.0f}s") from None
+        if not texto.strip():
+            raise ErroLLM("resposta vazia")
+        return texto
+
+    inicio = time.perf_counter()
+    respostas = dict(zip(pedidas, await asyncio.gather(*(_redigir(s) for s in pedidas), return_exceptions=True)))
+    resultado = ResultadoRedacao(segundos=time.perf_counter() - inicio)
+    for secao in secoes:  # na ordem pedida, qualquer que seja a ordem de chegada
+        resposta = aceitos[secao] if secao in aceitos else respostas[secao]
+        if isinstance(resposta, BaseException):
+            resultado.falhas[secao] = str(resposta) or type(resposta).__name__
+        else:
+            resultado.textos[secao] = resposta
+    return resultado
+
+def iniciar_redacao(objeto: str, secoes=SECOES, incluir_opcao_hibrida: bool = True,
+                    servico: ServicoLLM | None = None, **opcoes) -> Future:
+    """Dispara a redação no laço do serviço e devolve na hora um Future com o ResultadoRedacao."""
+    servico = servico or servico_padrao()
+    return asyncio.run_coroutine_threadsafe(
+        aredigir_secoes(objeto, secoes, incluir_opcao_hibrida, servico, **opcoes), servico.laco()
+    )
+
+def redigir_secoes(objeto: str, secoes=SECOES, incluir_opcao_hibrida: bool = True,
+                   servico: ServicoLLM | None = None, **opcoes) -> ResultadoRedacao:
+    return iniciar_redacao(objeto, secoes, incluir_opcao_hibrida, servico, **opcoes).result()
@@ -0,0 +1,373 @@
+"""
+Renderizador DOCX do modelo de documento. Além de to_docx (bytes), há saídas
+que não mantêm o arquivo inteiro em memória uma segunda vez: escrever_docx
+grava direto num caminho/arquivo e iterar_docx entrega o .docx em partes, para
+a camada HTTP/download transmitir à medida que o pacote é compactado.
+CorpoDocx monta o documento bloco a bloco e entrega os elementos gerados.
+
+As cláusulas da biblioteca (tr_core.clausulas) são renderizadas uma vez por
+município e depois só copiadas para cada documento, pelo hash do conteúdo.
+"""
+import copy
+import io
+import threading
+import zipfile
+from functools import lru_cache
+
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.opc.packuri import PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+from lxml.etree import SubElement
+
+from .base_docx import novo_documento
+from .clausulas import segmentar
+from .instrumentacao import etapa, instrumentada
+from .modelo import QUEBRA, Documento, Espaco, ItemLista, Paragrafo, Separador, Tabela, Titulo
+from .municipios import municipio as _municipio
+
+_ESTILO_ITEM = {
+    (False, 0): "List Bullet",
+    (False, 1): "List Bullet 2",
+    (True, 0): "List Number",
+    (True, 1): "List Number 2",
+}
+_ESTILO_TITULO = {1: "Heading 1", 2: "Heading 2", 3: "Heading 3"}
+_ESTILO_TABELA = "Table Grid"
+_SECTPR = qn("w:sectPr")
+
+def _ids_de_estilo(doc) -> dict:
+    # Resolver o estilo pelo nome a cada parágrafo varre todos os estilos do
+    # documento (é o que domina o custo do python-docx); resolvemos uma vez só
+    # e gravamos o styleId direto no XML. Estilos ausentes num modelo
+    # personalizado (TR_DOCX_BASE) resultam em parágrafo/tabela sem estilo.
+    estilos = doc.styles
+    ids = {}
+    for nome in (*_ESTILO_ITEM.values(), *_ESTILO_TITULO.values(), _ESTILO_TABELA):
+        try:
+            ids[nome] = estilos[nome].style_id
+        except KeyError:
+            ids[nome] = None
+    return ids
+
+# ----------------------------------
+# XML montado direto no lxml
+# ----------------------------------
+# Parágrafos, itens e linhas de tabela saem de moldes prontos (w:p com o
+# estilo, w:tr com as células) clonados por bloco, com os w:r acrescentados por
+# SubElement, em vez de uma chamada da API do python-docx por parágrafo, run ou
+# célula. Na tabela isso era quadrático: table.rows[i].cells recalcula a grade
+# inteira a cada linha. O XML gerado é o mesmo da API.
+_W_P, _W_R, _W_RPR, _W_B, _W_I, _W_T, _W_BR = (qn(t) for t in ("w:p", "w:r", "w:rPr", "w:b", "w:i", "w:t", "w:br"))
+_XML_ESPACO = qn("xml:space")
+
+@lru_cache(maxsize=None)
+def _molde_paragrafo(estilo_id: str | None):
+    p = OxmlElement("w:p")
+    if estilo_id:
+        p.style = estilo_id
+    return p
+
+def _molde_separador():
+    # linha horizontal: parágrafo vazio com borda inferior
+    p = OxmlElement("w:p")
+    borda = OxmlElement("w:bottom")
+    borda.set(qn("w:val"), "single")
+    borda.set(qn("w:sz"), "6")
+    borda.set(qn("w:space"), "1")
+    borda.set(qn("w:color"), "auto")
+    pbdr = OxmlElement("w:pBdr")
+    pbdr.append(borda)
+    p.get_or_add_pPr().append(pbdr)
+    return p
+
+def _molde_alinhado_a_direita():
+    p = OxmlElement("w:p")
+    p.get_or_add_pPr().jc_val = WD_ALIGN_PARAGRAPH.RIGHT
+    return p.pPr
+
+_SEPARADOR = _molde_separador()
+_DIREITA = _molde_alinhado_a_direita()
+
+def _run(p, texto: str, negrito: bool = False, italico: bool = False) -> None:
+    """Acrescenta a `p` o mesmo w:r de paragraph.add_run(texto) com bold/italic."""
+    r = SubElement(p, _W_R)
+    if negrito or italico:
+        rpr = SubElement(r, _W_RPR)
+        if negrito:
+            SubElement(rpr, _W_B)
+        if italico:
+            SubElement(rpr, _W_I)
+    if not texto:
+        return
+    if "\t" in texto or "\n" in texto or "\r" in texto:
+        r.text = texto  # tabulação e quebras viram w:tab/w:br (CT_R do python-docx)
+        return
+    t = SubElement(r, _W_T)
+    t.text = texto
+    if len(texto.strip()) < len(texto):
+        t.set(_XML_ESPACO, "preserve")
+
+def _paragrafo(estilo_id, trechos):
+    p = copy.deepcopy(_molde_paragrafo(estilo_id))
+    for t in trechos:
+        if t is QUEBRA:
+            SubElement(SubElement(p, _W_R), _W_BR)
+        else:
+            _run(p, t.texto, t.negrito, t.italico)
+    return p
+
+def _simples(texto: str) -> bool:
+    """Texto que vira um único w:t sem atributos (sem espaço nas pontas, tabulação ou quebra)."""
+    return bool(texto) and texto.strip() == texto and "\t" not in texto and "\n" not in texto and "\r" not in texto
+
+def _adicionar_tabela(doc, tabela: Tabela, estilo_id) -> None:
+    tbl = doc.add_table(rows=1, cols=len(tabela.cabecalho))._tbl
+    if estilo_id:
+        tbl.tblStyle_val = estilo_id
+    # a linha criada pelo python-docx (células com largura e um w:p vazio) vira o molde das demais
+    vazia = tbl.tr_lst[0]
+    tbl.remove(vazia)
+
+    def preencher(linha, negrito: bool = False):
+        tr = copy.deepcopy(vazia)
+        for p, valor, alinhamento in zip(tr.iter(_W_P), linha, tabela.alinhamentos):
+            if alinhamento == "r":
+                p.append(copy.deepcopy(_DIREITA))
+            _run(p, str(valor), negrito=negrito)
+        return tr
+
+    tbl.append(preencher(tabela.cabecalho, negrito=True))
+    # linha típica: clona uma linha já preenchida e só troca o texto de cada w:t
+    colunas = len(tabela.cabecalho)
+    preenchida = preencher(("x",) * colunas)
+    for linha in tabela.linhas:
+        textos = [str(valor) for valor in linha]
+        if len(textos) == colunas and all(_simples(t) for t in textos):
+            tr = copy.deepcopy(preenchida)
+            for t, texto in zip(tr.iter(_W_T), textos):
+                t.text = texto
+        else:
+            tr = preencher(linha)
+        tbl.append(tr)
+
+def _renderizar_blocos(doc, blocos, estilos) -> None:
+    corpo = doc.element.body
+    fim = corpo.find(_SECTPR)
+    inserir = fim.addprevious if fim is not None else corpo.append
+    for bloco in blocos:
+        tipo = type(bloco)
+        if tipo is Paragrafo:
+            inserir(_paragrafo(None, bloco.trechos))
+        elif tipo is ItemLista:
+            estilo = _ESTILO_ITEM[(bloco.numero is not None, min(bloco.nivel, 1))]
+            inserir(_paragrafo(estilos[estilo], bloco.trechos))
+        elif tipo is Titulo:
+            p = copy.deepcopy(_molde_paragrafo(estilos[_ESTILO_TITULO[min(bloco.nivel, 3)]]))
+            _run(p, bloco.texto)
+            inserir(p)
+        elif tipo is Tabela:
+            _adicionar_tabela(doc, bloco, estilos[_ESTILO_TABELA])  # o python-docx já a põe antes do sectPr
+        elif tipo is Separador:
+            inserir(copy.deepcopy(_SEPARADOR))
+        elif tipo is not Espaco:
+            raise TypeError(f"Bloco desconhecido: {tipo.__name__}")
+
+def _novo_documento(municipio: str | None):
+    """Cópia do modelo base com o papel timbrado do município."""
+    m = _municipio(municipio)
+    return novo_documento(m.docx_base, m.brasao, m.linhas_timbre)
+
+# (hash da cláusula, id do município) -> elementos w:p/w:tbl já renderizados.
+# Limitado pelo tamanho da biblioteca x municípios; as versões são imutáveis.
+_fragmentos_clausula = {}
+_trava_clausulas = threading.Lock()
+
+def _xml_clausula(clausula, id_municipio: str) -> tuple:
+    chave = (clausula.hash, id_municipio)
+    elementos = _fragmentos_clausula.get(chave)
+    if elementos is None:
+        doc = _novo_documento(id_municipio)
+        _renderizar_blocos(doc, clausula.blocos, _ids_de_estilo(doc))
+        elementos = tuple(e for e in doc.element.body if e.tag != _SECTPR)
+        with _trava_clausulas:
+            elementos = _fragmentos_clausula.setdefault(chave, elementos)
+    return elementos
+
+def _renderizar(doc, blocos, estilos, id_municipio: str) -> None:
+    """Renderiza os blocos; as cláusulas da biblioteca entram como cópia do XML já pronto."""
+    corpo = doc.element.body
+    for clausula, trecho in segmentar(blocos):
+        if clausula is None:
+            _renderizar_blocos(doc, trecho, estilos)
+            continue
+        fim = corpo.find(_SECTPR)
+        inserir = fim.addprevious if fim is not None else corpo.append
+        for elemento in _xml_clausula(clausula, id_municipio):
+            inserir(copy.deepcopy(elemento))
+
+@instrumentada("montar_docx")
+def montar_docx(documento: Documento):
+    """
+    Monta o documento do python-docx percorrendo o Documento em uma única
+    passada: títulos, parágrafos com negrito/itálico, listas com estilo do Word
+    e tabelas reais.
+    """
+    id_municipio = _municipio(documento.municipio).id
+    doc = _novo_documento(id_municipio)
+    _renderizar(doc, documento.blocos, _ids_de_estilo(doc), id_municipio)
+    return doc
+
+def fragmento_docx(blocos, municipio: str | None = None) -> tuple:
+    """
+    XML (w:p/w:tbl) de um trecho do documento, renderizado à parte para ser
+    reaproveitado por montar_docx_fragmentos (do mesmo município) enquanto o
+    trecho não mudar.
+    """
+    id_municipio = _municipio(municipio).id
+    doc = _novo_documento(id_municipio)
+    _renderizar(doc, blocos, _ids_de_estilo(doc), id_municipio)
+    corpo = doc.element.body
+    elementos = tuple(e for e in corpo if e.tag != _SECTPR)
+    for elemento in elementos:
+        corpo.remove(elemento)
+    return elementos
+
+@instrumentada("montar_docx_fragmentos")
+def montar_docx_fragmentos(fragmentos, municipio: str | None = None):
+    """Documento do python-docx com cópias dos fragmentos, na ordem (o fim do corpo é o sectPr)."""
+    doc = _novo_documento(municipio)
+    corpo = doc.element.body
+    fim = corpo.find(_SECTPR)
+    inserir = fim.addprevious if fim is not None else corpo.append
+    for fragmento in fragmentos:
+        for elemento in fragmento:
+            inserir(copy.deepcopy(elemento))
+    return doc
+
+class CorpoDocx:
+    """
+    Documento do python-docx de um município montado bloco a bloco, para quem
+    precisa dos elementos gerados (ex.: o redline de tr_core.comparacao, que os
+    marca como revisão). O que sai é o mesmo XML de montar_docx; o fim do corpo
+    continua sendo o sectPr.
+    """
+    __slots__ = ("doc", "id_municipio", "_estilos")
+
+    def __init__(self, municipio: str | None = None):
+        self.id_municipio = _municipio(municipio).id
+        self.doc = _novo_documento(self.id_municipio)
+        self._estilos = _ids_de_estilo(self.doc)
+
+    def acrescentar(self, blocos) -> list:
+        """Renderiza os blocos no fim do corpo e devolve os elementos (w:p/w:tbl) acrescentados."""
+        corpo = self.doc.element.body
+        antes = len(corpo)
+        _renderizar(self.doc, blocos, self._estilos, self.id_municipio)
+        fim = len(corpo) - (1 if corpo[-1].tag == _SECTPR else 0)
+        return corpo[fim - (len(corpo) - antes):fim]
+
+    def paragrafo(self, bloco, trechos):
+        """
+        Acrescenta um w:p com o estilo de `bloco` (título, item de lista ou
+        parágrafo) e um w:r por trecho de `trechos`; devolve o w:p.
+        """
+        tipo = type(bloco)
+        estilo = None
+        if tipo is ItemLista:
+            estilo = self._estilos[_ESTILO_ITEM[(bloco.numero is not None, min(bloco.nivel, 1))]]
+        elif tipo is Titulo:
+            estilo = self._estilos[_ESTILO_TITULO[min(bloco.nivel, 3)]]
+        p = _paragrafo(estilo, trechos)
+        corpo = self.doc.element.body
+        fim = corpo.find(_SECTPR)
+        (fim.addprevious if fim is not None else corpo.append)(p)
+        return p
+
+@instrumentada("docx_save", tamanho=len)
+def bytes_docx(doc) -> bytes:
+    bio = io.BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+@instrumentada("to_docx", tamanho=len)
+def to_docx(documento: Documento) -> bytes:
+    """DOCX completo em bytes (para o cache e o download do Streamlit)."""
+    return bytes_docx(montar_docx(documento))
+
+def escrever_docx(documento: Documento, destino) -> None:
+    """Grava o DOCX direto em `destino` (caminho ou arquivo binário aberto), sem passar por bytes."""
+    doc = montar_docx(documento)
+    with etapa("docx_save"):
+        doc.save(destino)
+
+class _Sumidouro:
+    """
+    Arquivo só de escrita que guarda apenas o que ainda não foi entregue. O
+    zipfile volta (seek) ao cabeçalho do membro que acabou de gravar para
+    anotar tamanhos e CRC; como só esvaziamos entre um membro e outro, esse
+    trecho ainda está no buffer e o .docx sai idêntico ao de to_docx.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._inicio = 0  # posição absoluta de _buffer[0]
+        self._pos = 0
+
+    def write(self, dados) -> int:
+        i = self._pos - self._inicio
+        self._buffer[i:i + len(dados)] = dados
+        self._pos += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, posicao: int, referencia: int = io.SEEK_SET) -> int:
+        if referencia == io.SEEK_CUR:
+            posicao += self._pos
+        elif referencia == io.SEEK_END:
+            posicao += self._inicio + len(self._buffer)
+        if posicao < self._inicio:
+            raise io.UnsupportedOperation("trecho já entregue")
+        self._pos = posicao
+        return posicao
+
+    def seekable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def esvaziar(self) -> bytes:
+        self._pos = self._inicio + len(self._buffer)
+        parte = bytes(self._buffer)
+        self._inicio = self._pos
+        self._buffer.clear()
+        return parte
+
+def iterar_docx(documento: Documento):
+    """
+    Gera o .docx em partes (um membro do pacote compactado por vez), na mesma
+    ordem e com os mesmos bytes de python-docx `Document.save`.
+    """
+    pacote = montar_docx(documento).part.package
+    partes = list(pacote.parts)
+    for parte in partes:
+        parte.before_marshal()
+    sumidouro = _Sumidouro()
+    with zipfile.ZipFile(sumidouro, "w", compression=zipfile.ZIP_DEFLATED) as zip_:
+        membros = (
+            ("[Content_Types].xml", lambda: _ContentTypesItem.from_parts(partes).blob),
+            (PACKAGE_URI.rels_uri.membername, lambda: pacote.rels.xml),
+        )
+        for nome, conteudo in membros:
+            zip_.writestr(nome, conteudo())
+            yield sumidouro.esvaziar()
+        for parte in partes:
+            zip_.writestr(parte.partname.membername, parte.blob)
+            if len(parte.rels):
+                zip_.writestr(parte.partname.rels_uri.membername, parte.rels.xml)
+            yield sumidouro.esvaziar()
+    yield sumidouro.esvaziar()  # diretório central
@@ -0,0 +1,60 @@
+from .instrumentacao import instrumentada
+from .modelo import QUEBRA, Documento, Espaco, ItemLista, Paragrafo, Separador, Tabela, Titulo
+
+def _trechos_md(trechos) -> str:
+    partes = []
+    for t in trechos:
+        if t is QUEBRA:
+            partes.append("  \n")
+        elif t.negrito:
+            partes.append(f"**{t.texto}**")
+        elif t.italico:
+            partes.append(f"_{t.texto}_")
+        else:
+            partes.append(t.texto)
+    return "".join(partes)
+
+def celula_md(valor) -> str:
+    """Texto de uma célula de tabela: "|" escapado e quebras de linha viram espaço (senão a tabela se parte)."""
+    texto = str(valor)
+    if "|" in texto or "\n" in texto or "\r" in texto:
+        texto = " ".join(texto.split()).replace("|", "\\|")
+    return texto
+
+def _tabela_md(tabela: Tabela) -> str:
+    recuo = "  " * tabela.nivel
+    linhas = [f"{recuo}| " + " | ".join(map(celula_md, tabela.cabecalho)) + " |"]
+    linhas.append(recuo + "|" + "|".join("---:" if a == "r" else "---" for a in tabela.alinhamentos) + "|")
+    for linha in tabela.linhas:
+        linhas.append(f"{recuo}| " + " | ".join(map(celula_md, linha)) + " |")
+    return "\n".join(linhas)
+
+def bloco_md(bloco) -> str:
+    """Markdown de um bloco (sem a quebra de linha final), memoizado no próprio nó."""
+    md = bloco._md
+    if md is not None:
+        return md
+    tipo = type(bloco)
+    if tipo is Paragrafo:
+        md = _trechos_md(bloco.trechos)
+    elif tipo is ItemLista:
+        marcador = "- " if bloco.numero is None else f"{bloco.numero}. "
+        md = "  " * bloco.nivel + marcador + _trechos_md(bloco.trechos)
+    elif tipo is Titulo:
+        md = "#" * bloco.nivel + " " + bloco.texto
+    elif tipo is Tabela:
+        md = _tabela_md(bloco)
+    elif tipo is Separador:
+        md = "---"
+    elif tipo is Espaco:
+        md = ""
+    else:
+        raise TypeError(f"Bloco desconhecido: {tipo.__name__}")
+    bloco._md = md
+    return md
+
+@instrumentada("render_markdown", tamanho=len)
+def render_markdown(documento: Documento) -> str:
+    """Renderiza o documento em Markdown, em uma única passada pelos blocos."""
+    # o teste inline do cache evita uma chamada de função por bloco fixo
+    return "\n".join([b._md if b._md is not None else bloco_md(b) for b in documento.blocos])
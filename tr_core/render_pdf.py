@@ -0,0 +1,543 @@
+"""
+Renderizador PDF do modelo de documento, para a publicação no Portal da
+Transparência e no PNCP sem passar pelo Word.
+
+O PDF é diagramado aqui mesmo, em Python puro, a partir dos blocos do TR: sem
+LibreOffice/conversor externo, não há processo a iniciar por documento, e a
+geração em lote (tr_core.lote) e o serviço HTTP usam os pools de processos que
+já têm. As fontes são as Helvetica padrão do PDF (não vão embutidas no
+arquivo), com a codificação WinAnsi (cp1252), que cobre o português; os
+poucos caracteres fora dela são trocados por equivalentes (ver _SUBSTITUICOES).
+
+Página A4 com o timbre do município no topo de cada página e "Página X de N"
+no rodapé; o brasão entra quando é JPEG (outros formatos ficam só com o texto
+do timbre). Tabelas quebram entre páginas repetindo o cabeçalho.
+
+Linha de comando:
+    python -m tr_core.render_pdf "Objeto do TR" -o tr.pdf
+"""
+import os
+import zlib
+
+from .instrumentacao import instrumentada
+from .modelo import QUEBRA, Documento, Espaco, ItemLista, Paragrafo, Separador, Tabela, Titulo
+from .municipios import municipio as _municipio
+
+# ----------------------------------
+# Fontes e medidas de texto
+# ----------------------------------
+# (negrito, itálico) -> (recurso na página, nome da fonte padrão)
+_FONTES = {
+    (False, False): (b"/F1", b"Helvetica"),
+    (True, False): (b"/F2", b"Helvetica-Bold"),
+    (False, True): (b"/F3", b"Helvetica-Oblique"),
+    (True, True): (b"/F4", b"Helvetica-BoldOblique"),
+}
+
+# Larguras (milésimos do corpo) dos caracteres 32–126, das métricas AFM da
+# Helvetica; as versões oblíquas têm as mesmas larguras das retas.
+_ASCII_REGULAR = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_ASCII_NEGRITO = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Símbolos de 0x80–0xBF (cp1252) que não são letras acentuadas
+_SIMBOLOS = {
+    "€": 556, "‚": 222, "ƒ": 556, "„": 333, "…": 1000, "†": 556, "‡": 556, "ˆ": 333,
+    "‰": 1000, "‹": 333, "Œ": 1000, "‘": 222, "’": 222, "“": 333, "”": 333, "•": 350,
+    "–": 556, "—": 1000, "˜": 333, "™": 1000, "›": 333, "œ": 944, "\u00a0": 278, "¡": 333,
+    "¢": 556, "£": 556, "¤": 556, "¥": 556, "¦": 260, "§": 556, "¨": 333, "©": 737,
+    "ª": 370, "«": 556, "¬": 584, "\u00ad": 333, "®": 737, "¯": 333, "°": 400, "±": 584,
+    "²": 333, "³": 333, "´": 333, "µ": 556, "¶": 537, "·": 278, "¸": 333, "¹": 333,
+    "º": 365, "»": 556, "¼": 834, "½": 834, "¾": 834, "¿": 611, "Æ": 1000, "×": 584,
+    "Ø": 778, "Ð": 722, "Þ": 667, "ß": 611, "æ": 889, "ð": 556, "÷": 584, "ø": 611, "þ": 556,
+}
+_SIMBOLOS_NEGRITO = {
+    "‚": 278, "„": 500, "‘": 278, "’": 278, "“": 500, "”": 500, "¶": 556, "¦": 280,
+    "¿": 611, "ß": 611, "ð": 611, "þ": 611, "ø": 611,
+}
+
+# Fora da cp1252: troca por equivalentes antes de codificar (o resto vira "?")
+_SUBSTITUICOES = str.maketrans({
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2212": "-", "\u2015": "—",
+    "\u2192": "->", "\u2190": "<-", "\u2264": "<=", "\u2265": ">=", "\u2260": "!=",
+    "\u2248": "~", "\u2032": "'", "\u2033": '"', "\u202f": " ", "\u2009": " ", "\u200b": "",
+    "\t": "    ",
+})
+
+def _tabela_larguras(ascii_: tuple, simbolos: dict) -> tuple:
+    """Largura de cada byte cp1252 (0–255) numa fonte."""
+    import unicodedata
+
+    larguras = [556] * 256
+    larguras[32:127] = ascii_
+    for byte in range(128, 256):
+        try:
+            caractere = bytes((byte,)).decode("cp1252")
+        except UnicodeDecodeError:
+            continue
+        if caractere in simbolos:
+            larguras[byte] = simbolos[caractere]
+            continue
+        base = unicodedata.normalize("NFD", caractere)[0]
+        if " " <= base <= "~":
+            larguras[byte] = ascii_[ord(base) - 32]  # letra acentuada: mesma largura da letra base
+    return tuple(larguras)
+
+# negrito -> larguras por byte (montadas na importação, que só acontece quando um PDF é pedido)
+_LARGURAS = {
+    False: _tabela_larguras(_ASCII_REGULAR, _SIMBOLOS),
+    True: _tabela_larguras(_ASCII_NEGRITO, {**_SIMBOLOS, **_SIMBOLOS_NEGRITO}),
+}
+
+def _codificar(texto: str) -> bytes:
+    return texto.translate(_SUBSTITUICOES).encode("cp1252", "replace")
+
+def _largura(dados: bytes, negrito: bool, corpo: float) -> float:
+    return sum(map(_LARGURAS[negrito].__getitem__, dados)) * corpo / 1000
+
+def _literal(dados: bytes) -> bytes:
+    return b"(" + dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r") + b")"
+
+def _n(valor: float) -> bytes:
+    return b"%.2f" % valor
+
+# ----------------------------------
+# Diagramação
+# ----------------------------------
+_CM = 72 / 2.54
+LARGURA_PAGINA, ALTURA_PAGINA = 595.28, 841.89  # A4
+_ESQUERDA, _DIREITA = 2.5 * _CM, 2 * _CM
+_TOPO, _BASE = 3.6 * _CM, 2.2 * _CM  # o timbre fica dentro da margem de cima
+_LARGURA_UTIL = LARGURA_PAGINA - _ESQUERDA - _DIREITA
+
+_CORPO, _ENTRELINHA = 11, 14.5
+_CORPO_TABELA, _ENTRELINHA_TABELA = 9.5, 12
+_TITULO = {1: (15, 22, 10), 2: (12.5, 16, 6), 3: (11.5, 12, 4)}  # nível -> (corpo, espaço antes, depois)
+_RECUO_ITEM = 18
+_FOLGA_CELULA = 4
+
+class _Linha:
+    """Linha já quebrada: segmentos (x, negrito, itálico, bytes) relativos ao início da linha."""
+    __slots__ = ("segmentos", "largura")
+
+    def __init__(self):
+        self.segmentos = []
+        self.largura = 0.0
+
+    def acrescentar(self, x: float, negrito: bool, italico: bool, dados: bytes, largura: float) -> None:
+        if self.segmentos:
+            ultimo = self.segmentos[-1]
+            if ultimo[1] == negrito and ultimo[2] == italico:
+                # mesmo estilo na sequência: um só comando de texto (o espaço vai junto)
+                self.segmentos[-1] = (ultimo[0], negrito, italico, ultimo[3] + b" " * (x > self.largura) + dados)
+                self.largura = x + largura
+                return
+        self.segmentos.append((x, negrito, italico, dados))
+        self.largura = x + largura
+
+def _palavras(trechos):
+    """
+    Palavras (listas de pedaços (negrito, itálico, bytes, largura em milésimos))
+    e None para as quebras de linha forçadas. Cada trecho é codificado uma vez só.
+    """
+    palavra = []
+    for trecho in trechos:
+        if trecho is QUEBRA:
+            if palavra:
+                yield palavra
+                palavra = []
+            yield None
+            continue
+        negrito, italico = trecho.negrito, trecho.italico
+        medir = _LARGURAS[negrito].__getitem__
+        for j, linha in enumerate(_codificar(trecho.texto).split(b"\n")):
+            if j:
+                if palavra:
+                    yield palavra
+                    palavra = []
+                yield None
+            for i, parte in enumerate(linha.split(b" ")):
+                if i and palavra:
+                    yield palavra
+                    palavra = []
+                if parte:
+                    palavra.append((negrito, italico, parte, sum(map(medir, parte))))
+    if palavra:
+        yield palavra
+
+def quebrar_linhas(trechos, largura: float, corpo: float = _CORPO) -> list:
+    """Quebra os trechos em linhas de até `largura` pontos (só nos espaços, salvo palavras maiores que a linha)."""
+    linhas = [_Linha()]
+    escala = corpo / 1000
+    espaco = 278 * escala
+    for palavra in _palavras(trechos):
+        if palavra is None:
+            linhas.append(_Linha())
+            continue
+        medidas = [unidades * escala for *_, unidades in palavra]
+        total = sum(medidas)
+        linha = linhas[-1]
+        x = linha.largura + espaco if linha.segmentos else 0.0
+        if x + total > largura and linha.segmentos:
+            linha = _Linha()
+            linhas.append(linha)
+            x = 0.0
+        for (negrito, italico, dados, _), medida in zip(palavra, medidas):
+            if x + medida > largura and medida > largura / 2:
+                # palavra maior que a linha (ex.: URL): corta por caractere
+                larguras = _LARGURAS[negrito]
+                inicio = 0
+                for fim in range(1, len(dados) + 1):
+                    trecho = sum(larguras[b] for b in dados[inicio:fim]) * corpo / 1000
+                    if x + trecho > largura and fim - 1 > inicio:
+                        linha.acrescentar(x, negrito, italico, dados[inicio:fim - 1], _largura(dados[inicio:fim - 1], negrito, corpo))
+                        linha = _Linha()
+                        linhas.append(linha)
+                        x, inicio = 0.0, fim - 1
+                medida = _largura(dados[inicio:], negrito, corpo)
+                dados = dados[inicio:]
+            linha.acrescentar(x, negrito, italico, dados, medida)
+            x += medida
+    return linhas
+
+class _Diagramador:
+    """Distribui os blocos em páginas; cada página é uma lista de comandos do fluxo de conteúdo."""
+
+    def __init__(self):
+        self.paginas = []
+        self.nova_pagina()
+
+    def nova_pagina(self) -> None:
+        self.comandos = []
+        self.paginas.append(self.comandos)
+        self.y = ALTURA_PAGINA - _TOPO
+
+    def caber(self, altura: float) -> None:
+        """Garante `altura` pontos livres, abrindo uma página se preciso (salvo no topo de uma página vazia)."""
+        if self.y - altura < _BASE and self.y < ALTURA_PAGINA - _TOPO:
+            self.nova_pagina()
+
+    def texto(self, x: float, y: float, negrito: bool, italico: bool, corpo: float, dados: bytes) -> None:
+        self.comandos.append(
+            b"BT %s %s Tf %s %s Td %s Tj ET" % (_FONTES[negrito, italico][0], _n(corpo), _n(x), _n(y), _literal(dados))
+        )
+
+    def linhas(self, linhas, x: float, corpo: float, entrelinha: float, alinhar_direita: float | None = None,
+               paginar: bool = True) -> None:
+        for linha in linhas:
+            if paginar:
+                self.caber(entrelinha)
+            self.y -= entrelinha
+            deslocamento = x if alinhar_direita is None else alinhar_direita - linha.largura
+            for xs, negrito, italico, dados in linha.segmentos:
+                self.texto(deslocamento + xs, self.y + entrelinha * 0.25, negrito, italico, corpo, dados)
+
+    def linha_horizontal(self, x0: float, x1: float, y: float, espessura: float = 0.5) -> None:
+        self.comandos.append(b"%s w %s %s m %s %s l S" % (_n(espessura), _n(x0), _n(y), _n(x1), _n(y)))
+
+    # --- blocos ---
+    def titulo(self, bloco: Titulo) -> None:
+        corpo, antes, depois = _TITULO.get(bloco.nivel, _TITULO[3])
+        linhas = quebrar_linhas(((_Trecho(bloco.texto)),), _LARGURA_UTIL, corpo)
+        entrelinha = corpo * 1.3
+        # título não fica sozinho no pé da página: exige espaço para ele e duas linhas de texto
+        self.caber(antes + entrelinha * len(linhas) + 2 * _ENTRELINHA)
+        if self.y < ALTURA_PAGINA - _TOPO:
+            self.y -= antes
+        self.linhas(linhas, _ESQUERDA, corpo, entrelinha)
+        self.y -= depois
+
+    def paragrafo(self, bloco: Paragrafo) -> None:
+        self.linhas(quebrar_linhas(bloco.trechos, _LARGURA_UTIL), _ESQUERDA, _CORPO, _ENTRELINHA)
+        self.y -= 6
+
+    def item(self, bloco: ItemLista) -> None:
+        recuo = _ESQUERDA + _RECUO_ITEM * (bloco.nivel + 1)
+        linhas = quebrar_linhas(bloco.trechos, LARGURA_PAGINA - _DIREITA - recuo)
+        self.caber(_ENTRELINHA)
+        rotulo = f"{bloco.numero}." if bloco.numero is not None else ("•" if bloco.nivel == 0 else "–")
+        dados = _codificar(rotulo)
+        # o marcador vem antes do texto no fluxo, para a ordem de leitura/cópia do PDF
+        self.texto(recuo - 4 - _largura(dados, False, _CORPO), self.y - _ENTRELINHA * 0.75, False, False, _CORPO, dados)
+        self.linhas(linhas, recuo, _CORPO, _ENTRELINHA)
+        self.y -= 3
+
+    def separador(self) -> None:
+        self.caber(12)
+        self.y -= 6
+        self.linha_horizontal(_ESQUERDA, LARGURA_PAGINA - _DIREITA, self.y, 0.75)
+        self.y -= 6
+
+    def espaco(self) -> None:
+        self.y -= _ENTRELINHA * 0.5
+
+    def tabela(self, bloco: Tabela) -> None:
+        x0 = _ESQUERDA + _RECUO_ITEM * bloco.nivel
+        larguras = _larguras_colunas(bloco, LARGURA_PAGINA - _DIREITA - x0)
+        direita = [a == "r" for a in bloco.alinhamentos]
+
+        def celulas(textos, negrito):
+            resultado = []
+            for texto, larg in zip(textos, larguras):
+                texto = str(texto)
+                dados = _codificar(texto)
+                medida = _largura(dados, negrito, _CORPO_TABELA)
+                if medida <= larg - 2 * _FOLGA_CELULA and "\n" not in texto:
+                    # a maioria das células cabe numa linha: sem separar palavras
+                    linha = _Linha()
+                    linha.acrescentar(0.0, negrito, False, dados, medida)
+                    resultado.append((linha,))
+                else:
+                    resultado.append(quebrar_linhas((_Trecho(texto, negrito),), larg - 2 * _FOLGA_CELULA, _CORPO_TABELA))
+            return resultado
+
+        cabecalho = celulas(bloco.cabecalho, True)
+        altura_cabecalho = _altura_linha(cabecalho)
+
+        def desenhar(linhas_celulas, altura, fundo=False):
+            topo = self.y
+            if fundo:
+                self.comandos.append(b"0.9 g %s %s %s %s re f 0 g" % (_n(x0), _n(topo - altura), _n(sum(larguras)), _n(altura)))
+            x = x0
+            for linhas, larg, a_direita in zip(linhas_celulas, larguras, direita):
+                self.y = topo - _FOLGA_CELULA / 2
+                self.linhas(linhas, x + _FOLGA_CELULA, _CORPO_TABELA, _ENTRELINHA_TABELA,
+                            x + larg - _FOLGA_CELULA if a_direita else None, paginar=False)
+                self.comandos.append(b"%s %s %s %s re S" % (_n(x), _n(topo - altura), _n(larg), _n(altura)))
+                x += larg
+            self.y = topo - altura
+
+        self.caber(altura_cabecalho + _ENTRELINHA_TABELA + _FOLGA_CELULA)
+        self.comandos.append(b"0.5 w")
+        desenhar(cabecalho, altura_cabecalho, fundo=True)
+        for linha in bloco.linhas:
+            linhas_celulas = celulas(linha, False)
+            altura = _altura_linha(linhas_celulas)
+            if self.y - altura < _BASE:
+                self.nova_pagina()
+                self.comandos.append(b"0.5 w")
+                desenhar(cabecalho, altura_cabecalho, fundo=True)
+            desenhar(linhas_celulas, altura)
+        self.y -= 6
+
+def _altura_linha(linhas_celulas) -> float:
+    return max(len(linhas) for linhas in linhas_celulas) * _ENTRELINHA_TABELA + _FOLGA_CELULA
+
+def _larguras_colunas(tabela: Tabela, disponivel: float) -> list:
+    """
+    Largura natural de cada coluna (maior texto, sem quebra); se não couber
+    tudo, as colunas estreitas ficam com a natural e as largas dividem o resto
+    na proporção do seu conteúdo, sem descer abaixo da maior palavra do
+    cabeçalho (que não é cortada no meio).
+    """
+    naturais = [_largura(_codificar(str(t)), True, _CORPO_TABELA) for t in tabela.cabecalho]
+    minimos = [max(_largura(_codificar(p), True, _CORPO_TABELA) for p in str(t).split() or ("",)) for t in tabela.cabecalho]
+    for linha in tabela.linhas:
+        for i, texto in enumerate(linha):
+            medida = _largura(_codificar(str(texto)), False, _CORPO_TABELA)
+            if medida > naturais[i]:
+                naturais[i] = medida
+    folga = 2 * _FOLGA_CELULA + 1
+    naturais = [n + folga for n in naturais]
+    minimos = [m + folga for m in minimos]
+    total = sum(naturais)
+    if total <= disponivel:
+        return [n * disponivel / total for n in naturais]
+    justa = disponivel / len(naturais)
+    estreitas = [n if n <= justa else None for n in naturais]
+    resto = disponivel - sum(n for n in estreitas if n is not None)
+    largas = sum(n for n, e in zip(naturais, estreitas) if e is None)
+    larguras = [e if e is not None else n * resto / largas for n, e in zip(naturais, estreitas)]
+    falta = sum(max(0.0, m - l) for m, l in zip(minimos, larguras))
+    sobra = sum(max(0.0, l - m) for m, l in zip(minimos, larguras))
+    if falta and sobra > falta:
+        # as colunas abaixo do mínimo crescem; as demais cedem na proporção da folga que têm
+        larguras = [m if l < m else l - (l - m) * falta / sobra for m, l in zip(minimos, larguras)]
+    return larguras
+
+class _Trecho:
+    """Trecho de estilo uniforme montado aqui (títulos e células), com a mesma interface de modelo.Trecho."""
+    __slots__ = ("texto", "negrito", "italico")
+
+    def __init__(self, texto: str, negrito: bool = True, italico: bool = False):
+        self.texto = texto
+        self.negrito = negrito
+        self.italico = italico
+
+def _timbre(id_municipio: str | None) -> tuple:
+    m = _municipio(id_municipio)
+    brasao = m.brasao or os.environ.get("TR_DOCX_BRASAO") or None
+    return m.linhas_timbre, brasao
+
+def _jpeg(caminho: str):
+    """(bytes, largura, altura, componentes) de um JPEG, ou None se não for JPEG legível."""
+    try:
+        with open(caminho, "rb") as f:
+            dados = f.read()
+    except OSError:
+        return None
+    if dados[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 < len(dados):
+        if dados[i] != 0xFF:
+            return None
+        marcador = dados[i + 1]
+        tamanho = int.from_bytes(dados[i + 2:i + 4], "big")
+        if 0xC0 <= marcador <= 0xCF and marcador not in (0xC4, 0xC8, 0xCC):
+            altura = int.from_bytes(dados[i + 5:i + 7], "big")
+            largura = int.from_bytes(dados[i + 7:i + 9], "big")
+            return dados, largura, altura, dados[i + 9]
+        i += 2 + tamanho
+    return None
+
+def _cabecalho_rodape(pagina: int, total: int, timbre: tuple, brasao) -> bytes:
+    comandos = []
+    y = ALTURA_PAGINA - 1.2 * _CM
+    if brasao is not None:
+        altura = 1.4 * _CM
+        largura = altura * brasao[1] / brasao[2]
+        y -= altura
+        comandos.append(b"q %s 0 0 %s %s %s cm /Im1 Do Q" % (_n(largura), _n(altura), _n((LARGURA_PAGINA - largura) / 2), _n(y)))
+        y -= 4
+    for n, linha in enumerate(timbre):
+        negrito = n == 0
+        corpo = 12 if negrito else 10
+        dados = _codificar(linha)
+        y -= corpo * 1.25
+        x = (LARGURA_PAGINA - _largura(dados, negrito, corpo)) / 2
+        comandos.append(b"BT %s %s Tf %s %s Td %s Tj ET" % (_FONTES[negrito, False][0], _n(corpo), _n(x), _n(y), _literal(dados)))
+    y -= 6
+    comandos.append(b"0.5 w %s %s m %s %s l S" % (_n(_ESQUERDA), _n(y), _n(LARGURA_PAGINA - _DIREITA), _n(y)))
+    rodape = _codificar(f"Página {pagina} de {total}")
+    x = (LARGURA_PAGINA - _largura(rodape, False, 8.5)) / 2
+    comandos.append(b"0.4 g BT /F1 8.5 Tf %s %s Td %s Tj ET 0 g" % (_n(x), _n(1.2 * _CM), _literal(rodape)))
+    return b"\n".join(comandos)
+
+@instrumentada("diagramar_pdf")
+def diagramar(documento: Documento) -> list:
+    """Comandos de desenho (sem timbre e rodapé) de cada página do documento."""
+    diagramador = _Diagramador()
+    for bloco in documento.blocos:
+        if isinstance(bloco, Paragrafo):
+            diagramador.paragrafo(bloco)
+        elif isinstance(bloco, ItemLista):
+            diagramador.item(bloco)
+        elif isinstance(bloco, Titulo):
+            diagramador.titulo(bloco)
+        elif isinstance(bloco, Tabela):
+            diagramador.tabela(bloco)
+        elif isinstance(bloco, Separador):
+            diagramador.separador()
+        elif isinstance(bloco, Espaco):
+            diagramador.espaco()
+    return diagramador.paginas
+
+# ----------------------------------
+# Arquivo PDF
+# ----------------------------------
+def _texto_info(texto: str) -> bytes:
+    return b"<FEFF" + texto.encode("utf-16-be").hex().upper().encode() + b">"
+
+def _titulo_documento(documento: Documento) -> str:
+    return next((b.texto for b in documento.blocos if isinstance(b, Titulo)), "Termo de Referência")
+
+@instrumentada("montar_pdf", tamanho=len)
+def montar_pdf(documento: Documento) -> bytes:
+    """PDF 1.4 completo em bytes; fluxos de conteúdo comprimidos (Flate)."""
+    paginas = diagramar(documento)
+    timbre, brasao = _timbre(documento.municipio)
+    imagem = _jpeg(brasao) if brasao else None
+
+    objetos = []  # corpo de cada objeto; o número é a posição + 1
+
+    def novo(corpo: bytes = b"") -> int:
+        objetos.append(corpo)
+        return len(objetos)
+
+    catalogo, raiz_paginas, info = novo(), novo(), novo()
+    fontes = b" ".join(
+        b"%s %d 0 R" % (recurso, novo(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % nome))
+        for recurso, nome in _FONTES.values()
+    )
+    recursos = b"<< /Font << %s >>" % fontes
+    if imagem is not None:
+        dados, largura, altura, componentes = imagem
+        espaco_cor = {1: b"/DeviceGray", 4: b"/DeviceCMYK"}.get(componentes, b"/DeviceRGB")
+        id_imagem = novo(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 "
+            b"/Filter /DCTDecode /Length %d >>\nstream\n%s\nendstream" % (largura, altura, espaco_cor, len(dados), dados)
+        )
+        recursos += b" /XObject << /Im1 %d 0 R >>" % id_imagem
+    recursos += b" >>"
+
+    filhos = []
+    for numero, comandos in enumerate(paginas, 1):
+        conteudo = zlib.compress(
+            _cabecalho_rodape(numero, len(paginas), timbre, imagem) + b"\n" + b"\n".join(comandos), 6
+        )
+        id_conteudo = novo(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(conteudo), conteudo))
+        filhos.append(novo(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Resources %s /Contents %d 0 R >>"
+            % (raiz_paginas, _n(LARGURA_PAGINA), _n(ALTURA_PAGINA), recursos, id_conteudo)
+        ))
+
+    objetos[catalogo - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % raiz_paginas
+    objetos[raiz_paginas - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % f for f in filhos), len(filhos)
+    )
+    objetos[info - 1] = b"<< /Title %s /Producer %s >>" % (
+        _texto_info(_titulo_documento(documento)), _texto_info("tr_core (Lei nº 14.133/2021)")
+    )
+
+    saida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    posicoes = []
+    for numero, corpo in enumerate(objetos, 1):
+        posicoes.append(len(saida))
+        saida += b"%d 0 obj\n%s\nendobj\n" % (numero, corpo)
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    saida += b"".join(b"%010d 00000 n \n" % p for p in posicoes)
+    saida += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objetos) + 1, catalogo, info, inicio_xref
+    )
+    return bytes(saida)
+
+def to_pdf(documento: Documento) -> bytes:
+    """PDF completo em bytes (para o cache e o download do Streamlit)."""
+    return montar_pdf(documento)
+
+def escrever_pdf(documento: Documento, destino) -> None:
+    """Grava o PDF em `destino` (caminho ou arquivo binário aberto)."""
+    dados = montar_pdf(documento)
+    if hasattr(destino, "write"):
+        destino.write(dados)
+    else:
+        with open(destino, "wb") as f:
+            f.write(dados)
+
+if __name__ == "__main__":
+    import argparse
+
+    from .gerador import montar_tr
+
+    parser = argparse.ArgumentParser(prog="python -m tr_core.render_pdf", description="Gera o TR padrão de um objeto em PDF.")
+    parser.add_argument("objeto")
+    parser.add_argument("-o", "--saida", default="tr.pdf")
+    parser.add_argument("--municipio", default=None)
+    args = parser.parse_args()
+    opcionais = {"municipio": args.municipio} if args.municipio else {}
+    escrever_pdf(montar_tr(args.objeto, [], 12, True, True, **opcionais), args.saida)
+    print(args.saida)
@@ -0,0 +1,251 @@
+"""
+Repositório dos TRs gerados, em SQLite (modo WAL): cada TR é guardado com as
+entradas do formulário (inclusive os textos redigidos pelo LLM) e o Markdown
+emitido, e entra num índice de texto completo (FTS5) sobre o objeto e as
+seções redigidas. Assim uma secretaria encontra, em milissegundos, TRs já
+feitos para objetos parecidos e pode partir de um deles em vez de gerar (e
+pagar a redação) de novo.
+
+    repositorio = repositorio_padrao()
+    repositorio.salvar(entradas)                     # mesmos argumentos de montar_tr
+    for tr in repositorio.buscar("locação de veículos"):
+        print(tr.id, tr.objeto, tr.criado_em)
+    repositorio.obter(tr.id).entradas                # para montar_tr(**entradas)
+    repositorio.obter(tr.id).clausulas               # id -> hash das cláusulas usadas
+    repositorio.com_clausula(hash_antigo)            # TRs emitidos com essa versão
+
+Configuração por variável de ambiente:
+    TR_REPOSITORIO   arquivo do banco (padrão: dados_tr/trs.sqlite3)
+
+Linha de comando:
+    python -m tr_core.repositorio buscar "locação de veículos" [-n 10]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+from .cache import chave_documento
+from .clausulas import clausulas_usadas
+from .gerador import montar_tr
+from .municipios import municipio_padrao
+from .render_markdown import render_markdown
+
+VERSAO_ESQUEMA = 2
+
+# Seções redigidas (parâmetros de montar_tr) que entram no índice junto com o
+# objeto; o texto padrão do template é igual em todos os TRs e não ajuda a busca.
+SECOES_INDEXADAS = ("justificativa", "solucao", "requisitos", "kpis")
+
+# Peso do objeto x seções no bm25
+PESO_OBJETO = 4.0
+PESO_SECOES = 1.0
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tr (
+    id        INTEGER PRIMARY KEY,
+    chave     TEXT NOT NULL UNIQUE,  -- chave_documento: o mesmo TR não é guardado duas vezes
+    criado_em TEXT NOT NULL,
+    objeto    TEXT NOT NULL,
+    municipio TEXT NOT NULL,
+    entradas  TEXT NOT NULL,         -- JSON com os argumentos de montar_tr e a data
+    markdown  BLOB NOT NULL,         -- Markdown emitido, comprimido (zlib)
+    clausulas TEXT                   -- conjunto_clausulas.hash (NULL nos TRs anteriores à versão 2)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS tr_busca USING fts5(
+    objeto, secoes, content='', tokenize='unicode61 remove_diacritics 2'
+);
+-- Cláusulas da biblioteca (tr_core.clausulas) usadas pelos TRs. Só há
+-- poucas combinações (variantes de 4 e 6.4), então cada uma é gravada uma vez
+-- e o TR guarda apenas o hash dela.
+CREATE TABLE IF NOT EXISTS conjunto_clausulas (
+    hash      TEXT PRIMARY KEY,
+    clausulas TEXT NOT NULL          -- JSON: id da cláusula -> hash da versão
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tr_clausulas ON tr (clausulas);
+"""
+
+# Alterações para bancos criados numa versão anterior do esquema
+_MIGRACOES = {
+    2: "ALTER TABLE tr ADD COLUMN clausulas TEXT",
+}
+
+_PALAVRA = re.compile(r"\w+")
+_PALAVRAS_VAZIAS = frozenset("com das dos nas nos para pela pelo por sem que uma".split())
+
+def termos_de_busca(texto: str) -> str:
+    """
+    Consulta FTS5 a partir de um objeto em texto livre: palavras com 3 letras
+    ou mais, sem acento, com prefixo (plural incluído) e ligadas por OR, para
+    que o bm25 ordene pelos TRs que têm mais termos em comum.
+    """
+    sem_acento = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+    termos = []
+    for palavra in _PALAVRA.findall(sem_acento):
+        if len(palavra) < 3 or palavra in _PALAVRAS_VAZIAS or palavra.isdigit():
+            continue
+        if len(palavra) > 4 and palavra.endswith("s"):
+            palavra = palavra[:-1]
+        termo = f'"{palavra}"*'
+        if termo not in termos:
+            termos.append(termo)
+    return " OR ".join(termos)
+
+@dataclass
+class TRSalvo:
+    id: int
+    criado_em: str
+    objeto: str
+    municipio: str
+    pontuacao: float = 0.0     # bm25 da busca (menor = mais parecido)
+    entradas: dict | None = None
+    markdown: str | None = None
+    clausulas: dict | None = None  # id -> hash das cláusulas da biblioteca usadas
+
+def _serializavel(entradas: dict) -> dict:
+    """Entradas como JSON: a tabela de itens (tr_core.itens) vai em colunas."""
+    if entradas.get("itens"):
+        return {**entradas, "itens": entradas["itens"].para_json()}
+    return {k: v for k, v in entradas.items() if k != "itens"}
+
+class Repositorio:
+    """Uma conexão por thread (as sessões do Streamlit rodam em threads diferentes)."""
+
+    def __init__(self, caminho):
+        self.caminho = str(caminho)
+        if self.caminho != ":memory:":
+            Path(self.caminho).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conexao()  # cria o esquema já na abertura
+
+    def _conexao(self) -> sqlite3.Connection:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5.0)
+            conexao.execute("PRAGMA journal_mode=WAL")  # leitores não esperam o gravador
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+            if versao < VERSAO_ESQUEMA:
+                with conexao:
+                    if versao:
+                        for nova in range(versao + 1, VERSAO_ESQUEMA + 1):
+                            conexao.execute(_MIGRACOES[nova])
+                    conexao.executescript(_ESQUEMA)
+                    conexao.execute(f"PRAGMA user_version={VERSAO_ESQUEMA}")
+            self._local.conexao = conexao
+        return conexao
+
+    def salvar(self, entradas: dict, markdown: str | None = None, data: str | None = None) -> int:
+        """
+        Guarda o TR (argumentos de montar_tr) e devolve o id. `markdown` é o
+        texto já emitido; se omitido, é gerado aqui. Um TR idêntico (mesmas
+        entradas e data) devolve o id do que já está guardado.
+        """
+        data = data or date.today().strftime("%d/%m/%Y")
+        entradas = {**entradas, "secretarias": list(entradas.get("secretarias") or [])}
+        entradas.setdefault("municipio", municipio_padrao().nome)
+        documento = montar_tr(**entradas, data=data)
+        if markdown is None:
+            markdown = render_markdown(documento)
+        chave = chave_documento(**entradas, data=data)
+        clausulas = json.dumps(clausulas_usadas(documento), sort_keys=True)
+        conjunto = hashlib.sha256(clausulas.encode("ascii")).hexdigest()[:16]
+        conexao = self._conexao()
+        with conexao:
+            cursor = conexao.execute(
+                "INSERT OR IGNORE INTO tr (chave, criado_em, objeto, municipio, entradas, markdown, clausulas) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    chave,
+                    datetime.now().isoformat(timespec="seconds"),
+                    entradas["objeto"].strip(),
+                    entradas["municipio"],
+                    json.dumps({**_serializavel(entradas), "data": data}, ensure_ascii=False),
+                    zlib.compress(markdown.encode("utf-8")),
+                    conjunto,
+                ),
+            )
+            if not cursor.rowcount:
+                return conexao.execute("SELECT id FROM tr WHERE chave = ?", (chave,)).fetchone()[0]
+            secoes = "\n\n".join(entradas[s] for s in SECOES_INDEXADAS if entradas.get(s))
+            conexao.execute(
+                "INSERT INTO tr_busca (rowid, objeto, secoes) VALUES (?, ?, ?)",
+                (cursor.lastrowid, entradas["objeto"], secoes),
+            )
+            conexao.execute(
+                "INSERT OR IGNORE INTO conjunto_clausulas (hash, clausulas) VALUES (?, ?)", (conjunto, clausulas)
+            )
+            return cursor.lastrowid
+
+    def buscar(self, objeto: str, limite: int = 10) -> list[TRSalvo]:
+        """TRs com objeto/seções parecidos com `objeto`, do mais para o menos parecido."""
+        consulta = termos_de_busca(objeto)
+        if not consulta:
+            return []
+        linhas = self._conexao().execute(
+            "SELECT tr.id, tr.criado_em, tr.objeto, tr.municipio, busca.pontuacao "
+            "FROM (SELECT rowid, bm25(tr_busca, ?, ?) AS pontuacao FROM tr_busca "
+            "      WHERE tr_busca MATCH ? ORDER BY pontuacao LIMIT ?) AS busca "
+            "JOIN tr ON tr.id = busca.rowid ORDER BY busca.pontuacao",
+            (PESO_OBJETO, PESO_SECOES, consulta, limite),
+        ).fetchall()
+        return [TRSalvo(*linha) for linha in linhas]
+
+    def obter(self, id_tr: int) -> TRSalvo | None:
+        """TR completo: entradas (para montar_tr, sem a data) e o Markdown emitido."""
+        linha = self._conexao().execute(
+            "SELECT tr.id, tr.criado_em, tr.objeto, tr.municipio, tr.entradas, tr.markdown, c.clausulas "
+            "FROM tr LEFT JOIN conjunto_clausulas AS c ON c.hash = tr.clausulas WHERE tr.id = ?",
+            (id_tr,),
+        ).fetchone()
+        if linha is None:
+            return None
+        entradas = json.loads(linha[4])
+        entradas.pop("data", None)
+        if entradas.get("itens"):
+            from .itens import TabelaItens
+
+            entradas["itens"] = TabelaItens.de_json(entradas["itens"])
+        return TRSalvo(
+            *linha[:4],
+            entradas=entradas,
+            markdown=zlib.decompress(linha[5]).decode("utf-8"),
+            clausulas=json.loads(linha[6]) if linha[6] else {},
+        )
+
+    def com_clausula(self, hash_clausula: str) -> list[int]:
+        """Ids dos TRs que usaram a versão da cláusula com esse hash (ex.: antes de uma mudança no texto)."""
+        linhas = self._conexao().execute(
+            "SELECT id FROM tr WHERE clausulas IN "
+            "(SELECT c.hash FROM conjunto_clausulas AS c, json_each(c.clausulas) AS j WHERE j.value = ?) "
+            "ORDER BY id",
+            (hash_clausula,),
+        )
+        return [linha[0] for linha in linhas]
+
+    def __len__(self):
+        return self._conexao().execute("SELECT count(*) FROM tr").fetchone()[0]
+
+@lru_cache(maxsize=None)
+def repositorio_padrao() -> Repositorio:
+    return Repositorio(os.environ.get("TR_REPOSITORIO") or "dados_tr/trs.sqlite3")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca nos TRs já gerados.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    buscar = sub.add_parser("buscar", help="TRs com objeto parecido")
+    buscar.add_argument("objeto")
+    buscar.add_argument("-n", type=int, default=10, help="quantidade de resultados")
+    args = parser.parse_args()
+
+    for tr in repositorio_padrao().buscar(args.objeto, args.n):
+        print(f"{tr.id:>6}  {tr.criado_em}  {tr.municipio}  {tr.objeto}")
@@ -0,0 +1,11 @@
+# ----------------------------------
+# Lista de Secretarias do município padrão (multiselect)
+# ----------------------------------
+# A lista de cada prefeitura fica no seu TOML (tr_core/municipios); o registro
+# só é lido no primeiro acesso a SECRETARIAS_PADRAO.
+from .municipios import municipio_padrao
+
+def __getattr__(nome):
+    if nome == "SECRETARIAS_PADRAO":
+        return list(municipio_padrao().secretarias)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
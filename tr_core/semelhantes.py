@@ -0,0 +1,121 @@
+"""
+Busca local de objetos parecidos, para reaproveitar um texto já redigido pelo
+LLM quando o objeto difere de um anterior só na grafia ("Locação de veículos
+utilitários com motorista" x "locação de veículos utilitários c/ motorista").
+
+O objeto é normalizado (caixa, acentos, pontuação e abreviações comuns) e
+vira um vetor TF-IDF de n-gramas de caracteres e de palavras, projetado num
+espaço de dimensão fixa (hashing). A busca é o cosseno contra todos os objetos
+do índice numa única multiplicação de matriz (NumPy), sem serviço externo.
+"""
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+DIMENSOES = 2**11
+TAMANHO_NGRAMA = 3
+
+_ABREVIACOES = (
+    (re.compile(r"\bc/\s*"), "com "),
+    (re.compile(r"\bs/\s*"), "sem "),
+    (re.compile(r"\bp/\s*"), "para "),
+    (re.compile(r"\bqtd[e]?\b\.?"), "quantidade"),
+    (re.compile(r"\bsec\b\.?"), "secretaria"),
+)
+_NAO_PALAVRA = re.compile(r"[^a-z0-9]+")
+
+def normalizar_objeto(texto: str) -> str:
+    """
+    Minúsculas, sem acentos, abreviações expandidas, palavras sem o "s" do
+    plural e só letras/números separados por um espaço.
+    """
+    texto = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+    for padrao, troca in _ABREVIACOES:
+        texto = padrao.sub(troca, texto)
+    return " ".join(p[:-1] if len(p) > 3 and p.endswith("s") else p for p in _NAO_PALAVRA.split(texto) if p)
+
+# Palavras que não mudam o objeto ("locação de veículos" = "locação veículos");
+# "com"/"sem"/"para" ficam de fora daqui porque mudam.
+_PALAVRAS_VAZIAS = frozenset(("a", "o", "as", "os", "ao", "aos", "de", "da", "do", "das", "dos",
+                              "e", "em", "no", "na", "nos", "nas", "um", "uma"))
+
+def palavras_de_conteudo(texto: str) -> frozenset:
+    """
+    Palavras do objeto normalizado, sem artigos e preposições: dois objetos só
+    são "o mesmo" com o mesmo conjunto ("manutenção preventiva" não é
+    "manutenção preventiva e corretiva", por alto que seja o cosseno).
+    """
+    return frozenset(normalizar_objeto(texto).split()) - _PALAVRAS_VAZIAS
+
+def _indices(normalizado: str) -> list[int]:
+    # n-gramas de caracteres (com as bordas das palavras) e as próprias
+    # palavras: estas pesam a troca de uma palavra inteira (ex.: "com" x "sem",
+    # "aro 15" x "aro 16") mais do que uma diferença de grafia.
+    com_bordas = f" {normalizado} "
+    termos = [com_bordas[i:i + TAMANHO_NGRAMA] for i in range(len(com_bordas) - TAMANHO_NGRAMA + 1)]
+    termos += [f"#{palavra}" for palavra in normalizado.split()]
+    return [zlib.crc32(t.encode("ascii")) % DIMENSOES for t in termos]
+
+def _contagens(normalizado: str) -> np.ndarray:
+    return np.bincount(_indices(normalizado), minlength=DIMENSOES).astype(np.float32)
+
+class IndiceSemelhantes:
+    """Objetos (normalizados) e o valor associado a cada um, com busca pelo cosseno TF-IDF."""
+
+    def __init__(self):
+        self.objetos = []   # objeto original de cada linha
+        self.valores = []
+        self._normalizados = {}  # normalizado -> linha
+        self._linhas = []        # contagens de cada objeto, empilhadas sob demanda
+        self._matriz = None      # TF-IDF normalizado (linhas x DIMENSOES)
+        self._idf = None
+
+    def __len__(self):
+        return len(self.objetos)
+
+    def adicionar(self, objeto: str, valor) -> None:
+        normalizado = normalizar_objeto(objeto)
+        if not normalizado:
+            return
+        linha = self._normalizados.get(normalizado)
+        if linha is not None:  # mesmo objeto normalizado: fica o valor mais recente
+            self.valores[linha] = valor
+            return
+        self._normalizados[normalizado] = len(self.objetos)
+        self.objetos.append(objeto)
+        self.valores.append(valor)
+        self._linhas.append(_contagens(normalizado))
+        self._matriz = None
+
+    def _preparar(self) -> None:
+        contagens = np.vstack(self._linhas)
+        frequencia = np.count_nonzero(contagens, axis=0)
+        self._idf = (np.log((1 + len(contagens)) / (1 + frequencia)) + 1).astype(np.float32)
+        matriz = contagens * self._idf
+        matriz /= np.linalg.norm(matriz, axis=1, keepdims=True)
+        self._matriz = matriz
+
+    def buscar(self, objeto: str, limiar: float = 0.0, quantidade: int = 1) -> list[tuple[float, str, object]]:
+        """Até `quantidade` (similaridade, objeto, valor) com similaridade >= limiar, da maior para a menor."""
+        normalizado = normalizar_objeto(objeto)
+        if not normalizado or not self.objetos:
+            return []
+        linha = self._normalizados.get(normalizado)
+        if linha is not None and quantidade == 1:
+            return [(1.0, self.objetos[linha], self.valores[linha])]
+        if self._matriz is None:
+            self._preparar()
+        consulta = _contagens(normalizado) * self._idf
+        consulta /= np.linalg.norm(consulta)
+        similaridades = self._matriz @ consulta
+        if quantidade < len(similaridades):
+            candidatas = np.argpartition(-similaridades, quantidade)[:quantidade]
+        else:
+            candidatas = np.arange(len(similaridades))
+        candidatas = candidatas[np.argsort(-similaridades[candidatas])]
+        return [
+            (float(similaridades[i]), self.objetos[i], self.valores[i])
+            for i in candidatas if similaridades[i] >= limiar
+        ]